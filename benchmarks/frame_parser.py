@@ -0,0 +1,134 @@
+"""Compare the frame parsing throughput of the old StreamReader based
+reader loop with the BufferedProtocol based FrameProtocol.
+
+Run with python3 -m benchmarks.frame_parser
+
+"""
+
+import time
+import asyncio
+import argparse
+
+import bitstruct
+
+from bunga.transport import FrameProtocol
+from bunga.transport import pack_header
+
+
+CF_HEADER = bitstruct.compile('u8u24')
+
+
+class Transport:
+
+    def pause_reading(self):
+        pass
+
+    def resume_reading(self):
+        pass
+
+
+def create_data(number_of_frames, payload_size):
+    frame = pack_header(2, payload_size) + payload_size * b'x'
+
+    return number_of_frames * frame
+
+
+async def stream_reader_frames(data, chunk_size):
+    """The reader loop before the FrameProtocol; two readexactly() per
+    frame and a bitstruct header decode.
+
+    """
+
+    reader = asyncio.StreamReader()
+
+    async def feed():
+        for offset in range(0, len(data), chunk_size):
+            reader.feed_data(data[offset:offset + chunk_size])
+            await asyncio.sleep(0)
+
+        reader.feed_eof()
+
+    task = asyncio.create_task(feed())
+    count = 0
+
+    try:
+        while True:
+            header = await reader.readexactly(4)
+            _, size = CF_HEADER.unpack(header)
+            await reader.readexactly(size)
+            count += 1
+    except asyncio.IncompleteReadError:
+        pass
+
+    await task
+
+    return count
+
+
+async def frame_protocol_frames(data, chunk_size):
+    protocol = FrameProtocol()
+    protocol.connection_made(Transport())
+    view = memoryview(data)
+
+    async def feed():
+        offset = 0
+
+        while offset < len(data):
+            buffer = protocol.get_buffer(-1)
+            size = min(len(buffer), chunk_size, len(data) - offset)
+            buffer[:size] = view[offset:offset + size]
+            protocol.buffer_updated(size)
+            offset += size
+            await asyncio.sleep(0)
+
+        protocol.connection_lost(None)
+
+    task = asyncio.create_task(feed())
+    count = 0
+
+    try:
+        while True:
+            count += len(await protocol.read_frames())
+    except ConnectionResetError:
+        pass
+
+    await task
+
+    return count
+
+
+def measure(function, data, chunk_size, number_of_frames):
+    start_time = time.perf_counter()
+    count = asyncio.run(function(data, chunk_size))
+    elapsed_time = time.perf_counter() - start_time
+
+    if count != number_of_frames:
+        raise Exception(f'Expected {number_of_frames} frames, got {count}.')
+
+    return number_of_frames / elapsed_time
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--number-of-frames', type=int, default=200000)
+    parser.add_argument('-c', '--chunk-size', type=int, default=65536)
+    args = parser.parse_args()
+
+    print('PAYLOAD  BEFORE [frames/s]  AFTER [frames/s]  SPEEDUP')
+
+    for payload_size in [2, 96, 448]:
+        data = create_data(args.number_of_frames, payload_size)
+        before = measure(stream_reader_frames,
+                         data,
+                         args.chunk_size,
+                         args.number_of_frames)
+        after = measure(frame_protocol_frames,
+                        data,
+                        args.chunk_size,
+                        args.number_of_frames)
+        print(f'{payload_size:<7}  {before:<17.0f}  {after:<16.0f}  '
+              f'{after / before:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
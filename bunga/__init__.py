@@ -1,11 +1,70 @@
 import sys
 import argparse
 import logging
+import importlib
 
 from .version import __version__
-from .client import Client
-from .client import ClientThread
-from .client import ExecuteCommandError
+
+
+# Public classes and the modules they are imported from when first
+# used, as importing the client takes longer than most commands take
+# to execute.
+LAZY_ATTRIBUTES = {
+    'Client': 'client',
+    'ClientThread': 'client',
+    'ExecuteCommandError': 'client',
+    'Fleet': 'fleet',
+    'FleetResult': 'fleet',
+    'ReconnectPolicy': 'reconnect',
+    'FixedDelay': 'reconnect',
+    'ExponentialBackoff': 'reconnect',
+    'DecorrelatedJitter': 'reconnect',
+    'Server': 'server'
+}
+
+# Subcommands and their modules, in help order.
+SUBCOMMANDS = {
+    'shell': 'shell',
+    'get_file': 'get_file',
+    'put_file': 'put_file',
+    'get_tree': 'get_tree',
+    'put_tree': 'put_tree',
+    'log': 'log',
+    'execute': 'execute',
+    'plot': 'plot',
+    'top': 'top',
+    'netstat': 'netstat',
+    'fleet_execute': 'fleet_execute',
+    'fleet-execute': 'fleet_execute',
+    'bench': 'bench',
+    'agent': 'agent'
+}
+
+
+def __getattr__(name):
+    if name not in LAZY_ATTRIBUTES:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+    module = importlib.import_module(f'.{LAZY_ATTRIBUTES[name]}', __name__)
+
+    return getattr(module, name)
+
+
+def find_subcommand(argv):
+    """Returns the subcommand in given command line arguments, or
+    ``None`` if missing.
+
+    """
+
+    arguments = iter(argv)
+
+    for argument in arguments:
+        if argument in ['-l', '--log-level']:
+            next(arguments, None)
+        elif not argument.startswith('-'):
+            return argument
+
+    return None
 
 
 def main():
@@ -28,21 +87,20 @@ def main():
                                        dest='subcommand')
     subparsers.required = True
 
-    # Import when used for less dependencies. For example, curses is
-    # not part of all Python builds.
-    from .subparsers import shell
-    from .subparsers import get_file
-    from .subparsers import put_file
-    from .subparsers import log
-    from .subparsers import execute
-    from .subparsers import plot
-
-    shell.add_subparser(subparsers)
-    get_file.add_subparser(subparsers)
-    put_file.add_subparser(subparsers)
-    log.add_subparser(subparsers)
-    execute.add_subparser(subparsers)
-    plot.add_subparser(subparsers)
+    # Only import the given subcommand for less dependencies and a
+    # faster start. For example, curses is not part of all Python
+    # builds. All are imported for help and errors.
+    subcommand = find_subcommand(sys.argv[1:])
+
+    if subcommand in SUBCOMMANDS:
+        modules = [SUBCOMMANDS[subcommand]]
+    else:
+        modules = sorted(set(SUBCOMMANDS.values()),
+                         key=list(SUBCOMMANDS.values()).index)
+
+    for module in modules:
+        module = importlib.import_module(f'.subparsers.{module}', __name__)
+        module.add_subparser(subparsers)
 
     args = parser.parse_args()
 
@@ -0,0 +1,275 @@
+"""An agent keeping connections to servers open, shared by command line
+invocations over a Unix socket instead of each connecting on its own.
+
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+
+from .agent_client import FrameType
+from .agent_client import FRAME_SIZE_MAX
+from .agent_client import HEADER
+from .agent_client import HEADER_SIZE
+from .agent_client import pack_frame
+from .agent_client import pack_json_frame
+from .client import Client
+from .client import ExecuteCommandError
+from .reconnect import DecorrelatedJitter
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Seconds to wait for a server connection before failing a request.
+CONNECT_TIMEOUT = 10
+
+# Maximum seconds between reconnect attempts.
+RECONNECT_DELAY_MAX = 30
+
+# Bytes buffered for a command line invocation before getting more
+# file data from the server is paused.
+FRAME_WRITER_BUFFER_SIZE_MAX = 1024 * 1024
+
+
+class ClosedError(Exception):
+    """The command line invocation closed its connection.
+
+    """
+
+
+class FrameWriter:
+    """Sends data written to it as data frames, for getting files to
+    standard output. Paused when more than
+    FRAME_WRITER_BUFFER_SIZE_MAX bytes are buffered, for example as
+    standard output is piped to a slow reader, so the file is not
+    buffered in the agent.
+
+    """
+
+    def __init__(self, writer):
+        self._writer = writer
+
+    def open(self, size):
+        pass
+
+    def write(self, data):
+        for offset in range(0, len(data), FRAME_SIZE_MAX):
+            self._writer.write(pack_frame(FrameType.DATA,
+                                          data[offset:offset + FRAME_SIZE_MAX]))
+
+    def is_paused(self):
+        return (self._writer.transport.get_write_buffer_size()
+                > FRAME_WRITER_BUFFER_SIZE_MAX)
+
+    async def drain(self):
+        await self._writer.drain()
+
+    def close(self):
+        pass
+
+
+class Agent:
+    """Keeps a connection to each server in `uris`, and to each server
+    requested by a command line invocation, listening for requests on
+    a Unix socket at `path`.
+
+    Lost connections are re-established as given by
+    `reconnect_policy`, by default with decorrelated jitter so that
+    servers restarted at the same time, for example by a switch
+    reboot, are not reconnected to all at once.
+
+    """
+
+    def __init__(self,
+                 path,
+                 uris=None,
+                 connect_timeout=CONNECT_TIMEOUT,
+                 reconnect_policy=None):
+        if reconnect_policy is None:
+            reconnect_policy = DecorrelatedJitter(cap=RECONNECT_DELAY_MAX)
+
+        self._path = path
+        self._connect_timeout = connect_timeout
+        self._reconnect_policy = reconnect_policy
+        self._clients = {}
+        self._listener = None
+
+        for uri in uris or []:
+            self._create_client(uri)
+
+    async def start(self):
+        if os.path.exists(self._path):
+            os.remove(self._path)
+
+        # Only the user may connect, also between bind and listen.
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o077)
+
+        try:
+            sock.bind(self._path)
+        except BaseException:
+            sock.close()
+            raise
+        finally:
+            os.umask(umask)
+
+        self._listener = await asyncio.start_unix_server(self._on_connected,
+                                                         sock=sock)
+
+        for client in self._clients.values():
+            client.start()
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.close()
+            await self._listener.wait_closed()
+            self._listener = None
+            os.remove(self._path)
+
+        for client in self._clients.values():
+            client.stop()
+
+        self._clients.clear()
+
+    async def serve_forever(self):
+        if self._listener is None:
+            await self.start()
+
+        async with self._listener:
+            await self._listener.serve_forever()
+
+    def _create_client(self, uri):
+        client = Client(uri,
+                        asyncio.get_event_loop(),
+                        reconnect_policy=self._reconnect_policy)
+        self._clients[uri] = client
+
+        return client
+
+    async def _connected_client(self, uri):
+        client = self._clients.get(uri)
+
+        if client is None:
+            client = self._create_client(uri)
+            client.start()
+
+        try:
+            await client.wait_for_connection(self._connect_timeout)
+        except asyncio.TimeoutError:
+            raise Exception(f"Not connected to '{uri}'.")
+
+        return client
+
+    async def _execute(self, client, request, writer):
+        async for chunk in client.execute_command_stream(request['command']):
+            writer.write(pack_frame(FrameType.DATA, chunk))
+            await writer.drain()
+
+    async def _get_file(self, client, request, writer):
+        local_path = request['local_path']
+
+        if local_path is None:
+            local_path = FrameWriter(writer)
+
+        await client.get_file(request['remote_path'],
+                              local_path,
+                              window_size=request.get('window_size'),
+                              preallocate=request.get('preallocate', False),
+                              offset=request.get('offset', 0),
+                              length=request.get('length'),
+                              compress=request.get('compress', True),
+                              verify=request.get('verify', False))
+
+    async def _put_file(self, client, request, writer):
+        local_path = request['local_path']
+        size = os.stat(local_path).st_size
+
+        with open(local_path, 'rb') as fin:
+            if request.get('delta', False):
+                return await client.put_file_delta(
+                    fin,
+                    size,
+                    request['remote_path'],
+                    compress=request.get('compress', True),
+                    verify=request.get('verify', False))
+            else:
+                await client.put_file(fin,
+                                      size,
+                                      request['remote_path'],
+                                      compress=request.get('compress', True),
+                                      verify=request.get('verify', False))
+
+    async def _handle_request(self, request, writer):
+        operations = {
+            'execute': self._execute,
+            'get_file': self._get_file,
+            'put_file': self._put_file
+        }
+        operation = operations.get(request.get('operation'))
+
+        if operation is None:
+            raise Exception(f"Invalid operation '{request.get('operation')}'.")
+
+        client = await self._connected_client(request['uri'])
+
+        return await operation(client, request, writer)
+
+    async def _handle_request_until_closed(self, request, reader, writer):
+        """Handle given request, but cancel it if the command line
+        invocation closes its connection, for example as it is killed.
+
+        """
+
+        task = asyncio.ensure_future(self._handle_request(request, writer))
+        closed = asyncio.ensure_future(reader.read(1))
+
+        try:
+            await asyncio.wait([task, closed],
+                               return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            closed.cancel()
+
+            if not task.done():
+                task.cancel()
+                await asyncio.wait([task])
+
+        if task.cancelled():
+            raise ClosedError()
+
+        return task.result()
+
+    async def _on_connected(self, reader, writer):
+        result = None
+        error = None
+
+        try:
+            header = HEADER.unpack(await reader.readexactly(HEADER_SIZE))[0]
+            payload = await reader.readexactly(header & 0xffffff)
+
+            if (header >> 24) != FrameType.REQUEST:
+                raise Exception('Expected a request.')
+
+            result = await self._handle_request_until_closed(
+                json.loads(payload),
+                reader,
+                writer)
+        except ExecuteCommandError as e:
+            error = e.error
+        except (asyncio.IncompleteReadError, ClosedError):
+            writer.close()
+
+            return
+        except Exception as e:
+            LOGGER.info('Request failed with %r.', e)
+            error = str(e)
+
+        try:
+            writer.write(pack_json_frame(FrameType.RESPONSE,
+                                         {'result': result, 'error': error}))
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+        writer.close()
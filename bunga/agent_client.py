@@ -0,0 +1,111 @@
+"""Sends requests to a running agent over its Unix socket. Only uses
+modules that are fast to import, as it is used by one-shot command
+line invocations.
+
+"""
+
+import json
+import os
+import socket
+import struct
+
+
+# Frame type in the upper 8 bits and payload size in the lower 24
+# bits, as in the bunga protocol.
+HEADER = struct.Struct('>I')
+HEADER_SIZE = HEADER.size
+
+# Maximum payload size of a frame.
+FRAME_SIZE_MAX = 0xffffff
+
+
+class FrameType:
+
+    # A JSON object with the operation and its arguments.
+    REQUEST = 1
+    # File data or command output.
+    DATA = 2
+    # A JSON object with the result or an error. Always last.
+    RESPONSE = 3
+
+
+class AgentError(Exception):
+
+    def __init__(self, error):
+        super().__init__(error)
+        self.error = error
+
+
+def default_socket_path():
+    """Returns the socket path of the agent, either from the
+    BUNGA_AGENT_SOCKET environment variable or ~/.bunga-agent.sock.
+
+    """
+
+    path = os.environ.get('BUNGA_AGENT_SOCKET')
+
+    if not path:
+        path = os.path.expanduser('~/.bunga-agent.sock')
+
+    return path
+
+
+def pack_frame(frame_type, payload):
+    return HEADER.pack((frame_type << 24) | len(payload)) + payload
+
+
+def pack_json_frame(frame_type, value):
+    return pack_frame(frame_type, json.dumps(value).encode())
+
+
+def _recv_exactly(sock, size):
+    data = bytearray()
+
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+
+        if not chunk:
+            raise AgentError('Connection to agent lost.')
+
+        data += chunk
+
+    return bytes(data)
+
+
+def call(operation, arguments, on_data=None, path=None):
+    """Execute given operation with given arguments on the agent's
+    connection to ``arguments['uri']``. Calls `on_data` with each
+    received data chunk. Returns the result of the operation, or
+    raises AgentError on failure.
+
+    """
+
+    if path is None:
+        path = default_socket_path()
+
+    request = dict(arguments)
+    request['operation'] = operation
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(path)
+        except OSError as e:
+            raise AgentError(f"No agent at '{path}': {e.strerror}")
+
+        sock.sendall(pack_json_frame(FrameType.REQUEST, request))
+
+        while True:
+            header = HEADER.unpack(_recv_exactly(sock, HEADER_SIZE))[0]
+            payload = _recv_exactly(sock, header & 0xffffff)
+            frame_type = (header >> 24)
+
+            if frame_type == FrameType.DATA:
+                if on_data is not None:
+                    on_data(payload)
+            elif frame_type == FrameType.RESPONSE:
+                response = json.loads(payload)
+
+                if response['error'] is not None:
+                    raise AgentError(response['error'])
+
+                return response['result']
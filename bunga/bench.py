@@ -0,0 +1,458 @@
+"""Benchmarks of all protocol operations against a local server, over
+loopback.
+
+"""
+
+import asyncio
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+from . import proc
+from .agent import Agent
+from .client import Client
+from .server import MAXIMUM_MESSAGE_SIZE
+from .server import PUT_FILE_WINDOW_SIZE
+from .server import ServerThread
+from .version import __version__
+
+
+# Default benchmark parameters.
+EXECUTE_COMMAND_ITERATIONS = 1000
+FILE_SIZE = 8 * 1024 * 1024
+MESSAGE_SIZES = [4096, 16384, 65536]
+WINDOW_SIZES = [1, 10, 100]
+LOG_ENTRIES = 10000
+STARTUP_ITERATIONS = 20
+PROC_PARSE_ITERATIONS = 1000
+
+# Size of the system described by the /proc files in the parse
+# benchmark.
+PROC_CPUS = 64
+PROC_NET_DEVICES = 32
+PROC_DISKS = 64
+
+# Log entries sent in each event loop iteration in the log benchmark.
+LOG_ENTRIES_BATCH_SIZE = 100
+
+
+def percentile(values, percent):
+    """Returns given percentile of given sorted values, using the nearest
+    rank method.
+
+    """
+
+    index = max(int(len(values) * percent / 100 + 0.5) - 1, 0)
+
+    return values[min(index, len(values) - 1)]
+
+
+def latency_statistics(latencies, scale=1000000):
+    """Returns latency statistics of given latencies in seconds, by
+    default in microseconds.
+
+    """
+
+    latencies = sorted(scale * latency for latency in latencies)
+
+    return {
+        'min': round(latencies[0], 1),
+        'mean': round(sum(latencies) / len(latencies), 1),
+        'p50': round(percentile(latencies, 50), 1),
+        'p90': round(percentile(latencies, 90), 1),
+        'p99': round(percentile(latencies, 99), 1),
+        'max': round(latencies[-1], 1)
+    }
+
+
+def throughput(size, seconds):
+    return round(size / seconds / 1000000, 2)
+
+
+async def nop(argv):
+    return b''
+
+
+def start_server(root, maximum_message_size, put_file_window_size):
+    """Start a server in its own thread, with a command doing nothing, for
+    measuring the protocol overhead.
+
+    """
+
+    server = ServerThread(root, maximum_message_size, put_file_window_size)
+    server.server.add_command('nop', nop)
+    server.start()
+
+    return server
+
+
+class BenchClient(Client):
+
+    def __init__(self, uri, maximum_message_size):
+        super().__init__(uri,
+                         asyncio.get_event_loop(),
+                         maximum_message_size=maximum_message_size)
+        self.log_entries_expected = 0
+        self.log_entries_received = 0
+        self.log_entries_done = asyncio.Event()
+
+    async def on_log_entry_ind(self, message):
+        self.log_entries_received += 1
+
+        if self.log_entries_received == self.log_entries_expected:
+            self.log_entries_done.set()
+
+
+class Bench:
+    """Runs benchmarks against servers in a temporary directory. Each
+    benchmark method returns its results as a JSON serializable
+    dictionary.
+
+    """
+
+    def __init__(self, root):
+        self._root = root
+
+    async def _connect(self, maximum_message_size, put_file_window_size):
+        server = start_server(self._root,
+                              maximum_message_size,
+                              put_file_window_size)
+        client = BenchClient(server.uri, maximum_message_size)
+        client.start()
+        await client.wait_for_connection()
+
+        return server, client
+
+    async def _disconnect(self, server, client):
+        client.stop()
+        await asyncio.get_event_loop().run_in_executor(None, server.stop)
+
+    async def execute_command(self, iterations):
+        """Round trip latency of a command without output.
+
+        """
+
+        server, client = await self._connect(MAXIMUM_MESSAGE_SIZE,
+                                             PUT_FILE_WINDOW_SIZE)
+
+        try:
+            # Warm up.
+            await client.execute_command('nop')
+            latencies = []
+
+            for _ in range(iterations):
+                start_time = time.perf_counter()
+                await client.execute_command('nop')
+                latencies.append(time.perf_counter() - start_time)
+        finally:
+            await self._disconnect(server, client)
+
+        return {
+            'iterations': iterations,
+            'latency_us': latency_statistics(latencies)
+        }
+
+    async def _transfer(self, data, message_size, window_size, compress):
+        server, client = await self._connect(message_size, window_size)
+
+        try:
+            start_time = time.perf_counter()
+            await client.put_file(BytesIO(data),
+                                  len(data),
+                                  '/bench.bin',
+                                  compress=compress)
+            put_seconds = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            received = await client.get_file('/bench.bin',
+                                             window_size=window_size,
+                                             compress=compress)
+            get_seconds = time.perf_counter() - start_time
+        finally:
+            await self._disconnect(server, client)
+
+        os.remove(os.path.join(self._root, 'bench.bin'))
+
+        if received != data:
+            raise Exception('Got file data differs from put file data.')
+
+        return put_seconds, get_seconds
+
+    async def files(self, size, message_sizes, window_sizes, compress):
+        """Put file and get file throughput in MB/s for all combinations of
+        given maximum message sizes and window sizes.
+
+        """
+
+        data = os.urandom(size)
+        put_results = []
+        get_results = []
+
+        for message_size in message_sizes:
+            for window_size in window_sizes:
+                put_seconds, get_seconds = await self._transfer(data,
+                                                                message_size,
+                                                                window_size,
+                                                                compress)
+
+                for results, seconds in [(put_results, put_seconds),
+                                         (get_results, get_seconds)]:
+                    results.append({
+                        'maximum_message_size': message_size,
+                        'window_size': window_size,
+                        'size': size,
+                        'seconds': round(seconds, 6),
+                        'mb_per_second': throughput(size, seconds)
+                    })
+
+        return put_results, get_results
+
+    async def _send_log_entries(self, server, count):
+        for i in range(count):
+            server.log('A benchmark log entry.')
+
+            if i % LOG_ENTRIES_BATCH_SIZE == 0:
+                await asyncio.sleep(0)
+
+    async def log_entries(self, count):
+        """Number of log entry indications per second received by a client.
+
+        """
+
+        server, client = await self._connect(MAXIMUM_MESSAGE_SIZE,
+                                             PUT_FILE_WINDOW_SIZE)
+
+        try:
+            client.log_entries_expected = count
+            start_time = time.perf_counter()
+            server.run_coroutine(self._send_log_entries(server.server, count))
+            await client.log_entries_done.wait()
+            seconds = time.perf_counter() - start_time
+        finally:
+            await self._disconnect(server, client)
+
+        return {
+            'count': count,
+            'seconds': round(seconds, 6),
+            'per_second': round(count / seconds)
+        }
+
+
+def proc_samples():
+    """Returns /proc file names, their parsers and contents for the parse
+    benchmark, as of a large system.
+
+    """
+
+    stat = ['cpu  4812 0 859 177717 213 0 97 0 0 0']
+    stat += [
+        f'cpu{cpu} {cpu} 0 {cpu + 13} 2777 3 0 {cpu + 1} 0 0 0'
+        for cpu in range(PROC_CPUS)
+    ]
+    stat += [
+        'intr 60213 9 0 0 0 0 0 0 0 1 0 0 0 0 0 0 0',
+        'ctxt 120713',
+        'btime 1792318981',
+        'processes 1095',
+        'procs_running 1',
+        'procs_blocked 0',
+        'softirq 31016 0 10071 2 1290 0 0 3 9810 0 9840'
+    ]
+    process_stat = (
+        '49 (bunga_server) S 1 49 49 0 -1 4194368 735 0 0 0 74 241 0 0 20 0 '
+        '9 0 248 5316608 930 4294967295 65536 923972 3196878608 0 0 0 0 0 '
+        '0 1 0 0 -1 0 0 0 0 0 0 991224 991996 1011712 3196878814 3196878820 '
+        '3196878820 3196878838 0')
+    meminfo = [
+        f'{key}: {1024 * index:15} kB'
+        for index, key in enumerate(
+            ['MemTotal', 'MemFree', 'MemAvailable', 'Buffers', 'Cached',
+             'SwapCached', 'Active', 'Inactive', 'Active(anon)',
+             'Inactive(anon)', 'Active(file)', 'Inactive(file)', 'Unevictable',
+             'Mlocked', 'SwapTotal', 'SwapFree', 'Dirty', 'Writeback',
+             'AnonPages', 'Mapped', 'Shmem', 'KReclaimable', 'Slab',
+             'SReclaimable', 'SUnreclaim', 'KernelStack', 'PageTables',
+             'NFS_Unstable', 'Bounce', 'WritebackTmp', 'CommitLimit',
+             'Committed_AS', 'VmallocTotal', 'VmallocUsed', 'VmallocChunk',
+             'Percpu', 'AnonHugePages', 'ShmemHugePages', 'ShmemPmdMapped',
+             'FileHugePages', 'FilePmdMapped', 'Hugetlb', 'DirectMap4k',
+             'DirectMap2M', 'DirectMap1G'],
+            1)
+    ]
+    meminfo += [
+        'HugePages_Total:       0',
+        'HugePages_Free:        0',
+        'HugePages_Rsvd:        0',
+        'HugePages_Surp:        0',
+        'Hugepagesize:       2048 kB'
+    ]
+    net_dev = [
+        'Inter-|   Receive                                                |'
+        '  Transmit',
+        ' face |bytes    packets errs drop fifo frame compressed multicast|'
+        'bytes    packets errs drop fifo colls carrier compressed'
+    ]
+    net_dev += [
+        f'  eth{device}: 69081024    3155    0    0    0     0          0'
+        '         0   290894    2680    0    0    0     0       0          0'
+        for device in range(PROC_NET_DEVICES)
+    ]
+    diskstats = [
+        f' 259 {disk} nvme0n{disk} 45031 8123 3521470 9912 108274 60291 '
+        '7462994 107355 0 83608 121287 0 0 0 0 4107 4019'
+        for disk in range(PROC_DISKS)
+    ]
+
+    return [
+        ('/proc/stat', proc.parse_stat, '\n'.join(stat) + '\n'),
+        ('/proc/<pid>/stat', proc.parse_process_stat, process_stat),
+        ('/proc/meminfo', proc.parse_meminfo, '\n'.join(meminfo) + '\n'),
+        ('/proc/net/dev', proc.parse_net_dev, '\n'.join(net_dev) + '\n'),
+        ('/proc/diskstats', proc.parse_diskstats, '\n'.join(diskstats) + '\n'),
+        ('/proc/loadavg', proc.parse_loadavg, '0.49 0.45 0.46 3/35 102\n')
+    ]
+
+
+def proc_parse(iterations):
+    """Parse throughput of each /proc file parser, in parses and MB per
+    second.
+
+    """
+
+    results = []
+
+    for name, parse, text in proc_samples():
+        # Warm up.
+        parse(text)
+        start_time = time.perf_counter()
+
+        for _ in range(iterations):
+            parse(text)
+
+        seconds = time.perf_counter() - start_time
+        results.append({
+            'file': name,
+            'size': len(text),
+            'iterations': iterations,
+            'seconds': round(seconds, 6),
+            'per_second': round(iterations / seconds),
+            'mb_per_second': throughput(len(text) * iterations, seconds)
+        })
+
+    return results
+
+
+def run_command(command, env=None):
+    """Returns the time in seconds to run given Python command line
+    arguments in a new interpreter, with given additional environment
+    variables.
+
+    """
+
+    env = dict(os.environ, **(env or {}))
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))]
+        + [path for path in [env.get('PYTHONPATH')] if path])
+    start_time = time.perf_counter()
+    subprocess.run([sys.executable] + command,
+                   env=env,
+                   stdout=subprocess.DEVNULL,
+                   check=True)
+
+    return time.perf_counter() - start_time
+
+
+async def start_agent(path, uris):
+    agent = Agent(path, uris)
+    await agent.start()
+
+    return agent
+
+
+def startup(iterations):
+    """Time to execute a command with a bunga command against a local
+    server, both connecting on its own and over an agent, and, for
+    comparison, to start and exit the interpreter.
+
+    """
+
+    bunga_times = []
+    agent_times = []
+    python_times = []
+
+    with tempfile.TemporaryDirectory() as root:
+        server = start_server(root, MAXIMUM_MESSAGE_SIZE, PUT_FILE_WINDOW_SIZE)
+        path = os.path.join(root, 'agent.sock')
+        agent = server.run_coroutine(start_agent(path, [server.uri])).result()
+        command = ['-m', 'bunga', 'execute', '--uri', server.uri, 'nop']
+        agent_command = command[:3] + ['--agent'] + command[3:]
+        agent_env = {'BUNGA_AGENT_SOCKET': path}
+
+        try:
+            # Warm up, and wait for the agent to connect.
+            run_command(command)
+            run_command(agent_command, agent_env)
+
+            for _ in range(iterations):
+                bunga_times.append(run_command(command))
+                agent_times.append(run_command(agent_command, agent_env))
+                python_times.append(run_command(['-c', 'pass']))
+        finally:
+            server.run_coroutine(agent.stop()).result()
+            server.stop()
+
+    return {
+        'iterations': iterations,
+        'command': 'bunga execute nop',
+        'time_ms': latency_statistics(bunga_times, 1000),
+        'agent_command': 'bunga execute --agent nop',
+        'agent_time_ms': latency_statistics(agent_times, 1000),
+        'python_time_ms': latency_statistics(python_times, 1000)
+    }
+
+
+async def bench(iterations=EXECUTE_COMMAND_ITERATIONS,
+                size=FILE_SIZE,
+                message_sizes=None,
+                window_sizes=None,
+                log_entries=LOG_ENTRIES,
+                compress=False,
+                startup_iterations=STARTUP_ITERATIONS,
+                proc_parse_iterations=PROC_PARSE_ITERATIONS):
+    """Run all benchmarks and return their results as a JSON serializable
+    dictionary.
+
+    """
+
+    if message_sizes is None:
+        message_sizes = MESSAGE_SIZES
+
+    if window_sizes is None:
+        window_sizes = WINDOW_SIZES
+
+    with tempfile.TemporaryDirectory() as root:
+        bench = Bench(root)
+        execute_command = await bench.execute_command(iterations)
+        put_file, get_file = await bench.files(size,
+                                               message_sizes,
+                                               window_sizes,
+                                               compress)
+        log_entry_ind = await bench.log_entries(log_entries)
+
+    startup_time = startup(startup_iterations)
+    proc_parse_results = proc_parse(proc_parse_iterations)
+
+    return {
+        'version': __version__,
+        'python': platform.python_version(),
+        'compress': compress,
+        'execute_command': execute_command,
+        'put_file': put_file,
+        'get_file': get_file,
+        'log_entry_ind': log_entry_ind,
+        'startup': startup_time,
+        'proc_parse': proc_parse_results
+    }
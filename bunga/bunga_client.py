@@ -1,17 +1,25 @@
-# This file was generated by Messi.
+# This file was generated by Messi, but has since been extended by
+# hand and is no longer regenerated. Hand written transport code, not
+# specific to the bunga protocol, is in transport.py.
 
 import asyncio
 import logging
-import bitstruct
+from collections import deque
+import time
 
 from . import bunga_pb2
+from .decoder import decode_server_to_client
+from .decoder import is_enabled as is_fast_decoding_enabled
+from .transport import ConnectStatistics
+from .transport import ConnectionClosedError
+from .transport import FrameProtocol
+from .transport import RoundTripTime
+from .transport import WRITE_HIGH_WATER_MARK
+from .transport import pack_header
 
 
 LOGGER = logging.getLogger(__name__)
 
-CF_HEADER = bitstruct.compile('u8u24')
-
-
 class MessageType:
 
     CLIENT_TO_SERVER_USER = 1
@@ -44,12 +52,21 @@ class BungaClient:
         self._uri = uri
         self._keep_alive_interval = keep_alive_interval
         self._connect_timeout = connect_timeout
-        self._reader = None
-        self._writer = None
+        self._protocol = None
+        self._transport = None
+        self._maximum_frame_size = 0
         self._task = None
         self._keep_alive_task = None
-        self._pong_event = None
+        self._keep_alive_interval_changed = None
+        self._ping_times = deque()
+        self.rtt = RoundTripTime()
+        self.connect_statistics = ConnectStatistics()
+        self._connect_rsp_received = False
         self._output = None
+        self._write_chunks = []
+        self._write_size = 0
+        self._flush_scheduled = False
+        self._fast_decoding = is_fast_decoding_enabled()
 
     def start(self):
         """Connect to the server. `on_connected()` is called once
@@ -71,15 +88,37 @@ class BungaClient:
             self._task = None
 
     def send(self):
-        """Send prepared message to the server.
+        """Send prepared message to the server. Messages sent in the same
+        event loop iteration are written to the socket together.
 
         """
 
         encoded = self._output.SerializeToString()
-        header = CF_HEADER.pack(MessageType.CLIENT_TO_SERVER_USER, len(encoded))
+        self._write(pack_header(MessageType.CLIENT_TO_SERVER_USER, len(encoded)),
+                    encoded)
+
+    def set_keep_alive_interval(self, interval):
+        """Set the number of seconds between pings, for example to the keep
+        alive timeout received from the server. The next ping is sent
+        given number of seconds from now.
+
+        """
+
+        self._keep_alive_interval = interval
+
+        if self._keep_alive_interval_changed is not None:
+            self._keep_alive_interval_changed.set()
+
+    def flush(self):
+        """Write all sent messages to the socket now instead of at the end
+        of the event loop iteration.
+
+        """
 
-        if self._writer is not None:
-            self._writer.write(header + encoded)
+        if self._write_chunks:
+            self._transport.writelines(self._write_chunks)
+            self._write_chunks = []
+            self._write_size = 0
 
     async def on_connected(self):
         """Called when connected to the server.
@@ -103,6 +142,15 @@ class BungaClient:
         else:
             return 1
 
+    async def on_connection_lost(self):
+        """Called when an established connection to the server is
+        lost. Returns the number of seconds to wait before trying to
+        connect again, or ``None`` never to connect again.
+
+        """
+
+        return 0
+
     async def on_connect_rsp(self, message):
         """Called when a connect_rsp message is received from the server.
 
@@ -128,6 +176,16 @@ class BungaClient:
 
         """
 
+    async def on_find_blocks_rsp(self, message):
+        """Called when a find_blocks_rsp message is received from the server.
+
+        """
+
+    async def on_list_files_rsp(self, message):
+        """Called when a list_files_rsp message is received from the server.
+
+        """
+
     def init_connect_req(self):
         """Prepare a connect_req message. Call `send()` to send it.
 
@@ -168,89 +226,242 @@ class BungaClient:
 
         return self._output.put_file_req
 
+    def init_find_blocks_req(self):
+        """Prepare a find_blocks_req message. Call `send()` to send it.
+
+        """
+
+        self._output = bunga_pb2.ClientToServer()
+        self._output.find_blocks_req.SetInParent()
+
+        return self._output.find_blocks_req
+
+    def init_list_files_req(self):
+        """Prepare a list_files_req message. Call `send()` to send it.
+
+        """
+
+        self._output = bunga_pb2.ClientToServer()
+        self._output.list_files_req.SetInParent()
+
+        return self._output.list_files_req
+
     async def _main(self):
+        statistics = self.connect_statistics
+
         while True:
             if not await self._connect():
                 break
 
+            self._connect_rsp_received = False
             await self.on_connected()
-            self._pong_event = asyncio.Event()
+            self._ping_times.clear()
+            self._keep_alive_interval_changed = asyncio.Event()
             self._keep_alive_task = asyncio.create_task(self._keep_alive_main())
 
+            stopped = False
+
             try:
                 await self._reader_loop()
             except (Exception, asyncio.CancelledError) as e:
                 LOGGER.info('Reader loop stopped by %r.', e)
                 self._close()
+                stopped = isinstance(e, asyncio.CancelledError)
 
             self._keep_alive_task.cancel()
             await self.on_disconnected()
 
+            if stopped:
+                break
+
+            if self._connect_rsp_received:
+                statistics.consecutive_failures += 1
+                delay = await self.on_connection_lost()
+            else:
+                LOGGER.info("Connection closed before connect response.")
+                statistics.closed += 1
+                statistics.consecutive_failures += 1
+                delay = await self.on_connect_failure(ConnectionClosedError(
+                    'Connection closed before connect response.'))
+
+            if not await self._wait_before_reconnect(delay):
+                break
+
+    async def _wait_before_reconnect(self, delay):
+        """Wait given number of seconds before reconnecting. Returns
+        ``False`` if `delay` is ``None``, never to reconnect.
+
+        """
+
+        if delay is None:
+            return False
+
+        statistics = self.connect_statistics
+        statistics.delay = delay
+        statistics.total_delay += delay
+        await asyncio.sleep(delay)
+
+        return True
+
+    def _create_protocol(self):
+        return FrameProtocol(self._maximum_frame_size)
+
     async def _connect(self):
         """Repeatedly try to connect to the server. Returns ``True`` if a
         connection has been established, and ``False`` otherwise.
 
         """
 
+        statistics = self.connect_statistics
+
         while True:
+            statistics.attempts += 1
+
             try:
-                self._reader, self._writer = await asyncio.wait_for(
-                    asyncio.open_connection(self._address, self._port),
+                self._transport, self._protocol = await asyncio.wait_for(
+                    asyncio.get_event_loop().create_connection(
+                        self._create_protocol,
+                        self._address,
+                        self._port),
                     self._connect_timeout)
+                statistics.connects += 1
 
                 return True
             except ConnectionRefusedError as e:
                 LOGGER.info("Connection refused.")
+                statistics.refused += 1
+                statistics.consecutive_failures += 1
                 delay = await self.on_connect_failure(e)
             except asyncio.TimeoutError as e:
                 LOGGER.info("Connect timeout.")
+                statistics.timeouts += 1
+                statistics.consecutive_failures += 1
                 delay = await self.on_connect_failure(e)
             except OSError as e:
                 LOGGER.info("OS error: %s", e)
+                statistics.errors += 1
+                statistics.consecutive_failures += 1
                 delay = await self.on_connect_failure(e)
 
-            if delay is None:
+            if not await self._wait_before_reconnect(delay):
                 return False
 
-            await asyncio.sleep(delay)
-
     async def _handle_user_message(self, payload):
-        message = bunga_pb2.ServerToClient()
-        message.ParseFromString(payload)
-        choice = message.WhichOneof('messages')
+        # The most frequent messages are decoded without protobuf, if
+        # faster.
+        if self._fast_decoding:
+            choice, message = decode_server_to_client(payload)
+        else:
+            choice = None
 
-        if choice == 'connect_rsp':
-            await self.on_connect_rsp(message.connect_rsp)
-        elif choice == 'execute_command_rsp':
-            await self.on_execute_command_rsp(message.execute_command_rsp)
+        if choice is None:
+            message = bunga_pb2.ServerToClient()
+            message.ParseFromString(payload)
+            choice = message.WhichOneof('messages')
+
+            if choice is None:
+                return
+
+            message = getattr(message, choice)
+
+        if choice == 'get_file_rsp':
+            await self.on_get_file_rsp(message)
         elif choice == 'log_entry_ind':
-            await self.on_log_entry_ind(message.log_entry_ind)
-        elif choice == 'get_file_rsp':
-            await self.on_get_file_rsp(message.get_file_rsp)
+            await self.on_log_entry_ind(message)
+        elif choice == 'execute_command_rsp':
+            await self.on_execute_command_rsp(message)
+        elif choice == 'connect_rsp':
+            # The connection is established first when the server
+            # responds, as it may close it right away if busy.
+            self._connect_rsp_received = True
+            self.connect_statistics.consecutive_failures = 0
+            self.connect_statistics.delay = None
+            await self.on_connect_rsp(message)
         elif choice == 'put_file_rsp':
-            await self.on_put_file_rsp(message.put_file_rsp)
+            await self.on_put_file_rsp(message)
+        elif choice == 'find_blocks_rsp':
+            await self.on_find_blocks_rsp(message)
+        elif choice == 'list_files_rsp':
+            await self.on_list_files_rsp(message)
+
+    def _write(self, header, payload=b''):
+        if self._transport is None:
+            return
+
+        self._write_chunks.append(header)
+        self._write_size += len(header)
+
+        if payload:
+            self._write_chunks.append(payload)
+            self._write_size += len(payload)
+
+        if self._write_size >= WRITE_HIGH_WATER_MARK:
+            self.flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_event_loop().call_soon(self._on_flush)
+
+    def _on_flush(self):
+        self._flush_scheduled = False
+
+        if self._transport is not None:
+            self.flush()
 
     def _handle_pong(self):
-        self._pong_event.set()
+        # The server responds to pings in order.
+        if self._ping_times:
+            self.rtt.update(time.perf_counter() - self._ping_times.popleft())
 
     async def _reader_loop(self):
         while True:
-            header = await self._reader.readexactly(4)
-            message_type, size = CF_HEADER.unpack(header)
-            payload = await self._reader.readexactly(size)
-
-            if message_type == MessageType.SERVER_TO_CLIENT_USER:
-                await self._handle_user_message(payload)
-            elif message_type == MessageType.PONG:
-                self._handle_pong()
+            for message_type, payload in await self._protocol.read_frames():
+                if message_type == MessageType.SERVER_TO_CLIENT_USER:
+                    await self._handle_user_message(payload)
+                elif message_type == MessageType.PONG:
+                    self._handle_pong()
 
     async def _keep_alive_loop(self):
+        """Ping the server at a fixed rate, independent of the round trip
+        time, as the server disconnects clients that do not ping it
+        often enough. Several pings may thereby be in flight on links
+        with long round trip times.
+
+        """
+
+        ping_times = self._ping_times
+        ping_time = time.perf_counter()
+
         while True:
-            await asyncio.sleep(self._keep_alive_interval)
-            self._pong_event.clear()
-            self._writer.write(CF_HEADER.pack(MessageType.PING, 0))
-            await asyncio.wait_for(self._pong_event.wait(),
-                                   self._keep_alive_interval)
+            now = time.perf_counter()
+            next_ping_time = ping_time + self._keep_alive_interval
+
+            if ping_times:
+                # Wait longer than the interval for the pong on links
+                # with long or varying round trip times.
+                pong_deadline = ping_times[0] + self.rtt.timeout(
+                    2 * self._keep_alive_interval)
+
+                if now >= pong_deadline:
+                    raise asyncio.TimeoutError('No pong received.')
+            else:
+                pong_deadline = next_ping_time
+
+            if now >= next_ping_time:
+                self._write(pack_header(MessageType.PING, 0))
+                self.flush()
+                ping_times.append(now)
+                ping_time = now
+
+                continue
+
+            # Woken up early if the interval is changed.
+            self._keep_alive_interval_changed.clear()
+
+            try:
+                await asyncio.wait_for(self._keep_alive_interval_changed.wait(),
+                                       min(next_ping_time, pong_deadline) - now)
+            except asyncio.TimeoutError:
+                pass
 
     async def _keep_alive_main(self):
         try:
@@ -260,6 +471,7 @@ class BungaClient:
             self._close()
 
     def _close(self):
-        if self._writer is not None:
-            self._writer.close()
-            self._writer = None
+        if self._transport is not None:
+            self.flush()
+            self._transport.close()
+            self._transport = None
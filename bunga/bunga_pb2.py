@@ -20,7 +20,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   package='bunga',
   syntax='proto3',
   serialized_options=None,
-  serialized_pb=_b('\n\x0b\x62unga.proto\x12\x05\x62unga\"\xd5\x01\n\x0e\x43lientToServer\x12(\n\x0b\x63onnect_req\x18\x01 \x01(\x0b\x32\x11.bunga.ConnectReqH\x00\x12\x37\n\x13\x65xecute_command_req\x18\x02 \x01(\x0b\x32\x18.bunga.ExecuteCommandReqH\x00\x12)\n\x0cget_file_req\x18\x03 \x01(\x0b\x32\x11.bunga.GetFileReqH\x00\x12)\n\x0cput_file_req\x18\x04 \x01(\x0b\x32\x11.bunga.PutFileReqH\x00\x42\n\n\x08messages\"\x82\x02\n\x0eServerToClient\x12(\n\x0b\x63onnect_rsp\x18\x01 \x01(\x0b\x32\x11.bunga.ConnectRspH\x00\x12\x37\n\x13\x65xecute_command_rsp\x18\x02 \x01(\x0b\x32\x18.bunga.ExecuteCommandRspH\x00\x12+\n\rlog_entry_ind\x18\x03 \x01(\x0b\x32\x12.bunga.LogEntryIndH\x00\x12)\n\x0cget_file_rsp\x18\x04 \x01(\x0b\x32\x11.bunga.GetFileRspH\x00\x12)\n\x0cput_file_rsp\x18\x05 \x01(\x0b\x32\x11.bunga.PutFileRspH\x00\x42\n\n\x08messages\"F\n\nConnectReq\x12\x1a\n\x12keep_alive_timeout\x18\x01 \x01(\r\x12\x1c\n\x14maximum_message_size\x18\x02 \x01(\r\"F\n\nConnectRsp\x12\x1a\n\x12keep_alive_timeout\x18\x01 \x01(\r\x12\x1c\n\x14maximum_message_size\x18\x02 \x01(\r\"$\n\x11\x45xecuteCommandReq\x12\x0f\n\x07\x63ommand\x18\x01 \x01(\t\"2\n\x11\x45xecuteCommandRsp\x12\x0e\n\x06output\x18\x01 \x01(\x0c\x12\r\n\x05\x65rror\x18\x02 \x01(\t\"\x1b\n\x0bLogEntryInd\x12\x0c\n\x04text\x18\x01 \x03(\t\"J\n\nGetFileReq\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x13\n\x0bwindow_size\x18\x02 \x01(\r\x12\x19\n\x11\x61\x63knowledge_count\x18\x03 \x01(\r\"7\n\nGetFileRsp\x12\x0c\n\x04size\x18\x01 \x01(\x04\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\x12\r\n\x05\x65rror\x18\x03 \x01(\t\"6\n\nPutFileReq\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04size\x18\x02 \x01(\x04\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\"K\n\nPutFileRsp\x12\x13\n\x0bwindow_size\x18\x01 \x01(\r\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\x19\n\x11\x61\x63knowledge_count\x18\x03 \x01(\rb\x06proto3')
+  serialized_pb=_b('\n\x0b\x62unga.proto\x12\x05\x62unga\"\xb5\x02\n\x0e\x43lientToServer\x12(\n\x0b\x63onnect_req\x18\x01 \x01(\x0b\x32\x11.bunga.ConnectReqH\x00\x12\x37\n\x13\x65xecute_command_req\x18\x02 \x01(\x0b\x32\x18.bunga.ExecuteCommandReqH\x00\x12)\n\x0cget_file_req\x18\x03 \x01(\x0b\x32\x11.bunga.GetFileReqH\x00\x12)\n\x0cput_file_req\x18\x04 \x01(\x0b\x32\x11.bunga.PutFileReqH\x00\x12/\n\x0f\x66ind_blocks_req\x18\x05 \x01(\x0b\x32\x14.bunga.FindBlocksReqH\x00\x12-\n\x0elist_files_req\x18\x06 \x01(\x0b\x32\x13.bunga.ListFilesReqH\x00\x42\n\n\x08messages\"\xe2\x02\n\x0eServerToClient\x12(\n\x0b\x63onnect_rsp\x18\x01 \x01(\x0b\x32\x11.bunga.ConnectRspH\x00\x12\x37\n\x13\x65xecute_command_rsp\x18\x02 \x01(\x0b\x32\x18.bunga.ExecuteCommandRspH\x00\x12+\n\rlog_entry_ind\x18\x03 \x01(\x0b\x32\x12.bunga.LogEntryIndH\x00\x12)\n\x0cget_file_rsp\x18\x04 \x01(\x0b\x32\x11.bunga.GetFileRspH\x00\x12)\n\x0cput_file_rsp\x18\x05 \x01(\x0b\x32\x11.bunga.PutFileRspH\x00\x12/\n\x0f\x66ind_blocks_rsp\x18\x06 \x01(\x0b\x32\x14.bunga.FindBlocksRspH\x00\x12-\n\x0elist_files_rsp\x18\x07 \x01(\x0b\x32\x13.bunga.ListFilesRspH\x00\x42\n\n\x08messages\"\\\n\nConnectReq\x12\x1a\n\x12keep_alive_timeout\x18\x01 \x01(\r\x12\x1c\n\x14maximum_message_size\x18\x02 \x01(\r\x12\x14\n\x0c\x63ompressions\x18\x03 \x01(\r\"[\n\nConnectRsp\x12\x1a\n\x12keep_alive_timeout\x18\x01 \x01(\r\x12\x1c\n\x14maximum_message_size\x18\x02 \x01(\r\x12\x13\n\x0b\x63ompression\x18\x03 \x01(\r\"L\n\x11\x45xecuteCommandReq\x12\x0f\n\x07\x63ommand\x18\x01 \x01(\t\x12\x12\n\nrequest_id\x18\x02 \x01(\r\x12\x12\n\ncompressed\x18\x03 \x01(\x08\"F\n\x11\x45xecuteCommandRsp\x12\x0e\n\x06output\x18\x01 \x01(\x0c\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\x12\n\nrequest_id\x18\x03 \x01(\r\"\x1b\n\x0bLogEntryInd\x12\x0c\n\x04text\x18\x01 \x03(\t\"\xa4\x01\n\nGetFileReq\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x13\n\x0bwindow_size\x18\x02 \x01(\r\x12\x19\n\x11\x61\x63knowledge_count\x18\x03 \x01(\r\x12\x12\n\nrequest_id\x18\x04 \x01(\r\x12\x0e\n\x06offset\x18\x05 \x01(\x04\x12\x0e\n\x06length\x18\x06 \x01(\x04\x12\x12\n\ncompressed\x18\x07 \x01(\x08\x12\x10\n\x08\x63hecksum\x18\x08 \x01(\x08\"Z\n\nGetFileRsp\x12\x0c\n\x04size\x18\x01 \x01(\x04\x12\x0c\n\x04\x64\x61ta\x18\x02 \x01(\x0c\x12\r\n\x05\x65rror\x18\x03 \x01(\t\x12\x12\n\nrequest_id\x18\x04 \x01(\r\x12\r\n\x05\x63rc32\x18\x05 \x01(\r\"\xf1\x01\n\nPutFileReq\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x0c\n\x04size\x18\x02 \x01(\x04\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\x12\x12\n\nrequest_id\x18\x04 \x01(\r\x12\x0e\n\x06offset\x18\x05 \x01(\x04\x12\x12\n\ncompressed\x18\x06 \x01(\x08\x12\r\n\x05\x64\x65lta\x18\x07 \x01(\x08\x12\x13\n\x0b\x63opy_offset\x18\x08 \x01(\x04\x12\x11\n\tcopy_size\x18\t \x01(\x04\x12\r\n\x05mtime\x18\n \x01(\x04\x12\x1a\n\x12\x63reate_directories\x18\x0b \x01(\x08\x12\x10\n\x08\x63hecksum\x18\x0c \x01(\x08\x12\r\n\x05\x63rc32\x18\r \x01(\r\"_\n\nPutFileRsp\x12\x13\n\x0bwindow_size\x18\x01 \x01(\r\x12\r\n\x05\x65rror\x18\x02 \x01(\t\x12\x19\n\x11\x61\x63knowledge_count\x18\x03 \x01(\r\x12\x12\n\nrequest_id\x18\x04 \x01(\r\"X\n\rFindBlocksReq\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x12\n\nblock_size\x18\x02 \x01(\r\x12\x11\n\tchecksums\x18\x03 \x01(\x0c\x12\x12\n\nrequest_id\x18\x04 \x01(\r\"s\n\rFindBlocksRsp\x12\x13\n\x0bwindow_size\x18\x01 \x01(\r\x12\x19\n\x11\x61\x63knowledge_count\x18\x02 \x01(\r\x12\x0f\n\x07offsets\x18\x03 \x01(\x0c\x12\r\n\x05\x65rror\x18\x04 \x01(\t\x12\x12\n\nrequest_id\x18\x05 \x01(\r\"0\n\x0cListFilesReq\x12\x0c\n\x04path\x18\x01 \x01(\t\x12\x12\n\nrequest_id\x18\x02 \x01(\r\"_\n\x0cListFilesRsp\x12\r\n\x05paths\x18\x01 \x03(\t\x12\r\n\x05sizes\x18\x02 \x03(\x04\x12\x0e\n\x06mtimes\x18\x03 \x03(\x04\x12\r\n\x05\x65rror\x18\x04 \x01(\t\x12\x12\n\nrequest_id\x18\x05 \x01(\rb\x06proto3')
 )
 
 
@@ -61,6 +61,20 @@ _CLIENTTOSERVER = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='find_blocks_req', full_name='bunga.ClientToServer.find_blocks_req', index=4,
+      number=5, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='list_files_req', full_name='bunga.ClientToServer.list_files_req', index=5,
+      number=6, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -77,7 +91,7 @@ _CLIENTTOSERVER = _descriptor.Descriptor(
       index=0, containing_type=None, fields=[]),
   ],
   serialized_start=23,
-  serialized_end=236,
+  serialized_end=332,
 )
 
 
@@ -123,6 +137,20 @@ _SERVERTOCLIENT = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='find_blocks_rsp', full_name='bunga.ServerToClient.find_blocks_rsp', index=5,
+      number=6, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='list_files_rsp', full_name='bunga.ServerToClient.list_files_rsp', index=6,
+      number=7, type=11, cpp_type=10, label=1,
+      has_default_value=False, default_value=None,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -138,8 +166,8 @@ _SERVERTOCLIENT = _descriptor.Descriptor(
       name='messages', full_name='bunga.ServerToClient.messages',
       index=0, containing_type=None, fields=[]),
   ],
-  serialized_start=239,
-  serialized_end=497,
+  serialized_start=335,
+  serialized_end=689,
 )
 
 
@@ -164,6 +192,13 @@ _CONNECTREQ = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='compressions', full_name='bunga.ConnectReq.compressions', index=2,
+      number=3, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -176,8 +211,8 @@ _CONNECTREQ = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=499,
-  serialized_end=569,
+  serialized_start=691,
+  serialized_end=783,
 )
 
 
@@ -202,6 +237,13 @@ _CONNECTRSP = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='compression', full_name='bunga.ConnectRsp.compression', index=2,
+      number=3, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -214,8 +256,8 @@ _CONNECTRSP = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=571,
-  serialized_end=641,
+  serialized_start=785,
+  serialized_end=876,
 )
 
 
@@ -233,6 +275,20 @@ _EXECUTECOMMANDREQ = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='request_id', full_name='bunga.ExecuteCommandReq.request_id', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='compressed', full_name='bunga.ExecuteCommandReq.compressed', index=2,
+      number=3, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -245,8 +301,8 @@ _EXECUTECOMMANDREQ = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=643,
-  serialized_end=679,
+  serialized_start=878,
+  serialized_end=954,
 )
 
 
@@ -271,6 +327,13 @@ _EXECUTECOMMANDRSP = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='request_id', full_name='bunga.ExecuteCommandRsp.request_id', index=2,
+      number=3, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -283,8 +346,8 @@ _EXECUTECOMMANDRSP = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=681,
-  serialized_end=731,
+  serialized_start=956,
+  serialized_end=1026,
 )
 
 
@@ -314,8 +377,8 @@ _LOGENTRYIND = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=733,
-  serialized_end=760,
+  serialized_start=1028,
+  serialized_end=1055,
 )
 
 
@@ -347,6 +410,41 @@ _GETFILEREQ = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='request_id', full_name='bunga.GetFileReq.request_id', index=3,
+      number=4, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='offset', full_name='bunga.GetFileReq.offset', index=4,
+      number=5, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='length', full_name='bunga.GetFileReq.length', index=5,
+      number=6, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='compressed', full_name='bunga.GetFileReq.compressed', index=6,
+      number=7, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='checksum', full_name='bunga.GetFileReq.checksum', index=7,
+      number=8, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -359,8 +457,8 @@ _GETFILEREQ = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=762,
-  serialized_end=836,
+  serialized_start=1058,
+  serialized_end=1222,
 )
 
 
@@ -392,6 +490,20 @@ _GETFILERSP = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='request_id', full_name='bunga.GetFileRsp.request_id', index=3,
+      number=4, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='crc32', full_name='bunga.GetFileRsp.crc32', index=4,
+      number=5, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -404,8 +516,8 @@ _GETFILERSP = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=838,
-  serialized_end=893,
+  serialized_start=1224,
+  serialized_end=1314,
 )
 
 
@@ -437,6 +549,76 @@ _PUTFILEREQ = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='request_id', full_name='bunga.PutFileReq.request_id', index=3,
+      number=4, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='offset', full_name='bunga.PutFileReq.offset', index=4,
+      number=5, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='compressed', full_name='bunga.PutFileReq.compressed', index=5,
+      number=6, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='delta', full_name='bunga.PutFileReq.delta', index=6,
+      number=7, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='copy_offset', full_name='bunga.PutFileReq.copy_offset', index=7,
+      number=8, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='copy_size', full_name='bunga.PutFileReq.copy_size', index=8,
+      number=9, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='mtime', full_name='bunga.PutFileReq.mtime', index=9,
+      number=10, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='create_directories', full_name='bunga.PutFileReq.create_directories', index=10,
+      number=11, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='checksum', full_name='bunga.PutFileReq.checksum', index=11,
+      number=12, type=8, cpp_type=7, label=1,
+      has_default_value=False, default_value=False,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='crc32', full_name='bunga.PutFileReq.crc32', index=12,
+      number=13, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -449,8 +631,8 @@ _PUTFILEREQ = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=895,
-  serialized_end=949,
+  serialized_start=1317,
+  serialized_end=1558,
 )
 
 
@@ -482,6 +664,13 @@ _PUTFILERSP = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='request_id', full_name='bunga.PutFileRsp.request_id', index=3,
+      number=4, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
   ],
   extensions=[
   ],
@@ -494,14 +683,224 @@ _PUTFILERSP = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=951,
-  serialized_end=1026,
+  serialized_start=1560,
+  serialized_end=1655,
+)
+
+
+_FINDBLOCKSREQ = _descriptor.Descriptor(
+  name='FindBlocksReq',
+  full_name='bunga.FindBlocksReq',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='path', full_name='bunga.FindBlocksReq.path', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='block_size', full_name='bunga.FindBlocksReq.block_size', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='checksums', full_name='bunga.FindBlocksReq.checksums', index=2,
+      number=3, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='request_id', full_name='bunga.FindBlocksReq.request_id', index=3,
+      number=4, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1657,
+  serialized_end=1745,
+)
+
+
+_FINDBLOCKSRSP = _descriptor.Descriptor(
+  name='FindBlocksRsp',
+  full_name='bunga.FindBlocksRsp',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='window_size', full_name='bunga.FindBlocksRsp.window_size', index=0,
+      number=1, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='acknowledge_count', full_name='bunga.FindBlocksRsp.acknowledge_count', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='offsets', full_name='bunga.FindBlocksRsp.offsets', index=2,
+      number=3, type=12, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b(""),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='error', full_name='bunga.FindBlocksRsp.error', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='request_id', full_name='bunga.FindBlocksRsp.request_id', index=4,
+      number=5, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1747,
+  serialized_end=1862,
+)
+
+
+_LISTFILESREQ = _descriptor.Descriptor(
+  name='ListFilesReq',
+  full_name='bunga.ListFilesReq',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='path', full_name='bunga.ListFilesReq.path', index=0,
+      number=1, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='request_id', full_name='bunga.ListFilesReq.request_id', index=1,
+      number=2, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1864,
+  serialized_end=1912,
+)
+
+
+_LISTFILESRSP = _descriptor.Descriptor(
+  name='ListFilesRsp',
+  full_name='bunga.ListFilesRsp',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='paths', full_name='bunga.ListFilesRsp.paths', index=0,
+      number=1, type=9, cpp_type=9, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='sizes', full_name='bunga.ListFilesRsp.sizes', index=1,
+      number=2, type=4, cpp_type=4, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='mtimes', full_name='bunga.ListFilesRsp.mtimes', index=2,
+      number=3, type=4, cpp_type=4, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='error', full_name='bunga.ListFilesRsp.error', index=3,
+      number=4, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=_b("").decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+    _descriptor.FieldDescriptor(
+      name='request_id', full_name='bunga.ListFilesRsp.request_id', index=4,
+      number=5, type=13, cpp_type=3, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=1914,
+  serialized_end=2009,
 )
 
 _CLIENTTOSERVER.fields_by_name['connect_req'].message_type = _CONNECTREQ
 _CLIENTTOSERVER.fields_by_name['execute_command_req'].message_type = _EXECUTECOMMANDREQ
 _CLIENTTOSERVER.fields_by_name['get_file_req'].message_type = _GETFILEREQ
 _CLIENTTOSERVER.fields_by_name['put_file_req'].message_type = _PUTFILEREQ
+_CLIENTTOSERVER.fields_by_name['find_blocks_req'].message_type = _FINDBLOCKSREQ
+_CLIENTTOSERVER.fields_by_name['list_files_req'].message_type = _LISTFILESREQ
 _CLIENTTOSERVER.oneofs_by_name['messages'].fields.append(
   _CLIENTTOSERVER.fields_by_name['connect_req'])
 _CLIENTTOSERVER.fields_by_name['connect_req'].containing_oneof = _CLIENTTOSERVER.oneofs_by_name['messages']
@@ -514,11 +913,19 @@ _CLIENTTOSERVER.fields_by_name['get_file_req'].containing_oneof = _CLIENTTOSERVE
 _CLIENTTOSERVER.oneofs_by_name['messages'].fields.append(
   _CLIENTTOSERVER.fields_by_name['put_file_req'])
 _CLIENTTOSERVER.fields_by_name['put_file_req'].containing_oneof = _CLIENTTOSERVER.oneofs_by_name['messages']
+_CLIENTTOSERVER.oneofs_by_name['messages'].fields.append(
+  _CLIENTTOSERVER.fields_by_name['find_blocks_req'])
+_CLIENTTOSERVER.fields_by_name['find_blocks_req'].containing_oneof = _CLIENTTOSERVER.oneofs_by_name['messages']
+_CLIENTTOSERVER.oneofs_by_name['messages'].fields.append(
+  _CLIENTTOSERVER.fields_by_name['list_files_req'])
+_CLIENTTOSERVER.fields_by_name['list_files_req'].containing_oneof = _CLIENTTOSERVER.oneofs_by_name['messages']
 _SERVERTOCLIENT.fields_by_name['connect_rsp'].message_type = _CONNECTRSP
 _SERVERTOCLIENT.fields_by_name['execute_command_rsp'].message_type = _EXECUTECOMMANDRSP
 _SERVERTOCLIENT.fields_by_name['log_entry_ind'].message_type = _LOGENTRYIND
 _SERVERTOCLIENT.fields_by_name['get_file_rsp'].message_type = _GETFILERSP
 _SERVERTOCLIENT.fields_by_name['put_file_rsp'].message_type = _PUTFILERSP
+_SERVERTOCLIENT.fields_by_name['find_blocks_rsp'].message_type = _FINDBLOCKSRSP
+_SERVERTOCLIENT.fields_by_name['list_files_rsp'].message_type = _LISTFILESRSP
 _SERVERTOCLIENT.oneofs_by_name['messages'].fields.append(
   _SERVERTOCLIENT.fields_by_name['connect_rsp'])
 _SERVERTOCLIENT.fields_by_name['connect_rsp'].containing_oneof = _SERVERTOCLIENT.oneofs_by_name['messages']
@@ -534,6 +941,12 @@ _SERVERTOCLIENT.fields_by_name['get_file_rsp'].containing_oneof = _SERVERTOCLIEN
 _SERVERTOCLIENT.oneofs_by_name['messages'].fields.append(
   _SERVERTOCLIENT.fields_by_name['put_file_rsp'])
 _SERVERTOCLIENT.fields_by_name['put_file_rsp'].containing_oneof = _SERVERTOCLIENT.oneofs_by_name['messages']
+_SERVERTOCLIENT.oneofs_by_name['messages'].fields.append(
+  _SERVERTOCLIENT.fields_by_name['find_blocks_rsp'])
+_SERVERTOCLIENT.fields_by_name['find_blocks_rsp'].containing_oneof = _SERVERTOCLIENT.oneofs_by_name['messages']
+_SERVERTOCLIENT.oneofs_by_name['messages'].fields.append(
+  _SERVERTOCLIENT.fields_by_name['list_files_rsp'])
+_SERVERTOCLIENT.fields_by_name['list_files_rsp'].containing_oneof = _SERVERTOCLIENT.oneofs_by_name['messages']
 DESCRIPTOR.message_types_by_name['ClientToServer'] = _CLIENTTOSERVER
 DESCRIPTOR.message_types_by_name['ServerToClient'] = _SERVERTOCLIENT
 DESCRIPTOR.message_types_by_name['ConnectReq'] = _CONNECTREQ
@@ -545,6 +958,10 @@ DESCRIPTOR.message_types_by_name['GetFileReq'] = _GETFILEREQ
 DESCRIPTOR.message_types_by_name['GetFileRsp'] = _GETFILERSP
 DESCRIPTOR.message_types_by_name['PutFileReq'] = _PUTFILEREQ
 DESCRIPTOR.message_types_by_name['PutFileRsp'] = _PUTFILERSP
+DESCRIPTOR.message_types_by_name['FindBlocksReq'] = _FINDBLOCKSREQ
+DESCRIPTOR.message_types_by_name['FindBlocksRsp'] = _FINDBLOCKSRSP
+DESCRIPTOR.message_types_by_name['ListFilesReq'] = _LISTFILESREQ
+DESCRIPTOR.message_types_by_name['ListFilesRsp'] = _LISTFILESRSP
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
 ClientToServer = _reflection.GeneratedProtocolMessageType('ClientToServer', (_message.Message,), dict(
@@ -624,5 +1041,33 @@ PutFileRsp = _reflection.GeneratedProtocolMessageType('PutFileRsp', (_message.Me
   ))
 _sym_db.RegisterMessage(PutFileRsp)
 
+FindBlocksReq = _reflection.GeneratedProtocolMessageType('FindBlocksReq', (_message.Message,), dict(
+  DESCRIPTOR = _FINDBLOCKSREQ,
+  __module__ = 'bunga_pb2'
+  # @@protoc_insertion_point(class_scope:bunga.FindBlocksReq)
+  ))
+_sym_db.RegisterMessage(FindBlocksReq)
+
+FindBlocksRsp = _reflection.GeneratedProtocolMessageType('FindBlocksRsp', (_message.Message,), dict(
+  DESCRIPTOR = _FINDBLOCKSRSP,
+  __module__ = 'bunga_pb2'
+  # @@protoc_insertion_point(class_scope:bunga.FindBlocksRsp)
+  ))
+_sym_db.RegisterMessage(FindBlocksRsp)
+
+ListFilesReq = _reflection.GeneratedProtocolMessageType('ListFilesReq', (_message.Message,), dict(
+  DESCRIPTOR = _LISTFILESREQ,
+  __module__ = 'bunga_pb2'
+  # @@protoc_insertion_point(class_scope:bunga.ListFilesReq)
+  ))
+_sym_db.RegisterMessage(ListFilesReq)
+
+ListFilesRsp = _reflection.GeneratedProtocolMessageType('ListFilesRsp', (_message.Message,), dict(
+  DESCRIPTOR = _LISTFILESRSP,
+  __module__ = 'bunga_pb2'
+  # @@protoc_insertion_point(class_scope:bunga.ListFilesRsp)
+  ))
+_sym_db.RegisterMessage(ListFilesRsp)
+
 
 # @@protoc_insertion_point(module_scope)
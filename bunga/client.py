@@ -1,10 +1,17 @@
 import asyncio
 import sys
 import os
+import posixpath
 import threading
 import logging
 import time
 import re
+import mmap
+import math
+import zlib
+import struct
+import functools
+from collections import deque
 
 from colors import red
 from colors import yellow
@@ -13,6 +20,7 @@ from colors import color
 
 from .version import __version__
 from .bunga_client import BungaClient
+from .transport import ConnectionClosedError
 from . import linux
 
 
@@ -21,6 +29,65 @@ LOGGER = logging.getLogger(__file__)
 RE_ML_LOG = re.compile(r'( \d+-\d+-\d+ \d+:\d+:\d+)( [^ ]+)( [^ ]+)(.*)')
 RE_ERROR = re.compile(r'error', re.IGNORECASE)
 RE_WARNING = re.compile(r'warning', re.IGNORECASE)
+RE_PS = re.compile(r'ps(?: +(\d+))?$')
+
+# Seconds to wait for more get file data before acknowledging
+# received data that is less than a full acknowledge count.
+GET_FILE_ACKNOWLEDGE_DELAY = 0.2
+
+# Default seconds to wait before reconnecting, without a reconnect
+# policy, after the server closed the connection before responding to
+# the connect request.
+CONNECTION_CLOSED_DELAY = 1
+
+# Get file data rate in bytes per second the default window is sized
+# for at the measured round trip time, and the largest such window.
+# Smaller windows than the servers' default are left to the server.
+GET_FILE_RATE = 1000000
+GET_FILE_WINDOW_SIZE_MAX = 1000
+GET_FILE_WINDOW_SIZE_SERVER = 100
+
+# Default maximum message size in bytes the client can receive. Frames
+# are parsed into a growing buffer, so this is only limited by the 24
+# bits size field in the header. The connection is aborted if a larger
+# message is received.
+MAXIMUM_MESSAGE_SIZE = 65536
+
+# Servers send messages of up to this many bytes, even if the client's
+# maximum message size is smaller.
+MESSAGE_SIZE_MIN = 128
+
+# Bytes of each put file request reserved for everything but the data.
+PUT_FILE_OVERHEAD = 16
+
+# Additional bytes reserved in compressed put file requests, on top of
+# one byte per KiB of data, for compression overhead.
+PUT_FILE_COMPRESSION_OVERHEAD = 32
+
+# Number of times a file transfer is resumed after the connection was
+# lost without any progress in between, and seconds to wait for the
+# connection to be re-established each time.
+RESUME_ATTEMPTS = 5
+RESUME_TIMEOUT = 30
+
+CONNECTION_LOST = 'Connection lost.'
+CHECKSUM_MISMATCH = 'Checksum mismatch.'
+
+# Default maximum number of files transferred at the same time by
+# get_tree() and put_tree(), the number of transfers the C server
+# allows per client and direction.
+TREE_CONCURRENCY = 4
+
+# Smallest and largest delta put file block size in bytes.
+DELTA_BLOCK_SIZE_MIN = 512
+DELTA_BLOCK_SIZE_MAX = 65536
+
+# Offset of a block that was not found in the remote file.
+BLOCK_NOT_FOUND = 0xffffffffffffffff
+
+# Compression algorithms.
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
 
 
 class CompletionError(Exception):
@@ -65,6 +132,28 @@ class PutFileError(Exception):
         return f"Failed to put '{self.remote_path}' with error '{self.error}'."
 
 
+class ListFilesError(Exception):
+
+    def __init__(self, remote_path, error):
+        self.remote_path = remote_path
+        self.error = error
+
+    def __str__(self):
+        return f"Failed to list '{self.remote_path}' with error '{self.error}'."
+
+
+class FileInfo:
+    """A remote file, with its path relative to the listed directory,
+    size in bytes and modification time in seconds since the epoch.
+
+    """
+
+    def __init__(self, path, size, mtime):
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+
+
 class Progress:
 
     def init(self, size):
@@ -74,6 +163,98 @@ class Progress:
         pass
 
 
+class StreamWriter:
+    """Writes received file data to a writable binary stream.
+
+    """
+
+    def __init__(self, fout):
+        self._fout = fout
+
+    def open(self, size):
+        pass
+
+    def write(self, data):
+        self._fout.write(data)
+
+    def is_paused(self):
+        return False
+
+    def close(self):
+        pass
+
+
+class BytesWriter:
+    """Collects received file data in memory.
+
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def open(self, size):
+        pass
+
+    def write(self, data):
+        self._chunks.append(data)
+
+    def is_paused(self):
+        return False
+
+    def close(self):
+        pass
+
+    def getvalue(self):
+        return b''.join(self._chunks)
+
+
+class MmapWriter:
+    """Writes received file data into given file, preallocated to the
+    remote file size and memory mapped. Data beyond the preallocated
+    size, if the remote file grows during the transfer, is written
+    to the file as is.
+
+    """
+
+    def __init__(self, fout):
+        self._fout = fout
+        self._mmap = None
+        self._size = 0
+        self._offset = 0
+
+    def open(self, size):
+        self._fout.truncate(size)
+
+        if size > 0:
+            self._mmap = mmap.mmap(self._fout.fileno(), size)
+            self._size = size
+
+    def write(self, data):
+        end = self._offset + len(data)
+
+        if end <= self._size:
+            self._mmap[self._offset:end] = data
+        else:
+            self._close_mmap()
+            self._fout.seek(self._offset)
+            self._fout.write(data)
+
+        self._offset = end
+
+    def is_paused(self):
+        return False
+
+    def close(self):
+        self._close_mmap()
+        self._fout.truncate(self._offset)
+
+    def _close_mmap(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+            self._size = 0
+
+
 def is_error(text):
     return RE_ERROR.search(text)
 
@@ -82,45 +263,278 @@ def is_warning(text):
     return RE_WARNING.search(text)
 
 
+class Request:
+    """An outstanding request. Each request has an unique identifier and
+    its own completion queue, making it possible to have multiple
+    requests in flight at the same time on a single connection.
+
+    """
+
+    def __init__(self, request_id):
+        self.request_id = request_id
+        self.complete_queue = asyncio.Queue()
+
+
+class ExecuteCommandRequest(Request):
+
+    def __init__(self, request_id, compressed):
+        super().__init__(request_id)
+
+        if compressed:
+            self.decompressor = zlib.decompressobj()
+        else:
+            self.decompressor = None
+
+    def decompress(self, data):
+        if self.decompressor is not None:
+            data = self.decompressor.decompress(data)
+
+        return data
+
+
+class GetFileRequest(Request):
+
+    def __init__(self,
+                 request_id,
+                 writer,
+                 progress,
+                 acknowledge_count,
+                 offset,
+                 length):
+        super().__init__(request_id)
+        self.writer = writer
+        self.offset = offset
+        self.remaining = length
+        self.decompressor = None
+        self.crc = None
+        self.size = None
+        self.progress = progress
+        self.acknowledge_count = acknowledge_count
+        self.unacknowledged_count = 0
+        self.acknowledge_timer = None
+        self.drain_task = None
+
+    def cancel_acknowledge_timer(self):
+        if self.acknowledge_timer is not None:
+            self.acknowledge_timer.cancel()
+            self.acknowledge_timer = None
+
+        if self.drain_task is not None:
+            self.drain_task.cancel()
+            self.drain_task = None
+
+    def decompress(self, data):
+        if self.decompressor is not None:
+            data = self.decompressor.decompress(data)
+
+        return data
+
+
+class PutFileRequest(Request):
+
+    def __init__(self, request_id, offset, mtime=None, create_directories=False):
+        super().__init__(request_id)
+        self.offset = offset
+        self.mtime = mtime
+        self.create_directories = create_directories
+        self.compressor = None
+        self.crc = None
+
+
+class ListFilesRequest(Request):
+
+    def __init__(self, request_id):
+        super().__init__(request_id)
+        self.files = []
+
+
+class FindBlocksRequest(Request):
+
+    pass
+
+
+class DeltaChunks:
+    """Iterates over the file data to put as data and copies of blocks
+    found in the existing remote file. Data is yielded as bytes and
+    copies as (offset, size) tuples. Consecutive copies are merged.
+
+    """
+
+    def __init__(self, fin, block_size, offsets, size):
+        self._fin = fin
+        self._block_size = block_size
+        self._offsets = offsets
+        self._size = size
+        self.literal_size = 0
+        self.crc = 0
+
+    def _literal(self, data):
+        self.literal_size += len(data)
+
+        for offset in range(0, len(data), self._size):
+            yield data[offset:offset + self._size]
+
+    def __iter__(self):
+        data = bytearray()
+        copy_offset = None
+        copy_size = 0
+
+        for offset in self._offsets:
+            block = self._fin.read(self._block_size)
+            self.crc = zlib.crc32(block, self.crc)
+
+            if offset == BLOCK_NOT_FOUND:
+                if copy_size > 0:
+                    yield (copy_offset, copy_size)
+                    copy_size = 0
+
+                data += block
+
+                if len(data) >= self._size:
+                    yield from self._literal(bytes(data))
+                    data.clear()
+            else:
+                if data:
+                    yield from self._literal(bytes(data))
+                    data.clear()
+
+                if copy_size > 0 and copy_offset + copy_size == offset:
+                    copy_size += len(block)
+                else:
+                    if copy_size > 0:
+                        yield (copy_offset, copy_size)
+
+                    copy_offset = offset
+                    copy_size = len(block)
+
+        if copy_size > 0:
+            yield (copy_offset, copy_size)
+
+        # The data after the last full block is always sent as is.
+        block = self._fin.read()
+        self.crc = zlib.crc32(block, self.crc)
+        data += block
+
+        if data:
+            yield from self._literal(bytes(data))
+
+
+def is_unchanged(path, size, mtime):
+    """Returns ``True`` if given local file has given size and
+    modification time.
+
+    """
+
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return False
+
+    return stat.st_size == size and int(stat.st_mtime) == mtime
+
+
+def tree_local_path(local_path, path):
+    """Returns the local path of given remote path relative to a listed
+    directory, or ``None`` if it is absolute, has a ``..`` component or
+    is otherwise outside given local directory.
+
+    """
+
+    parts = path.split('/')
+
+    if posixpath.isabs(path) or os.path.isabs(path) or '..' in parts:
+        return None
+
+    full_path = os.path.normpath(os.path.join(local_path, *parts))
+    root = os.path.realpath(local_path)
+    real_path = os.path.realpath(full_path)
+
+    if real_path == root or os.path.commonpath([root, real_path]) != root:
+        return None
+
+    return full_path
+
+
+def delta_block_size(size):
+    """Returns the delta put file block size for a file of given size,
+    about the square root of the size, as rsync.
+
+    """
+
+    block_size = int(math.sqrt(size)) & ~7
+
+    return min(max(block_size, DELTA_BLOCK_SIZE_MIN), DELTA_BLOCK_SIZE_MAX)
+
+
 class Client(BungaClient):
 
     def __init__(self,
                  uri,
                  loop,
                  connection_refused_delay=1,
-                 connect_timeout_delay=0):
+                 connect_timeout_delay=0,
+                 maximum_message_size=MAXIMUM_MESSAGE_SIZE,
+                 keep_alive_timeout=None,
+                 reconnect_policy=None,
+                 connection_closed_delay=CONNECTION_CLOSED_DELAY):
         super().__init__(uri)
         self._is_connected = False
         self._connected_event = asyncio.Event(loop=loop)
-        self._complete_queue = asyncio.Queue(loop=loop)
-        self._fget = None
-        self._get_file_size = None
-        self._get_progress = None
-        self._command_output = []
+        self._requests = {}
+        self._next_request_id = 0
         self._connect_exception = None
         self._connection_refused_delay = connection_refused_delay
         self._connect_timeout_delay = connect_timeout_delay
+        self._connection_closed_delay = connection_closed_delay
+        self._reconnect_policy = reconnect_policy
+        self._receive_maximum_message_size = maximum_message_size
+        self._keep_alive_timeout = keep_alive_timeout
         self._maximum_message_size = 64
+        self._compression = COMPRESSION_NONE
         self._ps_formatter = linux.PsFormatter()
+        self._ps_stat_supported = True
+
+        if maximum_message_size > 0:
+            self._maximum_frame_size = max(maximum_message_size,
+                                           MESSAGE_SIZE_MIN)
 
     async def on_connected(self):
-        self.init_connect_req()
+        message = self.init_connect_req()
+        message.maximum_message_size = self._receive_maximum_message_size
+        message.compressions = (1 << (COMPRESSION_ZLIB - 1))
+
+        if self._keep_alive_timeout is not None:
+            message.keep_alive_timeout = self._keep_alive_timeout
+
         self.send()
 
     async def on_disconnected(self):
         if self._is_connected:
             self._connected_event.clear()
             self._is_connected = False
-            await self._complete_queue.put(('Connection lost.', None))
-        else:
-            await asyncio.sleep(1)
+
+            for request in self._requests.values():
+                await request.complete_queue.put((CONNECTION_LOST, None))
 
     def is_connected(self):
         return self._is_connected
 
+    def is_compressing(self):
+        """Returns ``True`` if compression was negotiated with the server.
+
+        """
+
+        return self._compression == COMPRESSION_ZLIB
+
     async def on_connect_failure(self, exception):
-        if isinstance(exception, ConnectionRefusedError):
+        if self._reconnect_policy is not None:
+            delay = self._reconnect_policy.delay(
+                self.connect_statistics.consecutive_failures,
+                self.connect_statistics.delay)
+        elif isinstance(exception, ConnectionRefusedError):
             delay = self._connection_refused_delay
+        elif isinstance(exception, ConnectionClosedError):
+            delay = self._connection_closed_delay
         else:
             delay = self._connect_timeout_delay
 
@@ -130,82 +544,221 @@ class Client(BungaClient):
 
         return delay
 
-    async def _write_completed(self, message):
-        await self._complete_queue.put((message.error, message))
+    async def on_connection_lost(self):
+        if self._reconnect_policy is None:
+            return 0
+
+        # Not reconnecting at once spreads out clients disconnected at
+        # the same time, for example by a server restart. The lost
+        # connection counts as the first consecutive failure.
+        delay = self._reconnect_policy.delay(
+            self.connect_statistics.consecutive_failures,
+            self.connect_statistics.delay)
+
+        if delay is None:
+            self._connect_exception = ConnectionClosedError('Connection lost.')
+            self._connected_event.set()
+
+        return delay
+
+    def _create_request(self, request_class, *args):
+        """Create a request with the next free identifier. Identifiers
+        increase, wrapping around at 32 bits, as the server keeps
+        responding to cancelled requests, and those late responses
+        must not be taken for responses to a later request.
+
+        """
 
-    async def _wait_for_completion(self):
-        error, message = await self._complete_queue.get()
+        request_id = self._next_request_id
+
+        while request_id in self._requests:
+            request_id = (request_id + 1) & 0xffffffff
+
+        self._next_request_id = (request_id + 1) & 0xffffffff
+        request = request_class(request_id, *args)
+        self._requests[request_id] = request
+
+        return request
+
+    def _delete_request(self, request):
+        del self._requests[request.request_id]
+
+    def _find_request(self, message, request_class):
+        request = self._requests.get(message.request_id)
+
+        if not isinstance(request, request_class):
+            LOGGER.debug('Discarding response to unknown request %d.',
+                         message.request_id)
+            request = None
+
+        return request
+
+    async def _write_completed(self, request, message):
+        await request.complete_queue.put((message.error, message))
+
+    async def _wait_for_completion(self, request):
+        error, message = await request.complete_queue.get()
 
         if error:
             raise CompletionError(error)
 
         return message
 
-    def _clear_completion_queue(self):
-        while not self._complete_queue.empty():
-            self._complete_queue.get_nowait()
-
-    async def _send_and_wait_for_completion(self):
+    async def _send_and_wait_for_completion(self, request):
         if not self._is_connected:
             raise NotConnectedError()
 
-        self._clear_completion_queue()
         self.send()
 
-        return await self._wait_for_completion()
+        return await self._wait_for_completion(request)
 
     async def on_connect_rsp(self, message):
-        # ToDo: Use received keep alive timeout.
-        if message.maximum_message_size > 64:
+        if message.keep_alive_timeout > 0:
+            self.set_keep_alive_interval(message.keep_alive_timeout)
+
+        if message.maximum_message_size == 0:
+            self._maximum_message_size = MAXIMUM_MESSAGE_SIZE
+        elif message.maximum_message_size > 64:
             self._maximum_message_size = message.maximum_message_size
+        else:
+            self._maximum_message_size = 64
 
+        self._compression = message.compression
+        self._ps_stat_supported = True
         self._is_connected = True
         self._connect_exception = None
         self._connected_event.set()
 
     async def on_execute_command_rsp(self, message):
-        if message.output:
-            self._command_output.append(message.output)
-        else:
-            await self._write_completed(message)
+        request = self._find_request(message, ExecuteCommandRequest)
+
+        if request is None:
+            return
+
+        await self._write_completed(request, message)
 
     async def on_log_entry_ind(self, message):
         pass
 
-    async def _on_get_file_rsp_open(self, message):
-        self._get_progress.init(message.size)
+    async def _on_get_file_rsp_open(self, request, message):
+        size = max(message.size - request.offset, 0)
 
-        if message.size > 0:
-            self._get_file_size = message.size
-        else:
-            self._fget = None
-            await self._write_completed(message)
+        if request.remaining is not None:
+            size = min(size, request.remaining)
+
+        request.writer.open(size)
+        request.progress.init(size)
+        request.size = message.size
+
+    def _get_file_acknowledge(self, request):
+        """Acknowledge all received but not yet acknowledged data, or, if
+        the writer is paused, once it has written its buffered data, so
+        the server sends at most a window of data in the meantime.
 
-    async def _on_get_file_rsp_data(self, message):
-        self._fget.write(message.data)
-        self._get_progress.update(len(message.data))
+        """
+
+        if request.writer.is_paused():
+            if request.drain_task is None:
+                request.drain_task = asyncio.ensure_future(
+                    self._get_file_acknowledge_drained(request))
+
+            return
+
+        request.cancel_acknowledge_timer()
         message = self.init_get_file_req()
-        message.acknowledge_count = 1
+        message.request_id = request.request_id
+        message.acknowledge_count = request.unacknowledged_count
         self.send()
+        request.unacknowledged_count = 0
+
+    async def _get_file_acknowledge_drained(self, request):
+        try:
+            await request.writer.drain()
+        except ConnectionError:
+            return
+
+        request.drain_task = None
+
+        if request.unacknowledged_count > 0:
+            self._get_file_acknowledge(request)
+
+    async def _on_get_file_rsp_data(self, request, message):
+        data = request.decompress(message.data)
+
+        if data:
+            request.writer.write(data)
+            request.progress.update(len(data))
+            request.offset += len(data)
+
+            if request.crc is not None:
+                request.crc = zlib.crc32(data, request.crc)
 
-    async def _on_get_file_rsp_close(self, message):
-        self._fget = None
-        await self._write_completed(message)
+            if request.remaining is not None:
+                request.remaining -= len(data)
+
+        request.unacknowledged_count += 1
+
+        if request.unacknowledged_count >= request.acknowledge_count:
+            self._get_file_acknowledge(request)
+        elif request.acknowledge_timer is None:
+            request.acknowledge_timer = asyncio.get_event_loop().call_later(
+                GET_FILE_ACKNOWLEDGE_DELAY,
+                self._get_file_acknowledge,
+                request)
+
+    async def _on_get_file_rsp_close(self, request, message):
+        request.cancel_acknowledge_timer()
+
+        if (not message.error
+            and request.crc is not None
+            and message.crc32 != request.crc):
+            await request.complete_queue.put((CHECKSUM_MISMATCH, message))
+        else:
+            await self._write_completed(request, message)
 
     async def on_get_file_rsp(self, message):
-        if self._fget is None:
+        request = self._find_request(message, GetFileRequest)
+
+        if request is None:
             return
 
-        if self._get_file_size is None:
-            await self._on_get_file_rsp_open(message)
+        if request.size is None:
+            await self._on_get_file_rsp_open(request, message)
 
         if message.data:
-            await self._on_get_file_rsp_data(message)
+            await self._on_get_file_rsp_data(request, message)
         else:
-            await self._on_get_file_rsp_close(message)
+            await self._on_get_file_rsp_close(request, message)
 
     async def on_put_file_rsp(self, message):
-        await self._write_completed(message)
+        request = self._find_request(message, PutFileRequest)
+
+        if request is None:
+            return
+
+        await self._write_completed(request, message)
+
+    async def on_find_blocks_rsp(self, message):
+        request = self._find_request(message, FindBlocksRequest)
+
+        if request is None:
+            return
+
+        await self._write_completed(request, message)
+
+    async def on_list_files_rsp(self, message):
+        request = self._find_request(message, ListFilesRequest)
+
+        if request is None:
+            return
+
+        if message.paths:
+            for path, size, mtime in zip(message.paths,
+                                         message.sizes,
+                                         message.mtimes):
+                request.files.append(FileInfo(path, size, mtime))
+        else:
+            await self._write_completed(request, message)
 
     async def wait_for_connection(self, timeout=None):
         if not self._is_connected:
@@ -214,10 +767,25 @@ class Client(BungaClient):
             if self._connect_exception:
                 raise self._connect_exception
 
-    async def execute_command_netstat(self):
-        output = await self.execute_command('cat /proc/net/tcp')
+    async def read_sockets(self):
+        """Returns all TCP, UDP and Unix sockets as `linux.Socket` objects.
+        All /proc/net files are read in a single round trip. Missing
+        files, for example tcp6 without IPv6 support, are skipped.
 
-        return linux.format_netstat(output.decode()).encode()
+        """
+
+        outputs = await self.execute_many(
+            [f'cat {path}' for _, path in linux.NETSTAT_FILES])
+        sockets = []
+
+        for (protocol, _), output in zip(linux.NETSTAT_FILES, outputs):
+            if not isinstance(output, ExecuteCommandError):
+                sockets += linux.parse_proc_net(protocol, output.decode())
+
+        return sockets
+
+    async def execute_command_netstat(self):
+        return linux.format_sockets(await self.read_sockets()).encode()
 
     async def execute_command_uptime(self):
         proc_uptime = await self.execute_command('cat /proc/uptime')
@@ -226,104 +794,799 @@ class Client(BungaClient):
         return linux.format_uptime(proc_uptime.decode(),
                                    proc_loadavg.decode()).encode()
 
-    async def execute_command_ps(self):
-        """This is a ps command for Monolinux, only showing information for
-        the init process and its threads. Make it more general at some
-        point?
+    async def execute_command_ps(self, pid=1):
+        """This is a ps command for Monolinux, showing information for given
+        process, by default the init process, and its threads.
 
         """
 
-        proc_n_stat = []
-        proc_1_task = await self.execute_command('ls /proc/1/task')
+        proc_stat, proc_n_stat = await self.read_ps_stat(pid)
 
-        for pid in proc_1_task.split():
-            output = await self.execute_command(
-                f'cat /proc/1/task/{pid.decode()}/stat')
-            proc_n_stat.append(output.decode())
+        return self._ps_formatter.format(proc_stat, proc_n_stat).encode()
+
+    async def read_ps_stat(self, pid=1):
+        """Returns the contents of /proc/stat and a list of the stat of
+        each thread of given process, by default the init process.
+
+        Everything is read in a single round trip with the
+        bunga_ps_stat command of the server, or in two if the server
+        does not have it, by reading all threads concurrently.
+
+        """
+
+        if self._ps_stat_supported:
+            try:
+                output = await self.execute_command(f'bunga_ps_stat {pid}')
+                proc_stat, *proc_n_stat = output.decode().splitlines()
 
-        proc_stat = await self.execute_command('cat /proc/stat')
+                return proc_stat, proc_n_stat
+            except ExecuteCommandError:
+                pass
 
-        return self._ps_formatter.format(proc_stat.decode(), proc_n_stat).encode()
+        proc_stat, proc_n_stat = await self._read_ps_stat_per_thread(pid)
+        self._ps_stat_supported = False
+
+        return proc_stat, proc_n_stat
+
+    async def _read_ps_stat_per_thread(self, pid):
+        async def read_thread_stat(tid):
+            try:
+                output = await self.execute_command(
+                    f'cat /proc/{pid}/task/{tid}/stat')
+            except ExecuteCommandError:
+                # The thread has exited.
+                return None
+
+            return output.decode()
+
+        tids = await self.execute_command(f'ls /proc/{pid}/task')
+        proc_stat, *proc_n_stat = await asyncio.gather(
+            self.execute_command('cat /proc/stat'),
+            *[read_thread_stat(tid.decode()) for tid in tids.split()])
+
+        return proc_stat.decode(), [stat for stat in proc_n_stat if stat]
+
+    async def execute_command_stream(self, command):
+        """Execute given command. Yields the command output as bytes chunks
+        as they are received. Raises an exception on command failure,
+        with an empty output as all output has already been yielded.
+
+        """
+
+        if command in ['netstat', 'uptime'] or RE_PS.match(command):
+            yield await self.execute_command(command)
+
+            return
+
+        compressed = self.is_compressing()
+        request = self._create_request(ExecuteCommandRequest, compressed)
+
+        try:
+            message = self.init_execute_command_req()
+            message.command = command
+            message.request_id = request.request_id
+            message.compressed = compressed
+
+            try:
+                message = await self._send_and_wait_for_completion(request)
+
+                while message.output:
+                    output = request.decompress(message.output)
+
+                    if output:
+                        yield output
+
+                    message = await self._wait_for_completion(request)
+            except CompletionError as e:
+                raise ExecuteCommandError(command, b'', e.error)
+        finally:
+            self._delete_request(request)
 
     async def execute_command(self, command):
         """Execute given command. Returns the command output as bytes. Raises
         an exception on command failure.
 
+        Multiple commands may be executed concurrently, each in its
+        own task.
+
         """
 
+        ps = RE_PS.match(command)
+
         if command == 'netstat':
             return await self.execute_command_netstat()
         elif command == 'uptime':
             return await self.execute_command_uptime()
-        elif command == 'ps':
-            return await self.execute_command_ps()
+        elif ps:
+            return await self.execute_command_ps(ps.group(1) or 1)
 
-        self._command_output = []
-        message = self.init_execute_command_req()
-        message.command = command
+        output = []
 
         try:
-            await self._send_and_wait_for_completion()
-        except CompletionError as e:
-            raise ExecuteCommandError(command,
-                                      b''.join(self._command_output),
-                                      e.error)
+            async for chunk in self.execute_command_stream(command):
+                output.append(chunk)
+        except ExecuteCommandError as e:
+            e.output = b''.join(output)
+
+            raise
+
+        return b''.join(output)
+
+    async def execute_many(self, commands):
+        """Execute given commands concurrently. All requests are sent back
+        to back instead of waiting for each response before sending
+        the next request, so all commands take about a single round
+        trip.
+
+        Returns a list with the output of each command as bytes, or an
+        `ExecuteCommandError` if the command failed, in `commands`
+        order. Other errors, for example if not connected, are
+        raised.
+
+        """
+
+        async def execute_command(command):
+            try:
+                return await self.execute_command(command)
+            except ExecuteCommandError as e:
+                return e
+
+        tasks = [
+            asyncio.ensure_future(execute_command(command))
+            for command in commands
+        ]
+
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _resume_transfer(self, error, attempts):
+        """Returns ``True`` if a file transfer that failed with given error
+        shall be resumed, once connected to the server again.
+
+        """
+
+        if error != CONNECTION_LOST or attempts > RESUME_ATTEMPTS:
+            return False
+
+        try:
+            await self.wait_for_connection(RESUME_TIMEOUT)
+        except (asyncio.TimeoutError, OSError):
+            return False
+
+        return True
+
+    def _get_file_window_size(self):
+        """Returns a window size large enough to get file data at
+        `GET_FILE_RATE` at the measured round trip time, or ``None``
+        for the server default if not larger than it.
+
+        """
+
+        if self.rtt.smoothed is None:
+            return None
+
+        data_size = self._maximum_message_size
+
+        if self._receive_maximum_message_size > 0:
+            data_size = min(data_size, self._receive_maximum_message_size)
+
+        window_size = math.ceil(GET_FILE_RATE * self.rtt.smoothed / data_size)
+
+        if window_size <= GET_FILE_WINDOW_SIZE_SERVER:
+            return None
+
+        return min(window_size, GET_FILE_WINDOW_SIZE_MAX)
 
-        return b''.join(self._command_output)
+    def _get_file_open(self,
+                       request,
+                       remote_path,
+                       window_size,
+                       compress,
+                       verify):
+        message = self.init_get_file_req()
+        message.path = remote_path
+        message.request_id = request.request_id
+        message.offset = request.offset
 
-    async def get_file(self, remote_path, local_path, progress=None):
+        if verify:
+            message.checksum = True
+            request.crc = 0
+
+        if compress and self.is_compressing():
+            message.compressed = True
+            request.decompressor = zlib.decompressobj()
+        else:
+            request.decompressor = None
+
+        if request.remaining is not None:
+            message.length = request.remaining
+
+        if window_size is not None:
+            message.window_size = window_size
+
+    async def _get_file(self,
+                        remote_path,
+                        writer,
+                        progress,
+                        window_size,
+                        offset,
+                        length,
+                        compress,
+                        verify):
         if progress is None:
             progress = Progress()
 
-        with open(local_path, 'wb') as self._fget:
-            self._get_file_size = None
-            self._get_progress = progress
-            message = self.init_get_file_req()
-            message.path = remote_path
+        # A zero length means to the end of the file on the wire, so
+        # nothing is requested.
+        if length == 0:
+            writer.open(0)
+            progress.init(0)
+            writer.close()
 
-            try:
-                await self._send_and_wait_for_completion()
-            except CompletionError as e:
-                raise GetFileError(remote_path, e.error)
+            return
+
+        if window_size is None:
+            window_size = self._get_file_window_size()
+
+        if window_size is None:
+            acknowledge_count = 1
+        else:
+            acknowledge_count = max(window_size // 2, 1)
+
+        request = self._create_request(GetFileRequest,
+                                       writer,
+                                       progress,
+                                       acknowledge_count,
+                                       offset,
+                                       length)
+        attempts = 0
+
+        try:
+            while True:
+                offset = request.offset
+                self._get_file_open(request,
+                                    remote_path,
+                                    window_size,
+                                    compress,
+                                    verify)
+
+                try:
+                    await self._send_and_wait_for_completion(request)
+
+                    break
+                except CompletionError as e:
+                    request.cancel_acknowledge_timer()
+                    request.unacknowledged_count = 0
+
+                    if request.offset > offset:
+                        attempts = 0
+
+                    attempts += 1
+
+                    if not await self._resume_transfer(e.error, attempts):
+                        raise GetFileError(remote_path, e.error)
+
+                    if request.remaining == 0:
+                        break
+        finally:
+            request.cancel_acknowledge_timer()
+            self._delete_request(request)
+            writer.close()
+
+    async def get_file(self,
+                       remote_path,
+                       local_path=None,
+                       progress=None,
+                       window_size=None,
+                       preallocate=False,
+                       offset=0,
+                       length=None,
+                       compress=True,
+                       verify=False):
+        """Get given remote file. `local_path` is either a local file path,
+        a writable binary stream, a writer as StreamWriter, or ``None``
+        to return the file contents as bytes. A writer may pause the
+        transfer by returning ``True`` from ``is_paused()``, until its
+        ``drain()`` coroutine returns.
+
+        `window_size` is the maximum number of data messages in flight.
+        Received data is then acknowledged every `window_size` / 2
+        messages instead of every message. If ``None``, the window is
+        sized for the measured round trip time on slow links, and is
+        the server default otherwise.
+
+        Give `preallocate` as ``True`` to preallocate a local file path
+        to the remote file size and write received data into it
+        through a memory map instead of buffered writes.
+
+        Only get `length` bytes, or up to the end of the file if
+        ``None``, starting at `offset` in the remote file. The
+        transfer is resumed where it stopped if the connection is lost
+        and re-established.
+
+        File data is compressed if negotiated with the server, unless
+        `compress` is ``False``, for example as the file is already
+        compressed.
+
+        Give `verify` as ``True`` to verify the received data against
+        a CRC-32 calculated by the server while sending it. A resumed
+        transfer only verifies the data received after it was resumed.
+
+        """
+
+        args = (progress, window_size, offset, length, compress, verify)
 
-    async def _put_file_open(self, remote_path, size):
+        if local_path is None:
+            writer = BytesWriter()
+            await self._get_file(remote_path, writer, *args)
+
+            return writer.getvalue()
+        elif hasattr(local_path, 'is_paused'):
+            await self._get_file(remote_path, local_path, *args)
+        elif hasattr(local_path, 'write'):
+            await self._get_file(remote_path, StreamWriter(local_path), *args)
+        elif preallocate:
+            with open(local_path, 'w+b') as fout:
+                await self._get_file(remote_path, MmapWriter(fout), *args)
+        else:
+            with open(local_path, 'wb') as fout:
+                await self._get_file(remote_path, StreamWriter(fout), *args)
+
+    async def _put_file_open(self,
+                             request,
+                             remote_path,
+                             size,
+                             compress,
+                             verify,
+                             delta=False):
         message = self.init_put_file_req()
         message.path = remote_path
         message.size = size
-        response = await self._send_and_wait_for_completion()
+        message.request_id = request.request_id
+        message.offset = request.offset
+        message.delta = delta
+        message.create_directories = request.create_directories
+
+        if request.mtime is not None:
+            message.mtime = request.mtime
+
+        if verify:
+            message.checksum = True
+            request.crc = 0
+        else:
+            request.crc = None
+
+        if compress and self.is_compressing():
+            message.compressed = True
+            request.compressor = zlib.compressobj()
+        else:
+            request.compressor = None
+
+        response = await self._send_and_wait_for_completion(request)
 
         return response.window_size
 
-    async def _put_file_data(self, fin, window_size):
-        outstanding_requests = 0
+    def _put_file_data_size(self, request):
+        """Returns the maximum number of bytes of file data in each put
+        file request.
+
+        """
+
+        size = self._maximum_message_size - PUT_FILE_OVERHEAD
+
+        if request.compressor is not None:
+            # Make room for compression overhead of incompressible
+            # data.
+            size -= size // 1024 + PUT_FILE_COMPRESSION_OVERHEAD
+
+        return size
+
+    async def _put_file_data(self, request, chunks, window_size):
+        """Send given chunks, each either file data as bytes, or an
+        (offset, size) tuple of data to copy from the existing file.
+
+        """
+
+        # Sizes of sent but not yet acknowledged data.
+        outstanding_sizes = deque()
+        chunks = iter(chunks)
 
         while True:
-            while outstanding_requests < window_size:
+            while len(outstanding_sizes) < window_size:
+                chunk = next(chunks, None)
+
+                if chunk is None:
+                    if outstanding_sizes:
+                        break
+                    else:
+                        return
+
                 message = self.init_put_file_req()
-                message.data = fin.read(self._maximum_message_size - 16)
+                message.request_id = request.request_id
 
-                if message.data:
-                    outstanding_requests += 1
-                    self.send()
-                elif outstanding_requests > 0:
-                    break
+                if isinstance(chunk, tuple):
+                    message.copy_offset, message.copy_size = chunk
+                    outstanding_sizes.append(message.copy_size)
                 else:
-                    return
+                    if request.crc is not None:
+                        request.crc = zlib.crc32(chunk, request.crc)
+
+                    if request.compressor is not None:
+                        message.data = (
+                            request.compressor.compress(chunk)
+                            + request.compressor.flush(zlib.Z_SYNC_FLUSH))
+                    else:
+                        message.data = chunk
+
+                    outstanding_sizes.append(len(chunk))
+
+                self.send()
+
+            # The window is full.
+            self.flush()
+            response = await self._wait_for_completion(request)
+
+            for _ in range(min(response.acknowledge_count,
+                               len(outstanding_sizes))):
+                request.offset += outstanding_sizes.popleft()
 
-            response = await self._wait_for_completion()
-            outstanding_requests -= response.acknowledge_count
+    async def _put_file_close(self, request):
+        message = self.init_put_file_req()
+        message.request_id = request.request_id
+
+        if request.crc is not None:
+            message.crc32 = request.crc
+        await self._send_and_wait_for_completion(request)
+
+    async def put_file(self,
+                       fin,
+                       size,
+                       remote_path,
+                       offset=0,
+                       compress=True,
+                       mtime=None,
+                       create_directories=False,
+                       verify=False):
+        """Put data read from given binary stream at given offset in given
+        remote file. The file is truncated at the end of the written
+        data. The transfer is resumed where it stopped if the
+        connection is lost and re-established, given that the stream
+        is seekable.
+
+        File data is compressed if negotiated with the server, unless
+        `compress` is ``False``.
+
+        Give `mtime` in seconds since the epoch to set the
+        modification time of the remote file, and `create_directories`
+        as ``True`` to create its missing parent directories.
+
+        Give `verify` as ``True`` to make the server verify the written
+        data against a CRC-32 calculated while sending it. A resumed
+        transfer only verifies the data sent after it was resumed.
+
+        """
 
-    async def _put_file_close(self):
-        self.init_put_file_req()
-        await self._send_and_wait_for_completion()
+        request = self._create_request(PutFileRequest,
+                                       offset,
+                                       mtime,
+                                       create_directories)
+        attempts = 0
+
+        if fin.seekable():
+            position = fin.tell() - offset
+        else:
+            position = None
 
-    async def put_file(self, fin, size, remote_path):
         try:
-            window_size = await self._put_file_open(remote_path, size)
-            await self._put_file_data(fin, window_size)
-            await self._put_file_close()
+            while True:
+                offset = request.offset
+
+                try:
+                    window_size = await self._put_file_open(request,
+                                                            remote_path,
+                                                            size,
+                                                            compress,
+                                                            verify)
+                    data_size = self._put_file_data_size(request)
+                    await self._put_file_data(
+                        request,
+                        iter(functools.partial(fin.read, data_size), b''),
+                        window_size)
+                    await self._put_file_close(request)
+
+                    break
+                except CompletionError as e:
+                    if request.offset > offset:
+                        attempts = 0
+
+                    attempts += 1
+
+                    if position is None:
+                        raise PutFileError(remote_path, e.error)
+
+                    if not await self._resume_transfer(e.error, attempts):
+                        raise PutFileError(remote_path, e.error)
+
+                    fin.seek(position + request.offset)
+        finally:
+            self._delete_request(request)
+
+    async def list_files(self, remote_path):
+        """Returns a list of FileInfo of all regular files in given remote
+        directory and its subdirectories.
+
+        """
+
+        request = self._create_request(ListFilesRequest)
+
+        try:
+            message = self.init_list_files_req()
+            message.path = remote_path
+            message.request_id = request.request_id
+            await self._send_and_wait_for_completion(request)
+        except CompletionError as e:
+            raise ListFilesError(remote_path, e.error)
+        finally:
+            self._delete_request(request)
+
+        return request.files
+
+    async def get_tree(self,
+                       remote_path,
+                       local_path,
+                       concurrency=TREE_CONCURRENCY,
+                       compress=True):
+        """Get all files in given remote directory and its subdirectories
+        into given local directory. Files with the same size and
+        modification time as the local file are skipped, and the
+        modification time of got files is set to the remote
+        file's. Up to `concurrency` files are transferred at the same
+        time on the connection.
+
+        Returns the paths, relative to the directories, of all got
+        files.
+
+        """
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def get(file_info, path):
+            if is_unchanged(path, file_info.size, file_info.mtime):
+                return None
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            async with semaphore:
+                await self.get_file(posixpath.join(remote_path, file_info.path),
+                                    path,
+                                    compress=compress)
+
+            os.utime(path, (file_info.mtime, file_info.mtime))
+
+            return file_info.path
+
+        files = []
+
+        # Never write outside the local directory, whatever paths the
+        # server lists.
+        for file_info in await self.list_files(remote_path):
+            path = tree_local_path(local_path, file_info.path)
+
+            if path is None:
+                raise GetFileError(posixpath.join(remote_path, file_info.path),
+                                   'Invalid path.')
+
+            files.append((file_info, path))
+
+        paths = await asyncio.gather(*[get(file_info, path)
+                                       for file_info, path in files])
+
+        return [path for path in paths if path is not None]
+
+    async def put_tree(self,
+                       local_path,
+                       remote_path,
+                       concurrency=TREE_CONCURRENCY,
+                       compress=True):
+        """Put all files in given local directory and its subdirectories
+        into given remote directory, creating missing remote
+        directories. Files with the same size and modification time as
+        the remote file are skipped, and the modification time of put
+        files is set to the local file's. Up to `concurrency` files are
+        transferred at the same time on the connection.
+
+        Returns the paths, relative to the directories, of all put
+        files.
+
+        """
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def put(path, stat):
+            async with semaphore:
+                with open(os.path.join(local_path, *path.split('/')), 'rb') as fin:
+                    await self.put_file(fin,
+                                        stat.st_size,
+                                        posixpath.join(remote_path, path),
+                                        compress=compress,
+                                        mtime=int(stat.st_mtime),
+                                        create_directories=True)
+
+            return path
+
+        try:
+            remote_files = {
+                file_info.path: file_info
+                for file_info in await self.list_files(remote_path)
+            }
+        except ListFilesError as e:
+            if e.error == CONNECTION_LOST:
+                raise
+
+            # Typically a missing directory.
+            remote_files = {}
+
+        puts = []
+
+        for root, _, names in os.walk(local_path):
+            for name in names:
+                local_file_path = os.path.join(root, name)
+
+                if not os.path.isfile(local_file_path):
+                    continue
+
+                path = os.path.relpath(local_file_path, local_path)
+                path = path.replace(os.sep, '/')
+                stat = os.stat(local_file_path)
+                file_info = remote_files.get(path)
+
+                if (file_info is not None
+                    and file_info.size == stat.st_size
+                    and file_info.mtime == int(stat.st_mtime)):
+                    continue
+
+                puts.append(put(path, stat))
+
+        return await asyncio.gather(*puts)
+
+    async def _find_blocks(self, remote_path, fin, block_size):
+        """Find all full blocks of given stream in given remote file.
+        Returns a list of their offsets in the remote file.
+
+        """
+
+        request = self._create_request(FindBlocksRequest)
+        blocks_per_message = (
+            (self._maximum_message_size - PUT_FILE_OVERHEAD) // 8)
+
+        try:
+            message = self.init_find_blocks_req()
+            message.path = remote_path
+            message.block_size = block_size
+            message.request_id = request.request_id
+            response = await self._send_and_wait_for_completion(request)
+            window_size = response.window_size
+            outstanding_count = 0
+            checksums = []
+
+            while True:
+                block = fin.read(block_size)
+
+                if len(block) == block_size:
+                    checksums.append(struct.pack('>II',
+                                                 zlib.adler32(block),
+                                                 zlib.crc32(block)))
+
+                    if len(checksums) < blocks_per_message:
+                        continue
+
+                while outstanding_count >= window_size:
+                    self.flush()
+                    response = await self._wait_for_completion(request)
+                    outstanding_count -= response.acknowledge_count
+
+                message = self.init_find_blocks_req()
+                message.checksums = b''.join(checksums)
+                message.request_id = request.request_id
+                self.send()
+                outstanding_count += 1
+
+                # The last request has no checksums, and is acknowledged
+                # after all offsets are sent.
+                if not checksums:
+                    break
+
+                checksums = []
+
+            offsets = []
+
+            while outstanding_count > 0:
+                response = await self._wait_for_completion(request)
+                offsets.append(response.offsets)
+                outstanding_count -= response.acknowledge_count
+        finally:
+            self._delete_request(request)
+
+        return [offset for (offset, ) in struct.iter_unpack('>Q', b''.join(offsets))]
+
+    async def put_file_delta(self,
+                             fin,
+                             size,
+                             remote_path,
+                             block_size=None,
+                             compress=True,
+                             verify=False):
+        """Replace given remote file with data read from given seekable
+        binary stream, only sending data not already in the remote
+        file. The server searches the existing file for each full
+        block of the stream, and found blocks are copied by the server
+        instead of sent. `block_size` is by default about the square
+        root of `size`. The whole file is put if the existing file
+        could not be searched, for example as it does not exist.
+
+        A lost connection fails the transfer, as delta transfers are
+        not resumed. Give `verify` as ``True`` to make the server
+        verify the whole new file, including copied blocks, against a
+        CRC-32 of the stream.
+
+        Returns the number of file data bytes sent.
+
+        """
+
+        if block_size is None:
+            block_size = delta_block_size(size)
+
+        position = fin.tell()
+
+        try:
+            offsets = await self._find_blocks(remote_path, fin, block_size)
+        except CompletionError as e:
+            if e.error == CONNECTION_LOST:
+                raise PutFileError(remote_path, e.error)
+
+            LOGGER.debug("Putting all of '%s' as finding blocks failed with "
+                         "'%s'.",
+                         remote_path,
+                         e.error)
+            fin.seek(position)
+            await self.put_file(fin,
+                                size,
+                                remote_path,
+                                compress=compress,
+                                verify=verify)
+
+            return size
+
+        fin.seek(position)
+        request = self._create_request(PutFileRequest, 0)
+
+        try:
+            window_size = await self._put_file_open(request,
+                                                    remote_path,
+                                                    size,
+                                                    compress,
+                                                    verify,
+                                                    True)
+            chunks = DeltaChunks(fin,
+                                 block_size,
+                                 offsets,
+                                 self._put_file_data_size(request))
+            await self._put_file_data(request, chunks, window_size)
+
+            # The checksum includes the copied blocks.
+            if verify:
+                request.crc = chunks.crc
+
+            await self._put_file_close(request)
         except CompletionError as e:
             raise PutFileError(remote_path, e.error)
+        finally:
+            self._delete_request(request)
+
+        return chunks.literal_size
 
 
 def print_info(text):
@@ -384,6 +1647,22 @@ class ClientThread(threading.Thread):
     def is_connected(self):
         return self._client.is_connected()
 
+    @property
+    def rtt(self):
+        """Round trip time statistics of the connection.
+
+        """
+
+        return self._client.rtt
+
+    @property
+    def connect_statistics(self):
+        """Connection attempt statistics.
+
+        """
+
+        return self._client.connect_statistics
+
     def wait_for_connection(self, timeout=None):
         asyncio.run_coroutine_threadsafe(self._client.wait_for_connection(timeout),
                                          self._loop).result()
@@ -393,22 +1672,125 @@ class ClientThread(threading.Thread):
             self._client.execute_command(command),
             self._loop).result()
 
-    def get_file(self, remote_path, local_path, progress=None):
+    def read_sockets(self):
+        return asyncio.run_coroutine_threadsafe(self._client.read_sockets(),
+                                                self._loop).result()
+
+    def read_ps_stat(self, pid=1):
         return asyncio.run_coroutine_threadsafe(
-            self._client.get_file(remote_path, local_path, progress),
+            self._client.read_ps_stat(pid),
             self._loop).result()
 
-    def put_file(self, fin, size, remote_path):
+    def execute_many(self, commands):
         return asyncio.run_coroutine_threadsafe(
-            self._client.put_file(fin, size, remote_path),
+            self._client.execute_many(commands),
             self._loop).result()
 
-    async def _start(self):
-        self._client.start()
+    def execute_command_stream(self, command):
+        """Execute given command. Yields the command output as bytes chunks
+        as they are received.
+
+        """
 
+        stream = self._client.execute_command_stream(command)
 
-def create_to_path(from_path, to_path):
-    if to_path:
-        return to_path
-    else:
-        return os.path.basename(from_path)
+        try:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(
+                        stream.__anext__(),
+                        self._loop).result()
+                except StopAsyncIteration:
+                    break
+        finally:
+            asyncio.run_coroutine_threadsafe(stream.aclose(), self._loop).result()
+
+    def get_file(self,
+                 remote_path,
+                 local_path=None,
+                 progress=None,
+                 window_size=None,
+                 preallocate=False,
+                 offset=0,
+                 length=None,
+                 compress=True,
+                 verify=False):
+        return asyncio.run_coroutine_threadsafe(
+            self._client.get_file(remote_path,
+                                  local_path,
+                                  progress,
+                                  window_size,
+                                  preallocate,
+                                  offset,
+                                  length,
+                                  compress,
+                                  verify),
+            self._loop).result()
+
+    def put_file(self,
+                 fin,
+                 size,
+                 remote_path,
+                 offset=0,
+                 compress=True,
+                 mtime=None,
+                 create_directories=False,
+                 verify=False):
+        return asyncio.run_coroutine_threadsafe(
+            self._client.put_file(fin,
+                                  size,
+                                  remote_path,
+                                  offset,
+                                  compress,
+                                  mtime,
+                                  create_directories,
+                                  verify),
+            self._loop).result()
+
+    def list_files(self, remote_path):
+        return asyncio.run_coroutine_threadsafe(
+            self._client.list_files(remote_path),
+            self._loop).result()
+
+    def get_tree(self,
+                 remote_path,
+                 local_path,
+                 concurrency=TREE_CONCURRENCY,
+                 compress=True):
+        return asyncio.run_coroutine_threadsafe(
+            self._client.get_tree(remote_path,
+                                  local_path,
+                                  concurrency,
+                                  compress),
+            self._loop).result()
+
+    def put_tree(self,
+                 local_path,
+                 remote_path,
+                 concurrency=TREE_CONCURRENCY,
+                 compress=True):
+        return asyncio.run_coroutine_threadsafe(
+            self._client.put_tree(local_path,
+                                  remote_path,
+                                  concurrency,
+                                  compress),
+            self._loop).result()
+
+    def put_file_delta(self,
+                       fin,
+                       size,
+                       remote_path,
+                       block_size=None,
+                       compress=True,
+                       verify=False):
+        return asyncio.run_coroutine_threadsafe(
+            self._client.put_file_delta(fin,
+                                        size,
+                                        remote_path,
+                                        block_size,
+                                        compress,
+                                        verify),
+            self._loop).result()
+
+    async def _start(self):
+        self._client.start()
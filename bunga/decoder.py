@@ -0,0 +1,212 @@
+"""Decoders of the most frequent server to client messages, reading
+fields directly from the received payload instead of creating
+protobuf objects. The decoded messages have the same attributes as
+their protobuf counterparts, except that file data is a memoryview
+of the payload.
+
+Only used with the pure Python protobuf implementation, as the C++
+and upb implementations parse these messages as fast as this module
+does.
+
+"""
+
+from google.protobuf.internal import api_implementation
+
+
+# Tags of the ServerToClient oneof fields, all length delimited.
+EXECUTE_COMMAND_RSP = 0x12
+LOG_ENTRY_IND = 0x1a
+GET_FILE_RSP = 0x22
+
+# Field tags, as field number << 3 | wire type.
+EXECUTE_COMMAND_RSP_OUTPUT = 0x0a
+EXECUTE_COMMAND_RSP_ERROR = 0x12
+EXECUTE_COMMAND_RSP_REQUEST_ID = 0x18
+LOG_ENTRY_IND_TEXT = 0x0a
+GET_FILE_RSP_SIZE = 0x08
+GET_FILE_RSP_DATA = 0x12
+GET_FILE_RSP_ERROR = 0x1a
+GET_FILE_RSP_REQUEST_ID = 0x20
+GET_FILE_RSP_CRC32 = 0x28
+
+UINT32_MASK = 0xffffffff
+UINT64_MASK = 0xffffffffffffffff
+
+
+class ExecuteCommandRsp:
+
+    __slots__ = ('output', 'error', 'request_id')
+
+
+class LogEntryInd:
+
+    __slots__ = ('text', )
+
+
+class GetFileRsp:
+
+    __slots__ = ('size', 'data', 'error', 'request_id', 'crc32')
+
+
+def is_enabled():
+    """Returns ``True`` if messages are faster decoded by this module than
+    by protobuf.
+
+    """
+
+    return api_implementation.Type() == 'python'
+
+
+def decode_varint(payload, position):
+    """Returns the varint at given position in given payload and the
+    position after it. Raises IndexError if truncated.
+
+    """
+
+    value = 0
+    shift = 0
+
+    while True:
+        byte = payload[position]
+        position += 1
+        value |= ((byte & 0x7f) << shift)
+
+        if byte < 0x80:
+            return value, position
+
+        shift += 7
+
+
+def decode_execute_command_rsp(payload, position, end):
+    message = ExecuteCommandRsp()
+    message.output = b''
+    message.error = ''
+    message.request_id = 0
+
+    while position < end:
+        tag = payload[position]
+        value = payload[position + 1]
+
+        if value < 0x80:
+            position += 2
+        else:
+            value, position = decode_varint(payload, position + 1)
+
+        if tag == EXECUTE_COMMAND_RSP_OUTPUT:
+            message.output = payload[position:position + value]
+            position += value
+        elif tag == EXECUTE_COMMAND_RSP_ERROR:
+            message.error = str(payload[position:position + value], 'utf-8')
+            position += value
+        elif tag == EXECUTE_COMMAND_RSP_REQUEST_ID:
+            message.request_id = (value & UINT32_MASK)
+        else:
+            return None
+
+    if position != end:
+        return None
+
+    return message
+
+
+def decode_log_entry_ind(payload, position, end):
+    message = LogEntryInd()
+    text = []
+
+    while position < end:
+        if payload[position] != LOG_ENTRY_IND_TEXT:
+            return None
+
+        value = payload[position + 1]
+
+        if value < 0x80:
+            position += 2
+        else:
+            value, position = decode_varint(payload, position + 1)
+
+        text.append(str(payload[position:position + value], 'utf-8'))
+        position += value
+
+    if position != end:
+        return None
+
+    message.text = text
+
+    return message
+
+
+def decode_get_file_rsp(payload, position, end):
+    message = GetFileRsp()
+    message.size = 0
+    message.data = b''
+    message.error = ''
+    message.request_id = 0
+    message.crc32 = 0
+
+    while position < end:
+        tag = payload[position]
+        value = payload[position + 1]
+
+        if value < 0x80:
+            position += 2
+        else:
+            value, position = decode_varint(payload, position + 1)
+
+        if tag == GET_FILE_RSP_DATA:
+            message.data = memoryview(payload)[position:position + value]
+            position += value
+        elif tag == GET_FILE_RSP_REQUEST_ID:
+            message.request_id = (value & UINT32_MASK)
+        elif tag == GET_FILE_RSP_SIZE:
+            message.size = (value & UINT64_MASK)
+        elif tag == GET_FILE_RSP_ERROR:
+            message.error = str(payload[position:position + value], 'utf-8')
+            position += value
+        elif tag == GET_FILE_RSP_CRC32:
+            message.crc32 = (value & UINT32_MASK)
+        else:
+            return None
+
+    if position != end:
+        return None
+
+    return message
+
+
+def decode_server_to_client(payload):
+    """Returns the oneof field name and the decoded message of given
+    ServerToClient payload, or ``(None, None)`` if it has to be
+    decoded with protobuf, for example as it is another message or
+    has unknown fields.
+
+    """
+
+    try:
+        tag = payload[0]
+
+        if tag == GET_FILE_RSP:
+            name = 'get_file_rsp'
+            decode = decode_get_file_rsp
+        elif tag == LOG_ENTRY_IND:
+            name = 'log_entry_ind'
+            decode = decode_log_entry_ind
+        elif tag == EXECUTE_COMMAND_RSP:
+            name = 'execute_command_rsp'
+            decode = decode_execute_command_rsp
+        else:
+            return None, None
+
+        length, position = decode_varint(payload, 1)
+
+        # A oneof field given more than once is merged by protobuf.
+        if position + length != len(payload):
+            return None, None
+
+        message = decode(payload, position, position + length)
+    except (IndexError, UnicodeDecodeError):
+        return None, None
+
+    if message is None:
+        return None, None
+
+    return name, message
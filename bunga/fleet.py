@@ -0,0 +1,125 @@
+import asyncio
+import logging
+
+from .client import Client
+from .client import ExecuteCommandError
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+class FleetResult:
+    """The outcome for a single device. `error` is ``None`` on success.
+
+    """
+
+    def __init__(self, uri, value=None, error=None):
+        self.uri = uri
+        self.value = value
+        self.error = error
+
+    def __repr__(self):
+        return f'FleetResult(uri={self.uri!r}, error={self.error!r})'
+
+
+class Fleet:
+    """Drive many devices from a single event loop. At most `concurrency`
+    devices are connected at the same time, and each device is given
+    at most `timeout` seconds to connect and complete its work.
+
+    A failed connection attempt fails the device, unless
+    `reconnect_policy` is given to retry within the timeout, for
+    example a `DecorrelatedJitter` policy not to retry all devices at
+    the same time.
+
+    """
+
+    def __init__(self,
+                 uris,
+                 concurrency=32,
+                 timeout=10,
+                 client_class=Client,
+                 reconnect_policy=None):
+        self._uris = list(uris)
+        self._concurrency = concurrency
+        self._timeout = timeout
+        self._client_class = client_class
+        self._reconnect_policy = reconnect_policy
+
+    async def run(self, function):
+        """Call given coroutine function with a connected client for each
+        device. Yields a `FleetResult` per device as soon as it is
+        available, so results are not in `uris` order.
+
+        """
+
+        semaphore = asyncio.Semaphore(self._concurrency)
+        tasks = [
+            asyncio.ensure_future(self._run_device(uri, function, semaphore))
+            for uri in self._uris
+        ]
+
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def execute_command(self, command):
+        """Execute given command on all devices. Yields a `FleetResult` per
+        device with the command output as value.
+
+        """
+
+        async def execute_command(client):
+            return await client.execute_command(command)
+
+        async for result in self.run(execute_command):
+            yield result
+
+    async def execute_many(self, commands):
+        """Execute given commands on all devices, with all requests to a
+        device sent back to back. Yields a `FleetResult` per device with
+        a list of the output or `ExecuteCommandError` of each command as
+        value.
+
+        """
+
+        async def execute_many(client):
+            return await client.execute_many(commands)
+
+        async for result in self.run(execute_many):
+            yield result
+
+    async def _run_device(self, uri, function, semaphore):
+        async with semaphore:
+            LOGGER.info('Running on %s.', uri)
+            client = self._client_class(uri,
+                                        asyncio.get_event_loop(),
+                                        connection_refused_delay=None,
+                                        connect_timeout_delay=None,
+                                        connection_closed_delay=None,
+                                        reconnect_policy=self._reconnect_policy)
+            client.start()
+
+            try:
+                value = await asyncio.wait_for(
+                    self._connect_and_run(client, function),
+                    self._timeout)
+                result = FleetResult(uri, value)
+            except ExecuteCommandError as e:
+                result = FleetResult(uri, e.output, e.error)
+            except asyncio.TimeoutError:
+                result = FleetResult(uri, error='Timeout.')
+            except Exception as e:
+                result = FleetResult(uri, error=str(e) or repr(e))
+            finally:
+                client.stop()
+
+            return result
+
+    async def _connect_and_run(self, client, function):
+        await client.wait_for_connection()
+
+        return await function(client)
@@ -1,11 +1,8 @@
-import re
 import struct
-from humanfriendly import format_timespan
+import ipaddress
 
+from . import proc
 
-RE_IPV4 = re.compile(
-    r'^\s*\d+: (\w{8}):(\w{4}) (\w{8}):(\w{4}) (\w{2}) (\w{8}):(\w{8})',
-    re.MULTILINE)
 
 TCP_STATES = [
     '',
@@ -33,30 +30,265 @@ def format_ipv4(hexstring):
                                 (address >> 0) & 0xff)
 
 
-def format_port(hexstring):
-    return str(struct.unpack('>H', bytes.fromhex(hexstring))[0])
+# /proc/net files and their protocols, in netstat order.
+NETSTAT_FILES = [
+    ('tcp', '/proc/net/tcp'),
+    ('tcp6', '/proc/net/tcp6'),
+    ('udp', '/proc/net/udp'),
+    ('udp6', '/proc/net/udp6'),
+    ('unix', '/proc/net/unix')
+]
 
+UDP_STATES = {
+    1: 'established',
+    7: 'close'
+}
 
-def format_netstat(proc_net_tcp):
-    lines = [
-        'PROTO  LOCAL-ADDRESS          REMOTE-ADDRESS         STATE',
-        '----------------------------------------------------------------'
+UNIX_STATES = [
+    '',
+    'unconnected',
+    'connecting',
+    'connected',
+    'disconnecting'
+]
+
+# Set in the flags of listening Unix sockets.
+UNIX_FLAG_ACCEPT_CONNECTIONS = 0x10000
+
+
+class Socket:
+    """A socket in /proc/net. Addresses and ports are ``None`` and the
+    local address is the path, if any, for Unix sockets, which also do
+    not have queue sizes.
+
+    """
+
+    __slots__ = (
+        'protocol',
+        'local_address',
+        'local_port',
+        'remote_address',
+        'remote_port',
+        'state',
+        'send_queue',
+        'receive_queue',
+        'inode'
+    )
+
+    def __init__(self,
+                 protocol,
+                 local_address,
+                 local_port,
+                 remote_address,
+                 remote_port,
+                 state,
+                 send_queue,
+                 receive_queue,
+                 inode):
+        self.protocol = protocol
+        self.local_address = local_address
+        self.local_port = local_port
+        self.remote_address = remote_address
+        self.remote_port = remote_port
+        self.state = state
+        self.send_queue = send_queue
+        self.receive_queue = receive_queue
+        self.inode = inode
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def format_ipv6(hexstring):
+    """Format given IPv6 address, as four 32 bits words in host byte order
+    (little endian). IPv4-mapped addresses are formatted with the IPv4
+    address in dotted decimal, as ``::ffff:192.168.0.4``.
+
+    """
+
+    data = bytes.fromhex(hexstring)
+    address = ipaddress.IPv6Address(
+        b''.join(data[i:i + 4][::-1] for i in range(0, 16, 4)))
+
+    if address.ipv4_mapped is not None:
+        return f'::ffff:{address.ipv4_mapped}'
+
+    return str(address)
+
+
+def parse_address(address):
+    address, port = address.split(':')
+
+    if len(address) == 8:
+        address = format_ipv4(address)
+    else:
+        address = format_ipv6(address)
+
+    return address, int(port, 16)
+
+
+def parse_proc_net_inet(protocol, text):
+    """Parse given /proc/net/tcp, tcp6, udp or udp6 contents.
+
+    """
+
+    if protocol.startswith('tcp'):
+        states = TCP_STATES
+    else:
+        states = UDP_STATES
+
+    sockets = []
+
+    for line in text.splitlines():
+        items = line.split()
+
+        # Skip the header.
+        if len(items) < 10 or not items[0].endswith(':'):
+            continue
+
+        local_address, local_port = parse_address(items[1])
+        remote_address, remote_port = parse_address(items[2])
+        state = int(items[3], 16)
+
+        try:
+            state = states[state]
+        except (IndexError, KeyError):
+            state = str(state)
+
+        send_queue, receive_queue = items[4].split(':')
+        sockets.append(Socket(protocol,
+                              local_address,
+                              local_port,
+                              remote_address,
+                              remote_port,
+                              state,
+                              int(send_queue, 16),
+                              int(receive_queue, 16),
+                              int(items[9])))
+
+    return sockets
+
+
+def parse_proc_net_unix(text):
+    """Parse given /proc/net/unix contents.
+
+    """
+
+    sockets = []
+
+    for line in text.splitlines():
+        items = line.split(None, 7)
+
+        # Skip the header.
+        if len(items) < 7 or not items[0].endswith(':'):
+            continue
+
+        if int(items[3], 16) & UNIX_FLAG_ACCEPT_CONNECTIONS:
+            state = 'listen'
+        else:
+            state = int(items[5], 16)
+
+            try:
+                state = UNIX_STATES[state]
+            except IndexError:
+                state = str(state)
+
+        if len(items) == 8:
+            path = items[7]
+        else:
+            path = ''
+
+        sockets.append(Socket('unix',
+                              path,
+                              None,
+                              None,
+                              None,
+                              state,
+                              None,
+                              None,
+                              int(items[6])))
+
+    return sockets
+
+
+def parse_proc_net(protocol, text):
+    if protocol == 'unix':
+        return parse_proc_net_unix(text)
+    else:
+        return parse_proc_net_inet(protocol, text)
+
+
+def filter_sockets(sockets, protocols=None, states=None, port=None):
+    """Returns sockets of any of given protocols, in any of given states,
+    and with given local or remote port. ``None`` matches all.
+
+    """
+
+    return [
+        socket
+        for socket in sockets
+        if ((protocols is None or socket.protocol in protocols)
+            and (states is None or socket.state in states)
+            and (port is None or port in [socket.local_port, socket.remote_port]))
+    ]
+
+
+def format_socket_address(address, port):
+    if address is None:
+        return '-'
+    elif port is None:
+        return address
+    else:
+        return f'{address}:{port}'
+
+
+def format_queue(size):
+    if size is None:
+        return '-'
+    else:
+        return str(size)
+
+
+def format_sockets(sockets):
+    rows = [
+        (socket.protocol,
+         format_queue(socket.receive_queue),
+         format_queue(socket.send_queue),
+         format_socket_address(socket.local_address, socket.local_port),
+         format_socket_address(socket.remote_address, socket.remote_port),
+         socket.state,
+         str(socket.inode))
+        for socket in sockets
+    ]
+    header = (
+        'PROTO', 'RECV-Q', 'SEND-Q', 'LOCAL-ADDRESS', 'REMOTE-ADDRESS',
+        'STATE', 'INODE'
+    )
+    widths = [
+        max([len(value) for value in column])
+        for column in zip(header, *rows)
     ]
+    lines = []
 
-    for entry in RE_IPV4.finditer(proc_net_tcp):
-        local = f'{format_ipv4(entry.group(1))}:{format_port(entry.group(2))}'
-        remote = f'{format_ipv4(entry.group(3))}:{format_port(entry.group(4))}'
-        state = TCP_STATES[int(entry.group(5), 16)]
-        lines.append(f'tcp    {local:21}  {remote:21}  {state}')
+    for row in [header] + rows:
+        lines.append('  '.join(value.ljust(width)
+                               for value, width in zip(row, widths)).rstrip())
+
+    lines.insert(1, '-' * len(max(lines, key=len)))
 
     return '\n'.join(lines) + '\n'
 
 
 def format_uptime(proc_uptime, proc_loadavg):
-    one, five, fifteen, _, _ = proc_loadavg.split()
+    # Imported here as it takes longer than most commands take to
+    # execute.
+    from humanfriendly import format_timespan
+
+    loadavg = proc.parse_loadavg(proc_loadavg)
     uptime = int(float(proc_uptime.split()[0]))
 
-    return f'up {format_timespan(uptime)},  load average: {one}, {five}, {fifteen}\n'
+    return (f'up {format_timespan(uptime)},  load average: '
+            f'{loadavg.one:.2f}, {loadavg.five:.2f}, {loadavg.fifteen:.2f}\n')
 
 
 def proc_state(state):
@@ -90,24 +322,23 @@ class PsFormatter:
         ]
 
         for stat in proc_n_stat:
-            items = stat.split()
-            pid = items[0]
-            name = items[1][1:-1]
-            state = proc_state(items[2])
-            utime = int(items[13])
-            stime = int(items[14])
-            ticks = utime + stime
+            thread = proc.parse_process_stat(stat)
+            ticks = thread.ticks
 
             try:
-                delta = (ticks - self._prev_ticks[pid])
+                delta = (ticks - self._prev_ticks[thread.pid])
             except KeyError:
                 delta = '-'
 
-            self._prev_ticks[pid] = ticks
-            lines.append(format_thread(name, pid, state, ticks, delta))
+            self._prev_ticks[thread.pid] = ticks
+            lines.append(format_thread(thread.name,
+                                       thread.pid,
+                                       proc_state(thread.state),
+                                       ticks,
+                                       delta))
 
         # Faked idle thread.
-        ticks = int(proc_stat.split()[4])
+        ticks = proc.parse_stat(proc_stat).cpu.idle
 
         if self._prev_idle_ticks is not None:
             delta = (ticks - self._prev_idle_ticks)
@@ -118,3 +349,114 @@ class PsFormatter:
         lines.append(format_thread('idle', '-', '-', ticks, delta))
 
         return '\n'.join(lines) + '\n'
+
+
+class TopRow:
+    """A thread in top. `cpu` is its CPU usage in percent of one CPU since
+    the previous sample, or ``None`` in its first sample.
+
+    """
+
+    __slots__ = ('name', 'pid', 'state', 'ticks', 'cpu')
+
+    def __init__(self, name, pid, state, ticks, cpu):
+        self.name = name
+        self.pid = pid
+        self.state = state
+        self.ticks = ticks
+        self.cpu = cpu
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'pid': self.pid,
+            'state': self.state,
+            'ticks': self.ticks,
+            'cpu': self.cpu
+        }
+
+
+class Top:
+    """Calculates the CPU usage of threads from the ticks they used
+    between samples, compared to the ticks all `cpus` CPUs used in the
+    same time according to /proc/stat. The time between samples is
+    thereby measured by the server, in the same read as the threads'
+    ticks, and not by the client.
+
+    """
+
+    def __init__(self, cpus=1):
+        self._cpus = cpus
+        self._prev_ticks = {}
+        self._prev_idle_ticks = None
+        self._prev_total_ticks = None
+
+    def update(self, proc_stat, proc_n_stat):
+        """Add a sample of /proc/stat, or its first line, and the stat of
+        each thread. Returns a row per thread, highest CPU usage
+        first, and a last row for idle time, which may exceed 100
+        percent on multi-core systems.
+
+        """
+
+        cpu = proc.parse_stat(proc_stat).cpu
+        total_ticks = cpu.total
+
+        if (self._prev_total_ticks is None
+            or total_ticks <= self._prev_total_ticks):
+            scale = None
+        else:
+            scale = 100 * self._cpus / (total_ticks - self._prev_total_ticks)
+
+        rows = []
+        ticks = {}
+
+        for stat in proc_n_stat:
+            thread = proc.parse_process_stat(stat)
+            thread_ticks = thread.ticks
+            rows.append(TopRow(thread.name,
+                               str(thread.pid),
+                               proc_state(thread.state),
+                               thread_ticks,
+                               self._cpu(thread_ticks,
+                                         self._prev_ticks.get(thread.pid),
+                                         scale)))
+            ticks[thread.pid] = thread_ticks
+
+        rows.sort(key=lambda row: (row.cpu or 0, row.ticks), reverse=True)
+        idle_ticks = cpu.idle
+        rows.append(TopRow('idle',
+                           '-',
+                           '-',
+                           idle_ticks,
+                           self._cpu(idle_ticks, self._prev_idle_ticks, scale)))
+        self._prev_ticks = ticks
+        self._prev_idle_ticks = idle_ticks
+        self._prev_total_ticks = total_ticks
+
+        return rows
+
+    @staticmethod
+    def _cpu(ticks, prev_ticks, scale):
+        if scale is None or prev_ticks is None:
+            return None
+
+        return (ticks - prev_ticks) * scale
+
+
+def format_top(rows):
+    lines = [
+        'NAME               PID  STATE     CPU-TICKS   CPU%',
+        '--------------------------------------------------'
+    ]
+
+    for row in rows:
+        if row.cpu is None:
+            cpu = '-'
+        else:
+            cpu = f'{row.cpu:.1f}'
+
+        lines.append(
+            f'{row.name:18} {row.pid:4} {row.state:9} {row.ticks:<10} {cpu:>5}')
+
+    return '\n'.join(lines) + '\n'
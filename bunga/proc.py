@@ -0,0 +1,535 @@
+"""Typed parsers of /proc files.
+
+Each parser returns records with __slots__ and integer or float
+fields, leaving formatting to the caller. Parsers and regular
+expressions are created once when the module is imported. Tables,
+files with one record per line, are converted to integers all at once
+instead of line by line, see TableParser.
+
+"""
+
+import re
+
+
+# Fields of /proc/net/dev, after the interface name.
+NET_DEV_FIELDS = (
+    'rx_bytes',
+    'rx_packets',
+    'rx_errors',
+    'rx_dropped',
+    'rx_fifo',
+    'rx_frame',
+    'rx_compressed',
+    'rx_multicast',
+    'tx_bytes',
+    'tx_packets',
+    'tx_errors',
+    'tx_dropped',
+    'tx_fifo',
+    'tx_collisions',
+    'tx_carrier',
+    'tx_compressed'
+)
+
+# Fields of /proc/diskstats, after the device name. Newer kernels
+# append discard and flush fields, which are ignored.
+DISKSTATS_FIELDS = (
+    'reads',
+    'reads_merged',
+    'sectors_read',
+    'read_time',
+    'writes',
+    'writes_merged',
+    'sectors_written',
+    'write_time',
+    'ios_in_progress',
+    'io_time',
+    'weighted_io_time'
+)
+
+# /proc/meminfo keys of MemInfo attributes.
+MEMINFO_KEYS = {
+    'MemTotal': 'total',
+    'MemFree': 'free',
+    'MemAvailable': 'available',
+    'Buffers': 'buffers',
+    'Cached': 'cached',
+    'SwapTotal': 'swap_total',
+    'SwapFree': 'swap_free'
+}
+
+# Start of the first line in /proc/stat that is not a cpu line.
+RE_STAT_CPU_END = re.compile(r'^(?!cpu)', re.MULTILINE)
+RE_MEMINFO = re.compile(r'^([^:\n]+):\s+(\d+)( kB)?$', re.MULTILINE)
+
+
+class Record:
+    """Base class of all records. Subclasses list their fields in
+    ``__slots__``.
+
+    """
+
+    __slots__ = ()
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+
+        return self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}'
+                           for name in self.__slots__)
+
+        return f'{type(self).__name__}({fields})'
+
+
+class TableParser:
+    """Parses a table of records, one per line, with a name column and
+    otherwise integer columns. All lines must have as many columns as
+    the first. The whole table is split at once, all integers are
+    converted with a single map() call, and each record is created from
+    its slice of them. Columns after the first `columns` integers of a
+    line are ignored, as newer kernels may append columns.
+
+    """
+
+    def __init__(self, record, columns, name_column=0, header_lines=0):
+        self._record = record
+        self._columns = columns
+        self._name_column = name_column
+        self._header_lines = header_lines
+
+    def parse(self, text):
+        """Returns a list of records of given table.
+
+        """
+
+        if self._header_lines > 0:
+            text = text.split('\n', self._header_lines)[-1]
+
+        tokens = text.split()
+
+        if not tokens:
+            return []
+
+        width = len(text.lstrip().split('\n', 1)[0].split())
+
+        if len(tokens) % width != 0:
+            raise ValueError(
+                f'Expected {width} columns on each line in {text!r}.')
+
+        names = tokens[self._name_column::width]
+        del tokens[self._name_column::width]
+        integers = list(map(int, tokens))
+        record = self._record
+        width -= 1
+        columns = min(self._columns, width)
+
+        return [
+            record(name, *integers[offset:offset + columns])
+            for name, offset in zip(names, range(0, len(integers), width))
+        ]
+
+
+class CpuTimes(Record):
+    """A cpu line in /proc/stat, in clock ticks. `name` is ``'cpu'`` for
+    all CPUs, and ``'cpu<n>'`` for CPU n. Fields missing in older
+    kernels are zero.
+
+    """
+
+    __slots__ = ('name',
+                 'user',
+                 'nice',
+                 'system',
+                 'idle',
+                 'iowait',
+                 'irq',
+                 'softirq',
+                 'steal',
+                 'guest',
+                 'guest_nice')
+
+    def __init__(self,
+                 name,
+                 user,
+                 nice,
+                 system,
+                 idle,
+                 iowait=0,
+                 irq=0,
+                 softirq=0,
+                 steal=0,
+                 guest=0,
+                 guest_nice=0):
+        self.name = name
+        self.user = user
+        self.nice = nice
+        self.system = system
+        self.idle = idle
+        self.iowait = iowait
+        self.irq = irq
+        self.softirq = softirq
+        self.steal = steal
+        self.guest = guest
+        self.guest_nice = guest_nice
+
+    @property
+    def total(self):
+        """All ticks. Guest time is already included in user and nice
+        time.
+
+        """
+
+        return (self.user
+                + self.nice
+                + self.system
+                + self.idle
+                + self.iowait
+                + self.irq
+                + self.softirq
+                + self.steal)
+
+
+class Stat(Record):
+    """/proc/stat. `cpu` is the time of all CPUs and `cpus` the time of
+    each CPU. Fields of missing lines are ``None``.
+
+    """
+
+    __slots__ = ('cpu',
+                 'cpus',
+                 'interrupts',
+                 'context_switches',
+                 'boot_time',
+                 'processes',
+                 'procs_running',
+                 'procs_blocked')
+
+    def __init__(self):
+        self.cpu = None
+        self.cpus = []
+        self.interrupts = None
+        self.context_switches = None
+        self.boot_time = None
+        self.processes = None
+        self.procs_running = None
+        self.procs_blocked = None
+
+
+class ProcessStat(Record):
+    """The first 24 fields of /proc/<pid>/stat or
+    /proc/<pid>/task/<tid>/stat. Times are in clock ticks and `rss` in
+    pages.
+
+    """
+
+    __slots__ = ('pid',
+                 'name',
+                 'state',
+                 'ppid',
+                 'pgrp',
+                 'session',
+                 'tty_nr',
+                 'tpgid',
+                 'flags',
+                 'minflt',
+                 'cminflt',
+                 'majflt',
+                 'cmajflt',
+                 'utime',
+                 'stime',
+                 'cutime',
+                 'cstime',
+                 'priority',
+                 'nice',
+                 'num_threads',
+                 'itrealvalue',
+                 'starttime',
+                 'vsize',
+                 'rss')
+
+    def __init__(self, pid, name, state, *values):
+        self.pid = pid
+        self.name = name
+        self.state = state
+        (self.ppid,
+         self.pgrp,
+         self.session,
+         self.tty_nr,
+         self.tpgid,
+         self.flags,
+         self.minflt,
+         self.cminflt,
+         self.majflt,
+         self.cmajflt,
+         self.utime,
+         self.stime,
+         self.cutime,
+         self.cstime,
+         self.priority,
+         self.nice,
+         self.num_threads,
+         self.itrealvalue,
+         self.starttime,
+         self.vsize,
+         self.rss) = values
+
+    @property
+    def ticks(self):
+        """Used CPU ticks, in user and kernel mode.
+
+        """
+
+        return self.utime + self.stime
+
+
+class MemInfo(Record):
+    """/proc/meminfo, in bytes. Attributes of keys missing in older
+    kernels are ``None``. `values` has all keys, in bytes if given in
+    kB in the file.
+
+    """
+
+    __slots__ = ('total',
+                 'free',
+                 'available',
+                 'buffers',
+                 'cached',
+                 'swap_total',
+                 'swap_free',
+                 'values')
+
+    def __init__(self, values):
+        for key, name in MEMINFO_KEYS.items():
+            setattr(self, name, values.get(key))
+
+        self.values = values
+
+
+class NetDevice(Record):
+    """A network interface in /proc/net/dev.
+
+    """
+
+    __slots__ = ('name', ) + NET_DEV_FIELDS
+
+    def __init__(self, name, *values):
+        self.name = name
+        (self.rx_bytes,
+         self.rx_packets,
+         self.rx_errors,
+         self.rx_dropped,
+         self.rx_fifo,
+         self.rx_frame,
+         self.rx_compressed,
+         self.rx_multicast,
+         self.tx_bytes,
+         self.tx_packets,
+         self.tx_errors,
+         self.tx_dropped,
+         self.tx_fifo,
+         self.tx_collisions,
+         self.tx_carrier,
+         self.tx_compressed) = values
+
+
+class DiskStat(Record):
+    """A block device in /proc/diskstats. Times are in milliseconds.
+    Partitions in kernels before 2.6.25 only have reads, sectors read,
+    writes and sectors written, and their other fields are zero.
+
+    """
+
+    __slots__ = ('major', 'minor', 'name') + DISKSTATS_FIELDS
+
+    def __init__(self, name, major, minor, *values):
+        self.major = major
+        self.minor = minor
+        self.name = name
+
+        if len(values) == 4:
+            values = (values[0], 0, values[1], 0, values[2], 0, values[3],
+                      0, 0, 0, 0)
+        elif len(values) != len(DISKSTATS_FIELDS):
+            raise ValueError(
+                f'Expected 4 or {len(DISKSTATS_FIELDS)} values of disk '
+                f'{name!r}, got {len(values)}.')
+
+        (self.reads,
+         self.reads_merged,
+         self.sectors_read,
+         self.read_time,
+         self.writes,
+         self.writes_merged,
+         self.sectors_written,
+         self.write_time,
+         self.ios_in_progress,
+         self.io_time,
+         self.weighted_io_time) = values
+
+
+class LoadAvg(Record):
+    """/proc/loadavg.
+
+    """
+
+    __slots__ = ('one',
+                 'five',
+                 'fifteen',
+                 'running',
+                 'total',
+                 'last_pid')
+
+    def __init__(self, one, five, fifteen, running, total, last_pid):
+        self.one = one
+        self.five = five
+        self.fifteen = fifteen
+        self.running = running
+        self.total = total
+        self.last_pid = last_pid
+
+
+def _parse_stat_intr(stat, items):
+    stat.interrupts = int(items[1])
+
+
+def _parse_stat_ctxt(stat, items):
+    stat.context_switches = int(items[1])
+
+
+def _parse_stat_btime(stat, items):
+    stat.boot_time = int(items[1])
+
+
+def _parse_stat_processes(stat, items):
+    stat.processes = int(items[1])
+
+
+def _parse_stat_procs_running(stat, items):
+    stat.procs_running = int(items[1])
+
+
+def _parse_stat_procs_blocked(stat, items):
+    stat.procs_blocked = int(items[1])
+
+
+STAT_PARSERS = {
+    'intr': _parse_stat_intr,
+    'ctxt': _parse_stat_ctxt,
+    'btime': _parse_stat_btime,
+    'processes': _parse_stat_processes,
+    'procs_running': _parse_stat_procs_running,
+    'procs_blocked': _parse_stat_procs_blocked
+}
+
+
+CPU_TIMES_PARSER = TableParser(CpuTimes, len(CpuTimes.__slots__) - 1)
+NET_DEV_PARSER = TableParser(NetDevice, len(NET_DEV_FIELDS), header_lines=2)
+DISKSTATS_PARSER = TableParser(DiskStat, len(DISKSTATS_FIELDS) + 2, 2)
+
+
+def parse_stat(text):
+    """Parse given /proc/stat contents, or its first lines.
+
+    """
+
+    stat = Stat()
+    match = RE_STAT_CPU_END.search(text)
+
+    if match is None:
+        end = len(text)
+    else:
+        end = match.start()
+
+    cpus = CPU_TIMES_PARSER.parse(text[:end])
+
+    if cpus and cpus[0].name == 'cpu':
+        stat.cpu = cpus.pop(0)
+
+    stat.cpus = cpus
+
+    for line in text[end:].splitlines():
+        items = line.split(' ', 2)
+        parser = STAT_PARSERS.get(items[0])
+
+        if parser is not None:
+            parser(stat, items)
+
+    return stat
+
+
+def parse_process_stat(text):
+    """Parse given /proc/<pid>/stat or /proc/<pid>/task/<tid>/stat
+    contents. The name may contain spaces and parentheses.
+
+    """
+
+    pid, rest = text.split(' (', 1)
+    name, rest = rest.rsplit(') ', 1)
+    items = rest.split(None, 22)
+
+    return ProcessStat(int(pid), name, items[0], *map(int, items[1:22]))
+
+
+def parse_meminfo(text):
+    """Parse given /proc/meminfo contents.
+
+    """
+
+    return MemInfo({
+        key: int(value) * 1024 if unit else int(value)
+        for key, value, unit in RE_MEMINFO.findall(text)
+    })
+
+
+def parse_net_dev(text):
+    """Parse given /proc/net/dev contents.
+
+    """
+
+    # Older kernels do not separate the interface name and large
+    # received byte counts with a space.
+    return NET_DEV_PARSER.parse(text.replace(':', ' '))
+
+
+def parse_diskstats(text):
+    """Parse given /proc/diskstats contents.
+
+    """
+
+    try:
+        return DISKSTATS_PARSER.parse(text)
+    except ValueError:
+        # Disks and partitions have different number of columns in
+        # kernels before 2.6.25, so parse each line on its own.
+        disks = []
+
+        for line in text.splitlines():
+            major, minor, name, *values = line.split()
+            disks.append(DiskStat(name,
+                                  int(major),
+                                  int(minor),
+                                  *map(int, values[:len(DISKSTATS_FIELDS)])))
+
+        return disks
+
+
+def parse_loadavg(text):
+    """Parse given /proc/loadavg contents.
+
+    """
+
+    one, five, fifteen, entities, last_pid = text.split()
+    running, total = entities.split('/')
+
+    return LoadAvg(float(one),
+                   float(five),
+                   float(fifteen),
+                   int(running),
+                   int(total),
+                   int(last_pid))
@@ -0,0 +1,97 @@
+"""Policies deciding how long to wait before reconnecting to a server.
+
+A policy is given the number of consecutive failed connection attempts
+and the previous delay, and does not keep any state of its own, so a
+single policy may be shared by many clients.
+
+"""
+
+import abc
+import random
+
+
+class ReconnectPolicy(abc.ABC):
+    """Base class of reconnect policies. Gives up after `attempts`
+    consecutive failed connection attempts, or never if ``None``.
+    Subclasses implement next_delay().
+
+    """
+
+    def __init__(self, attempts=None):
+        self.attempts = attempts
+
+    def delay(self, failures, previous):
+        """Returns the number of seconds to wait before the next connection
+        attempt after `failures` consecutive failed attempts, or
+        ``None`` to give up. `previous` is the previous delay, or
+        ``None`` after the first failed attempt.
+
+        """
+
+        if self.attempts is not None and failures >= self.attempts:
+            return None
+
+        return self.next_delay(failures, previous)
+
+    @abc.abstractmethod
+    def next_delay(self, failures, previous):
+        """Returns the number of seconds to wait before the next connection
+        attempt. Only called if not giving up.
+
+        """
+
+
+class FixedDelay(ReconnectPolicy):
+    """Wait `seconds` seconds between attempts.
+
+    """
+
+    def __init__(self, seconds=1, attempts=None):
+        super().__init__(attempts)
+        self.seconds = seconds
+
+    def next_delay(self, failures, previous):
+        return self.seconds
+
+
+class ExponentialBackoff(ReconnectPolicy):
+    """Double the delay after each failed attempt, starting at `base` and
+    limited to `cap` seconds. With `jitter`, wait a random time
+    between zero and the delay instead, so clients disconnected at the
+    same time do not reconnect at the same time.
+
+    """
+
+    def __init__(self, base=1, cap=60, jitter=True, attempts=None):
+        super().__init__(attempts)
+        self.base = base
+        self.cap = cap
+        self.jitter = jitter
+
+    def next_delay(self, failures, previous):
+        delay = min(self.cap, self.base * 2 ** min(failures - 1, 32))
+
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        return delay
+
+
+class DecorrelatedJitter(ReconnectPolicy):
+    """Wait a random time between `base` and three times the previous
+    delay, limited to `cap` seconds. Spreads reconnecting clients
+    better than exponential backoff with jitter while still backing
+    off.
+
+    """
+
+    def __init__(self, base=1, cap=60, attempts=None):
+        super().__init__(attempts)
+        self.base = base
+        self.cap = cap
+
+    def next_delay(self, failures, previous):
+        if previous is None:
+            previous = self.base
+
+        return min(self.cap, random.uniform(self.base, 3 * previous))
@@ -0,0 +1,1151 @@
+"""An asyncio implementation of the bunga protocol server, behaving as
+the C server in lib/src/bunga_server_linux.c. Serves the host file
+system below given root, and commands from pluggable handlers.
+
+"""
+
+import asyncio
+import errno
+import inspect
+import logging
+import mmap
+import os
+import shlex
+import stat
+import struct
+import threading
+import time
+import zlib
+from collections import defaultdict
+
+from . import bunga_pb2
+from .bunga_client import MessageType
+from .bunga_client import parse_tcp_uri
+from .transport import FrameProtocol
+from .transport import WRITE_HIGH_WATER_MARK
+from .transport import pack_header
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Default maximum message size in bytes to send and receive.
+MAXIMUM_MESSAGE_SIZE = 65536
+
+# Bytes of each message reserved for everything but file data or
+# command output.
+MESSAGE_OVERHEAD = 64
+
+# Keep alive timeout in seconds sent to clients not requesting one,
+# and maximum requested timeout. Clients are disconnected after half a
+# timeout more than the timeout without a ping, to allow for network
+# delays.
+KEEP_ALIVE_TIMEOUT = 2
+KEEP_ALIVE_TIMEOUT_MAX = 600
+PING_TIMEOUT = 3
+
+# Window sizes.
+GET_FILE_WINDOW_SIZE = 100
+PUT_FILE_WINDOW_SIZE = 100
+FIND_BLOCKS_WINDOW_SIZE = 100
+
+# Maximum number of blocks to find in a file.
+FIND_BLOCKS_MAX = 1048576
+
+# Bytes of a list files response reserved for each file, on top of its
+# path.
+LIST_FILES_FILE_OVERHEAD = 32
+
+# Bytes read from file at a time when compressing file data.
+COMPRESSION_INPUT_SIZE = 65536
+
+# Compression algorithms.
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+
+# Suffix of the temporary file a delta put file is written to before it
+# replaces the existing file.
+DELTA_SUFFIX = '.bunga-delta'
+
+ADLER_BASE = 65521
+BLOCK_NOT_FOUND = 0xffffffffffffffff
+
+
+def format_error(error):
+    if isinstance(error, OSError) and error.strerror:
+        return error.strerror
+    else:
+        return str(error)
+
+
+def search_blocks(data, block_size, checksums):
+    """Returns the offsets in given data of blocks with given Adler-32
+    and CRC-32 checksums, as 8 bytes big endian each. All ones if not
+    found.
+
+    """
+
+    blocks = defaultdict(list)
+    offsets = [BLOCK_NOT_FOUND] * len(checksums)
+
+    for index, (weak, strong) in enumerate(checksums):
+        blocks[weak].append((strong, index))
+
+    size = len(data)
+    remaining = len(checksums)
+    offset = 0
+
+    if size >= block_size:
+        weak = zlib.adler32(data[:block_size])
+
+    while remaining > 0 and offset + block_size <= size:
+        found = False
+
+        if weak in blocks:
+            strong = zlib.crc32(data[offset:offset + block_size])
+
+            for expected_strong, index in blocks[weak]:
+                if offsets[index] == BLOCK_NOT_FOUND and strong == expected_strong:
+                    offsets[index] = offset
+                    remaining -= 1
+                    found = True
+
+        if found:
+            offset += block_size
+
+            if offset + block_size <= size:
+                weak = zlib.adler32(data[offset:offset + block_size])
+        elif offset + block_size < size:
+            out = data[offset]
+            a = weak & 0xffff
+            b = weak >> 16
+            a = (a - out + data[offset + block_size]) % ADLER_BASE
+            b = (b - block_size * out + a - 1) % ADLER_BASE
+            weak = (b << 16) | a
+            offset += 1
+        else:
+            break
+
+    return b''.join(struct.pack('>Q', offset) for offset in offsets)
+
+
+def list_files(path):
+    """Returns a list of (path, size, mtime) of all regular files in given
+    directory and its subdirectories. Symbolic links are not followed.
+
+    """
+
+    if not os.path.isdir(path):
+        raise OSError(errno.ENOENT, os.strerror(errno.ENOENT))
+
+    files = []
+
+    for root, _, names in os.walk(path):
+        for name in names:
+            file_path = os.path.join(root, name)
+            file_stat = os.lstat(file_path)
+
+            if stat.S_ISREG(file_stat.st_mode):
+                files.append((os.path.relpath(file_path, path).replace(os.sep, '/'),
+                              file_stat.st_size,
+                              int(file_stat.st_mtime)))
+
+    return files
+
+
+class GetFile:
+
+    def __init__(self, fin, window_size, remaining, compressed, checksum):
+        self.fin = fin
+        self.window_size = window_size
+        self.remaining = remaining
+        self.outstanding_responses = 0
+
+        if compressed:
+            self.compressor = zlib.compressobj()
+        else:
+            self.compressor = None
+
+        self.compressed = b''
+        self.eof = False
+
+        if checksum:
+            self.crc = 0
+        else:
+            self.crc = None
+
+    def _read(self, size):
+        if self.remaining is not None:
+            size = min(size, self.remaining)
+
+        data = self.fin.read(size)
+
+        if self.remaining is not None:
+            self.remaining -= len(data)
+
+        if self.crc is not None:
+            self.crc = zlib.crc32(data, self.crc)
+
+        return data
+
+    def read(self, size):
+        """Returns up to given number of bytes of, possibly compressed,
+        file data. Empty at the end of the file.
+
+        """
+
+        if self.compressor is None:
+            return self._read(size)
+
+        while len(self.compressed) < size and not self.eof:
+            data = self._read(COMPRESSION_INPUT_SIZE)
+
+            if data:
+                self.compressed += self.compressor.compress(data)
+            else:
+                self.compressed += self.compressor.flush()
+                self.eof = True
+
+        data = self.compressed[:size]
+        self.compressed = self.compressed[size:]
+
+        return data
+
+    def close(self):
+        self.fin.close()
+
+
+class PutFile:
+
+    def __init__(self, fout, mtime, compressed, checksum):
+        self.fout = fout
+        self.mtime = mtime
+        self.fbase = None
+        self.path = None
+        self.tmp_path = None
+
+        if compressed:
+            self.decompressor = zlib.decompressobj()
+        else:
+            self.decompressor = None
+
+        if checksum:
+            self.crc = 0
+        else:
+            self.crc = None
+
+    def write(self, data):
+        if self.decompressor is not None:
+            data = self.decompressor.decompress(data)
+
+        self._write(data)
+
+    def copy(self, offset, size):
+        if self.fbase is None:
+            raise OSError(errno.EINVAL, 'No base file.')
+
+        self.fbase.seek(offset)
+
+        while size > 0:
+            data = self.fbase.read(min(size, MAXIMUM_MESSAGE_SIZE))
+
+            if not data:
+                raise OSError(errno.EIO, 'Read error.')
+
+            self._write(data)
+            size -= len(data)
+
+    def _write(self, data):
+        self.fout.write(data)
+
+        if self.crc is not None:
+            self.crc = zlib.crc32(data, self.crc)
+
+    def release(self):
+        self.fout.close()
+
+        if self.fbase is not None:
+            self.fbase.close()
+            self.fbase = None
+
+        if self.tmp_path is not None:
+            os.remove(self.tmp_path)
+            self.tmp_path = None
+
+
+class FindBlocks:
+
+    def __init__(self, path, block_size, request_id):
+        self.path = path
+        self.block_size = block_size
+        self.request_id = request_id
+        self.checksums = bytearray()
+
+
+class ServerProtocol(FrameProtocol):
+
+    def __init__(self, server):
+        super().__init__(server.maximum_message_size,
+                         server.maximum_message_size)
+        self._server = server
+
+    def connection_made(self, transport):
+        super().connection_made(transport)
+        self._server._on_client_connected(transport, self)
+
+
+class ServerClient:
+    """A connected client.
+
+    """
+
+    def __init__(self, server, transport, protocol):
+        self._server = server
+        self._transport = transport
+        self._protocol = protocol
+        self._write_chunks = []
+        self._write_size = 0
+        self._flush_scheduled = False
+        self.maximum_message_size = 0
+        self.compression = COMPRESSION_NONE
+        self.ping_timeout = PING_TIMEOUT
+        self._ping_deadline = None
+        self.get_files = {}
+        self.put_files = {}
+        self.find_blocks = None
+        self.tasks = set()
+
+    def data_size_max(self):
+        """Returns the maximum number of file data or command output bytes
+        in a message sent to this client.
+
+        """
+
+        size = self._server.maximum_message_size
+
+        if 0 < self.maximum_message_size < size:
+            size = max(self.maximum_message_size, 128)
+
+        return size - MESSAGE_OVERHEAD
+
+    def send(self, message):
+        encoded = message.SerializeToString()
+        self._write(pack_header(MessageType.SERVER_TO_CLIENT_USER, len(encoded)),
+                    encoded)
+
+    def flush(self):
+        if self._write_chunks:
+            self._transport.writelines(self._write_chunks)
+            self._write_chunks = []
+            self._write_size = 0
+
+    def close(self):
+        self.flush()
+        self._transport.close()
+
+    def destroy(self):
+        for task in self.tasks:
+            task.cancel()
+
+        for get_file in self.get_files.values():
+            get_file.close()
+
+        for put_file in self.put_files.values():
+            put_file.release()
+
+        self.get_files.clear()
+        self.put_files.clear()
+
+    def _write(self, header, payload=b''):
+        if self._transport.is_closing():
+            return
+
+        self._write_chunks.append(header)
+        self._write_size += len(header)
+
+        if payload:
+            self._write_chunks.append(payload)
+            self._write_size += len(payload)
+
+        if self._write_size >= WRITE_HIGH_WATER_MARK:
+            self.flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_event_loop().call_soon(self._on_flush)
+
+    def _on_flush(self):
+        self._flush_scheduled = False
+        self.flush()
+
+    def send_pong(self):
+        self._write(pack_header(MessageType.PONG, 0))
+
+    def restart_ping_timer(self):
+        """Disconnect the client if it does not ping within the ping
+        timeout from now. Only pings restart the timer, as in the C
+        server, and not other messages.
+
+        """
+
+        loop = asyncio.get_event_loop()
+        self._ping_deadline = loop.time() + self.ping_timeout
+
+    async def read_frames(self):
+        timeout = self._ping_deadline - asyncio.get_event_loop().time()
+
+        return await asyncio.wait_for(self._protocol.read_frames(), timeout)
+
+
+class Server:
+    """A bunga server serving files below `root`. Commands are executed
+    by handlers added with `add_command()`. Clients are told to keep
+    at most `put_file_window_size` put file data messages in flight.
+
+    """
+
+    def __init__(self,
+                 uri='tcp://127.0.0.1:28000',
+                 root='/',
+                 maximum_message_size=MAXIMUM_MESSAGE_SIZE,
+                 put_file_window_size=PUT_FILE_WINDOW_SIZE):
+        self._address, self._port = parse_tcp_uri(uri)
+        self._root = os.path.realpath(root)
+        self.maximum_message_size = maximum_message_size
+        self.put_file_window_size = put_file_window_size
+        self._listener = None
+        self._clients = set()
+        self._commands = {}
+        self._start_time = time.monotonic()
+        self.add_command('cat', self._command_cat)
+        self.add_command('ls', self._command_ls)
+        self.add_command('echo', self._command_echo)
+        self.add_command('bunga_ps_stat', self._command_bunga_ps_stat)
+
+    @property
+    def uri(self):
+        """The URI clients connect to, with the actual port if started on
+        port 0.
+
+        """
+
+        if self._listener is not None:
+            address, port = self._listener.sockets[0].getsockname()[:2]
+        else:
+            address = self._address
+            port = self._port
+
+        return f'tcp://{address}:{port}'
+
+    def add_command(self, name, handler):
+        """Execute commands named `name` with given coroutine function or
+        async generator function. It is called with the command
+        arguments, including its name, as a list of strings.
+
+        A coroutine function returns the command output as bytes,
+        string or ``None``, and an async generator function yields the
+        output in chunks, sent to the client as they are yielded. An
+        exception fails the command with the exception as error.
+
+        """
+
+        self._commands[name] = handler
+
+    async def start(self):
+        self._listener = await asyncio.get_event_loop().create_server(
+            lambda: ServerProtocol(self),
+            self._address,
+            self._port)
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.close()
+            await self._listener.wait_closed()
+            self._listener = None
+
+        for client in list(self._clients):
+            client.close()
+
+    async def serve_forever(self):
+        if self._listener is None:
+            await self.start()
+
+        async with self._listener:
+            await self._listener.serve_forever()
+
+    def log(self, text):
+        """Send given log entry to all connected clients, prefixed by the
+        time since the server was created, as the kernel does.
+
+        """
+
+        seconds = time.monotonic() - self._start_time
+        header = f'[{int(seconds):5d}.{int(seconds * 1000000) % 1000000:06d}] '
+
+        for client in self._clients:
+            message = bunga_pb2.ServerToClient()
+            message.log_entry_ind.text.extend([header, text])
+            client.send(message)
+
+    def _resolve(self, path):
+        """Returns the real path of given path below root. Raises
+        PermissionError if it is outside root, for example by a ``..``
+        component or a symbolic link.
+
+        """
+
+        resolved = os.path.realpath(os.path.join(self._root, path.lstrip('/')))
+
+        if os.path.commonpath([self._root, resolved]) != self._root:
+            raise PermissionError(errno.EACCES, os.strerror(errno.EACCES), path)
+
+        return resolved
+
+    async def _command_cat(self, argv):
+        output = []
+
+        for path in argv[1:]:
+            with open(self._resolve(path), 'rb') as fin:
+                output.append(fin.read())
+
+        return b''.join(output)
+
+    async def _command_ls(self, argv):
+        if len(argv) > 1:
+            path = argv[1]
+        else:
+            path = '/'
+
+        return ''.join(name + '\n'
+                       for name in sorted(os.listdir(self._resolve(path))))
+
+    async def _command_echo(self, argv):
+        return ' '.join(argv[1:]) + '\n'
+
+    async def _command_bunga_ps_stat(self, argv):
+        """The first line of /proc/stat followed by the stat line of each
+        thread of given process, or of the init process, as the C
+        server. Reads this system's /proc, not below the root.
+
+        """
+
+        if len(argv) == 1:
+            pid = '1'
+        elif len(argv) == 2 and argv[1].isdigit():
+            pid = argv[1]
+        else:
+            raise OSError(errno.EINVAL, 'Invalid argument')
+
+        with open('/proc/stat', 'rb') as fin:
+            output = [fin.readline()]
+
+        for tid in os.listdir(f'/proc/{pid}/task'):
+            try:
+                with open(f'/proc/{pid}/task/{tid}/stat', 'rb') as fin:
+                    output.append(fin.read())
+            except FileNotFoundError:
+                # The thread has exited.
+                pass
+
+        return b''.join(output)
+
+    def _create_client_task(self, client, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        client.tasks.add(task)
+        task.add_done_callback(client.tasks.discard)
+
+    async def _serve_client(self, client):
+        self._clients.add(client)
+        client.restart_ping_timer()
+
+        try:
+            while True:
+                for message_type, payload in await client.read_frames():
+                    if message_type == MessageType.CLIENT_TO_SERVER_USER:
+                        await self._handle_user_message(client, payload)
+                    elif message_type == MessageType.PING:
+                        client.restart_ping_timer()
+                        client.send_pong()
+        except (Exception, asyncio.CancelledError) as e:
+            LOGGER.info('Client stopped by %r.', e)
+        finally:
+            self._clients.discard(client)
+            client.destroy()
+            client.close()
+
+    async def _handle_user_message(self, client, payload):
+        message = bunga_pb2.ClientToServer()
+        message.ParseFromString(payload)
+        choice = message.WhichOneof('messages')
+
+        if choice == 'connect_req':
+            self._on_connect_req(client, message.connect_req)
+        elif choice == 'execute_command_req':
+            self._on_execute_command_req(client, message.execute_command_req)
+        elif choice == 'get_file_req':
+            await self._on_get_file_req(client, message.get_file_req)
+        elif choice == 'put_file_req':
+            await self._on_put_file_req(client, message.put_file_req)
+        elif choice == 'find_blocks_req':
+            self._on_find_blocks_req(client, message.find_blocks_req)
+        elif choice == 'list_files_req':
+            self._on_list_files_req(client, message.list_files_req)
+
+    def _on_connect_req(self, client, request):
+        client.maximum_message_size = request.maximum_message_size
+
+        if request.compressions & (1 << (COMPRESSION_ZLIB - 1)):
+            client.compression = COMPRESSION_ZLIB
+
+        keep_alive_timeout = min(request.keep_alive_timeout or KEEP_ALIVE_TIMEOUT,
+                                 KEEP_ALIVE_TIMEOUT_MAX)
+        client.ping_timeout = keep_alive_timeout + (keep_alive_timeout + 1) // 2
+        # The client pings at the negotiated interval from now on.
+        client.restart_ping_timer()
+        message = bunga_pb2.ServerToClient()
+        response = message.connect_rsp
+        response.keep_alive_timeout = keep_alive_timeout
+        response.maximum_message_size = self.maximum_message_size
+        response.compression = client.compression
+        client.send(message)
+
+    def _on_execute_command_req(self, client, request):
+        self._create_client_task(client, self._execute_command(client, request))
+
+    async def _execute_command(self, client, request):
+        if request.compressed and client.compression == COMPRESSION_ZLIB:
+            compressor = zlib.compressobj()
+        else:
+            compressor = None
+
+        chunk_size = client.data_size_max()
+
+        def send(output):
+            for offset in range(0, len(output), chunk_size):
+                message = bunga_pb2.ServerToClient()
+                response = message.execute_command_rsp
+                response.request_id = request.request_id
+                response.output = output[offset:offset + chunk_size]
+                client.send(message)
+
+        def send_output(output):
+            if isinstance(output, str):
+                output = output.encode()
+
+            if compressor is not None:
+                output = (compressor.compress(output)
+                          + compressor.flush(zlib.Z_SYNC_FLUSH))
+
+            send(output)
+
+        error = None
+
+        try:
+            argv = shlex.split(request.command)
+        except ValueError as e:
+            argv = []
+            error = str(e)
+
+        if argv:
+            handler = self._commands.get(argv[0])
+
+            if handler is None:
+                error = os.strerror(errno.ENOENT)
+            else:
+                try:
+                    if inspect.isasyncgenfunction(handler):
+                        async for output in handler(argv):
+                            send_output(output)
+                    else:
+                        output = await handler(argv)
+
+                        if output:
+                            send_output(output)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    error = format_error(e)
+        elif error is None:
+            error = os.strerror(errno.EINVAL)
+
+        if compressor is not None:
+            send(compressor.flush())
+
+        message = bunga_pb2.ServerToClient()
+        response = message.execute_command_rsp
+        response.request_id = request.request_id
+
+        if error is not None:
+            response.error = error
+
+        client.send(message)
+
+    async def _run_file_operation(self, client, function, *args):
+        """Call given function with the client, a send function and given
+        arguments in the default executor, not to block the event loop
+        on file I/O. Messages are sent once it returns, as the client
+        may only be used in the event loop thread. Following messages
+        from the client are not handled until then, so the files of
+        a client are only used by one thread at a time.
+
+        """
+
+        messages = []
+        await asyncio.get_event_loop().run_in_executor(None,
+                                                       function,
+                                                       client,
+                                                       messages.append,
+                                                       *args)
+
+        for message in messages:
+            client.send(message)
+
+    async def _on_get_file_req(self, client, request):
+        if request.path:
+            await self._run_file_operation(client, self._get_file_open, request)
+        else:
+            get_file = client.get_files.get(request.request_id)
+
+            if get_file is not None:
+                await self._run_file_operation(client,
+                                               self._get_file_data,
+                                               request,
+                                               get_file)
+
+    def _get_file_add_data(self, client, get_file, message, request_id):
+        response = message.get_file_rsp
+        response.request_id = request_id
+
+        try:
+            response.data = get_file.read(client.data_size_max())
+        except OSError:
+            response.error = 'Read error.'
+
+        if not response.data:
+            if get_file.crc is not None:
+                response.crc32 = get_file.crc
+
+            get_file.close()
+            del client.get_files[request_id]
+
+    def _get_file_fill_window(self, client, send, get_file, request_id):
+        while get_file.outstanding_responses < get_file.window_size:
+            message = bunga_pb2.ServerToClient()
+            self._get_file_add_data(client, get_file, message, request_id)
+            send(message)
+
+            if not message.get_file_rsp.data:
+                break
+
+            get_file.outstanding_responses += 1
+
+    def _get_file_open(self, client, send, request):
+        message = bunga_pb2.ServerToClient()
+        response = message.get_file_rsp
+        response.request_id = request.request_id
+        get_file = client.get_files.pop(request.request_id, None)
+
+        if get_file is not None:
+            get_file.close()
+
+        try:
+            fin = open(self._resolve(request.path), 'rb')
+        except OSError as e:
+            response.error = format_error(e)
+            send(message)
+
+            return
+
+        try:
+            response.size = os.fstat(fin.fileno()).st_size
+            fin.seek(request.offset)
+        except OSError as e:
+            fin.close()
+            response.error = format_error(e)
+            send(message)
+
+            return
+
+        compressed = request.compressed
+
+        if compressed and client.compression != COMPRESSION_ZLIB:
+            fin.close()
+            response.error = 'Compression failed.'
+            send(message)
+
+            return
+
+        get_file = GetFile(fin,
+                           request.window_size or GET_FILE_WINDOW_SIZE,
+                           request.length or None,
+                           compressed,
+                           request.checksum)
+        client.get_files[request.request_id] = get_file
+        self._get_file_add_data(client, get_file, message, request.request_id)
+        send(message)
+
+        if response.data:
+            get_file.outstanding_responses += 1
+            self._get_file_fill_window(client,
+                                       send,
+                                       get_file,
+                                       request.request_id)
+
+    def _get_file_data(self, client, send, request, get_file):
+        if request.acknowledge_count > get_file.outstanding_responses:
+            get_file.close()
+            del client.get_files[request.request_id]
+
+            return
+
+        get_file.outstanding_responses -= request.acknowledge_count
+        self._get_file_fill_window(client, send, get_file, request.request_id)
+
+    async def _on_put_file_req(self, client, request):
+        await self._run_file_operation(client, self._put_file, request)
+
+    def _put_file(self, client, send, request):
+        message = bunga_pb2.ServerToClient()
+        response = message.put_file_rsp
+        response.acknowledge_count = 1
+        response.request_id = request.request_id
+
+        if request.path:
+            self._put_file_open(client, request, response)
+        else:
+            put_file = client.put_files.get(request.request_id)
+
+            if request.data or request.copy_size > 0:
+                self._put_file_data(client, request, response, put_file)
+            elif put_file is not None:
+                self._put_file_close(client, request, response, put_file)
+
+        send(message)
+
+    def _put_file_open_delta(self, path, mtime, compressed, checksum):
+        fbase = open(path, 'rb')
+        tmp_path = path + DELTA_SUFFIX
+
+        try:
+            fout = open(tmp_path, 'wb')
+        except OSError:
+            fbase.close()
+
+            raise
+
+        put_file = PutFile(fout, mtime, compressed, checksum)
+        put_file.fbase = fbase
+        put_file.path = path
+        put_file.tmp_path = tmp_path
+
+        try:
+            # Keep the permissions of the existing file.
+            os.chmod(tmp_path, os.fstat(fbase.fileno()).st_mode & 0o7777)
+        except OSError:
+            # Closes both files and removes the temporary file.
+            put_file.release()
+
+            raise
+
+        return put_file
+
+    def _put_file_open(self, client, request, response):
+        response.window_size = self.put_file_window_size
+        put_file = client.put_files.pop(request.request_id, None)
+
+        if put_file is not None:
+            put_file.release()
+
+        if request.compressed and client.compression != COMPRESSION_ZLIB:
+            response.error = 'Compression failed.'
+
+            return
+
+        args = (request.mtime, request.compressed, request.checksum)
+
+        try:
+            path = self._resolve(request.path)
+
+            if request.create_directories:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            if request.delta:
+                put_file = self._put_file_open_delta(path, *args)
+            else:
+                if request.offset == 0:
+                    fout = open(path, 'wb')
+                else:
+                    fout = open(path, 'r+b')
+
+                put_file = PutFile(fout, *args)
+        except OSError:
+            response.error = 'Open failed.'
+
+            return
+
+        try:
+            put_file.fout.seek(request.offset)
+        except OSError:
+            response.error = 'Seek failed.'
+            put_file.release()
+
+            return
+
+        client.put_files[request.request_id] = put_file
+
+    def _put_file_data(self, client, request, response, put_file):
+        if put_file is None:
+            response.error = 'No file open.'
+
+            return
+
+        try:
+            if request.copy_size > 0:
+                put_file.copy(request.copy_offset, request.copy_size)
+            else:
+                put_file.write(request.data)
+        except (OSError, zlib.error):
+            response.error = 'Write failed.'
+            put_file.release()
+            del client.put_files[request.request_id]
+
+    def _put_file_close(self, client, request, response, put_file):
+        del client.put_files[request.request_id]
+        fout = put_file.fout
+
+        try:
+            # Remove any old data after the written data of a resumed
+            # transfer.
+            fout.flush()
+            fout.truncate()
+        except OSError:
+            response.error = 'Write failed.'
+        else:
+            if put_file.crc is not None and put_file.crc != request.crc32:
+                response.error = 'Checksum mismatch.'
+            elif put_file.mtime != 0 and not self._put_file_set_mtime(put_file):
+                response.error = 'Set time failed.'
+            elif put_file.tmp_path is not None:
+                try:
+                    os.replace(put_file.tmp_path, put_file.path)
+                    put_file.tmp_path = None
+                except OSError:
+                    response.error = 'Rename failed.'
+
+        put_file.release()
+
+    def _put_file_set_mtime(self, put_file):
+        fd = put_file.fout.fileno()
+
+        try:
+            os.utime(fd, ns=(os.fstat(fd).st_atime_ns,
+                             put_file.mtime * 1000000000))
+        except OSError:
+            return False
+
+        return True
+
+    def _on_find_blocks_req(self, client, request):
+        if not request.path and not request.checksums:
+            self._find_blocks_start(client, request)
+
+            return
+
+        message = bunga_pb2.ServerToClient()
+        response = message.find_blocks_rsp
+        response.acknowledge_count = 1
+        response.request_id = request.request_id
+
+        if request.path:
+            response.window_size = FIND_BLOCKS_WINDOW_SIZE
+
+            if request.block_size == 0:
+                response.error = 'Invalid block size.'
+                client.find_blocks = None
+            else:
+                try:
+                    client.find_blocks = FindBlocks(self._resolve(request.path),
+                                                    request.block_size,
+                                                    request.request_id)
+                except OSError:
+                    response.error = 'Open failed.'
+                    client.find_blocks = None
+        else:
+            find_blocks = client.find_blocks
+
+            if (find_blocks is None
+                or find_blocks.request_id != request.request_id):
+                response.error = 'No file open.'
+            elif (len(request.checksums) % 8 != 0
+                  or (len(find_blocks.checksums) + len(request.checksums)
+                      > 8 * FIND_BLOCKS_MAX)):
+                response.error = 'Too many blocks.'
+                client.find_blocks = None
+            else:
+                find_blocks.checksums += request.checksums
+
+        client.send(message)
+
+    def _find_blocks_start(self, client, request):
+        find_blocks = client.find_blocks
+
+        if find_blocks is None or find_blocks.request_id != request.request_id:
+            message = bunga_pb2.ServerToClient()
+            response = message.find_blocks_rsp
+            response.acknowledge_count = 1
+            response.request_id = request.request_id
+            response.error = 'No file open.'
+            client.send(message)
+        else:
+            client.find_blocks = None
+            self._create_client_task(client,
+                                     self._find_blocks(client, find_blocks))
+
+    def _find_blocks_search(self, find_blocks):
+        checksums = list(struct.iter_unpack('>II', find_blocks.checksums))
+
+        with open(find_blocks.path, 'rb') as fin:
+            size = os.fstat(fin.fileno()).st_size
+
+            if size < find_blocks.block_size or not checksums:
+                return len(checksums) * struct.pack('>Q', BLOCK_NOT_FOUND)
+
+            with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return search_blocks(data, find_blocks.block_size, checksums)
+
+    async def _find_blocks(self, client, find_blocks):
+        error = None
+
+        try:
+            offsets = await asyncio.get_event_loop().run_in_executor(
+                None,
+                self._find_blocks_search,
+                find_blocks)
+        except OSError:
+            offsets = b''
+            error = 'Open failed.'
+
+        chunk_size = client.data_size_max()
+        chunk_size -= chunk_size % 8
+
+        for offset in range(0, len(offsets), chunk_size):
+            message = bunga_pb2.ServerToClient()
+            response = message.find_blocks_rsp
+            response.request_id = find_blocks.request_id
+            response.offsets = offsets[offset:offset + chunk_size]
+            client.send(message)
+
+        message = bunga_pb2.ServerToClient()
+        response = message.find_blocks_rsp
+        response.acknowledge_count = 1
+        response.request_id = find_blocks.request_id
+
+        if error is not None:
+            response.error = error
+
+        client.send(message)
+
+    def _on_list_files_req(self, client, request):
+        self._create_client_task(client, self._list_files(client, request))
+
+    async def _list_files(self, client, request):
+        error = None
+
+        try:
+            files = await asyncio.get_event_loop().run_in_executor(
+                None,
+                list_files,
+                self._resolve(request.path))
+        except OSError as e:
+            files = []
+            error = format_error(e)
+
+        size_max = client.data_size_max()
+        message = None
+        size = 0
+
+        for path, file_size, mtime in files:
+            file_message_size = len(path.encode()) + LIST_FILES_FILE_OVERHEAD
+
+            if file_message_size > size_max:
+                error = 'Path too long.'
+                break
+
+            if message is not None and size + file_message_size > size_max:
+                client.send(message)
+                message = None
+
+            if message is None:
+                message = bunga_pb2.ServerToClient()
+                message.list_files_rsp.request_id = request.request_id
+                size = 0
+
+            response = message.list_files_rsp
+            response.paths.append(path)
+            response.sizes.append(file_size)
+            response.mtimes.append(mtime)
+            size += file_message_size
+
+        if message is not None:
+            client.send(message)
+
+        message = bunga_pb2.ServerToClient()
+        response = message.list_files_rsp
+        response.request_id = request.request_id
+
+        if error is not None:
+            response.error = error
+
+        client.send(message)
+
+    def _on_client_connected(self, transport, protocol):
+        client = ServerClient(self, transport, protocol)
+        asyncio.ensure_future(self._serve_client(client))
+
+
+class ServerThread(threading.Thread):
+    """A server on a free loopback port in its own thread and event loop,
+    so clients and the server do not share a CPU core. Commands may
+    be added to `server` before the thread is started.
+
+    """
+
+    def __init__(self,
+                 root='/',
+                 maximum_message_size=MAXIMUM_MESSAGE_SIZE,
+                 put_file_window_size=PUT_FILE_WINDOW_SIZE):
+        super().__init__(daemon=True)
+        self.uri = None
+        self.server = Server('tcp://127.0.0.1:0',
+                             root=root,
+                             maximum_message_size=maximum_message_size,
+                             put_file_window_size=put_file_window_size)
+        self._loop = None
+        self._stop_event = None
+        self._ready = threading.Event()
+
+    def start(self):
+        super().start()
+        self._ready.wait()
+
+    def run(self):
+        asyncio.run(self._main())
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._stop_event.set)
+        self.join()
+
+    def run_coroutine(self, coroutine):
+        """Run given coroutine in the server thread. Returns a concurrent
+        future of its result.
+
+        """
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    async def _main(self):
+        self._loop = asyncio.get_event_loop()
+        self._stop_event = asyncio.Event()
+        await self.server.start()
+        self.uri = self.server.uri
+        self._ready.set()
+        await self._stop_event.wait()
+        await self.server.stop()
@@ -0,0 +1,43 @@
+import asyncio
+
+from ..agent import Agent
+from ..agent_client import default_socket_path
+from .fleet_execute import load_uris
+
+
+async def agent_main(path, uris):
+    agent = Agent(path, uris)
+    await agent.start()
+    print(f"Listening on '{path}'.")
+
+    try:
+        await agent.serve_forever()
+    finally:
+        await agent.stop()
+
+
+def _do_agent(args):
+    if args.uri or args.uris_file:
+        uris = load_uris(args)
+    else:
+        uris = []
+
+    asyncio.run(agent_main(args.socket, uris))
+
+
+def add_subparser(subparsers):
+    subparser = subparsers.add_parser(
+        'agent',
+        description=('Keep connections to servers open, and share them with '
+                     'execute, get_file and put_file given --agent.'))
+    subparser.add_argument('-u' ,'--uri',
+                           action='append',
+                           help=('URI of a server to connect to at start. May '
+                                 'be given multiple times. Other servers are '
+                                 'connected to when first used.'))
+    subparser.add_argument('-f', '--uris-file',
+                           help='File with one server URI per line.')
+    subparser.add_argument('-s', '--socket',
+                           default=default_socket_path(),
+                           help='Unix socket path (default: %(default)s).')
+    subparser.set_defaults(func=_do_agent)
@@ -0,0 +1,121 @@
+import json
+import asyncio
+
+from ..bench import bench
+from ..bench import EXECUTE_COMMAND_ITERATIONS
+from ..bench import FILE_SIZE
+from ..bench import MESSAGE_SIZES
+from ..bench import WINDOW_SIZES
+from ..bench import LOG_ENTRIES
+from ..bench import STARTUP_ITERATIONS
+from ..bench import PROC_PARSE_ITERATIONS
+
+
+def print_results(results):
+    latency = results['execute_command']['latency_us']
+    print('execute_command latency (us):')
+    print('  ' + '  '.join(f'{name} {value}' for name, value in latency.items()))
+
+    for operation in ['put_file', 'get_file']:
+        print(f'{operation} throughput (MB/s):')
+        print('  MESSAGE SIZE  WINDOW SIZE     MB/S')
+
+        for result in results[operation]:
+            print(f"  {result['maximum_message_size']:12}"
+                  f"  {result['window_size']:11}"
+                  f"  {result['mb_per_second']:7}")
+
+    print('log_entry_ind rate (1/s):')
+    print(f"  {results['log_entry_ind']['per_second']}")
+    startup = results['startup']
+    print(f"startup time of {startup['command']} (ms):")
+    print('  ' + '  '.join(f'{name} {value}'
+                           for name, value in startup['time_ms'].items()))
+    print(f"startup time of {startup['agent_command']} (ms):")
+    print('  ' + '  '.join(
+        f'{name} {value}'
+        for name, value in startup['agent_time_ms'].items()))
+    print('startup time of python (ms):')
+    print('  ' + '  '.join(f'{name} {value}'
+                           for name, value in startup['python_time_ms'].items()))
+    print('/proc parse throughput:')
+    print('  FILE                SIZE  PARSES/S     MB/S')
+
+    for result in results['proc_parse']:
+        print(f"  {result['file']:16}"
+              f"  {result['size']:6}"
+              f"  {result['per_second']:8}"
+              f"  {result['mb_per_second']:7}")
+
+
+def _do_bench(args):
+    results = asyncio.run(bench(args.iterations,
+                                args.size,
+                                args.message_size,
+                                args.window_size,
+                                args.log_entries,
+                                args.compress,
+                                args.startup_iterations,
+                                args.proc_parse_iterations))
+
+    if args.json is None:
+        print_results(results)
+    elif args.json == '-':
+        print(json.dumps(results, indent=4))
+    else:
+        with open(args.json, 'w') as fout:
+            json.dump(results, fout, indent=4)
+            fout.write('\n')
+
+
+def add_subparser(subparsers):
+    subparser = subparsers.add_parser(
+        'bench',
+        description=('Benchmark all protocol operations against a local '
+                     'Python server over loopback.'))
+    subparser.add_argument('-i', '--iterations',
+                           type=int,
+                           default=EXECUTE_COMMAND_ITERATIONS,
+                           help=('Number of executed commands in the latency '
+                                 'benchmark (default: %(default)s).'))
+    subparser.add_argument('-s', '--size',
+                           type=int,
+                           default=FILE_SIZE,
+                           help=('File size in bytes in the throughput '
+                                 'benchmarks (default: %(default)s).'))
+    subparser.add_argument('-m', '--message-size',
+                           type=int,
+                           action='append',
+                           help=('Maximum message size to benchmark. May be '
+                                 'given multiple times (default: '
+                                 f'{MESSAGE_SIZES}).'))
+    subparser.add_argument('-w', '--window-size',
+                           type=int,
+                           action='append',
+                           help=('Window size to benchmark. May be given '
+                                 f'multiple times (default: {WINDOW_SIZES}).'))
+    subparser.add_argument('-l', '--log-entries',
+                           type=int,
+                           default=LOG_ENTRIES,
+                           help=('Number of log entries in the log benchmark '
+                                 '(default: %(default)s).'))
+    subparser.add_argument('-t', '--startup-iterations',
+                           type=int,
+                           default=STARTUP_ITERATIONS,
+                           help=('Number of started bunga commands in the '
+                                 'startup time benchmark (default: '
+                                 '%(default)s).'))
+    subparser.add_argument('-p', '--proc-parse-iterations',
+                           type=int,
+                           default=PROC_PARSE_ITERATIONS,
+                           help=('Number of parses of each /proc file in the '
+                                 'parse benchmark (default: %(default)s).'))
+    subparser.add_argument('-c', '--compress',
+                           action='store_true',
+                           help='Compress file data.')
+    subparser.add_argument('-j', '--json',
+                           nargs='?',
+                           const='-',
+                           help=('Write the results as JSON to given file, or '
+                                 'standard output if no file is given.'))
+    subparser.set_defaults(func=_do_bench)
@@ -1,20 +1,42 @@
 import sys
 
-from ..client import Client
-from ..client import ClientThread
-from ..client import ExecuteCommandError
+from ..agent_client import AgentError
+from ..agent_client import call
+
+
+def write_output(chunk):
+    sys.stdout.buffer.write(chunk)
+    sys.stdout.flush()
+
+
+def _do_execute_agent(args):
+    try:
+        call('execute',
+             {'uri': args.uri, 'command': args.command},
+             write_output)
+    except AgentError as e:
+        sys.exit(e.error)
 
 
 def _do_execute(args):
+    if args.agent:
+        _do_execute_agent(args)
+
+        return
+
+    # Imported here as not needed with an agent.
+    from ..client import Client
+    from ..client import ClientThread
+    from ..client import ExecuteCommandError
+
     client = ClientThread(args.uri, Client)
     client.start()
     client.wait_for_connection()
 
     try:
-        sys.stdout.buffer.write(client.execute_command(args.command))
+        for chunk in client.execute_command_stream(args.command):
+            write_output(chunk)
     except ExecuteCommandError as e:
-        sys.stdout.buffer.write(e.output)
-        sys.stdout.flush()
         sys.exit(e.error)
 
 
@@ -23,5 +45,8 @@ def add_subparser(subparsers):
     subparser.add_argument('-u' ,'--uri',
                            default='tcp://127.0.0.1:28000',
                            help='URI of the server (default: %(default)s)')
+    subparser.add_argument('-a', '--agent',
+                           action='store_true',
+                           help='Use the connection of a running agent.')
     subparser.add_argument('command', help='The command to execute.')
     subparser.set_defaults(func=_do_execute)
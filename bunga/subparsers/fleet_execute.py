@@ -0,0 +1,85 @@
+import sys
+import asyncio
+
+from colors import red
+
+from ..fleet import Fleet
+
+
+def load_uris(args):
+    uris = []
+
+    if args.uri:
+        uris += args.uri
+
+    if args.uris_file:
+        with open(args.uris_file, 'r') as fin:
+            for line in fin:
+                line = line.strip()
+
+                if line and not line.startswith('#'):
+                    uris.append(line)
+
+    if not uris:
+        raise Exception('No URIs given.')
+
+    return uris
+
+
+def print_result(result):
+    if result.value:
+        for line in result.value.decode('utf-8', 'replace').splitlines():
+            print(f'{result.uri}: {line}')
+
+    if result.error is not None:
+        print(f'{result.uri}: ' + red(f'ERROR({result.error})', style='bold'))
+
+    sys.stdout.flush()
+
+
+async def fleet_execute(uris, command, concurrency, timeout):
+    fleet = Fleet(uris, concurrency, timeout)
+    failures = 0
+
+    async for result in fleet.execute_command(command):
+        print_result(result)
+
+        if result.error is not None:
+            failures += 1
+
+    return failures
+
+
+def _do_fleet_execute(args):
+    uris = load_uris(args)
+    failures = asyncio.run(fleet_execute(uris,
+                                         args.command,
+                                         args.concurrency,
+                                         args.timeout))
+
+    if failures > 0:
+        sys.exit(f'Failed on {failures} of {len(uris)} device(s).')
+
+
+def add_subparser(subparsers):
+    subparser = subparsers.add_parser(
+        'fleet_execute',
+        aliases=['fleet-execute'],
+        description='Execute given command on many systems at once.')
+    subparser.add_argument('-u' ,'--uri',
+                           action='append',
+                           help='URI of a server. May be given multiple times.')
+    subparser.add_argument('-f', '--uris-file',
+                           help='File with one server URI per line.')
+    subparser.add_argument('-c', '--concurrency',
+                           type=int,
+                           default=32,
+                           help='Maximum number of connected servers (default: '
+                           '%(default)s).')
+    subparser.add_argument('-t', '--timeout',
+                           type=float,
+                           default=10,
+                           help='Connect and execute timeout per server in '
+                           'seconds (default: %(default)s).')
+    subparser.add_argument('command', help='The command to execute.')
+    subparser.set_defaults(func=_do_fleet_execute)
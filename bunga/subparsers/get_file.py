@@ -1,7 +1,9 @@
-from tqdm.auto import tqdm
+import os
+import sys
 
-from ..client import ClientThread
-from ..client import create_to_path
+from ..agent_client import AgentError
+from ..agent_client import call
+from .utils import create_to_path
 
 
 class ProgressBar:
@@ -10,6 +12,8 @@ class ProgressBar:
         self._tqdm = None
 
     def init(self, total):
+        from tqdm.auto import tqdm
+
         self._tqdm = tqdm(total=total, unit='B', unit_scale=True, unit_divisor=1024)
 
     def close(self):
@@ -20,28 +24,106 @@ class ProgressBar:
         self._tqdm.update(size)
 
 
+def _do_get_file_agent(args):
+    if args.localfile == '-':
+        localfile = None
+    else:
+        localfile = os.path.abspath(create_to_path(args.remotefile,
+                                                   args.localfile))
+
+    try:
+        call('get_file',
+             {
+                 'uri': args.uri,
+                 'remote_path': args.remotefile,
+                 'local_path': localfile,
+                 'window_size': args.window,
+                 'preallocate': args.mmap,
+                 'offset': args.offset,
+                 'length': args.length,
+                 'compress': not args.no_compression,
+                 'verify': args.verify
+             },
+             sys.stdout.buffer.write)
+    except AgentError as e:
+        sys.exit(e.error)
+
+    if args.localfile == '-':
+        sys.stdout.flush()
+
+
 def _do_get_file(args):
+    if args.agent:
+        _do_get_file_agent(args)
+
+        return
+
+    # Imported here as not needed with an agent.
+    from ..client import ClientThread
+
     client = ClientThread(args.uri,
                           connection_refused_delay=None,
-                          connect_timeout_delay=None)
+                          connect_timeout_delay=None,
+                          connection_closed_delay=None)
     client.start()
     client.wait_for_connection()
-    localfile = create_to_path(args.remotefile, args.localfile)
+    if args.localfile == '-':
+        localfile = sys.stdout.buffer
+    else:
+        localfile = create_to_path(args.remotefile, args.localfile)
+
     progress = ProgressBar()
 
     try:
-        client.get_file(args.remotefile, localfile, progress=progress)
+        client.get_file(args.remotefile,
+                        localfile,
+                        progress=progress,
+                        window_size=args.window,
+                        preallocate=args.mmap,
+                        offset=args.offset,
+                        length=args.length,
+                        compress=not args.no_compression,
+                        verify=args.verify)
     finally:
         progress.close()
 
+    if args.localfile == '-':
+        sys.stdout.flush()
+
 
 def add_subparser(subparsers):
     subparser = subparsers.add_parser('get_file')
     subparser.add_argument('-u' ,'--uri',
                            default='tcp://127.0.0.1:28000',
                            help='URI of the server (default: %(default)s)')
+    subparser.add_argument('-a', '--agent',
+                           action='store_true',
+                           help=('Use the connection of a running agent. No '
+                                 'progress is shown.'))
+    subparser.add_argument('-w', '--window',
+                           type=int,
+                           help=('Maximum number of data messages in flight '
+                                 '(default: server default).'))
+    subparser.add_argument('-m', '--mmap',
+                           action='store_true',
+                           help=('Preallocate the local file and write to it '
+                                 'through a memory map.'))
+    subparser.add_argument('-o', '--offset',
+                           type=int,
+                           default=0,
+                           help='Remote file offset to start at (default: 0).')
+    subparser.add_argument('-l', '--length',
+                           type=int,
+                           help='Number of bytes to get (default: to end of file).')
+    subparser.add_argument('-n', '--no-compression',
+                           action='store_true',
+                           help='Do not compress the file, for example as it '
+                           'already is compressed.')
+    subparser.add_argument('--verify',
+                           action='store_true',
+                           help='Verify the file data with a CRC-32.')
     subparser.add_argument('remotefile', help='The remote file path.')
     subparser.add_argument('localfile',
                            nargs='?',
-                           help='The local file path.')
+                           help='The local file path, or - for stdout.')
     subparser.set_defaults(func=_do_get_file)
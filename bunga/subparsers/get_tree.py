@@ -0,0 +1,43 @@
+from ..client import ClientThread
+from ..client import TREE_CONCURRENCY
+from .utils import create_to_path
+
+
+def _do_get_tree(args):
+    client = ClientThread(args.uri,
+                          connection_refused_delay=None,
+                          connect_timeout_delay=None,
+                          connection_closed_delay=None)
+    client.start()
+    client.wait_for_connection()
+    localdir = create_to_path(args.remotedir.rstrip('/'), args.localdir)
+    paths = client.get_tree(args.remotedir,
+                            localdir,
+                            concurrency=args.concurrency,
+                            compress=not args.no_compression)
+
+    for path in sorted(paths):
+        print(path)
+
+
+def add_subparser(subparsers):
+    subparser = subparsers.add_parser(
+        'get_tree',
+        description=('Get a directory and its subdirectories. Files with '
+                     'unchanged size and modification time are skipped.'))
+    subparser.add_argument('-u' ,'--uri',
+                           default='tcp://127.0.0.1:28000',
+                           help='URI of the server (default: %(default)s)')
+    subparser.add_argument('-c', '--concurrency',
+                           type=int,
+                           default=TREE_CONCURRENCY,
+                           help=('Maximum number of files transferred at the '
+                                 'same time (default: %(default)s).'))
+    subparser.add_argument('-n', '--no-compression',
+                           action='store_true',
+                           help='Do not compress files.')
+    subparser.add_argument('remotedir', help='The remote directory path.')
+    subparser.add_argument('localdir',
+                           nargs='?',
+                           help='The local directory path.')
+    subparser.set_defaults(func=_do_get_tree)
@@ -0,0 +1,47 @@
+import json
+
+from .. import linux
+
+
+def _do_netstat(args):
+    # Imported here as the client takes long time to import.
+    from ..client import ClientThread
+
+    client = ClientThread(args.uri)
+    client.start()
+    client.wait_for_connection()
+    sockets = linux.filter_sockets(client.read_sockets(),
+                                   args.protocol,
+                                   args.state,
+                                   args.port)
+
+    if args.json:
+        print(json.dumps([socket.as_dict() for socket in sockets], indent=4))
+    else:
+        print(linux.format_sockets(sockets), end='')
+
+
+def add_subparser(subparsers):
+    subparser = subparsers.add_parser(
+        'netstat',
+        description='List TCP, UDP and Unix sockets.')
+    subparser.add_argument('-u' ,'--uri',
+                           default='tcp://127.0.0.1:28000',
+                           help='URI of the server (default: %(default)s)')
+    subparser.add_argument('-p', '--protocol',
+                           action='append',
+                           choices=[protocol for protocol, _ in linux.NETSTAT_FILES],
+                           help=('Only list sockets of given protocol. May be '
+                                 'given multiple times.'))
+    subparser.add_argument('-s', '--state',
+                           action='append',
+                           help=('Only list sockets in given state, for example '
+                                 'listen or established. May be given multiple '
+                                 'times.'))
+    subparser.add_argument('--port',
+                           type=int,
+                           help='Only list sockets with given local or remote port.')
+    subparser.add_argument('-j', '--json',
+                           action='store_true',
+                           help='Print the sockets as JSON.')
+    subparser.set_defaults(func=_do_netstat)
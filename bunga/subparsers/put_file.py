@@ -1,22 +1,70 @@
 import sys
 import os
-from tqdm.auto import tqdm
-from tqdm.utils import CallbackIOWrapper
 
-from ..client import ClientThread
-from ..client import create_to_path
+from ..agent_client import AgentError
+from ..agent_client import call
+from .utils import create_to_path
+
+
+def format_size(size):
+    from tqdm import tqdm
+
+    return tqdm.format_sizeof(size, divisor=1024)
+
+
+def _do_put_file_agent(args, remotefile, size):
+    try:
+        sent = call('put_file',
+                    {
+                        'uri': args.uri,
+                        'local_path': os.path.abspath(args.localfile),
+                        'remote_path': remotefile,
+                        'delta': args.delta,
+                        'compress': not args.no_compression,
+                        'verify': args.verify
+                    })
+    except AgentError as e:
+        sys.exit(e.error)
+
+    if args.delta:
+        print(f'Sent {format_size(sent)} of {format_size(size)} bytes.')
 
 
 def do_put_file(args):
     if not os.path.exists(args.localfile):
         sys.exit(f"Local file '{args.localfile}' does not exist.")
 
+    remotefile = create_to_path(args.localfile, args.remotefile)
+    size = os.stat(args.localfile).st_size
+
+    if args.agent:
+        _do_put_file_agent(args, remotefile, size)
+
+        return
+
+    # Imported here as not needed with an agent.
+    from tqdm.auto import tqdm
+    from tqdm.utils import CallbackIOWrapper
+    from ..client import ClientThread
+
     client = ClientThread(args.uri,
                           connection_refused_delay=None,
-                          connect_timeout_delay=None)
+                          connect_timeout_delay=None,
+                          connection_closed_delay=None)
     client.start()
-    remotefile = create_to_path(args.localfile, args.remotefile)
-    size = os.stat(args.localfile).st_size
+
+    if args.delta:
+        with open(args.localfile, 'rb') as fin:
+            client.wait_for_connection()
+            sent = client.put_file_delta(fin,
+                                         size,
+                                         remotefile,
+                                         compress=not args.no_compression,
+                                         verify=args.verify)
+
+        print(f'Sent {format_size(sent)} of {format_size(size)} bytes.')
+
+        return
 
     with open(args.localfile, 'rb') as fin:
         with tqdm(total=size,
@@ -26,7 +74,9 @@ def do_put_file(args):
             client.wait_for_connection()
             client.put_file(CallbackIOWrapper(progress.update, fin, 'read'),
                             size,
-                            remotefile)
+                            remotefile,
+                            compress=not args.no_compression,
+                            verify=args.verify)
 
 
 def add_subparser(subparsers):
@@ -34,6 +84,21 @@ def add_subparser(subparsers):
     subparser.add_argument('-u' ,'--uri',
                            default='tcp://127.0.0.1:28000',
                            help='URI of the server (default: %(default)s)')
+    subparser.add_argument('-a', '--agent',
+                           action='store_true',
+                           help=('Use the connection of a running agent. No '
+                                 'progress is shown.'))
+    subparser.add_argument('-n', '--no-compression',
+                           action='store_true',
+                           help='Do not compress the file, for example as it '
+                           'already is compressed.')
+    subparser.add_argument('-d', '--delta',
+                           action='store_true',
+                           help='Only send data that differs from the existing '
+                           'remote file.')
+    subparser.add_argument('--verify',
+                           action='store_true',
+                           help='Verify the file data with a CRC-32.')
     subparser.add_argument('localfile', help='The local file path.')
     subparser.add_argument('remotefile',
                            nargs='?',
@@ -0,0 +1,49 @@
+import sys
+import os
+
+from ..client import ClientThread
+from ..client import TREE_CONCURRENCY
+from .utils import create_to_path
+
+
+def do_put_tree(args):
+    if not os.path.isdir(args.localdir):
+        sys.exit(f"Local directory '{args.localdir}' does not exist.")
+
+    client = ClientThread(args.uri,
+                          connection_refused_delay=None,
+                          connect_timeout_delay=None,
+                          connection_closed_delay=None)
+    client.start()
+    client.wait_for_connection()
+    remotedir = create_to_path(os.path.normpath(args.localdir), args.remotedir)
+    paths = client.put_tree(args.localdir,
+                            remotedir,
+                            concurrency=args.concurrency,
+                            compress=not args.no_compression)
+
+    for path in sorted(paths):
+        print(path)
+
+
+def add_subparser(subparsers):
+    subparser = subparsers.add_parser(
+        'put_tree',
+        description=('Put a directory and its subdirectories. Files with '
+                     'unchanged size and modification time are skipped.'))
+    subparser.add_argument('-u' ,'--uri',
+                           default='tcp://127.0.0.1:28000',
+                           help='URI of the server (default: %(default)s)')
+    subparser.add_argument('-c', '--concurrency',
+                           type=int,
+                           default=TREE_CONCURRENCY,
+                           help=('Maximum number of files transferred at the '
+                                 'same time (default: %(default)s).'))
+    subparser.add_argument('-n', '--no-compression',
+                           action='store_true',
+                           help='Do not compress files.')
+    subparser.add_argument('localdir', help='The local directory path.')
+    subparser.add_argument('remotedir',
+                           nargs='?',
+                           help='The remote directory path.')
+    subparser.set_defaults(func=do_put_tree)
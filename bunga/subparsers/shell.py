@@ -2,6 +2,7 @@ import re
 import sys
 import os
 import subprocess
+import codecs
 
 import prompt_toolkit
 from prompt_toolkit.history import FileHistory
@@ -46,14 +47,20 @@ def is_comment(line):
 
 
 def print_output(output, pipe_commands):
+    """Print given output chunks as they are generated.
+
+    """
+
     if pipe_commands:
         with subprocess.Popen(pipe_commands,
                               shell=True,
                               stdin=subprocess.PIPE,
                               encoding='utf-8') as proc:
-            print(output, end='', flush=True, file=proc.stdin)
+            for chunk in output:
+                print(chunk, end='', flush=True, file=proc.stdin)
     else:
-        print(output, end='', flush=True)
+        for chunk in output:
+            print(chunk, end='', flush=True)
 
 
 def parse_command(line):
@@ -95,6 +102,15 @@ def execute_command(client, command):
     return client.execute_command(command).decode('utf-8', 'replace')
 
 
+def execute_command_stream(client, command):
+    decoder = codecs.getincrementaldecoder('utf-8')('replace')
+
+    for chunk in client.execute_command_stream(command):
+        yield decoder.decode(chunk)
+
+    yield decoder.decode(b'', final=True)
+
+
 def execute_dmesg(client):
     lines = []
 
@@ -153,9 +169,9 @@ def shell_main(client):
 
             try:
                 if command == 'dmesg':
-                    output = execute_dmesg(client)
+                    output = [execute_dmesg(client)]
                 else:
-                    output = execute_command(client, command)
+                    output = execute_command_stream(client, command)
 
                 print_output(output, pipe_commands)
             except ExecuteCommandError as e:
@@ -0,0 +1,75 @@
+import sys
+import json
+import time
+
+from .. import linux
+from .. import proc
+
+
+# Move the cursor to the top left corner and clear the screen.
+CLEAR_SCREEN = '\x1b[H\x1b[2J'
+
+
+def print_rows(args, rows):
+    if args.json:
+        print(json.dumps([row.as_dict() for row in rows]), flush=True)
+    elif sys.stdout.isatty():
+        sys.stdout.write(CLEAR_SCREEN
+                         + f'top - {args.uri}, PID {args.pid}\n\n'
+                         + linux.format_top(rows))
+        sys.stdout.flush()
+    else:
+        print(linux.format_top(rows), flush=True)
+
+
+def _do_top(args):
+    # Imported here as the client takes long time to import.
+    from ..client import ClientThread
+
+    client = ClientThread(args.uri)
+    client.start()
+    client.wait_for_connection()
+    # Each sample has only the first line of /proc/stat, without the
+    # lines of each CPU.
+    proc_stat = client.execute_command('cat /proc/stat').decode()
+    top = linux.Top(len(proc.parse_stat(proc_stat).cpus) or 1)
+    sample_time = time.monotonic()
+    iteration = 0
+
+    while True:
+        proc_stat, proc_n_stat = client.read_ps_stat(args.pid)
+        print_rows(args, top.update(proc_stat, proc_n_stat))
+        iteration += 1
+
+        if iteration == args.iterations:
+            break
+
+        # Sample at a fixed rate, independent of the time it takes to
+        # get a sample.
+        sample_time += args.interval
+        time.sleep(max(sample_time - time.monotonic(), 0))
+
+
+def add_subparser(subparsers):
+    subparser = subparsers.add_parser(
+        'top',
+        description=('Continuously show the threads of a process, highest CPU '
+                     'usage first.'))
+    subparser.add_argument('-u' ,'--uri',
+                           default='tcp://127.0.0.1:28000',
+                           help='URI of the server (default: %(default)s)')
+    subparser.add_argument('-p', '--pid',
+                           type=int,
+                           default=1,
+                           help='Process id (default: %(default)s).')
+    subparser.add_argument('-i', '--interval',
+                           type=float,
+                           default=2,
+                           help='Seconds between samples (default: %(default)s).')
+    subparser.add_argument('-n', '--iterations',
+                           type=int,
+                           help='Number of samples (default: forever).')
+    subparser.add_argument('-j', '--json',
+                           action='store_true',
+                           help='Print each sample as a JSON list of rows.')
+    subparser.set_defaults(func=_do_top)
@@ -0,0 +1,8 @@
+import os
+
+
+def create_to_path(from_path, to_path):
+    if to_path:
+        return to_path
+    else:
+        return os.path.basename(from_path)
@@ -0,0 +1,237 @@
+"""Transport of frames between clients and servers, independent of
+the messages in them. A frame is a 32 bits big endian header, with the
+message type in the upper 8 bits and the payload size in the lower 24
+bits, followed by the payload.
+
+"""
+
+import asyncio
+import logging
+import struct
+
+
+LOGGER = logging.getLogger(__name__)
+
+# Message type in the upper 8 bits and payload size in the lower 24
+# bits.
+HEADER = struct.Struct('>I')
+HEADER_SIZE = HEADER.size
+
+# Flush sent messages immediately when at least this many bytes are
+# waiting, instead of at the end of the event loop iteration.
+WRITE_HIGH_WATER_MARK = 65536
+
+
+def pack_header(message_type, size):
+    return HEADER.pack((message_type << 24) | size)
+
+
+class FrameProtocol(asyncio.BufferedProtocol):
+    """Receives data into a single buffer and parses all complete frames
+    in it on each read, instead of awaiting each header and payload
+    separately. The connection is aborted if a frame payload is larger
+    than `maximum_size` bytes, unless zero, so the buffer never grows
+    beyond it.
+
+    """
+
+    # Stop reading from the socket when this many parsed frames are
+    # waiting to be handled.
+    FRAMES_HIGH_WATER_MARK = 1024
+
+    def __init__(self, maximum_size=0, buffer_size=65536):
+        self.transport = None
+        self._maximum_size = maximum_size
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._size = 0
+        self._frames = []
+        self._waiter = None
+        self._exception = None
+        self._paused = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exception):
+        if exception is None:
+            exception = ConnectionResetError('Connection lost.')
+
+        if self._exception is None:
+            self._exception = exception
+
+        self._wakeup()
+
+    def get_buffer(self, sizehint):
+        return self._view[self._size:]
+
+    def buffer_updated(self, nbytes):
+        self._size += nbytes
+        view = self._view
+        offset = 0
+        end = self._size
+
+        while end - offset >= HEADER_SIZE:
+            header = HEADER.unpack_from(view, offset)[0]
+            size = header & 0xffffff
+
+            if 0 < self._maximum_size < size:
+                self._abort(size)
+
+                return
+
+            frame_end = offset + HEADER_SIZE + size
+
+            if frame_end > end:
+                break
+
+            self._frames.append((header >> 24,
+                                 bytes(view[offset + HEADER_SIZE:frame_end])))
+            offset = frame_end
+
+        if offset > 0:
+            self._size = end - offset
+            view[:self._size] = view[offset:end]
+
+        if self._size >= HEADER_SIZE:
+            header = HEADER.unpack_from(view)[0]
+            self._reserve(HEADER_SIZE + (header & 0xffffff))
+
+        if self._frames:
+            if len(self._frames) >= self.FRAMES_HIGH_WATER_MARK:
+                self._paused = True
+                self.transport.pause_reading()
+
+            self._wakeup()
+
+    def eof_received(self):
+        return False
+
+    async def read_frames(self):
+        """Returns a list of all received (message type, payload) frames,
+        waiting for at least one. Raises an exception once all frames
+        received before the connection was lost have been returned.
+
+        """
+
+        while not self._frames:
+            if self._exception is not None:
+                raise self._exception
+
+            self._waiter = asyncio.get_event_loop().create_future()
+
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+        frames = self._frames
+        self._frames = []
+
+        if self._paused:
+            self._paused = False
+            self.transport.resume_reading()
+
+        return frames
+
+    def _abort(self, size):
+        LOGGER.warning('Aborting connection as a frame of %d bytes is larger '
+                       'than the maximum of %d bytes.',
+                       size,
+                       self._maximum_size)
+        self._exception = ConnectionAbortedError(
+            f'Frame of {size} bytes larger than {self._maximum_size} bytes.')
+        self._size = 0
+        self.transport.abort()
+        self._wakeup()
+
+    def _reserve(self, size):
+        """Make room for a frame of given size. The old buffer may still be
+        referenced by the transport, so it is replaced rather than
+        resized.
+
+        """
+
+        if size > len(self._buffer):
+            buffer = bytearray(size)
+            buffer[:self._size] = self._view[:self._size]
+            self._buffer = buffer
+            self._view = memoryview(buffer)
+
+    def _wakeup(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+
+class RoundTripTime:
+    """Round trip time statistics in seconds, measured from ping to pong.
+    The smoothed round trip time and its variation are estimated as
+    in RFC 6298. All but `samples` are ``None`` until the first pong
+    is received.
+
+    """
+
+    def __init__(self):
+        self.samples = 0
+        self.latest = None
+        self.minimum = None
+        self.smoothed = None
+        self.variation = None
+
+    def update(self, sample):
+        if self.samples == 0:
+            self.minimum = sample
+            self.smoothed = sample
+            self.variation = sample / 2
+        else:
+            self.minimum = min(self.minimum, sample)
+            self.variation = (0.75 * self.variation
+                              + 0.25 * abs(self.smoothed - sample))
+            self.smoothed = 0.875 * self.smoothed + 0.125 * sample
+
+        self.latest = sample
+        self.samples += 1
+
+    def timeout(self, minimum):
+        """Returns the smoothed round trip time plus four times its
+        variation, but at least given minimum.
+
+        """
+
+        if self.samples == 0:
+            return minimum
+
+        return max(self.smoothed + 4 * self.variation, minimum)
+
+
+class ConnectionClosedError(ConnectionError):
+    """The server closed the connection before responding to the connect
+    request, for example as all its client slots are in use.
+
+    """
+
+
+class ConnectStatistics:
+    """Connection attempt counters. `connects` counts established TCP
+    connections, and `closed` the ones closed by the server before it
+    responded to the connect request, which are failed attempts as
+    well. `consecutive_failures` also counts a lost connection, as the
+    first failure before reconnecting. `delay` is the latest delay
+    before reconnecting in seconds, and is ``None`` once connected.
+
+    """
+
+    def __init__(self):
+        self.attempts = 0
+        self.connects = 0
+        self.refused = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.closed = 0
+        self.consecutive_failures = 0
+        self.delay = None
+        self.total_delay = 0
+
+    @property
+    def failures(self):
+        return self.refused + self.timeouts + self.errors + self.closed
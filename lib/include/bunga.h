@@ -49,6 +49,7 @@ struct bunga_connect_req_t {
     struct pbtools_message_base_t base;
     uint32_t keep_alive_timeout;
     uint32_t maximum_message_size;
+    uint32_t compressions;
 };
 
 /**
@@ -62,6 +63,8 @@ struct bunga_execute_command_req_repeated_t {
 struct bunga_execute_command_req_t {
     struct pbtools_message_base_t base;
     char *command_p;
+    uint32_t request_id;
+    bool compressed;
 };
 
 /**
@@ -77,6 +80,11 @@ struct bunga_get_file_req_t {
     char *path_p;
     uint32_t window_size;
     uint32_t acknowledge_count;
+    uint32_t request_id;
+    uint64_t offset;
+    uint64_t length;
+    bool compressed;
+    bool checksum;
 };
 
 /**
@@ -92,6 +100,46 @@ struct bunga_put_file_req_t {
     char *path_p;
     uint64_t size;
     struct pbtools_bytes_t data;
+    uint32_t request_id;
+    uint64_t offset;
+    bool compressed;
+    bool delta;
+    uint64_t copy_offset;
+    uint64_t copy_size;
+    uint64_t mtime;
+    bool create_directories;
+    bool checksum;
+    uint32_t crc32;
+};
+
+/**
+ * Message bunga.FindBlocksReq.
+ */
+struct bunga_find_blocks_req_repeated_t {
+    int length;
+    struct bunga_find_blocks_req_t *items_p;
+};
+
+struct bunga_find_blocks_req_t {
+    struct pbtools_message_base_t base;
+    char *path_p;
+    uint32_t block_size;
+    struct pbtools_bytes_t checksums;
+    uint32_t request_id;
+};
+
+/**
+ * Message bunga.ListFilesReq.
+ */
+struct bunga_list_files_req_repeated_t {
+    int length;
+    struct bunga_list_files_req_t *items_p;
+};
+
+struct bunga_list_files_req_t {
+    struct pbtools_message_base_t base;
+    char *path_p;
+    uint32_t request_id;
 };
 
 /**
@@ -102,7 +150,9 @@ enum bunga_client_to_server_messages_choice_e {
     bunga_client_to_server_messages_choice_connect_req_e = 1,
     bunga_client_to_server_messages_choice_execute_command_req_e = 2,
     bunga_client_to_server_messages_choice_get_file_req_e = 3,
-    bunga_client_to_server_messages_choice_put_file_req_e = 4
+    bunga_client_to_server_messages_choice_put_file_req_e = 4,
+    bunga_client_to_server_messages_choice_find_blocks_req_e = 5,
+    bunga_client_to_server_messages_choice_list_files_req_e = 6
 };
 
 /**
@@ -115,6 +165,8 @@ struct bunga_client_to_server_messages_oneof_t {
         struct bunga_execute_command_req_t execute_command_req;
         struct bunga_get_file_req_t get_file_req;
         struct bunga_put_file_req_t put_file_req;
+        struct bunga_find_blocks_req_t find_blocks_req;
+        struct bunga_list_files_req_t list_files_req;
     } value;
 };
 
@@ -143,6 +195,7 @@ struct bunga_connect_rsp_t {
     struct pbtools_message_base_t base;
     uint32_t keep_alive_timeout;
     uint32_t maximum_message_size;
+    uint32_t compression;
 };
 
 /**
@@ -157,6 +210,7 @@ struct bunga_execute_command_rsp_t {
     struct pbtools_message_base_t base;
     struct pbtools_bytes_t output;
     char *error_p;
+    uint32_t request_id;
 };
 
 /**
@@ -185,6 +239,8 @@ struct bunga_get_file_rsp_t {
     uint64_t size;
     struct pbtools_bytes_t data;
     char *error_p;
+    uint32_t request_id;
+    uint32_t crc32;
 };
 
 /**
@@ -200,6 +256,41 @@ struct bunga_put_file_rsp_t {
     uint32_t window_size;
     char *error_p;
     uint32_t acknowledge_count;
+    uint32_t request_id;
+};
+
+/**
+ * Message bunga.FindBlocksRsp.
+ */
+struct bunga_find_blocks_rsp_repeated_t {
+    int length;
+    struct bunga_find_blocks_rsp_t *items_p;
+};
+
+struct bunga_find_blocks_rsp_t {
+    struct pbtools_message_base_t base;
+    uint32_t window_size;
+    uint32_t acknowledge_count;
+    struct pbtools_bytes_t offsets;
+    char *error_p;
+    uint32_t request_id;
+};
+
+/**
+ * Message bunga.ListFilesRsp.
+ */
+struct bunga_list_files_rsp_repeated_t {
+    int length;
+    struct bunga_list_files_rsp_t *items_p;
+};
+
+struct bunga_list_files_rsp_t {
+    struct pbtools_message_base_t base;
+    struct pbtools_repeated_string_t paths;
+    struct pbtools_repeated_uint64_t sizes;
+    struct pbtools_repeated_uint64_t mtimes;
+    char *error_p;
+    uint32_t request_id;
 };
 
 /**
@@ -211,7 +302,9 @@ enum bunga_server_to_client_messages_choice_e {
     bunga_server_to_client_messages_choice_execute_command_rsp_e = 2,
     bunga_server_to_client_messages_choice_log_entry_ind_e = 3,
     bunga_server_to_client_messages_choice_get_file_rsp_e = 4,
-    bunga_server_to_client_messages_choice_put_file_rsp_e = 5
+    bunga_server_to_client_messages_choice_put_file_rsp_e = 5,
+    bunga_server_to_client_messages_choice_find_blocks_rsp_e = 6,
+    bunga_server_to_client_messages_choice_list_files_rsp_e = 7
 };
 
 /**
@@ -225,6 +318,8 @@ struct bunga_server_to_client_messages_oneof_t {
         struct bunga_log_entry_ind_t log_entry_ind;
         struct bunga_get_file_rsp_t get_file_rsp;
         struct bunga_put_file_rsp_t put_file_rsp;
+        struct bunga_find_blocks_rsp_t find_blocks_rsp;
+        struct bunga_list_files_rsp_t list_files_rsp;
     } value;
 };
 
@@ -313,6 +408,42 @@ int bunga_put_file_req_decode(
     const uint8_t *encoded_p,
     size_t size);
 
+/**
+ * Encoding and decoding of bunga.FindBlocksReq.
+ */
+struct bunga_find_blocks_req_t *
+bunga_find_blocks_req_new(
+    void *workspace_p,
+    size_t size);
+
+int bunga_find_blocks_req_encode(
+    struct bunga_find_blocks_req_t *self_p,
+    uint8_t *encoded_p,
+    size_t size);
+
+int bunga_find_blocks_req_decode(
+    struct bunga_find_blocks_req_t *self_p,
+    const uint8_t *encoded_p,
+    size_t size);
+
+/**
+ * Encoding and decoding of bunga.ListFilesReq.
+ */
+struct bunga_list_files_req_t *
+bunga_list_files_req_new(
+    void *workspace_p,
+    size_t size);
+
+int bunga_list_files_req_encode(
+    struct bunga_list_files_req_t *self_p,
+    uint8_t *encoded_p,
+    size_t size);
+
+int bunga_list_files_req_decode(
+    struct bunga_list_files_req_t *self_p,
+    const uint8_t *encoded_p,
+    size_t size);
+
 void bunga_client_to_server_messages_connect_req_init(
     struct bunga_client_to_server_t *self_p);
 
@@ -325,6 +456,12 @@ void bunga_client_to_server_messages_get_file_req_init(
 void bunga_client_to_server_messages_put_file_req_init(
     struct bunga_client_to_server_t *self_p);
 
+void bunga_client_to_server_messages_find_blocks_req_init(
+    struct bunga_client_to_server_t *self_p);
+
+void bunga_client_to_server_messages_list_files_req_init(
+    struct bunga_client_to_server_t *self_p);
+
 /**
  * Encoding and decoding of bunga.ClientToServer.
  */
@@ -437,6 +574,54 @@ int bunga_put_file_rsp_decode(
     const uint8_t *encoded_p,
     size_t size);
 
+/**
+ * Encoding and decoding of bunga.FindBlocksRsp.
+ */
+struct bunga_find_blocks_rsp_t *
+bunga_find_blocks_rsp_new(
+    void *workspace_p,
+    size_t size);
+
+int bunga_find_blocks_rsp_encode(
+    struct bunga_find_blocks_rsp_t *self_p,
+    uint8_t *encoded_p,
+    size_t size);
+
+int bunga_find_blocks_rsp_decode(
+    struct bunga_find_blocks_rsp_t *self_p,
+    const uint8_t *encoded_p,
+    size_t size);
+
+int bunga_list_files_rsp_paths_alloc(
+    struct bunga_list_files_rsp_t *self_p,
+    int length);
+
+int bunga_list_files_rsp_sizes_alloc(
+    struct bunga_list_files_rsp_t *self_p,
+    int length);
+
+int bunga_list_files_rsp_mtimes_alloc(
+    struct bunga_list_files_rsp_t *self_p,
+    int length);
+
+/**
+ * Encoding and decoding of bunga.ListFilesRsp.
+ */
+struct bunga_list_files_rsp_t *
+bunga_list_files_rsp_new(
+    void *workspace_p,
+    size_t size);
+
+int bunga_list_files_rsp_encode(
+    struct bunga_list_files_rsp_t *self_p,
+    uint8_t *encoded_p,
+    size_t size);
+
+int bunga_list_files_rsp_decode(
+    struct bunga_list_files_rsp_t *self_p,
+    const uint8_t *encoded_p,
+    size_t size);
+
 void bunga_server_to_client_messages_connect_rsp_init(
     struct bunga_server_to_client_t *self_p);
 
@@ -452,6 +637,12 @@ void bunga_server_to_client_messages_get_file_rsp_init(
 void bunga_server_to_client_messages_put_file_rsp_init(
     struct bunga_server_to_client_t *self_p);
 
+void bunga_server_to_client_messages_find_blocks_rsp_init(
+    struct bunga_server_to_client_t *self_p);
+
+void bunga_server_to_client_messages_list_files_rsp_init(
+    struct bunga_server_to_client_t *self_p);
+
 /**
  * Encoding and decoding of bunga.ServerToClient.
  */
@@ -560,6 +751,50 @@ void bunga_put_file_req_decode_repeated_inner(
     struct pbtools_repeated_info_t *repeated_info_p,
     struct bunga_put_file_req_repeated_t *repeated_p);
 
+void bunga_find_blocks_req_init(
+    struct bunga_find_blocks_req_t *self_p,
+    struct pbtools_heap_t *heap_p);
+
+void bunga_find_blocks_req_encode_inner(
+    struct pbtools_encoder_t *encoder_p,
+    struct bunga_find_blocks_req_t *self_p);
+
+void bunga_find_blocks_req_decode_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct bunga_find_blocks_req_t *self_p);
+
+void bunga_find_blocks_req_encode_repeated_inner(
+    struct pbtools_encoder_t *encoder_p,
+    int field_number,
+    struct bunga_find_blocks_req_repeated_t *repeated_p);
+
+void bunga_find_blocks_req_decode_repeated_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct pbtools_repeated_info_t *repeated_info_p,
+    struct bunga_find_blocks_req_repeated_t *repeated_p);
+
+void bunga_list_files_req_init(
+    struct bunga_list_files_req_t *self_p,
+    struct pbtools_heap_t *heap_p);
+
+void bunga_list_files_req_encode_inner(
+    struct pbtools_encoder_t *encoder_p,
+    struct bunga_list_files_req_t *self_p);
+
+void bunga_list_files_req_decode_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct bunga_list_files_req_t *self_p);
+
+void bunga_list_files_req_encode_repeated_inner(
+    struct pbtools_encoder_t *encoder_p,
+    int field_number,
+    struct bunga_list_files_req_repeated_t *repeated_p);
+
+void bunga_list_files_req_decode_repeated_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct pbtools_repeated_info_t *repeated_info_p,
+    struct bunga_list_files_req_repeated_t *repeated_p);
+
 void bunga_client_to_server_init(
     struct bunga_client_to_server_t *self_p,
     struct pbtools_heap_t *heap_p);
@@ -692,6 +927,50 @@ void bunga_put_file_rsp_decode_repeated_inner(
     struct pbtools_repeated_info_t *repeated_info_p,
     struct bunga_put_file_rsp_repeated_t *repeated_p);
 
+void bunga_find_blocks_rsp_init(
+    struct bunga_find_blocks_rsp_t *self_p,
+    struct pbtools_heap_t *heap_p);
+
+void bunga_find_blocks_rsp_encode_inner(
+    struct pbtools_encoder_t *encoder_p,
+    struct bunga_find_blocks_rsp_t *self_p);
+
+void bunga_find_blocks_rsp_decode_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct bunga_find_blocks_rsp_t *self_p);
+
+void bunga_find_blocks_rsp_encode_repeated_inner(
+    struct pbtools_encoder_t *encoder_p,
+    int field_number,
+    struct bunga_find_blocks_rsp_repeated_t *repeated_p);
+
+void bunga_find_blocks_rsp_decode_repeated_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct pbtools_repeated_info_t *repeated_info_p,
+    struct bunga_find_blocks_rsp_repeated_t *repeated_p);
+
+void bunga_list_files_rsp_init(
+    struct bunga_list_files_rsp_t *self_p,
+    struct pbtools_heap_t *heap_p);
+
+void bunga_list_files_rsp_encode_inner(
+    struct pbtools_encoder_t *encoder_p,
+    struct bunga_list_files_rsp_t *self_p);
+
+void bunga_list_files_rsp_decode_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct bunga_list_files_rsp_t *self_p);
+
+void bunga_list_files_rsp_encode_repeated_inner(
+    struct pbtools_encoder_t *encoder_p,
+    int field_number,
+    struct bunga_list_files_rsp_repeated_t *repeated_p);
+
+void bunga_list_files_rsp_decode_repeated_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct pbtools_repeated_info_t *repeated_info_p,
+    struct bunga_list_files_rsp_repeated_t *repeated_p);
+
 void bunga_server_to_client_init(
     struct bunga_server_to_client_t *self_p,
     struct pbtools_heap_t *heap_p);
@@ -56,6 +56,16 @@ typedef void (*bunga_server_on_put_file_req_t)(
     struct bunga_server_client_t *client_p,
     struct bunga_put_file_req_t *message_p);
 
+typedef void (*bunga_server_on_find_blocks_req_t)(
+    struct bunga_server_t *self_p,
+    struct bunga_server_client_t *client_p,
+    struct bunga_find_blocks_req_t *message_p);
+
+typedef void (*bunga_server_on_list_files_req_t)(
+    struct bunga_server_t *self_p,
+    struct bunga_server_client_t *client_p,
+    struct bunga_list_files_req_t *message_p);
+
 enum bunga_server_client_input_state_t {
     bunga_server_client_input_state_header_t = 0,
     bunga_server_client_input_state_payload_t
@@ -80,6 +90,8 @@ struct bunga_server_t {
     bunga_server_on_execute_command_req_t on_execute_command_req;
     bunga_server_on_get_file_req_t on_get_file_req;
     bunga_server_on_put_file_req_t on_put_file_req;
+    bunga_server_on_find_blocks_req_t on_find_blocks_req;
+    bunga_server_on_list_files_req_t on_list_files_req;
     int epoll_fd;
     messi_epoll_ctl_t epoll_ctl;
     int listener_fd;
@@ -147,6 +159,8 @@ int bunga_server_init(
     bunga_server_on_execute_command_req_t on_execute_command_req,
     bunga_server_on_get_file_req_t on_get_file_req,
     bunga_server_on_put_file_req_t on_put_file_req,
+    bunga_server_on_find_blocks_req_t on_find_blocks_req,
+    bunga_server_on_list_files_req_t on_list_files_req,
     int epoll_fd,
     messi_epoll_ctl_t epoll_ctl);
 
@@ -226,4 +240,18 @@ struct bunga_get_file_rsp_t *bunga_server_init_get_file_rsp(
 struct bunga_put_file_rsp_t *bunga_server_init_put_file_rsp(
     struct bunga_server_t *self_p);
 
+/**
+ * Prepare a find_blocks_rsp message. Call `send()`, `reply()` or `broadcast()`
+ * to send it.
+ */
+struct bunga_find_blocks_rsp_t *bunga_server_init_find_blocks_rsp(
+    struct bunga_server_t *self_p);
+
+/**
+ * Prepare a list_files_rsp message. Call `send()`, `reply()` or `broadcast()`
+ * to send it.
+ */
+struct bunga_list_files_rsp_t *bunga_server_init_list_files_rsp(
+    struct bunga_server_t *self_p);
+
 #endif
@@ -29,6 +29,18 @@
 #ifndef BUNGA_SERVER_LINUX_H
 #define BUNGA_SERVER_LINUX_H
 
+#include <stddef.h>
+
+/**
+ * Set the maximum message size in bytes to send and receive, 128 to
+ * 65536 bytes. Larger messages give higher file transfer throughput
+ * at the cost of memory. Must be called before
+ * bunga_server_linux_create(). Defaults to BUNGA_MESSAGE_SIZE_MAX.
+ *
+ * Returns zero or negative error code.
+ */
+int bunga_server_linux_set_maximum_message_size(size_t size);
+
 void bunga_server_linux_create(void);
 
 #endif
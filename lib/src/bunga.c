@@ -42,12 +42,14 @@ void bunga_connect_req_init(
     self_p->base.heap_p = heap_p;
     self_p->keep_alive_timeout = 0;
     self_p->maximum_message_size = 0;
+    self_p->compressions = 0;
 }
 
 void bunga_connect_req_encode_inner(
     struct pbtools_encoder_t *encoder_p,
     struct bunga_connect_req_t *self_p)
 {
+    pbtools_encoder_write_uint32(encoder_p, 3, self_p->compressions);
     pbtools_encoder_write_uint32(encoder_p, 2, self_p->maximum_message_size);
     pbtools_encoder_write_uint32(encoder_p, 1, self_p->keep_alive_timeout);
 }
@@ -69,6 +71,10 @@ void bunga_connect_req_decode_inner(
             self_p->maximum_message_size = pbtools_decoder_read_uint32(decoder_p, wire_type);
             break;
 
+        case 3:
+            self_p->compressions = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
         default:
             pbtools_decoder_skip_field(decoder_p, wire_type);
             break;
@@ -145,12 +151,16 @@ void bunga_execute_command_req_init(
 {
     self_p->base.heap_p = heap_p;
     self_p->command_p = "";
+    self_p->request_id = 0;
+    self_p->compressed = 0;
 }
 
 void bunga_execute_command_req_encode_inner(
     struct pbtools_encoder_t *encoder_p,
     struct bunga_execute_command_req_t *self_p)
 {
+    pbtools_encoder_write_bool(encoder_p, 3, self_p->compressed);
+    pbtools_encoder_write_uint32(encoder_p, 2, self_p->request_id);
     pbtools_encoder_write_string(encoder_p, 1, self_p->command_p);
 }
 
@@ -167,6 +177,14 @@ void bunga_execute_command_req_decode_inner(
             pbtools_decoder_read_string(decoder_p, wire_type, &self_p->command_p);
             break;
 
+        case 2:
+            self_p->request_id = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
+        case 3:
+            self_p->compressed = pbtools_decoder_read_bool(decoder_p, wire_type);
+            break;
+
         default:
             pbtools_decoder_skip_field(decoder_p, wire_type);
             break;
@@ -245,12 +263,22 @@ void bunga_get_file_req_init(
     self_p->path_p = "";
     self_p->window_size = 0;
     self_p->acknowledge_count = 0;
+    self_p->request_id = 0;
+    self_p->offset = 0;
+    self_p->length = 0;
+    self_p->compressed = 0;
+    self_p->checksum = 0;
 }
 
 void bunga_get_file_req_encode_inner(
     struct pbtools_encoder_t *encoder_p,
     struct bunga_get_file_req_t *self_p)
 {
+    pbtools_encoder_write_bool(encoder_p, 8, self_p->checksum);
+    pbtools_encoder_write_bool(encoder_p, 7, self_p->compressed);
+    pbtools_encoder_write_uint64(encoder_p, 6, self_p->length);
+    pbtools_encoder_write_uint64(encoder_p, 5, self_p->offset);
+    pbtools_encoder_write_uint32(encoder_p, 4, self_p->request_id);
     pbtools_encoder_write_uint32(encoder_p, 3, self_p->acknowledge_count);
     pbtools_encoder_write_uint32(encoder_p, 2, self_p->window_size);
     pbtools_encoder_write_string(encoder_p, 1, self_p->path_p);
@@ -277,6 +305,26 @@ void bunga_get_file_req_decode_inner(
             self_p->acknowledge_count = pbtools_decoder_read_uint32(decoder_p, wire_type);
             break;
 
+        case 4:
+            self_p->request_id = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
+        case 5:
+            self_p->offset = pbtools_decoder_read_uint64(decoder_p, wire_type);
+            break;
+
+        case 6:
+            self_p->length = pbtools_decoder_read_uint64(decoder_p, wire_type);
+            break;
+
+        case 7:
+            self_p->compressed = pbtools_decoder_read_bool(decoder_p, wire_type);
+            break;
+
+        case 8:
+            self_p->checksum = pbtools_decoder_read_bool(decoder_p, wire_type);
+            break;
+
         default:
             pbtools_decoder_skip_field(decoder_p, wire_type);
             break;
@@ -355,12 +403,32 @@ void bunga_put_file_req_init(
     self_p->path_p = "";
     self_p->size = 0;
     pbtools_bytes_init(&self_p->data);
+    self_p->request_id = 0;
+    self_p->offset = 0;
+    self_p->compressed = 0;
+    self_p->delta = 0;
+    self_p->copy_offset = 0;
+    self_p->copy_size = 0;
+    self_p->mtime = 0;
+    self_p->create_directories = 0;
+    self_p->checksum = 0;
+    self_p->crc32 = 0;
 }
 
 void bunga_put_file_req_encode_inner(
     struct pbtools_encoder_t *encoder_p,
     struct bunga_put_file_req_t *self_p)
 {
+    pbtools_encoder_write_uint32(encoder_p, 13, self_p->crc32);
+    pbtools_encoder_write_bool(encoder_p, 12, self_p->checksum);
+    pbtools_encoder_write_bool(encoder_p, 11, self_p->create_directories);
+    pbtools_encoder_write_uint64(encoder_p, 10, self_p->mtime);
+    pbtools_encoder_write_uint64(encoder_p, 9, self_p->copy_size);
+    pbtools_encoder_write_uint64(encoder_p, 8, self_p->copy_offset);
+    pbtools_encoder_write_bool(encoder_p, 7, self_p->delta);
+    pbtools_encoder_write_bool(encoder_p, 6, self_p->compressed);
+    pbtools_encoder_write_uint64(encoder_p, 5, self_p->offset);
+    pbtools_encoder_write_uint32(encoder_p, 4, self_p->request_id);
     pbtools_encoder_write_bytes(encoder_p, 3, &self_p->data);
     pbtools_encoder_write_uint64(encoder_p, 2, self_p->size);
     pbtools_encoder_write_string(encoder_p, 1, self_p->path_p);
@@ -387,6 +455,46 @@ void bunga_put_file_req_decode_inner(
             pbtools_decoder_read_bytes(decoder_p, wire_type, &self_p->data);
             break;
 
+        case 4:
+            self_p->request_id = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
+        case 5:
+            self_p->offset = pbtools_decoder_read_uint64(decoder_p, wire_type);
+            break;
+
+        case 6:
+            self_p->compressed = pbtools_decoder_read_bool(decoder_p, wire_type);
+            break;
+
+        case 7:
+            self_p->delta = pbtools_decoder_read_bool(decoder_p, wire_type);
+            break;
+
+        case 8:
+            self_p->copy_offset = pbtools_decoder_read_uint64(decoder_p, wire_type);
+            break;
+
+        case 9:
+            self_p->copy_size = pbtools_decoder_read_uint64(decoder_p, wire_type);
+            break;
+
+        case 10:
+            self_p->mtime = pbtools_decoder_read_uint64(decoder_p, wire_type);
+            break;
+
+        case 11:
+            self_p->create_directories = pbtools_decoder_read_bool(decoder_p, wire_type);
+            break;
+
+        case 12:
+            self_p->checksum = pbtools_decoder_read_bool(decoder_p, wire_type);
+            break;
+
+        case 13:
+            self_p->crc32 = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
         default:
             pbtools_decoder_skip_field(decoder_p, wire_type);
             break;
@@ -457,6 +565,226 @@ int bunga_put_file_req_decode(
                 (pbtools_message_decode_inner_t)bunga_put_file_req_decode_inner));
 }
 
+void bunga_find_blocks_req_init(
+    struct bunga_find_blocks_req_t *self_p,
+    struct pbtools_heap_t *heap_p)
+{
+    self_p->base.heap_p = heap_p;
+    self_p->path_p = "";
+    self_p->block_size = 0;
+    pbtools_bytes_init(&self_p->checksums);
+    self_p->request_id = 0;
+}
+
+void bunga_find_blocks_req_encode_inner(
+    struct pbtools_encoder_t *encoder_p,
+    struct bunga_find_blocks_req_t *self_p)
+{
+    pbtools_encoder_write_uint32(encoder_p, 4, self_p->request_id);
+    pbtools_encoder_write_bytes(encoder_p, 3, &self_p->checksums);
+    pbtools_encoder_write_uint32(encoder_p, 2, self_p->block_size);
+    pbtools_encoder_write_string(encoder_p, 1, self_p->path_p);
+}
+
+void bunga_find_blocks_req_decode_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct bunga_find_blocks_req_t *self_p)
+{
+    int wire_type;
+
+    while (pbtools_decoder_available(decoder_p)) {
+        switch (pbtools_decoder_read_tag(decoder_p, &wire_type)) {
+
+        case 1:
+            pbtools_decoder_read_string(decoder_p, wire_type, &self_p->path_p);
+            break;
+
+        case 2:
+            self_p->block_size = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
+        case 3:
+            pbtools_decoder_read_bytes(decoder_p, wire_type, &self_p->checksums);
+            break;
+
+        case 4:
+            self_p->request_id = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
+        default:
+            pbtools_decoder_skip_field(decoder_p, wire_type);
+            break;
+        }
+    }
+}
+
+void bunga_find_blocks_req_encode_repeated_inner(
+    struct pbtools_encoder_t *encoder_p,
+    int field_number,
+    struct bunga_find_blocks_req_repeated_t *repeated_p)
+{
+    pbtools_encode_repeated_inner(
+        encoder_p,
+        field_number,
+        (struct pbtools_repeated_message_t *)repeated_p,
+        sizeof(struct bunga_find_blocks_req_t),
+        (pbtools_message_encode_inner_t)bunga_find_blocks_req_encode_inner);
+}
+
+void bunga_find_blocks_req_decode_repeated_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct pbtools_repeated_info_t *repeated_info_p,
+    struct bunga_find_blocks_req_repeated_t *repeated_p)
+{
+    pbtools_decode_repeated_inner(
+        decoder_p,
+        repeated_info_p,
+        (struct pbtools_repeated_message_t *)repeated_p,
+        sizeof(struct bunga_find_blocks_req_t),
+        (pbtools_message_init_t)bunga_find_blocks_req_init,
+        (pbtools_message_decode_inner_t)bunga_find_blocks_req_decode_inner);
+}
+
+struct bunga_find_blocks_req_t *
+bunga_find_blocks_req_new(
+    void *workspace_p,
+    size_t size)
+{
+    return (pbtools_message_new(
+                workspace_p,
+                size,
+                sizeof(struct bunga_find_blocks_req_t),
+                (pbtools_message_init_t)bunga_find_blocks_req_init));
+}
+
+int bunga_find_blocks_req_encode(
+    struct bunga_find_blocks_req_t *self_p,
+    uint8_t *encoded_p,
+    size_t size)
+{
+    return (pbtools_message_encode(
+                &self_p->base,
+                encoded_p,
+                size,
+                (pbtools_message_encode_inner_t)bunga_find_blocks_req_encode_inner));
+}
+
+int bunga_find_blocks_req_decode(
+    struct bunga_find_blocks_req_t *self_p,
+    const uint8_t *encoded_p,
+    size_t size)
+{
+    return (pbtools_message_decode(
+                &self_p->base,
+                encoded_p,
+                size,
+                (pbtools_message_decode_inner_t)bunga_find_blocks_req_decode_inner));
+}
+
+void bunga_list_files_req_init(
+    struct bunga_list_files_req_t *self_p,
+    struct pbtools_heap_t *heap_p)
+{
+    self_p->base.heap_p = heap_p;
+    self_p->path_p = "";
+    self_p->request_id = 0;
+}
+
+void bunga_list_files_req_encode_inner(
+    struct pbtools_encoder_t *encoder_p,
+    struct bunga_list_files_req_t *self_p)
+{
+    pbtools_encoder_write_uint32(encoder_p, 2, self_p->request_id);
+    pbtools_encoder_write_string(encoder_p, 1, self_p->path_p);
+}
+
+void bunga_list_files_req_decode_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct bunga_list_files_req_t *self_p)
+{
+    int wire_type;
+
+    while (pbtools_decoder_available(decoder_p)) {
+        switch (pbtools_decoder_read_tag(decoder_p, &wire_type)) {
+
+        case 1:
+            pbtools_decoder_read_string(decoder_p, wire_type, &self_p->path_p);
+            break;
+
+        case 2:
+            self_p->request_id = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
+        default:
+            pbtools_decoder_skip_field(decoder_p, wire_type);
+            break;
+        }
+    }
+}
+
+void bunga_list_files_req_encode_repeated_inner(
+    struct pbtools_encoder_t *encoder_p,
+    int field_number,
+    struct bunga_list_files_req_repeated_t *repeated_p)
+{
+    pbtools_encode_repeated_inner(
+        encoder_p,
+        field_number,
+        (struct pbtools_repeated_message_t *)repeated_p,
+        sizeof(struct bunga_list_files_req_t),
+        (pbtools_message_encode_inner_t)bunga_list_files_req_encode_inner);
+}
+
+void bunga_list_files_req_decode_repeated_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct pbtools_repeated_info_t *repeated_info_p,
+    struct bunga_list_files_req_repeated_t *repeated_p)
+{
+    pbtools_decode_repeated_inner(
+        decoder_p,
+        repeated_info_p,
+        (struct pbtools_repeated_message_t *)repeated_p,
+        sizeof(struct bunga_list_files_req_t),
+        (pbtools_message_init_t)bunga_list_files_req_init,
+        (pbtools_message_decode_inner_t)bunga_list_files_req_decode_inner);
+}
+
+struct bunga_list_files_req_t *
+bunga_list_files_req_new(
+    void *workspace_p,
+    size_t size)
+{
+    return (pbtools_message_new(
+                workspace_p,
+                size,
+                sizeof(struct bunga_list_files_req_t),
+                (pbtools_message_init_t)bunga_list_files_req_init));
+}
+
+int bunga_list_files_req_encode(
+    struct bunga_list_files_req_t *self_p,
+    uint8_t *encoded_p,
+    size_t size)
+{
+    return (pbtools_message_encode(
+                &self_p->base,
+                encoded_p,
+                size,
+                (pbtools_message_encode_inner_t)bunga_list_files_req_encode_inner));
+}
+
+int bunga_list_files_req_decode(
+    struct bunga_list_files_req_t *self_p,
+    const uint8_t *encoded_p,
+    size_t size)
+{
+    return (pbtools_message_decode(
+                &self_p->base,
+                encoded_p,
+                size,
+                (pbtools_message_decode_inner_t)bunga_list_files_req_decode_inner));
+}
+
 void bunga_client_to_server_messages_connect_req_init(
     struct bunga_client_to_server_t *self_p)
 {
@@ -493,6 +821,24 @@ void bunga_client_to_server_messages_put_file_req_init(
         self_p->base.heap_p);
 }
 
+void bunga_client_to_server_messages_find_blocks_req_init(
+    struct bunga_client_to_server_t *self_p)
+{
+    self_p->messages.choice = bunga_client_to_server_messages_choice_find_blocks_req_e;
+    bunga_find_blocks_req_init(
+        &self_p->messages.value.find_blocks_req,
+        self_p->base.heap_p);
+}
+
+void bunga_client_to_server_messages_list_files_req_init(
+    struct bunga_client_to_server_t *self_p)
+{
+    self_p->messages.choice = bunga_client_to_server_messages_choice_list_files_req_e;
+    bunga_list_files_req_init(
+        &self_p->messages.value.list_files_req,
+        self_p->base.heap_p);
+}
+
 void bunga_client_to_server_messages_encode(
     struct pbtools_encoder_t *encoder_p,
     struct bunga_client_to_server_messages_oneof_t *self_p)
@@ -531,6 +877,22 @@ void bunga_client_to_server_messages_encode(
             (pbtools_message_encode_inner_t)bunga_put_file_req_encode_inner);
         break;
 
+    case bunga_client_to_server_messages_choice_find_blocks_req_e:
+        pbtools_encoder_sub_message_encode_always(
+            encoder_p,
+            5,
+            &self_p->value.find_blocks_req.base,
+            (pbtools_message_encode_inner_t)bunga_find_blocks_req_encode_inner);
+        break;
+
+    case bunga_client_to_server_messages_choice_list_files_req_e:
+        pbtools_encoder_sub_message_encode_always(
+            encoder_p,
+            6,
+            &self_p->value.list_files_req.base,
+            (pbtools_message_encode_inner_t)bunga_list_files_req_encode_inner);
+        break;
+
     default:
         break;
     }
@@ -588,6 +950,32 @@ static void bunga_client_to_server_messages_put_file_req_decode(
         (pbtools_message_decode_inner_t)bunga_put_file_req_decode_inner);
 }
 
+static void bunga_client_to_server_messages_find_blocks_req_decode(
+    struct pbtools_decoder_t *decoder_p,
+    int wire_type,
+    struct bunga_client_to_server_t *self_p)
+{
+    bunga_client_to_server_messages_find_blocks_req_init(self_p);
+    pbtools_decoder_sub_message_decode(
+        decoder_p,
+        wire_type,
+        &self_p->messages.value.find_blocks_req.base,
+        (pbtools_message_decode_inner_t)bunga_find_blocks_req_decode_inner);
+}
+
+static void bunga_client_to_server_messages_list_files_req_decode(
+    struct pbtools_decoder_t *decoder_p,
+    int wire_type,
+    struct bunga_client_to_server_t *self_p)
+{
+    bunga_client_to_server_messages_list_files_req_init(self_p);
+    pbtools_decoder_sub_message_decode(
+        decoder_p,
+        wire_type,
+        &self_p->messages.value.list_files_req.base,
+        (pbtools_message_decode_inner_t)bunga_list_files_req_decode_inner);
+}
+
 void bunga_client_to_server_init(
     struct bunga_client_to_server_t *self_p,
     struct pbtools_heap_t *heap_p)
@@ -640,6 +1028,20 @@ void bunga_client_to_server_decode_inner(
                 self_p);
             break;
 
+        case 5:
+            bunga_client_to_server_messages_find_blocks_req_decode(
+                decoder_p,
+                wire_type,
+                self_p);
+            break;
+
+        case 6:
+            bunga_client_to_server_messages_list_files_req_decode(
+                decoder_p,
+                wire_type,
+                self_p);
+            break;
+
         default:
             pbtools_decoder_skip_field(decoder_p, wire_type);
             break;
@@ -717,12 +1119,14 @@ void bunga_connect_rsp_init(
     self_p->base.heap_p = heap_p;
     self_p->keep_alive_timeout = 0;
     self_p->maximum_message_size = 0;
+    self_p->compression = 0;
 }
 
 void bunga_connect_rsp_encode_inner(
     struct pbtools_encoder_t *encoder_p,
     struct bunga_connect_rsp_t *self_p)
 {
+    pbtools_encoder_write_uint32(encoder_p, 3, self_p->compression);
     pbtools_encoder_write_uint32(encoder_p, 2, self_p->maximum_message_size);
     pbtools_encoder_write_uint32(encoder_p, 1, self_p->keep_alive_timeout);
 }
@@ -744,6 +1148,10 @@ void bunga_connect_rsp_decode_inner(
             self_p->maximum_message_size = pbtools_decoder_read_uint32(decoder_p, wire_type);
             break;
 
+        case 3:
+            self_p->compression = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
         default:
             pbtools_decoder_skip_field(decoder_p, wire_type);
             break;
@@ -821,12 +1229,14 @@ void bunga_execute_command_rsp_init(
     self_p->base.heap_p = heap_p;
     pbtools_bytes_init(&self_p->output);
     self_p->error_p = "";
+    self_p->request_id = 0;
 }
 
 void bunga_execute_command_rsp_encode_inner(
     struct pbtools_encoder_t *encoder_p,
     struct bunga_execute_command_rsp_t *self_p)
 {
+    pbtools_encoder_write_uint32(encoder_p, 3, self_p->request_id);
     pbtools_encoder_write_string(encoder_p, 2, self_p->error_p);
     pbtools_encoder_write_bytes(encoder_p, 1, &self_p->output);
 }
@@ -848,6 +1258,10 @@ void bunga_execute_command_rsp_decode_inner(
             pbtools_decoder_read_string(decoder_p, wire_type, &self_p->error_p);
             break;
 
+        case 3:
+            self_p->request_id = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
         default:
             pbtools_decoder_skip_field(decoder_p, wire_type);
             break;
@@ -1045,12 +1459,16 @@ void bunga_get_file_rsp_init(
     self_p->size = 0;
     pbtools_bytes_init(&self_p->data);
     self_p->error_p = "";
+    self_p->request_id = 0;
+    self_p->crc32 = 0;
 }
 
 void bunga_get_file_rsp_encode_inner(
     struct pbtools_encoder_t *encoder_p,
     struct bunga_get_file_rsp_t *self_p)
 {
+    pbtools_encoder_write_uint32(encoder_p, 5, self_p->crc32);
+    pbtools_encoder_write_uint32(encoder_p, 4, self_p->request_id);
     pbtools_encoder_write_string(encoder_p, 3, self_p->error_p);
     pbtools_encoder_write_bytes(encoder_p, 2, &self_p->data);
     pbtools_encoder_write_uint64(encoder_p, 1, self_p->size);
@@ -1077,7 +1495,15 @@ void bunga_get_file_rsp_decode_inner(
             pbtools_decoder_read_string(decoder_p, wire_type, &self_p->error_p);
             break;
 
-        default:
+        case 4:
+            self_p->request_id = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
+        case 5:
+            self_p->crc32 = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
+        default:
             pbtools_decoder_skip_field(decoder_p, wire_type);
             break;
         }
@@ -1155,12 +1581,14 @@ void bunga_put_file_rsp_init(
     self_p->window_size = 0;
     self_p->error_p = "";
     self_p->acknowledge_count = 0;
+    self_p->request_id = 0;
 }
 
 void bunga_put_file_rsp_encode_inner(
     struct pbtools_encoder_t *encoder_p,
     struct bunga_put_file_rsp_t *self_p)
 {
+    pbtools_encoder_write_uint32(encoder_p, 4, self_p->request_id);
     pbtools_encoder_write_uint32(encoder_p, 3, self_p->acknowledge_count);
     pbtools_encoder_write_string(encoder_p, 2, self_p->error_p);
     pbtools_encoder_write_uint32(encoder_p, 1, self_p->window_size);
@@ -1187,6 +1615,10 @@ void bunga_put_file_rsp_decode_inner(
             self_p->acknowledge_count = pbtools_decoder_read_uint32(decoder_p, wire_type);
             break;
 
+        case 4:
+            self_p->request_id = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
         default:
             pbtools_decoder_skip_field(decoder_p, wire_type);
             break;
@@ -1257,6 +1689,309 @@ int bunga_put_file_rsp_decode(
                 (pbtools_message_decode_inner_t)bunga_put_file_rsp_decode_inner));
 }
 
+void bunga_find_blocks_rsp_init(
+    struct bunga_find_blocks_rsp_t *self_p,
+    struct pbtools_heap_t *heap_p)
+{
+    self_p->base.heap_p = heap_p;
+    self_p->window_size = 0;
+    self_p->acknowledge_count = 0;
+    pbtools_bytes_init(&self_p->offsets);
+    self_p->error_p = "";
+    self_p->request_id = 0;
+}
+
+void bunga_find_blocks_rsp_encode_inner(
+    struct pbtools_encoder_t *encoder_p,
+    struct bunga_find_blocks_rsp_t *self_p)
+{
+    pbtools_encoder_write_uint32(encoder_p, 5, self_p->request_id);
+    pbtools_encoder_write_string(encoder_p, 4, self_p->error_p);
+    pbtools_encoder_write_bytes(encoder_p, 3, &self_p->offsets);
+    pbtools_encoder_write_uint32(encoder_p, 2, self_p->acknowledge_count);
+    pbtools_encoder_write_uint32(encoder_p, 1, self_p->window_size);
+}
+
+void bunga_find_blocks_rsp_decode_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct bunga_find_blocks_rsp_t *self_p)
+{
+    int wire_type;
+
+    while (pbtools_decoder_available(decoder_p)) {
+        switch (pbtools_decoder_read_tag(decoder_p, &wire_type)) {
+
+        case 1:
+            self_p->window_size = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
+        case 2:
+            self_p->acknowledge_count = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
+        case 3:
+            pbtools_decoder_read_bytes(decoder_p, wire_type, &self_p->offsets);
+            break;
+
+        case 4:
+            pbtools_decoder_read_string(decoder_p, wire_type, &self_p->error_p);
+            break;
+
+        case 5:
+            self_p->request_id = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
+        default:
+            pbtools_decoder_skip_field(decoder_p, wire_type);
+            break;
+        }
+    }
+}
+
+void bunga_find_blocks_rsp_encode_repeated_inner(
+    struct pbtools_encoder_t *encoder_p,
+    int field_number,
+    struct bunga_find_blocks_rsp_repeated_t *repeated_p)
+{
+    pbtools_encode_repeated_inner(
+        encoder_p,
+        field_number,
+        (struct pbtools_repeated_message_t *)repeated_p,
+        sizeof(struct bunga_find_blocks_rsp_t),
+        (pbtools_message_encode_inner_t)bunga_find_blocks_rsp_encode_inner);
+}
+
+void bunga_find_blocks_rsp_decode_repeated_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct pbtools_repeated_info_t *repeated_info_p,
+    struct bunga_find_blocks_rsp_repeated_t *repeated_p)
+{
+    pbtools_decode_repeated_inner(
+        decoder_p,
+        repeated_info_p,
+        (struct pbtools_repeated_message_t *)repeated_p,
+        sizeof(struct bunga_find_blocks_rsp_t),
+        (pbtools_message_init_t)bunga_find_blocks_rsp_init,
+        (pbtools_message_decode_inner_t)bunga_find_blocks_rsp_decode_inner);
+}
+
+struct bunga_find_blocks_rsp_t *
+bunga_find_blocks_rsp_new(
+    void *workspace_p,
+    size_t size)
+{
+    return (pbtools_message_new(
+                workspace_p,
+                size,
+                sizeof(struct bunga_find_blocks_rsp_t),
+                (pbtools_message_init_t)bunga_find_blocks_rsp_init));
+}
+
+int bunga_find_blocks_rsp_encode(
+    struct bunga_find_blocks_rsp_t *self_p,
+    uint8_t *encoded_p,
+    size_t size)
+{
+    return (pbtools_message_encode(
+                &self_p->base,
+                encoded_p,
+                size,
+                (pbtools_message_encode_inner_t)bunga_find_blocks_rsp_encode_inner));
+}
+
+int bunga_find_blocks_rsp_decode(
+    struct bunga_find_blocks_rsp_t *self_p,
+    const uint8_t *encoded_p,
+    size_t size)
+{
+    return (pbtools_message_decode(
+                &self_p->base,
+                encoded_p,
+                size,
+                (pbtools_message_decode_inner_t)bunga_find_blocks_rsp_decode_inner));
+}
+
+void bunga_list_files_rsp_init(
+    struct bunga_list_files_rsp_t *self_p,
+    struct pbtools_heap_t *heap_p)
+{
+    self_p->base.heap_p = heap_p;
+    self_p->paths.length = 0;
+    self_p->sizes.length = 0;
+    self_p->mtimes.length = 0;
+    self_p->error_p = "";
+    self_p->request_id = 0;
+}
+
+void bunga_list_files_rsp_encode_inner(
+    struct pbtools_encoder_t *encoder_p,
+    struct bunga_list_files_rsp_t *self_p)
+{
+    pbtools_encoder_write_uint32(encoder_p, 5, self_p->request_id);
+    pbtools_encoder_write_string(encoder_p, 4, self_p->error_p);
+    pbtools_encoder_write_repeated_uint64(encoder_p, 3, &self_p->mtimes);
+    pbtools_encoder_write_repeated_uint64(encoder_p, 2, &self_p->sizes);
+    pbtools_encoder_write_repeated_string(encoder_p, 1, &self_p->paths);
+}
+
+void bunga_list_files_rsp_decode_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct bunga_list_files_rsp_t *self_p)
+{
+    int wire_type;
+    struct pbtools_repeated_info_t repeated_info_paths;
+    struct pbtools_repeated_info_t repeated_info_sizes;
+    struct pbtools_repeated_info_t repeated_info_mtimes;
+
+    pbtools_repeated_info_init(&repeated_info_paths, 1);
+    pbtools_repeated_info_init(&repeated_info_sizes, 2);
+    pbtools_repeated_info_init(&repeated_info_mtimes, 3);
+
+    while (pbtools_decoder_available(decoder_p)) {
+        switch (pbtools_decoder_read_tag(decoder_p, &wire_type)) {
+
+        case 1:
+            pbtools_repeated_info_decode_string(
+                &repeated_info_paths,
+                decoder_p,
+                wire_type);
+            break;
+
+        case 2:
+            pbtools_repeated_info_decode_uint64(
+                &repeated_info_sizes,
+                decoder_p,
+                wire_type);
+            break;
+
+        case 3:
+            pbtools_repeated_info_decode_uint64(
+                &repeated_info_mtimes,
+                decoder_p,
+                wire_type);
+            break;
+
+        case 4:
+            pbtools_decoder_read_string(decoder_p, wire_type, &self_p->error_p);
+            break;
+
+        case 5:
+            self_p->request_id = pbtools_decoder_read_uint32(decoder_p, wire_type);
+            break;
+
+        default:
+            pbtools_decoder_skip_field(decoder_p, wire_type);
+            break;
+        }
+    }
+
+    pbtools_decoder_decode_repeated_string(
+        decoder_p,
+        &repeated_info_paths,
+        &self_p->paths);
+    pbtools_decoder_decode_repeated_uint64(
+        decoder_p,
+        &repeated_info_sizes,
+        &self_p->sizes);
+    pbtools_decoder_decode_repeated_uint64(
+        decoder_p,
+        &repeated_info_mtimes,
+        &self_p->mtimes);
+}
+
+int bunga_list_files_rsp_paths_alloc(
+    struct bunga_list_files_rsp_t *self_p,
+    int length)
+{
+    return (pbtools_alloc_repeated_string(
+                &self_p->base,
+                length,
+                &self_p->paths));
+}
+
+int bunga_list_files_rsp_sizes_alloc(
+    struct bunga_list_files_rsp_t *self_p,
+    int length)
+{
+    return (pbtools_alloc_repeated_uint64(
+                &self_p->base,
+                length,
+                &self_p->sizes));
+}
+
+int bunga_list_files_rsp_mtimes_alloc(
+    struct bunga_list_files_rsp_t *self_p,
+    int length)
+{
+    return (pbtools_alloc_repeated_uint64(
+                &self_p->base,
+                length,
+                &self_p->mtimes));
+}
+
+void bunga_list_files_rsp_encode_repeated_inner(
+    struct pbtools_encoder_t *encoder_p,
+    int field_number,
+    struct bunga_list_files_rsp_repeated_t *repeated_p)
+{
+    pbtools_encode_repeated_inner(
+        encoder_p,
+        field_number,
+        (struct pbtools_repeated_message_t *)repeated_p,
+        sizeof(struct bunga_list_files_rsp_t),
+        (pbtools_message_encode_inner_t)bunga_list_files_rsp_encode_inner);
+}
+
+void bunga_list_files_rsp_decode_repeated_inner(
+    struct pbtools_decoder_t *decoder_p,
+    struct pbtools_repeated_info_t *repeated_info_p,
+    struct bunga_list_files_rsp_repeated_t *repeated_p)
+{
+    pbtools_decode_repeated_inner(
+        decoder_p,
+        repeated_info_p,
+        (struct pbtools_repeated_message_t *)repeated_p,
+        sizeof(struct bunga_list_files_rsp_t),
+        (pbtools_message_init_t)bunga_list_files_rsp_init,
+        (pbtools_message_decode_inner_t)bunga_list_files_rsp_decode_inner);
+}
+
+struct bunga_list_files_rsp_t *
+bunga_list_files_rsp_new(
+    void *workspace_p,
+    size_t size)
+{
+    return (pbtools_message_new(
+                workspace_p,
+                size,
+                sizeof(struct bunga_list_files_rsp_t),
+                (pbtools_message_init_t)bunga_list_files_rsp_init));
+}
+
+int bunga_list_files_rsp_encode(
+    struct bunga_list_files_rsp_t *self_p,
+    uint8_t *encoded_p,
+    size_t size)
+{
+    return (pbtools_message_encode(
+                &self_p->base,
+                encoded_p,
+                size,
+                (pbtools_message_encode_inner_t)bunga_list_files_rsp_encode_inner));
+}
+
+int bunga_list_files_rsp_decode(
+    struct bunga_list_files_rsp_t *self_p,
+    const uint8_t *encoded_p,
+    size_t size)
+{
+    return (pbtools_message_decode(
+                &self_p->base,
+                encoded_p,
+                size,
+                (pbtools_message_decode_inner_t)bunga_list_files_rsp_decode_inner));
+}
+
 void bunga_server_to_client_messages_connect_rsp_init(
     struct bunga_server_to_client_t *self_p)
 {
@@ -1302,6 +2037,24 @@ void bunga_server_to_client_messages_put_file_rsp_init(
         self_p->base.heap_p);
 }
 
+void bunga_server_to_client_messages_find_blocks_rsp_init(
+    struct bunga_server_to_client_t *self_p)
+{
+    self_p->messages.choice = bunga_server_to_client_messages_choice_find_blocks_rsp_e;
+    bunga_find_blocks_rsp_init(
+        &self_p->messages.value.find_blocks_rsp,
+        self_p->base.heap_p);
+}
+
+void bunga_server_to_client_messages_list_files_rsp_init(
+    struct bunga_server_to_client_t *self_p)
+{
+    self_p->messages.choice = bunga_server_to_client_messages_choice_list_files_rsp_e;
+    bunga_list_files_rsp_init(
+        &self_p->messages.value.list_files_rsp,
+        self_p->base.heap_p);
+}
+
 void bunga_server_to_client_messages_encode(
     struct pbtools_encoder_t *encoder_p,
     struct bunga_server_to_client_messages_oneof_t *self_p)
@@ -1348,6 +2101,22 @@ void bunga_server_to_client_messages_encode(
             (pbtools_message_encode_inner_t)bunga_put_file_rsp_encode_inner);
         break;
 
+    case bunga_server_to_client_messages_choice_find_blocks_rsp_e:
+        pbtools_encoder_sub_message_encode_always(
+            encoder_p,
+            6,
+            &self_p->value.find_blocks_rsp.base,
+            (pbtools_message_encode_inner_t)bunga_find_blocks_rsp_encode_inner);
+        break;
+
+    case bunga_server_to_client_messages_choice_list_files_rsp_e:
+        pbtools_encoder_sub_message_encode_always(
+            encoder_p,
+            7,
+            &self_p->value.list_files_rsp.base,
+            (pbtools_message_encode_inner_t)bunga_list_files_rsp_encode_inner);
+        break;
+
     default:
         break;
     }
@@ -1418,6 +2187,32 @@ static void bunga_server_to_client_messages_put_file_rsp_decode(
         (pbtools_message_decode_inner_t)bunga_put_file_rsp_decode_inner);
 }
 
+static void bunga_server_to_client_messages_find_blocks_rsp_decode(
+    struct pbtools_decoder_t *decoder_p,
+    int wire_type,
+    struct bunga_server_to_client_t *self_p)
+{
+    bunga_server_to_client_messages_find_blocks_rsp_init(self_p);
+    pbtools_decoder_sub_message_decode(
+        decoder_p,
+        wire_type,
+        &self_p->messages.value.find_blocks_rsp.base,
+        (pbtools_message_decode_inner_t)bunga_find_blocks_rsp_decode_inner);
+}
+
+static void bunga_server_to_client_messages_list_files_rsp_decode(
+    struct pbtools_decoder_t *decoder_p,
+    int wire_type,
+    struct bunga_server_to_client_t *self_p)
+{
+    bunga_server_to_client_messages_list_files_rsp_init(self_p);
+    pbtools_decoder_sub_message_decode(
+        decoder_p,
+        wire_type,
+        &self_p->messages.value.list_files_rsp.base,
+        (pbtools_message_decode_inner_t)bunga_list_files_rsp_decode_inner);
+}
+
 void bunga_server_to_client_init(
     struct bunga_server_to_client_t *self_p,
     struct pbtools_heap_t *heap_p)
@@ -1477,6 +2272,20 @@ void bunga_server_to_client_decode_inner(
                 self_p);
             break;
 
+        case 6:
+            bunga_server_to_client_messages_find_blocks_rsp_decode(
+                decoder_p,
+                wire_type,
+                self_p);
+            break;
+
+        case 7:
+            bunga_server_to_client_messages_list_files_rsp_decode(
+                decoder_p,
+                wire_type,
+                self_p);
+            break;
+
         default:
             pbtools_decoder_skip_field(decoder_p, wire_type);
             break;
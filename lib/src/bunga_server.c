@@ -412,6 +412,20 @@ static int handle_message_user(struct bunga_server_t *self_p,
             &message_p->messages.value.put_file_req);
         break;
 
+    case bunga_client_to_server_messages_choice_find_blocks_req_e:
+        self_p->on_find_blocks_req(
+            self_p,
+            client_p,
+            &message_p->messages.value.find_blocks_req);
+        break;
+
+    case bunga_client_to_server_messages_choice_list_files_req_e:
+        self_p->on_list_files_req(
+            self_p,
+            client_p,
+            &message_p->messages.value.list_files_req);
+        break;
+
     default:
         break;
     }
@@ -613,6 +627,26 @@ static void on_put_file_req_default(
     (void)message_p;
 }
 
+static void on_find_blocks_req_default(
+    struct bunga_server_t *self_p,
+    struct bunga_server_client_t *client_p,
+    struct bunga_find_blocks_req_t *message_p)
+{
+    (void)self_p;
+    (void)client_p;
+    (void)message_p;
+}
+
+static void on_list_files_req_default(
+    struct bunga_server_t *self_p,
+    struct bunga_server_client_t *client_p,
+    struct bunga_list_files_req_t *message_p)
+{
+    (void)self_p;
+    (void)client_p;
+    (void)message_p;
+}
+
 static int encode_user_message(struct bunga_server_t *self_p)
 {
     int payload_size;
@@ -674,6 +708,8 @@ int bunga_server_init(
     bunga_server_on_execute_command_req_t on_execute_command_req,
     bunga_server_on_get_file_req_t on_get_file_req,
     bunga_server_on_put_file_req_t on_put_file_req,
+    bunga_server_on_find_blocks_req_t on_find_blocks_req,
+    bunga_server_on_list_files_req_t on_list_files_req,
     int epoll_fd,
     messi_epoll_ctl_t epoll_ctl)
 {
@@ -696,6 +732,14 @@ int bunga_server_init(
         on_put_file_req = on_put_file_req_default;
     }
 
+    if (on_find_blocks_req == NULL) {
+        on_find_blocks_req = on_find_blocks_req_default;
+    }
+
+    if (on_list_files_req == NULL) {
+        on_list_files_req = on_list_files_req_default;
+    }
+
     if (on_client_connected == NULL) {
         on_client_connected = on_client_connected_default;
     }
@@ -721,6 +765,8 @@ int bunga_server_init(
     self_p->on_execute_command_req = on_execute_command_req;
     self_p->on_get_file_req = on_get_file_req;
     self_p->on_put_file_req = on_put_file_req;
+    self_p->on_find_blocks_req = on_find_blocks_req;
+    self_p->on_list_files_req = on_list_files_req;
     self_p->epoll_fd = epoll_fd;
     self_p->epoll_ctl = epoll_ctl;
 
@@ -975,3 +1021,21 @@ struct bunga_put_file_rsp_t *bunga_server_init_put_file_rsp(
 
     return (&self_p->output.message_p->messages.value.put_file_rsp);
 }
+
+struct bunga_find_blocks_rsp_t *bunga_server_init_find_blocks_rsp(
+    struct bunga_server_t *self_p)
+{
+    bunga_server_new_output_message(self_p);
+    bunga_server_to_client_messages_find_blocks_rsp_init(self_p->output.message_p);
+
+    return (&self_p->output.message_p->messages.value.find_blocks_rsp);
+}
+
+struct bunga_list_files_rsp_t *bunga_server_init_list_files_rsp(
+    struct bunga_server_t *self_p)
+{
+    bunga_server_new_output_message(self_p);
+    bunga_server_to_client_messages_list_files_rsp_init(self_p->output.message_p);
+
+    return (&self_p->output.message_p->messages.value.list_files_rsp);
+}
@@ -29,24 +29,74 @@
 #define _GNU_SOURCE
 
 #include <errno.h>
+#include <stdbool.h>
+#include <string.h>
 #include <stdio.h>
 #include <stdlib.h>
 #include <unistd.h>
 #include <fcntl.h>
+#include <dirent.h>
+#include <limits.h>
 #include <sys/eventfd.h>
 #include <pthread.h>
 #include <sys/epoll.h>
+#include <sys/mman.h>
 #include <sys/stat.h>
+#include <sys/timerfd.h>
+#include <zlib.h>
 #include "bunga_server.h"
 #include "ml/ml.h"
 
 /**
- * The maximum message size to receive.
+ * The default maximum message size to send and receive. Call
+ * bunga_server_linux_set_maximum_message_size() to change it at
+ * runtime.
  */
 #ifndef BUNGA_MESSAGE_SIZE_MAX
 #    define BUNGA_MESSAGE_SIZE_MAX                    512
 #endif
 
+/**
+ * Limits of the runtime configurable maximum message size.
+ */
+#define MESSAGE_SIZE_MIN                              128
+#define MESSAGE_SIZE_LIMIT                            65536
+
+/**
+ * Bytes of each message reserved for everything but file data or
+ * command output.
+ */
+#define MESSAGE_OVERHEAD                              64
+
+/**
+ * Keep alive timeout in seconds sent to clients not requesting one,
+ * and maximum requested timeout. Clients are disconnected after
+ * half a timeout more than the timeout without a ping, to allow for
+ * network delays.
+ */
+#define KEEP_ALIVE_TIMEOUT                            2
+#define KEEP_ALIVE_TIMEOUT_MAX                        600
+
+/**
+ * Seconds without a ping before the generated server disconnects a
+ * client. It rearms its one shot keep alive timer with this timeout
+ * when a client connects and on each ping. Longer negotiated timeouts
+ * are implemented by rearming the timer for the remaining time when
+ * it expires, see handle_keep_alive_timer().
+ */
+#define GENERATED_KEEP_ALIVE_TIMEOUT                  3
+
+/**
+ * Compression algorithms.
+ */
+#define COMPRESSION_NONE                              0
+#define COMPRESSION_ZLIB                              1
+
+/**
+ * Bytes read from file at a time when compressing file data.
+ */
+#define COMPRESSION_INPUT_SIZE                        4096
+
 /**
  * Put file window size.
  */
@@ -61,9 +111,55 @@
 #    define BUNGA_GET_FILE_WINDOW_SIZE                100
 #endif
 
+/**
+ * Maximum number of files transferred at the same time in each
+ * direction per client.
+ */
+#ifndef BUNGA_FILES_MAX
+#    define BUNGA_FILES_MAX                           4
+#endif
+
+/**
+ * Find blocks window size.
+ */
+#ifndef BUNGA_FIND_BLOCKS_WINDOW_SIZE
+#    define BUNGA_FIND_BLOCKS_WINDOW_SIZE             100
+#endif
+
+/**
+ * Maximum number of blocks to find in a file.
+ */
+#ifndef BUNGA_FIND_BLOCKS_MAX
+#    define BUNGA_FIND_BLOCKS_MAX                     1048576
+#endif
+
+/**
+ * Bytes of a list files response reserved for each file, on top of
+ * its path, for its size, modification time and encoding overhead.
+ */
+#define LIST_FILES_FILE_OVERHEAD                      32
+
+/**
+ * Suffix of the temporary file a delta put file is written to before
+ * it replaces the existing file.
+ */
+#define DELTA_SUFFIX                                  ".bunga-delta"
+
+/**
+ * Adler-32 modulus.
+ */
+#define ADLER_BASE                                    65521
+
+/**
+ * Offset of blocks that were not found.
+ */
+#define BLOCK_NOT_FOUND                               UINT64_MAX
+
 struct execute_command_t {
     char *command_p;
     int res;
+    uint32_t request_id;
+    bool compressed;
     struct {
         char *buf_p;
         size_t size;
@@ -75,25 +171,118 @@ struct execute_command_t {
     struct ml_queue_t *queue_p;
 };
 
-struct client_t {
-    struct bunga_server_client_t *client_p;
-    int log_fd;
-    FILE *fput_p;
+struct get_file_t {
+    uint32_t request_id;
     FILE *fget_p;
     uint32_t outstanding_responses;
     uint32_t window_size;
+    uint64_t remaining;
+    struct {
+        bool enabled;
+        uint32_t crc;
+    } checksum;
+    struct {
+        bool enabled;
+        bool eof;
+        uint8_t *input_p;
+        z_stream stream;
+    } compression;
+};
+
+struct put_file_t {
+    uint32_t request_id;
+    FILE *fput_p;
+    uint64_t mtime;
+    struct {
+        bool enabled;
+        uint32_t crc;
+    } checksum;
+    struct {
+        bool enabled;
+        z_stream stream;
+    } compression;
+    struct {
+        FILE *fbase_p;
+        char *path_p;
+        char *tmp_path_p;
+    } delta;
+};
+
+struct find_blocks_t {
+    char *path_p;
+    uint32_t block_size;
+    uint32_t request_id;
+    struct {
+        uint8_t *buf_p;
+        size_t size;
+    } checksums;
+    struct {
+        uint8_t *buf_p;
+        size_t size;
+    } offsets;
+    char *error_p;
+    struct {
+        struct bunga_server_t *server_p;
+        struct bunga_server_client_t *client_p;
+    } bunga;
+    struct ml_queue_t *queue_p;
+};
+
+struct file_info_t {
+    char *path_p;
+    uint64_t size;
+    uint64_t mtime;
+};
+
+struct list_files_t {
+    char *path_p;
+    uint32_t request_id;
+    struct {
+        struct file_info_t *items_p;
+        size_t length;
+        size_t capacity;
+    } files;
+    char *error_p;
+    struct {
+        struct bunga_server_t *server_p;
+        struct bunga_server_client_t *client_p;
+    } bunga;
+    struct ml_queue_t *queue_p;
+};
+
+/**
+ * A block checksum to find, sorted on the weak checksum.
+ */
+struct block_t {
+    uint32_t weak;
+    uint32_t index;
+};
+
+struct client_t {
+    struct bunga_server_client_t *client_p;
+    int log_fd;
+    int keep_alive_timeout;
+    uint32_t maximum_message_size;
+    uint32_t compression;
+    struct get_file_t get_files[BUNGA_FILES_MAX];
+    struct put_file_t put_files[BUNGA_FILES_MAX];
+    struct find_blocks_t *find_blocks_p;
 };
 
 static struct bunga_server_client_t bunga_clients[2];
 static struct client_t clients[2];
 static struct ml_queue_t queue;
 static int epoll_fd;
-static uint8_t clients_input_buffers[2][BUNGA_MESSAGE_SIZE_MAX];
-static uint8_t message[BUNGA_MESSAGE_SIZE_MAX];
-static uint8_t workspace_in[BUNGA_MESSAGE_SIZE_MAX + 64];
-static uint8_t workspace_out[BUNGA_MESSAGE_SIZE_MAX + 64];
+static size_t maximum_message_size = BUNGA_MESSAGE_SIZE_MAX;
+static uint8_t *clients_input_buffers_p;
+static uint8_t *message_buf_p;
+static uint8_t *workspace_in_p;
+static uint8_t *workspace_out_p;
+static uint8_t *data_buf_p;
 
 static ML_UID(uid_execute_command_complete);
+static ML_UID(uid_find_blocks_complete);
+static ML_UID(uid_list_files_complete);
 
 static struct client_t *client_from_bunga_client(
     struct bunga_server_client_t *client_p)
@@ -107,36 +296,216 @@ static struct bunga_server_client_t *client_to_bunga_client(
     return (&bunga_clients[client_p - &clients[0]]);
 }
 
-static void client_init(struct client_t *self_p)
+static void get_file_release(struct get_file_t *self_p)
 {
-    self_p->log_fd = -1;
+    fclose(self_p->fget_p);
     self_p->fget_p = NULL;
+
+    if (self_p->compression.enabled) {
+        deflateEnd(&self_p->compression.stream);
+        free(self_p->compression.input_p);
+        self_p->compression.enabled = false;
+    }
+}
+
+static void put_file_release(struct put_file_t *self_p)
+{
+    fclose(self_p->fput_p);
     self_p->fput_p = NULL;
+
+    if (self_p->compression.enabled) {
+        inflateEnd(&self_p->compression.stream);
+        self_p->compression.enabled = false;
+    }
+
+    if (self_p->delta.fbase_p != NULL) {
+        fclose(self_p->delta.fbase_p);
+        self_p->delta.fbase_p = NULL;
+    }
+
+    if (self_p->delta.tmp_path_p != NULL) {
+        unlink(self_p->delta.tmp_path_p);
+        free(self_p->delta.tmp_path_p);
+        self_p->delta.tmp_path_p = NULL;
+    }
+
+    free(self_p->delta.path_p);
+    self_p->delta.path_p = NULL;
+}
+
+static void find_blocks_free(struct find_blocks_t *self_p)
+{
+    free(self_p->path_p);
+    free(self_p->checksums.buf_p);
+    free(self_p->offsets.buf_p);
+    ml_message_free(self_p);
+}
+
+static void client_init(struct client_t *self_p)
+{
+    int i;
+
+    self_p->log_fd = -1;
+    self_p->keep_alive_timeout = 0;
+
+    for (i = 0; i < BUNGA_FILES_MAX; i++) {
+        self_p->get_files[i].fget_p = NULL;
+        self_p->get_files[i].compression.enabled = false;
+        self_p->put_files[i].fput_p = NULL;
+        self_p->put_files[i].compression.enabled = false;
+        self_p->put_files[i].delta.fbase_p = NULL;
+        self_p->put_files[i].delta.path_p = NULL;
+        self_p->put_files[i].delta.tmp_path_p = NULL;
+    }
+
+    self_p->find_blocks_p = NULL;
 }
 
 static void client_destroy(struct client_t *self_p)
 {
+    int i;
+
     if (self_p->log_fd != -1) {
         epoll_ctl(epoll_fd, EPOLL_CTL_DEL, self_p->log_fd, NULL);
         close(self_p->log_fd);
         self_p->log_fd = -1;
     }
 
-    if (self_p->fget_p != NULL) {
-        fclose(self_p->fget_p);
-        self_p->fget_p = NULL;
+    self_p->keep_alive_timeout = 0;
+
+    for (i = 0; i < BUNGA_FILES_MAX; i++) {
+        if (self_p->get_files[i].fget_p != NULL) {
+            get_file_release(&self_p->get_files[i]);
+        }
+
+        if (self_p->put_files[i].fput_p != NULL) {
+            put_file_release(&self_p->put_files[i]);
+        }
+    }
+
+    if (self_p->find_blocks_p != NULL) {
+        find_blocks_free(self_p->find_blocks_p);
+        self_p->find_blocks_p = NULL;
+    }
+}
+
+static struct get_file_t *client_find_get_file(struct client_t *self_p,
+                                               uint32_t request_id)
+{
+    int i;
+
+    for (i = 0; i < BUNGA_FILES_MAX; i++) {
+        if ((self_p->get_files[i].fget_p != NULL)
+            && (self_p->get_files[i].request_id == request_id)) {
+            return (&self_p->get_files[i]);
+        }
+    }
+
+    return (NULL);
+}
+
+/**
+ * Returns the transfer with given request id, or a free transfer if
+ * not found. Returns NULL if all transfers are in use.
+ */
+static struct get_file_t *client_alloc_get_file(struct client_t *self_p,
+                                                uint32_t request_id)
+{
+    struct get_file_t *get_file_p;
+    int i;
+
+    get_file_p = client_find_get_file(self_p, request_id);
+
+    if (get_file_p != NULL) {
+        get_file_release(get_file_p);
+
+        return (get_file_p);
+    }
+
+    for (i = 0; i < BUNGA_FILES_MAX; i++) {
+        if (self_p->get_files[i].fget_p == NULL) {
+            self_p->get_files[i].request_id = request_id;
+
+            return (&self_p->get_files[i]);
+        }
+    }
+
+    return (NULL);
+}
+
+static struct put_file_t *client_find_put_file(struct client_t *self_p,
+                                               uint32_t request_id)
+{
+    int i;
+
+    for (i = 0; i < BUNGA_FILES_MAX; i++) {
+        if ((self_p->put_files[i].fput_p != NULL)
+            && (self_p->put_files[i].request_id == request_id)) {
+            return (&self_p->put_files[i]);
+        }
+    }
+
+    return (NULL);
+}
+
+/**
+ * Returns the transfer with given request id, or a free transfer if
+ * not found. Returns NULL if all transfers are in use.
+ */
+static struct put_file_t *client_alloc_put_file(struct client_t *self_p,
+                                                uint32_t request_id)
+{
+    struct put_file_t *put_file_p;
+    int i;
+
+    put_file_p = client_find_put_file(self_p, request_id);
+
+    if (put_file_p != NULL) {
+        put_file_release(put_file_p);
+
+        return (put_file_p);
+    }
+
+    for (i = 0; i < BUNGA_FILES_MAX; i++) {
+        if (self_p->put_files[i].fput_p == NULL) {
+            self_p->put_files[i].request_id = request_id;
+
+            return (&self_p->put_files[i]);
+        }
     }
 
-    if (self_p->fput_p != NULL) {
-        fclose(self_p->fput_p);
-        self_p->fput_p = NULL;
+    return (NULL);
+}
+
+/**
+ * Returns the maximum number of file data or command output bytes in
+ * a message sent to given client.
+ */
+static size_t client_data_size_max(struct client_t *self_p)
+{
+    size_t size;
+
+    size = maximum_message_size;
+
+    if ((self_p->maximum_message_size != 0)
+        && (self_p->maximum_message_size < size)) {
+        size = self_p->maximum_message_size;
+
+        if (size < MESSAGE_SIZE_MIN) {
+            size = MESSAGE_SIZE_MIN;
+        }
     }
+
+    return (size - MESSAGE_OVERHEAD);
 }
 
 static void client_on_connected(struct client_t *self_p)
 {
     struct epoll_event event;
 
+    self_p->maximum_message_size = 0;
+    self_p->compression = COMPRESSION_NONE;
+    self_p->keep_alive_timeout = GENERATED_KEEP_ALIVE_TIMEOUT;
     self_p->log_fd = open("/dev/kmsg", O_RDONLY | O_NONBLOCK);
 
     if (self_p->log_fd != -1) {
@@ -162,6 +531,39 @@ static void on_client_disconnected(struct bunga_server_t *self_p,
     client_destroy(client_from_bunga_client(client_p));
 }
 
+/**
+ * Replace given command's output with its compressed output. The
+ * output is left as is on failure.
+ */
+static int execute_command_compress(struct execute_command_t *command_p)
+{
+    uLongf size;
+    uint8_t *buf_p;
+
+    size = compressBound(command_p->output.size);
+    buf_p = malloc(size);
+
+    if (buf_p == NULL) {
+        return (-ENOMEM);
+    }
+
+    if (compress2(buf_p,
+                  &size,
+                  (uint8_t *)command_p->output.buf_p,
+                  command_p->output.size,
+                  Z_DEFAULT_COMPRESSION) != Z_OK) {
+        free(buf_p);
+
+        return (-ENOMEM);
+    }
+
+    free(command_p->output.buf_p);
+    command_p->output.buf_p = (char *)buf_p;
+    command_p->output.size = size;
+
+    return (0);
+}
+
 static void execute_command_job(struct execute_command_t *command_p)
 {
     FILE *fout_p;
@@ -171,6 +573,13 @@ static void execute_command_job(struct execute_command_t *command_p)
     if (fout_p != NULL) {
         command_p->res = ml_shell_execute_command(command_p->command_p, fout_p);
         fclose(fout_p);
+
+        if (command_p->compressed && (command_p->output.size > 0)) {
+            if (execute_command_compress(command_p) != 0) {
+                command_p->output.size = 0;
+                command_p->res = -ENOMEM;
+            }
+        }
     } else {
         command_p->output.buf_p = NULL;
         command_p->output.size = 0;
@@ -181,17 +590,35 @@ static void execute_command_job(struct execute_command_t *command_p)
 }
 
 static void on_connect_req(struct bunga_server_t *self_p,
-                           struct bunga_server_client_t *client_p,
+                           struct bunga_server_client_t *bunga_client_p,
                            struct bunga_connect_req_t *request_p)
 {
-    (void)client_p;
-    (void)request_p;
-
     struct bunga_connect_rsp_t *response_p;
+    struct client_t *client_p;
+    int keep_alive_timeout;
+
+    client_p = client_from_bunga_client(bunga_client_p);
+    client_p->maximum_message_size = request_p->maximum_message_size;
+
+    if (request_p->keep_alive_timeout == 0) {
+        keep_alive_timeout = KEEP_ALIVE_TIMEOUT;
+    } else if (request_p->keep_alive_timeout > KEEP_ALIVE_TIMEOUT_MAX) {
+        keep_alive_timeout = KEEP_ALIVE_TIMEOUT_MAX;
+    } else {
+        keep_alive_timeout = (int)request_p->keep_alive_timeout;
+    }
+
+    client_p->keep_alive_timeout = (keep_alive_timeout
+                                    + (keep_alive_timeout + 1) / 2);
+
+    if ((request_p->compressions & (1 << (COMPRESSION_ZLIB - 1))) != 0) {
+        client_p->compression = COMPRESSION_ZLIB;
+    }
 
     response_p = bunga_server_init_connect_rsp(self_p);
-    response_p->keep_alive_timeout = 2;
-    response_p->maximum_message_size = BUNGA_MESSAGE_SIZE_MAX;
+    response_p->keep_alive_timeout = (uint32_t)keep_alive_timeout;
+    response_p->maximum_message_size = maximum_message_size;
+    response_p->compression = client_p->compression;
     bunga_server_reply(self_p);
 }
 
@@ -203,192 +630,1176 @@ static void on_execute_command_req(struct bunga_server_t *self_p,
 
     command_p = ml_message_alloc(&uid_execute_command_complete, sizeof(*command_p));
     command_p->command_p = strdup(request_p->command_p);
+    command_p->request_id = request_p->request_id;
+    command_p->compressed = (request_p->compressed
+                             && (client_from_bunga_client(client_p)->compression
+                                 == COMPRESSION_ZLIB));
     command_p->bunga.server_p = self_p;
     command_p->bunga.client_p = client_p;
     command_p->queue_p = &queue;
     ml_spawn((ml_worker_pool_job_entry_t)execute_command_job, command_p);
 }
 
-static void get_file_add_data(struct client_t *client_p,
+static size_t get_file_read(struct get_file_t *get_file_p,
+                            uint8_t *buf_p,
+                            size_t size)
+{
+    if (size > get_file_p->remaining) {
+        size = get_file_p->remaining;
+    }
+
+    size = fread(buf_p, 1, size, get_file_p->fget_p);
+    get_file_p->remaining -= size;
+
+    if (get_file_p->checksum.enabled) {
+        get_file_p->checksum.crc = crc32(get_file_p->checksum.crc, buf_p, size);
+    }
+
+    return (size);
+}
+
+/**
+ * Fill given buffer with compressed file data, except at the end of
+ * the file.
+ */
+static size_t get_file_read_compressed(struct get_file_t *get_file_p,
+                                       uint8_t *buf_p,
+                                       size_t size)
+{
+    z_stream *stream_p;
+    int flush;
+
+    stream_p = &get_file_p->compression.stream;
+    stream_p->next_out = buf_p;
+    stream_p->avail_out = size;
+
+    while (stream_p->avail_out > 0) {
+        if ((stream_p->avail_in == 0) && !get_file_p->compression.eof) {
+            stream_p->next_in = get_file_p->compression.input_p;
+            stream_p->avail_in = get_file_read(get_file_p,
+                                               get_file_p->compression.input_p,
+                                               COMPRESSION_INPUT_SIZE);
+            get_file_p->compression.eof = (stream_p->avail_in == 0);
+        }
+
+        if (get_file_p->compression.eof) {
+            flush = Z_FINISH;
+        } else {
+            flush = Z_NO_FLUSH;
+        }
+
+        if (deflate(stream_p, flush) != Z_OK) {
+            break;
+        }
+    }
+
+    return (size - stream_p->avail_out);
+}
+
+static void get_file_add_data(struct get_file_t *get_file_p,
                               struct bunga_get_file_rsp_t *response_p,
                               uint8_t *buf_p,
                               size_t size)
 {
+    response_p->request_id = get_file_p->request_id;
     response_p->data.buf_p = buf_p;
-    response_p->data.size = fread(buf_p, 1, size, client_p->fget_p);
+
+    if (get_file_p->compression.enabled) {
+        response_p->data.size = get_file_read_compressed(get_file_p,
+                                                         buf_p,
+                                                         size);
+    } else {
+        response_p->data.size = get_file_read(get_file_p, buf_p, size);
+    }
 
     if (response_p->data.size == 0) {
-        if (ferror(client_p->fget_p) != 0) {
+        if (ferror(get_file_p->fget_p) != 0) {
             response_p->error_p = "Read error.";
         }
 
-        fclose(client_p->fget_p);
-        client_p->fget_p = NULL;
+        response_p->crc32 = get_file_p->checksum.crc;
+
+        get_file_release(get_file_p);
+    }
+}
+
+static int get_file_start_compression(struct client_t *client_p,
+                                      struct get_file_t *get_file_p)
+{
+    if (client_p->compression != COMPRESSION_ZLIB) {
+        return (-EINVAL);
+    }
+
+    get_file_p->compression.input_p = malloc(COMPRESSION_INPUT_SIZE);
+
+    if (get_file_p->compression.input_p == NULL) {
+        return (-ENOMEM);
+    }
+
+    memset(&get_file_p->compression.stream,
+           0,
+           sizeof(get_file_p->compression.stream));
+
+    if (deflateInit(&get_file_p->compression.stream,
+                    Z_DEFAULT_COMPRESSION) != Z_OK) {
+        free(get_file_p->compression.input_p);
+
+        return (-ENOMEM);
+    }
+
+    get_file_p->compression.enabled = true;
+    get_file_p->compression.eof = false;
+
+    return (0);
+}
+
+static void get_file_fill_window(struct bunga_server_t *self_p,
+                                 struct client_t *client_p,
+                                 struct get_file_t *get_file_p)
+{
+    struct bunga_get_file_rsp_t *response_p;
+
+    while (get_file_p->outstanding_responses < get_file_p->window_size) {
+        response_p = bunga_server_init_get_file_rsp(self_p);
+        get_file_add_data(get_file_p,
+                          response_p,
+                          data_buf_p,
+                          client_data_size_max(client_p));
+        bunga_server_reply(self_p);
+
+        if (response_p->data.size == 0) {
+            break;
+        }
+
+        get_file_p->outstanding_responses++;
+    }
+}
+
+static void get_file_open(struct bunga_server_t *self_p,
+                          struct client_t *client_p,
+                          struct bunga_get_file_req_t *request_p)
+{
+    struct bunga_get_file_rsp_t *response_p;
+    struct get_file_t *get_file_p;
+    struct stat statbuf;
+
+    response_p = bunga_server_init_get_file_rsp(self_p);
+    response_p->request_id = request_p->request_id;
+    get_file_p = client_alloc_get_file(client_p, request_p->request_id);
+
+    if (get_file_p == NULL) {
+        response_p->error_p = "Too many open files.";
+        bunga_server_reply(self_p);
+
+        return;
+    }
+
+    get_file_p->outstanding_responses = 0;
+    get_file_p->fget_p = fopen(request_p->path_p, "rb");
+
+    if (get_file_p->fget_p != NULL) {
+        if ((stat(request_p->path_p, &statbuf) == 0)
+            && (fseeko(get_file_p->fget_p,
+                       (off_t)request_p->offset,
+                       SEEK_SET) == 0)) {
+            get_file_p->window_size = request_p->window_size;
+
+            if (get_file_p->window_size == 0) {
+                get_file_p->window_size = BUNGA_GET_FILE_WINDOW_SIZE;
+            }
+
+            get_file_p->remaining = request_p->length;
+
+            if (get_file_p->remaining == 0) {
+                get_file_p->remaining = UINT64_MAX;
+            }
+
+            response_p->size = statbuf.st_size;
+            get_file_p->checksum.enabled = request_p->checksum;
+            get_file_p->checksum.crc = crc32(0, NULL, 0);
+
+            if (request_p->compressed
+                && (get_file_start_compression(client_p, get_file_p) != 0)) {
+                get_file_release(get_file_p);
+                response_p->error_p = "Compression failed.";
+            } else {
+                get_file_add_data(get_file_p,
+                                  response_p,
+                                  data_buf_p,
+                                  client_data_size_max(client_p));
+            }
+        } else {
+            get_file_release(get_file_p);
+            response_p->error_p = strerror(errno);
+        }
+    } else {
+        response_p->error_p = strerror(errno);
+    }
+
+    bunga_server_reply(self_p);
+
+    if (response_p->data.size > 0) {
+        get_file_p->outstanding_responses++;
+        get_file_fill_window(self_p, client_p, get_file_p);
+    }
+}
+
+static void get_file_data(struct bunga_server_t *self_p,
+                          struct client_t *client_p,
+                          struct get_file_t *get_file_p,
+                          struct bunga_get_file_req_t *request_p)
+{
+    if (request_p->acknowledge_count > get_file_p->outstanding_responses) {
+        get_file_release(get_file_p);
+
+        return;
+    }
+
+    get_file_p->outstanding_responses -= request_p->acknowledge_count;
+
+    get_file_fill_window(self_p, client_p, get_file_p);
+}
+
+static void on_get_file_req(struct bunga_server_t *self_p,
+                            struct bunga_server_client_t *bunga_client_p,
+                            struct bunga_get_file_req_t *request_p)
+{
+    struct client_t *client_p;
+    struct get_file_t *get_file_p;
+
+    client_p = client_from_bunga_client(bunga_client_p);
+
+    if (strlen(request_p->path_p) > 0) {
+        get_file_open(self_p, client_p, request_p);
+    } else {
+        get_file_p = client_find_get_file(client_p, request_p->request_id);
+
+        if (get_file_p != NULL) {
+            get_file_data(self_p, client_p, get_file_p, request_p);
+        }
+    }
+}
+
+/**
+ * Create all missing parent directories of given file path. Failures
+ * are detected when the file is opened.
+ */
+static void create_parent_directories(const char *path_p)
+{
+    char *directory_p;
+    char *slash_p;
+
+    directory_p = strdup(path_p);
+
+    if (directory_p == NULL) {
+        return;
+    }
+
+    slash_p = strchr(&directory_p[1], '/');
+
+    while (slash_p != NULL) {
+        *slash_p = '\0';
+        mkdir(directory_p, 0755);
+        *slash_p = '/';
+        slash_p = strchr(&slash_p[1], '/');
+    }
+
+    free(directory_p);
+}
+
+/**
+ * Open the existing file as base and a temporary file to write the
+ * new file to.
+ */
+static FILE *put_file_open_delta(struct put_file_t *put_file_p,
+                                 const char *path_p)
+{
+    FILE *fput_p;
+    struct stat statbuf;
+
+    put_file_p->delta.fbase_p = fopen(path_p, "rb");
+
+    if (put_file_p->delta.fbase_p == NULL) {
+        return (NULL);
+    }
+
+    put_file_p->delta.path_p = strdup(path_p);
+    put_file_p->delta.tmp_path_p = malloc(strlen(path_p) + sizeof(DELTA_SUFFIX));
+    fput_p = NULL;
+
+    if ((put_file_p->delta.path_p != NULL)
+        && (put_file_p->delta.tmp_path_p != NULL)) {
+        strcpy(put_file_p->delta.tmp_path_p, path_p);
+        strcat(put_file_p->delta.tmp_path_p, DELTA_SUFFIX);
+        fput_p = fopen(put_file_p->delta.tmp_path_p, "wb");
+    }
+
+    if (fput_p == NULL) {
+        fclose(put_file_p->delta.fbase_p);
+        put_file_p->delta.fbase_p = NULL;
+        free(put_file_p->delta.path_p);
+        put_file_p->delta.path_p = NULL;
+        free(put_file_p->delta.tmp_path_p);
+        put_file_p->delta.tmp_path_p = NULL;
+
+        return (NULL);
+    }
+
+    /* Keep the permissions of the existing file. */
+    if (fstat(fileno(put_file_p->delta.fbase_p), &statbuf) == 0) {
+        fchmod(fileno(fput_p), statbuf.st_mode & 07777);
+    }
+
+    return (fput_p);
+}
+
+static void put_file_open(struct client_t *client_p,
+                          struct bunga_put_file_req_t *request_p,
+                          struct bunga_put_file_rsp_t *response_p)
+{
+    struct put_file_t *put_file_p;
+
+    response_p->window_size = BUNGA_PUT_FILE_WINDOW_SIZE;
+    put_file_p = client_alloc_put_file(client_p, request_p->request_id);
+
+    if (put_file_p == NULL) {
+        response_p->error_p = "Too many open files.";
+
+        return;
+    }
+
+    put_file_p->mtime = request_p->mtime;
+    put_file_p->checksum.enabled = request_p->checksum;
+    put_file_p->checksum.crc = crc32(0, NULL, 0);
+
+    if (request_p->create_directories) {
+        create_parent_directories(request_p->path_p);
+    }
+
+    if (request_p->delta) {
+        put_file_p->fput_p = put_file_open_delta(put_file_p, request_p->path_p);
+    } else if (request_p->offset == 0) {
+        put_file_p->fput_p = fopen(request_p->path_p, "wb");
+    } else {
+        put_file_p->fput_p = fopen(request_p->path_p, "r+b");
+    }
+
+    if (put_file_p->fput_p == NULL) {
+        response_p->error_p = "Open failed.";
+
+        return;
+    }
+
+    if (fseeko(put_file_p->fput_p, (off_t)request_p->offset, SEEK_SET) != 0) {
+        response_p->error_p = "Seek failed.";
+        put_file_release(put_file_p);
+
+        return;
+    }
+
+    if (request_p->compressed) {
+        if (client_p->compression != COMPRESSION_ZLIB) {
+            response_p->error_p = "Compression failed.";
+            put_file_release(put_file_p);
+
+            return;
+        }
+
+        memset(&put_file_p->compression.stream,
+               0,
+               sizeof(put_file_p->compression.stream));
+
+        if (inflateInit(&put_file_p->compression.stream) != Z_OK) {
+            response_p->error_p = "Compression failed.";
+            put_file_release(put_file_p);
+
+            return;
+        }
+
+        put_file_p->compression.enabled = true;
+    }
+}
+
+/**
+ * Write given data to the file, and add it to the checksum.
+ */
+static int put_file_write(struct put_file_t *put_file_p,
+                          const uint8_t *buf_p,
+                          size_t size)
+{
+    if (fwrite(buf_p, size, 1, put_file_p->fput_p) != 1) {
+        return (-EIO);
+    }
+
+    if (put_file_p->checksum.enabled) {
+        put_file_p->checksum.crc = crc32(put_file_p->checksum.crc, buf_p, size);
+    }
+
+    return (0);
+}
+
+/**
+ * Decompress given data and write it to the file.
+ */
+static int put_file_write_compressed(struct put_file_t *put_file_p,
+                                     uint8_t *buf_p,
+                                     size_t size)
+{
+    z_stream *stream_p;
+    int res;
+    size_t written_size;
+
+    stream_p = &put_file_p->compression.stream;
+    stream_p->next_in = buf_p;
+    stream_p->avail_in = size;
+
+    do {
+        stream_p->next_out = data_buf_p;
+        stream_p->avail_out = maximum_message_size;
+        res = inflate(stream_p, Z_SYNC_FLUSH);
+
+        if ((res != Z_OK) && (res != Z_STREAM_END) && (res != Z_BUF_ERROR)) {
+            return (-EINVAL);
+        }
+
+        written_size = (maximum_message_size - stream_p->avail_out);
+
+        if (written_size > 0) {
+            if (put_file_write(put_file_p, data_buf_p, written_size) != 0) {
+                return (-EIO);
+            }
+        }
+    } while (stream_p->avail_out == 0);
+
+    return (0);
+}
+
+/**
+ * Copy given part of the existing file to the new file.
+ */
+static int put_file_copy(struct put_file_t *put_file_p,
+                         uint64_t offset,
+                         uint64_t size)
+{
+    size_t chunk_size;
+
+    if (put_file_p->delta.fbase_p == NULL) {
+        return (-EINVAL);
+    }
+
+    if (fseeko(put_file_p->delta.fbase_p, (off_t)offset, SEEK_SET) != 0) {
+        return (-EIO);
+    }
+
+    while (size > 0) {
+        chunk_size = maximum_message_size;
+
+        if (size < chunk_size) {
+            chunk_size = size;
+        }
+
+        if (fread(data_buf_p, chunk_size, 1, put_file_p->delta.fbase_p) != 1) {
+            return (-EIO);
+        }
+
+        if (put_file_write(put_file_p, data_buf_p, chunk_size) != 0) {
+            return (-EIO);
+        }
+
+        size -= chunk_size;
+    }
+
+    return (0);
+}
+
+static void put_file_data(struct put_file_t *put_file_p,
+                          struct bunga_put_file_req_t *request_p,
+                          struct bunga_put_file_rsp_t *response_p)
+{
+    int res;
+
+    if (put_file_p != NULL) {
+        if (request_p->copy_size > 0) {
+            res = put_file_copy(put_file_p,
+                                request_p->copy_offset,
+                                request_p->copy_size);
+        } else if (put_file_p->compression.enabled) {
+            res = put_file_write_compressed(put_file_p,
+                                            request_p->data.buf_p,
+                                            request_p->data.size);
+        } else {
+            res = put_file_write(put_file_p,
+                                 request_p->data.buf_p,
+                                 request_p->data.size);
+        }
+
+        if (res != 0) {
+            response_p->error_p = "Write failed.";
+            put_file_release(put_file_p);
+        }
+    } else {
+        response_p->error_p = "No file open.";
+    }
+}
+
+static int put_file_set_mtime(struct put_file_t *put_file_p)
+{
+    struct timespec times[2];
+
+    times[0].tv_sec = 0;
+    times[0].tv_nsec = UTIME_OMIT;
+    times[1].tv_sec = (time_t)put_file_p->mtime;
+    times[1].tv_nsec = 0;
+
+    return (futimens(fileno(put_file_p->fput_p), &times[0]));
+}
+
+static void put_file_close(struct put_file_t *put_file_p,
+                           struct bunga_put_file_req_t *request_p,
+                           struct bunga_put_file_rsp_t *response_p)
+{
+    /* Remove any old data after the written data of a resumed
+       transfer. */
+    if ((fflush(put_file_p->fput_p) != 0)
+        || (ftruncate(fileno(put_file_p->fput_p),
+                      ftello(put_file_p->fput_p)) != 0)) {
+        response_p->error_p = "Write failed.";
+    } else if (put_file_p->checksum.enabled
+               && (put_file_p->checksum.crc != request_p->crc32)) {
+        response_p->error_p = "Checksum mismatch.";
+    } else if ((put_file_p->mtime != 0) && (put_file_set_mtime(put_file_p) != 0)) {
+        response_p->error_p = "Set time failed.";
+    } else if (put_file_p->delta.tmp_path_p != NULL) {
+        if (rename(put_file_p->delta.tmp_path_p, put_file_p->delta.path_p) == 0) {
+            free(put_file_p->delta.tmp_path_p);
+            put_file_p->delta.tmp_path_p = NULL;
+        } else {
+            response_p->error_p = "Rename failed.";
+        }
+    }
+
+    put_file_release(put_file_p);
+}
+
+static void on_put_file_req(struct bunga_server_t *self_p,
+                            struct bunga_server_client_t *bunga_client_p,
+                            struct bunga_put_file_req_t *request_p)
+{
+    struct client_t *client_p;
+    struct put_file_t *put_file_p;
+    struct bunga_put_file_rsp_t *response_p;
+
+    client_p = client_from_bunga_client(bunga_client_p);
+    response_p = bunga_server_init_put_file_rsp(self_p);
+    response_p->acknowledge_count = 1;
+    response_p->request_id = request_p->request_id;
+
+    if (strlen(request_p->path_p) > 0) {
+        put_file_open(client_p, request_p, response_p);
+    } else {
+        put_file_p = client_find_put_file(client_p, request_p->request_id);
+
+        if ((request_p->data.size > 0) || (request_p->copy_size > 0)) {
+            put_file_data(put_file_p, request_p, response_p);
+        } else if (put_file_p != NULL) {
+            put_file_close(put_file_p, request_p, response_p);
+        }
+    }
+
+    bunga_server_reply(self_p);
+}
+
+static uint32_t load_u32_be(const uint8_t *buf_p)
+{
+    return (((uint32_t)buf_p[0] << 24)
+            | ((uint32_t)buf_p[1] << 16)
+            | ((uint32_t)buf_p[2] << 8)
+            | (uint32_t)buf_p[3]);
+}
+
+static bool is_block_found(const uint8_t *buf_p)
+{
+    return (load_u32_be(&buf_p[0]) != UINT32_MAX
+            || load_u32_be(&buf_p[4]) != UINT32_MAX);
+}
+
+static void store_u64_be(uint8_t *buf_p, uint64_t value)
+{
+    int i;
+
+    for (i = 7; i >= 0; i--) {
+        buf_p[i] = (uint8_t)value;
+        value >>= 8;
+    }
+}
+
+/**
+ * A 16 bits tag of given weak checksum, used to quickly rule out most
+ * offsets without searching the sorted blocks.
+ */
+static uint32_t weak_tag(uint32_t weak)
+{
+    return ((weak ^ (weak >> 16)) & 0xffff);
+}
+
+static int compare_blocks(const void *left_p, const void *right_p)
+{
+    const struct block_t *left_block_p;
+    const struct block_t *right_block_p;
+
+    left_block_p = left_p;
+    right_block_p = right_p;
+
+    if (left_block_p->weak != right_block_p->weak) {
+        return (left_block_p->weak < right_block_p->weak ? -1 : 1);
+    }
+
+    return (left_block_p->index < right_block_p->index ? -1 : 1);
+}
+
+/**
+ * Returns the index of the first block with given weak checksum, or
+ * the number of blocks if not found.
+ */
+static size_t find_first_block(struct block_t *blocks_p,
+                               size_t number_of_blocks,
+                               uint32_t weak)
+{
+    size_t first;
+    size_t last;
+    size_t middle;
+
+    first = 0;
+    last = number_of_blocks;
+
+    while (first < last) {
+        middle = first + (last - first) / 2;
+
+        if (blocks_p[middle].weak < weak) {
+            first = middle + 1;
+        } else {
+            last = middle;
+        }
+    }
+
+    return (first);
+}
+
+/**
+ * Match blocks with given weak checksum against the data at given
+ * offset. Returns true if at least one block was found.
+ */
+static bool find_blocks_match(struct find_blocks_t *self_p,
+                              struct block_t *blocks_p,
+                              size_t number_of_blocks,
+                              uint32_t weak,
+                              const uint8_t *data_p,
+                              uint64_t offset,
+                              size_t *found_p)
+{
+    size_t i;
+    uint32_t index;
+    uint32_t strong;
+    bool strong_valid;
+    bool found;
+
+    strong = 0;
+    strong_valid = false;
+    found = false;
+
+    for (i = find_first_block(blocks_p, number_of_blocks, weak);
+         (i < number_of_blocks) && (blocks_p[i].weak == weak);
+         i++) {
+        index = blocks_p[i].index;
+
+        if (is_block_found(&self_p->offsets.buf_p[8 * index])) {
+            continue;
+        }
+
+        if (!strong_valid) {
+            strong = crc32(0, &data_p[offset], self_p->block_size);
+            strong_valid = true;
+        }
+
+        if (strong == load_u32_be(&self_p->checksums.buf_p[8 * index + 4])) {
+            store_u64_be(&self_p->offsets.buf_p[8 * index], offset);
+            (*found_p)++;
+            found = true;
+        }
+    }
+
+    return (found);
+}
+
+/**
+ * Find blocks in given data by rolling an Adler-32 checksum over it
+ * one byte at a time. Blocks with matching Adler-32 checksums are
+ * confirmed with their CRC-32 checksums.
+ */
+static int find_blocks_search(struct find_blocks_t *self_p,
+                              const uint8_t *data_p,
+                              uint64_t size)
+{
+    struct block_t *blocks_p;
+    uint8_t *tags_p;
+    size_t number_of_blocks;
+    size_t found;
+    size_t i;
+    uint64_t offset;
+    uint32_t block_size;
+    uint32_t weak;
+    uint32_t tag;
+    uint32_t a;
+    uint32_t b;
+    uint32_t out;
+
+    number_of_blocks = (self_p->checksums.size / 8);
+    block_size = self_p->block_size;
+    blocks_p = malloc(number_of_blocks * sizeof(*blocks_p));
+    tags_p = calloc(65536 / 8, 1);
+
+    if ((blocks_p == NULL) || (tags_p == NULL)) {
+        free(blocks_p);
+        free(tags_p);
+
+        return (-ENOMEM);
+    }
+
+    for (i = 0; i < number_of_blocks; i++) {
+        blocks_p[i].weak = load_u32_be(&self_p->checksums.buf_p[8 * i]);
+        blocks_p[i].index = i;
+        tag = weak_tag(blocks_p[i].weak);
+        tags_p[tag / 8] |= (1 << (tag % 8));
+    }
+
+    qsort(blocks_p, number_of_blocks, sizeof(*blocks_p), compare_blocks);
+
+    offset = 0;
+    found = 0;
+    weak = adler32(1, &data_p[offset], block_size);
+
+    while (found < number_of_blocks) {
+        tag = weak_tag(weak);
+
+        if (((tags_p[tag / 8] & (1 << (tag % 8))) != 0)
+            && find_blocks_match(self_p,
+                                 blocks_p,
+                                 number_of_blocks,
+                                 weak,
+                                 data_p,
+                                 offset,
+                                 &found)) {
+            /* Continue after the found block. */
+            offset += block_size;
+
+            if ((offset + block_size) > size) {
+                break;
+            }
+
+            weak = adler32(1, &data_p[offset], block_size);
+        } else {
+            if ((offset + block_size) >= size) {
+                break;
+            }
+
+            /* Roll one byte forward. */
+            out = data_p[offset];
+            a = (weak & 0xffff);
+            b = (weak >> 16);
+            a = ((a + ADLER_BASE - out + data_p[offset + block_size])
+                 % ADLER_BASE);
+            b = ((b
+                  + 2 * ADLER_BASE
+                  - (uint32_t)(((uint64_t)(block_size % ADLER_BASE) * out)
+                               % ADLER_BASE)
+                  + a
+                  - 1) % ADLER_BASE);
+            weak = ((b << 16) | a);
+            offset++;
+        }
+    }
+
+    free(blocks_p);
+    free(tags_p);
+
+    return (0);
+}
+
+/**
+ * Find all blocks in the file. Returns an error string, or NULL on
+ * success.
+ */
+static char *find_blocks_find(struct find_blocks_t *self_p)
+{
+    int fd;
+    struct stat statbuf;
+    uint8_t *data_p;
+    char *error_p;
+
+    self_p->offsets.size = self_p->checksums.size;
+    self_p->offsets.buf_p = malloc(self_p->offsets.size + 1);
+
+    if (self_p->offsets.buf_p == NULL) {
+        return ("Out of memory.");
+    }
+
+    memset(self_p->offsets.buf_p, 0xff, self_p->offsets.size);
+    fd = open(self_p->path_p, O_RDONLY);
+
+    if (fd == -1) {
+        return ("Open failed.");
+    }
+
+    error_p = NULL;
+
+    if (fstat(fd, &statbuf) != 0) {
+        error_p = "Read error.";
+    } else if ((self_p->offsets.size > 0)
+               && ((uint64_t)statbuf.st_size >= self_p->block_size)) {
+        data_p = mmap(NULL, statbuf.st_size, PROT_READ, MAP_PRIVATE, fd, 0);
+
+        if (data_p != MAP_FAILED) {
+            if (find_blocks_search(self_p, data_p, statbuf.st_size) != 0) {
+                error_p = "Out of memory.";
+            }
+
+            munmap(data_p, statbuf.st_size);
+        } else {
+            error_p = "Read error.";
+        }
+    }
+
+    close(fd);
+
+    return (error_p);
+}
+
+static void find_blocks_job(struct find_blocks_t *find_blocks_p)
+{
+    find_blocks_p->error_p = find_blocks_find(find_blocks_p);
+
+    if (find_blocks_p->error_p != NULL) {
+        find_blocks_p->offsets.size = 0;
+    }
+
+    ml_queue_put(find_blocks_p->queue_p, find_blocks_p);
+}
+
+static void find_blocks_open(struct client_t *client_p,
+                             struct bunga_find_blocks_req_t *request_p,
+                             struct bunga_find_blocks_rsp_t *response_p)
+{
+    struct find_blocks_t *find_blocks_p;
+
+    response_p->window_size = BUNGA_FIND_BLOCKS_WINDOW_SIZE;
+
+    if (client_p->find_blocks_p != NULL) {
+        find_blocks_free(client_p->find_blocks_p);
+        client_p->find_blocks_p = NULL;
+    }
+
+    if (request_p->block_size == 0) {
+        response_p->error_p = "Invalid block size.";
+
+        return;
+    }
+
+    find_blocks_p = ml_message_alloc(&uid_find_blocks_complete,
+                                     sizeof(*find_blocks_p));
+    find_blocks_p->path_p = strdup(request_p->path_p);
+    find_blocks_p->block_size = request_p->block_size;
+    find_blocks_p->request_id = request_p->request_id;
+    find_blocks_p->checksums.buf_p = NULL;
+    find_blocks_p->checksums.size = 0;
+    find_blocks_p->offsets.buf_p = NULL;
+    find_blocks_p->offsets.size = 0;
+    find_blocks_p->error_p = NULL;
+
+    if (find_blocks_p->path_p == NULL) {
+        response_p->error_p = "Out of memory.";
+        find_blocks_free(find_blocks_p);
+
+        return;
     }
+
+    client_p->find_blocks_p = find_blocks_p;
 }
 
-static void get_file_fill_window(struct bunga_server_t *self_p,
-                                 struct client_t *client_p,
-                                 uint8_t *buf_p,
-                                 size_t size)
+static void find_blocks_data(struct client_t *client_p,
+                             struct bunga_find_blocks_req_t *request_p,
+                             struct bunga_find_blocks_rsp_t *response_p)
 {
-    struct bunga_get_file_rsp_t *response_p;
+    struct find_blocks_t *find_blocks_p;
+    uint8_t *buf_p;
+    size_t size;
 
-    while (client_p->outstanding_responses < client_p->window_size) {
-        response_p = bunga_server_init_get_file_rsp(self_p);
-        get_file_add_data(client_p, response_p, buf_p, size);
-        bunga_server_reply(self_p);
+    find_blocks_p = client_p->find_blocks_p;
 
-        if (response_p->data.size == 0) {
-            break;
+    if ((find_blocks_p == NULL)
+        || (find_blocks_p->request_id != request_p->request_id)) {
+        response_p->error_p = "No file open.";
+
+        return;
+    }
+
+    size = (find_blocks_p->checksums.size + request_p->checksums.size);
+
+    if (((request_p->checksums.size % 8) != 0)
+        || (size > (8 * BUNGA_FIND_BLOCKS_MAX))) {
+        response_p->error_p = "Too many blocks.";
+    } else {
+        buf_p = realloc(find_blocks_p->checksums.buf_p, size);
+
+        if (buf_p != NULL) {
+            memcpy(&buf_p[find_blocks_p->checksums.size],
+                   request_p->checksums.buf_p,
+                   request_p->checksums.size);
+            find_blocks_p->checksums.buf_p = buf_p;
+            find_blocks_p->checksums.size = size;
+
+            return;
         }
 
-        client_p->outstanding_responses++;
+        response_p->error_p = "Out of memory.";
     }
+
+    find_blocks_free(find_blocks_p);
+    client_p->find_blocks_p = NULL;
 }
 
-static void get_file_open(struct bunga_server_t *self_p,
-                          struct client_t *client_p,
-                          struct bunga_get_file_req_t *request_p)
+/**
+ * All checksums received. Find the blocks in a worker thread.
+ */
+static void find_blocks_start(struct bunga_server_t *self_p,
+                              struct bunga_server_client_t *bunga_client_p,
+                              struct bunga_find_blocks_req_t *request_p)
 {
-    struct bunga_get_file_rsp_t *response_p;
-    struct stat statbuf;
-    uint8_t buf[BUNGA_MESSAGE_SIZE_MAX - 64];
+    struct client_t *client_p;
+    struct find_blocks_t *find_blocks_p;
+    struct bunga_find_blocks_rsp_t *response_p;
 
-    response_p = bunga_server_init_get_file_rsp(self_p);
+    client_p = client_from_bunga_client(bunga_client_p);
+    find_blocks_p = client_p->find_blocks_p;
+
+    if ((find_blocks_p == NULL)
+        || (find_blocks_p->request_id != request_p->request_id)) {
+        response_p = bunga_server_init_find_blocks_rsp(self_p);
+        response_p->acknowledge_count = 1;
+        response_p->request_id = request_p->request_id;
+        response_p->error_p = "No file open.";
+        bunga_server_reply(self_p);
 
-    if (client_p->fget_p != NULL) {
-        fclose(client_p->fget_p);
+        return;
     }
 
-    client_p->outstanding_responses = 0;
-    client_p->fget_p = fopen(request_p->path_p, "rb");
+    client_p->find_blocks_p = NULL;
+    find_blocks_p->bunga.server_p = self_p;
+    find_blocks_p->bunga.client_p = bunga_client_p;
+    find_blocks_p->queue_p = &queue;
+    ml_spawn((ml_worker_pool_job_entry_t)find_blocks_job, find_blocks_p);
+}
 
-    if (client_p->fget_p != NULL) {
-        if (stat(request_p->path_p, &statbuf) == 0) {
-            client_p->window_size = request_p->window_size;
+static void on_find_blocks_req(struct bunga_server_t *self_p,
+                               struct bunga_server_client_t *bunga_client_p,
+                               struct bunga_find_blocks_req_t *request_p)
+{
+    struct client_t *client_p;
+    struct bunga_find_blocks_rsp_t *response_p;
 
-            if (client_p->window_size == 0) {
-                client_p->window_size = BUNGA_GET_FILE_WINDOW_SIZE;
-            }
+    client_p = client_from_bunga_client(bunga_client_p);
 
-            response_p->size = statbuf.st_size;
-            get_file_add_data(client_p, response_p, &buf[0], sizeof(buf));
-        } else {
-            fclose(client_p->fget_p);
-            client_p->fget_p = NULL;
-            response_p->error_p = strerror(errno);
-        }
+    if ((strlen(request_p->path_p) == 0) && (request_p->checksums.size == 0)) {
+        find_blocks_start(self_p, bunga_client_p, request_p);
+
+        return;
+    }
+
+    response_p = bunga_server_init_find_blocks_rsp(self_p);
+    response_p->acknowledge_count = 1;
+    response_p->request_id = request_p->request_id;
+
+    if (strlen(request_p->path_p) > 0) {
+        find_blocks_open(client_p, request_p, response_p);
     } else {
-        response_p->error_p = strerror(errno);
+        find_blocks_data(client_p, request_p, response_p);
     }
 
     bunga_server_reply(self_p);
+}
 
-    if (response_p->data.size > 0) {
-        client_p->outstanding_responses++;
-        get_file_fill_window(self_p, client_p, &buf[0], sizeof(buf));
+static void list_files_free(struct list_files_t *self_p)
+{
+    size_t i;
+
+    for (i = 0; i < self_p->files.length; i++) {
+        free(self_p->files.items_p[i].path_p);
     }
+
+    free(self_p->files.items_p);
+    free(self_p->path_p);
+    ml_message_free(self_p);
 }
 
-static void get_file_data(struct bunga_server_t *self_p,
-                          struct client_t *client_p,
-                          struct bunga_get_file_req_t *request_p)
+static int list_files_append(struct list_files_t *self_p,
+                             const char *path_p,
+                             struct stat *statbuf_p)
 {
-    uint8_t buf[BUNGA_MESSAGE_SIZE_MAX - 64];
+    struct file_info_t *items_p;
+    struct file_info_t *file_p;
+    size_t capacity;
 
-    if (request_p->acknowledge_count > client_p->outstanding_responses) {
-        fclose(client_p->fget_p);
-        client_p->fget_p = NULL;
+    if (self_p->files.length == self_p->files.capacity) {
+        capacity = (2 * self_p->files.capacity + 16);
+        items_p = realloc(self_p->files.items_p, capacity * sizeof(*items_p));
 
-        return;
+        if (items_p == NULL) {
+            return (-ENOMEM);
+        }
+
+        self_p->files.items_p = items_p;
+        self_p->files.capacity = capacity;
+    }
+
+    file_p = &self_p->files.items_p[self_p->files.length];
+    file_p->path_p = strdup(path_p);
+
+    if (file_p->path_p == NULL) {
+        return (-ENOMEM);
     }
 
-    client_p->outstanding_responses -= request_p->acknowledge_count;
+    file_p->size = statbuf_p->st_size;
+    file_p->mtime = statbuf_p->st_mtime;
+    self_p->files.length++;
 
-    get_file_fill_window(self_p, client_p, &buf[0], sizeof(buf));
+    return (0);
 }
 
-static void on_get_file_req(struct bunga_server_t *self_p,
-                            struct bunga_server_client_t *bunga_client_p,
-                            struct bunga_get_file_req_t *request_p)
+/**
+ * Append all regular files in given open directory and its
+ * subdirectories. The directory path is in given buffer of PATH_MAX
+ * bytes, and file paths are stored relative to the first `offset`
+ * bytes of it. Symbolic links are not followed. Subdirectories that
+ * cannot be opened, for example unreadable ones or ones removed
+ * during the walk, are skipped, just as os.walk() in the Python
+ * server does.
+ */
+static int list_files_walk(struct list_files_t *self_p,
+                           DIR *dir_p,
+                           char *path_p,
+                           size_t offset)
 {
-    struct client_t *client_p;
+    DIR *subdir_p;
+    struct dirent *dirent_p;
+    struct stat statbuf;
+    size_t length;
+    int res;
 
-    client_p = client_from_bunga_client(bunga_client_p);
+    length = strlen(path_p);
+    res = 0;
 
-    if (strlen(request_p->path_p) > 0) {
-        get_file_open(self_p, client_p, request_p);
-    } else if (client_p->fget_p != NULL) {
-        get_file_data(self_p, client_p, request_p);
-    }
+    while ((res == 0) && ((dirent_p = readdir(dir_p)) != NULL)) {
+        if ((strcmp(dirent_p->d_name, ".") == 0)
+            || (strcmp(dirent_p->d_name, "..") == 0)) {
+            continue;
+        }
 
-}
+        if ((length + strlen(dirent_p->d_name) + 2) > PATH_MAX) {
+            res = -ENAMETOOLONG;
+            break;
+        }
 
-static void put_file_open(struct client_t *client_p,
-                          struct bunga_put_file_req_t *request_p,
-                          struct bunga_put_file_rsp_t *response_p)
-{
-    if (client_p->fput_p != NULL) {
-        fclose(client_p->fput_p);
-    }
+        path_p[length] = '/';
+        strcpy(&path_p[length + 1], dirent_p->d_name);
 
-    response_p->window_size = BUNGA_PUT_FILE_WINDOW_SIZE;
-    client_p->fput_p = fopen(request_p->path_p, "wb");
+        if (lstat(path_p, &statbuf) == 0) {
+            if (S_ISDIR(statbuf.st_mode)) {
+                subdir_p = opendir(path_p);
 
-    if (client_p->fput_p == NULL) {
-        response_p->error_p = "Open failed.";
+                if (subdir_p != NULL) {
+                    res = list_files_walk(self_p, subdir_p, path_p, offset);
+                    closedir(subdir_p);
+                }
+            } else if (S_ISREG(statbuf.st_mode)) {
+                res = list_files_append(self_p, &path_p[offset], &statbuf);
+            }
+        }
+
+        path_p[length] = '\0';
     }
+
+    return (res);
 }
 
-static void put_file_data(struct client_t *client_p,
-                          struct bunga_put_file_req_t *request_p,
-                          struct bunga_put_file_rsp_t *response_p)
+static void list_files_job(struct list_files_t *list_files_p)
 {
-    size_t items_written;
+    DIR *dir_p;
+    char *path_p;
+    size_t length;
+    int res;
 
-    if (client_p->fput_p != NULL) {
-        items_written = fwrite(request_p->data.buf_p,
-                               request_p->data.size,
-                               1,
-                               client_p->fput_p);
+    path_p = malloc(PATH_MAX);
 
-        if (items_written != 1) {
-            response_p->error_p = "Write failed.";
-            fclose(client_p->fput_p);
-            client_p->fput_p = NULL;
+    if (path_p != NULL) {
+        length = strlen(list_files_p->path_p);
+
+        /* Remove any trailing slash as one is added before each name. */
+        while ((length > 1) && (list_files_p->path_p[length - 1] == '/')) {
+            length--;
+        }
+
+        if (length < PATH_MAX) {
+            memcpy(path_p, list_files_p->path_p, length);
+            path_p[length] = '\0';
+            dir_p = opendir(path_p);
+
+            if (dir_p != NULL) {
+                res = list_files_walk(list_files_p, dir_p, path_p, length + 1);
+                closedir(dir_p);
+            } else {
+                res = -errno;
+            }
+        } else {
+            res = -ENAMETOOLONG;
         }
+
+        free(path_p);
     } else {
-        response_p->error_p = "No file open.";
+        res = -ENOMEM;
     }
-}
 
-static void put_file_close(struct client_t *client_p)
-{
-    fclose(client_p->fput_p);
-    client_p->fput_p = NULL;
+    if (res != 0) {
+        list_files_p->error_p = strerror(-res);
+    }
+
+    ml_queue_put(list_files_p->queue_p, list_files_p);
 }
 
-static void on_put_file_req(struct bunga_server_t *self_p,
-                            struct bunga_server_client_t *bunga_client_p,
-                            struct bunga_put_file_req_t *request_p)
+static void on_list_files_req(struct bunga_server_t *self_p,
+                              struct bunga_server_client_t *bunga_client_p,
+                              struct bunga_list_files_req_t *request_p)
 {
-    struct client_t *client_p;
-    struct bunga_put_file_rsp_t *response_p;
-
-    client_p = client_from_bunga_client(bunga_client_p);
-    response_p = bunga_server_init_put_file_rsp(self_p);
-    response_p->acknowledge_count = 1;
+    struct list_files_t *list_files_p;
+
+    list_files_p = ml_message_alloc(&uid_list_files_complete,
+                                    sizeof(*list_files_p));
+    list_files_p->path_p = strdup(request_p->path_p);
+    list_files_p->request_id = request_p->request_id;
+    list_files_p->files.items_p = NULL;
+    list_files_p->files.length = 0;
+    list_files_p->files.capacity = 0;
+    list_files_p->error_p = NULL;
+    list_files_p->bunga.server_p = self_p;
+    list_files_p->bunga.client_p = bunga_client_p;
+    list_files_p->queue_p = &queue;
+
+    if (list_files_p->path_p == NULL) {
+        list_files_p->error_p = "Out of memory.";
+        ml_queue_put(&queue, list_files_p);
 
-    if (strlen(request_p->path_p) > 0) {
-        put_file_open(client_p, request_p, response_p);
-    } else if (request_p->data.size > 0) {
-        put_file_data(client_p, request_p, response_p);
-    } else if (client_p->fput_p != NULL) {
-        put_file_close(client_p);
+        return;
     }
 
-    bunga_server_reply(self_p);
+    ml_spawn((ml_worker_pool_job_entry_t)list_files_job, list_files_p);
 }
 
 static void handle_execute_command_complete(struct execute_command_t *command_p)
@@ -398,6 +1809,7 @@ static void handle_execute_command_complete(struct execute_command_t *command_p)
     size_t offset;
     size_t size;
     size_t chunk_size;
+    size_t chunk_size_max;
     struct bunga_server_t *server_p;
     struct bunga_server_client_t *client_p;
 
@@ -407,14 +1819,16 @@ static void handle_execute_command_complete(struct execute_command_t *command_p)
     /* Output. */
     output_p = command_p->output.buf_p;
     size = command_p->output.size;
-    chunk_size = 96;
+    chunk_size_max = client_data_size_max(client_from_bunga_client(client_p));
+    chunk_size = chunk_size_max;
 
     for (offset = 0; offset < size; offset += chunk_size) {
-        if ((size - offset) < 96) {
+        if ((size - offset) < chunk_size_max) {
             chunk_size = (size - offset);
         }
 
         response_p = bunga_server_init_execute_command_rsp(server_p);
+        response_p->request_id = command_p->request_id;
         response_p->output.size = chunk_size;
         response_p->output.buf_p = (uint8_t *)&output_p[offset];
         bunga_server_send(server_p, client_p);
@@ -422,6 +1836,7 @@ static void handle_execute_command_complete(struct execute_command_t *command_p)
 
     /* Command result. */
     response_p = bunga_server_init_execute_command_rsp(server_p);
+    response_p->request_id = command_p->request_id;
 
     if (command_p->res != 0) {
         response_p->error_p = strerror(-command_p->res);
@@ -438,6 +1853,118 @@ static void handle_execute_command_complete(struct execute_command_t *command_p)
     ml_message_free(command_p);
 }
 
+static void handle_find_blocks_complete(struct find_blocks_t *find_blocks_p)
+{
+    struct bunga_find_blocks_rsp_t *response_p;
+    size_t offset;
+    size_t size;
+    size_t chunk_size;
+    size_t chunk_size_max;
+    struct bunga_server_t *server_p;
+    struct bunga_server_client_t *client_p;
+
+    server_p = find_blocks_p->bunga.server_p;
+    client_p = find_blocks_p->bunga.client_p;
+
+    /* Offsets, a whole number of blocks per message. */
+    size = find_blocks_p->offsets.size;
+    chunk_size_max = client_data_size_max(client_from_bunga_client(client_p));
+    chunk_size_max -= (chunk_size_max % 8);
+    chunk_size = chunk_size_max;
+
+    for (offset = 0; offset < size; offset += chunk_size) {
+        if ((size - offset) < chunk_size_max) {
+            chunk_size = (size - offset);
+        }
+
+        response_p = bunga_server_init_find_blocks_rsp(server_p);
+        response_p->request_id = find_blocks_p->request_id;
+        response_p->offsets.size = chunk_size;
+        response_p->offsets.buf_p = &find_blocks_p->offsets.buf_p[offset];
+        bunga_server_send(server_p, client_p);
+    }
+
+    /* Result, acknowledging the last request. */
+    response_p = bunga_server_init_find_blocks_rsp(server_p);
+    response_p->acknowledge_count = 1;
+    response_p->request_id = find_blocks_p->request_id;
+
+    if (find_blocks_p->error_p != NULL) {
+        response_p->error_p = find_blocks_p->error_p;
+    }
+
+    bunga_server_send(server_p, client_p);
+    find_blocks_free(find_blocks_p);
+}
+
+/**
+ * Send the listed files, as many as fit in each message.
+ */
+static void handle_list_files_complete(struct list_files_t *list_files_p)
+{
+    struct bunga_list_files_rsp_t *response_p;
+    struct file_info_t *files_p;
+    size_t size;
+    size_t size_max;
+    size_t begin;
+    size_t end;
+    size_t i;
+    struct bunga_server_t *server_p;
+    struct bunga_server_client_t *client_p;
+
+    server_p = list_files_p->bunga.server_p;
+    client_p = list_files_p->bunga.client_p;
+    files_p = list_files_p->files.items_p;
+    size_max = client_data_size_max(client_from_bunga_client(client_p));
+    begin = 0;
+
+    while (begin < list_files_p->files.length) {
+        size = 0;
+
+        for (end = begin; end < list_files_p->files.length; end++) {
+            size += (strlen(files_p[end].path_p) + LIST_FILES_FILE_OVERHEAD);
+
+            if (size > size_max) {
+                break;
+            }
+        }
+
+        if (end == begin) {
+            list_files_p->error_p = "Path too long.";
+            break;
+        }
+
+        response_p = bunga_server_init_list_files_rsp(server_p);
+        response_p->request_id = list_files_p->request_id;
+
+        if ((bunga_list_files_rsp_paths_alloc(response_p, end - begin) != 0)
+            || (bunga_list_files_rsp_sizes_alloc(response_p, end - begin) != 0)
+            || (bunga_list_files_rsp_mtimes_alloc(response_p, end - begin) != 0)) {
+            list_files_p->error_p = "Out of memory.";
+            break;
+        }
+
+        for (i = begin; i < end; i++) {
+            response_p->paths.items_pp[i - begin] = files_p[i].path_p;
+            response_p->sizes.items_p[i - begin] = files_p[i].size;
+            response_p->mtimes.items_p[i - begin] = files_p[i].mtime;
+        }
+
+        bunga_server_send(server_p, client_p);
+        begin = end;
+    }
+
+    response_p = bunga_server_init_list_files_rsp(server_p);
+    response_p->request_id = list_files_p->request_id;
+
+    if (list_files_p->error_p != NULL) {
+        response_p->error_p = list_files_p->error_p;
+    }
+
+    bunga_server_send(server_p, client_p);
+    list_files_free(list_files_p);
+}
+
 static void print_kernel_message(char *message_p,
                                  struct bunga_server_t *server_p,
                                  struct bunga_server_client_t *client_p)
@@ -489,6 +2016,60 @@ static struct client_t *find_log_client(int log_fd)
     return (NULL);
 }
 
+static struct client_t *find_keep_alive_client(int timer_fd)
+{
+    int i;
+
+    for (i = 0; i < 2; i++) {
+        if ((clients[i].keep_alive_timeout > 0)
+            && (timer_fd == bunga_clients[i].keep_alive_timer_fd)) {
+            return (&clients[i]);
+        }
+    }
+
+    return (NULL);
+}
+
+/**
+ * Extend the generated server's keep alive timeout to the client's
+ * negotiated timeout. When the timer armed by the generated server
+ * expires, it is rearmed for the remaining time, with a non-zero
+ * interval to tell it apart from the generated server's arming, which
+ * is done on each ping. Returns true if the expiry was handled, and
+ * false if given file descriptor is not a keep alive timer, or if the
+ * client shall be disconnected by the generated server.
+ */
+static bool handle_keep_alive_timer(int timer_fd)
+{
+    struct client_t *client_p;
+    struct itimerspec timeout;
+
+    client_p = find_keep_alive_client(timer_fd);
+
+    if (client_p == NULL) {
+        return (false);
+    }
+
+    if (client_p->keep_alive_timeout <= GENERATED_KEEP_ALIVE_TIMEOUT) {
+        return (false);
+    }
+
+    if (timerfd_gettime(timer_fd, &timeout) != 0) {
+        return (false);
+    }
+
+    if (timeout.it_interval.tv_sec != 0) {
+        return (false);
+    }
+
+    memset(&timeout, 0, sizeof(timeout));
+    timeout.it_value.tv_sec = (client_p->keep_alive_timeout
+                               - GENERATED_KEEP_ALIVE_TIMEOUT);
+    timeout.it_interval.tv_sec = client_p->keep_alive_timeout;
+
+    return (timerfd_settime(timer_fd, 0, &timeout, NULL) == 0);
+}
+
 static bool handle_log(struct bunga_server_t *server_p, int log_fd)
 {
     char message[512];
@@ -540,6 +2121,20 @@ static void *server_main()
 
     pthread_setname_np(pthread_self(), "bunga_server");
 
+    clients_input_buffers_p = malloc(2 * maximum_message_size);
+    message_buf_p = malloc(maximum_message_size);
+    workspace_in_p = malloc(maximum_message_size + 64);
+    workspace_out_p = malloc(maximum_message_size + 64);
+    data_buf_p = malloc(maximum_message_size);
+
+    if ((clients_input_buffers_p == NULL)
+        || (message_buf_p == NULL)
+        || (workspace_in_p == NULL)
+        || (workspace_out_p == NULL)
+        || (data_buf_p == NULL)) {
+        return (NULL);
+    }
+
     epoll_fd = epoll_create1(0);
 
     if (epoll_fd == -1) {
@@ -568,20 +2163,22 @@ static void *server_main()
                             "tcp://:28000",
                             &bunga_clients[0],
                             2,
-                            &clients_input_buffers[0][0],
-                            sizeof(clients_input_buffers[0]),
-                            &message[0],
-                            sizeof(message),
-                            &workspace_in[0],
-                            sizeof(workspace_in),
-                            &workspace_out[0],
-                            sizeof(workspace_out),
+                            clients_input_buffers_p,
+                            maximum_message_size,
+                            message_buf_p,
+                            maximum_message_size,
+                            workspace_in_p,
+                            maximum_message_size + 64,
+                            workspace_out_p,
+                            maximum_message_size + 64,
                             on_client_connected,
                             on_client_disconnected,
                             on_connect_req,
                             on_execute_command_req,
                             on_get_file_req,
                             on_put_file_req,
+                            on_find_blocks_req,
+                            on_list_files_req,
                             epoll_fd,
                             NULL);
 
@@ -613,8 +2210,13 @@ static void *server_main()
 
             if (uid_p == &uid_execute_command_complete) {
                 handle_execute_command_complete(message_p);
+            } else if (uid_p == &uid_find_blocks_complete) {
+                handle_find_blocks_complete(message_p);
+            } else if (uid_p == &uid_list_files_complete) {
+                handle_list_files_complete(message_p);
             }
         } else if (handle_log(&server, event.data.fd)) {
+        } else if (handle_keep_alive_timer(event.data.fd)) {
         } else {
             bunga_server_process(&server, event.data.fd, event.events);
         }
@@ -623,9 +2225,116 @@ static void *server_main()
     return (NULL);
 }
 
+int bunga_server_linux_set_maximum_message_size(size_t size)
+{
+    if ((size < MESSAGE_SIZE_MIN) || (size > MESSAGE_SIZE_LIMIT)) {
+        return (-EINVAL);
+    }
+
+    maximum_message_size = size;
+
+    return (0);
+}
+
+/**
+ * Write given file to given output stream.
+ */
+static int ps_stat_copy_file(const char *path_p, FILE *fout_p)
+{
+    FILE *fin_p;
+    char buf[256];
+    size_t size;
+
+    fin_p = fopen(path_p, "r");
+
+    if (fin_p == NULL) {
+        return (-errno);
+    }
+
+    while ((size = fread(&buf[0], 1, sizeof(buf), fin_p)) > 0) {
+        fwrite(&buf[0], 1, size, fout_p);
+    }
+
+    fclose(fin_p);
+
+    return (0);
+}
+
+/**
+ * Write the first line of /proc/stat followed by the stat line of
+ * each thread of given process, or of the init process, so a client
+ * gets everything its ps command needs in a single round trip.
+ */
+static int command_bunga_ps_stat(int argc, const char *argv[], FILE *fout_p)
+{
+    const char *pid_p;
+    char path[64];
+    char line[512];
+    FILE *fin_p;
+    DIR *dir_p;
+    struct dirent *dirent_p;
+
+    if (argc == 1) {
+        pid_p = "1";
+    } else if ((argc == 2)
+               && (strlen(argv[1]) > 0)
+               && (strlen(argv[1]) <= 10)
+               && (strspn(argv[1], "0123456789") == strlen(argv[1]))) {
+        pid_p = argv[1];
+    } else {
+        fprintf(fout_p, "Usage: bunga_ps_stat [<pid>]\n");
+
+        return (-EINVAL);
+    }
+
+    fin_p = fopen("/proc/stat", "r");
+
+    if (fin_p == NULL) {
+        return (-errno);
+    }
+
+    if (fgets(&line[0], sizeof(line), fin_p) == NULL) {
+        fclose(fin_p);
+
+        return (-EIO);
+    }
+
+    fclose(fin_p);
+    snprintf(&path[0], sizeof(path), "/proc/%s/task", pid_p);
+    dir_p = opendir(&path[0]);
+
+    if (dir_p == NULL) {
+        return (-errno);
+    }
+
+    fputs(&line[0], fout_p);
+
+    while ((dirent_p = readdir(dir_p)) != NULL) {
+        if (dirent_p->d_name[0] == '.') {
+            continue;
+        }
+
+        snprintf(&path[0],
+                 sizeof(path),
+                 "/proc/%s/task/%.16s/stat",
+                 pid_p,
+                 &dirent_p->d_name[0]);
+
+        /* The thread may have exited. */
+        (void)ps_stat_copy_file(&path[0], fout_p);
+    }
+
+    closedir(dir_p);
+
+    return (0);
+}
+
 void bunga_server_linux_create(void)
 {
     pthread_t pthread;
 
+    ml_shell_register_command("bunga_ps_stat",
+                              "Process and thread statistics for ps.",
+                              command_bunga_ps_stat);
     pthread_create(&pthread, NULL, server_main, NULL);
 }
@@ -1,7 +1,11 @@
 #include <errno.h>
 #include <pthread.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
 #include <sys/eventfd.h>
 #include <sys/epoll.h>
+#include <sys/timerfd.h>
 #include <unistd.h>
 #include <fcntl.h>
 #include "nala.h"
@@ -13,10 +17,12 @@
 #define PUT_FD                                11
 #define CLIENT_FD                             12
 #define LOG_FD                                13
+#define TIMER_FD                              14
 
 static struct bunga_server_t *bunga_server_p;
 static struct bunga_server_client_t *bunga_clients_p;
 static int pthread_create_handle;
+static int ps_stat_handle;
 static int bunga_server_init_handle;
 static struct bunga_connect_rsp_t connect_rsp;
 static struct bunga_execute_command_rsp_t execute_command_rsp[10];
@@ -71,6 +77,8 @@ static void on_server_init(
     bunga_server_on_execute_command_req_t on_execute_command_req,
     bunga_server_on_get_file_req_t on_get_file_req,
     bunga_server_on_put_file_req_t on_put_file_req,
+    bunga_server_on_find_blocks_req_t on_find_blocks_req,
+    bunga_server_on_list_files_req_t on_list_files_req,
     int epoll_fd,
     messi_epoll_ctl_t epoll_ctl)
 {
@@ -90,6 +98,8 @@ static void on_server_init(
     (void)on_execute_command_req;
     (void)on_get_file_req;
     (void)on_put_file_req;
+    (void)on_find_blocks_req;
+    (void)on_list_files_req;
     (void)epoll_fd;
     (void)epoll_ctl;
 
@@ -102,7 +112,15 @@ static void mock_prepare_server_main_until_epoll()
     bunga_server_init_log_entry_ind_mock_none();
     bunga_server_init_put_file_rsp_mock_none();
     bunga_server_init_get_file_rsp_mock_none();
+    bunga_server_init_find_blocks_rsp_mock_none();
+    bunga_server_init_list_files_rsp_mock_none();
+    bunga_list_files_rsp_paths_alloc_mock_none();
+    bunga_list_files_rsp_sizes_alloc_mock_none();
+    bunga_list_files_rsp_mtimes_alloc_mock_none();
     bunga_log_entry_ind_text_alloc_mock_none();
+    ps_stat_handle = ml_shell_register_command_mock_once(
+        "bunga_ps_stat",
+        "Process and thread statistics for ps.");
     pthread_create_handle = pthread_create_mock_once(0);
 
     bunga_server_linux_create();
@@ -155,6 +173,7 @@ static void execute_command_process_on_connect_req(
 
     struct bunga_connect_req_t connect_req;
 
+    memset(&connect_req, 0, sizeof(connect_req));
     bunga_server_init_connect_rsp_mock_once(&connect_rsp);
     bunga_server_reply_mock_once();
     bunga_server_reply_mock_set_callback(execute_command_connect_reply);
@@ -184,11 +203,12 @@ static void execute_command_process_on_execute_command_req_date(
     struct nala_ml_message_alloc_params_t *alloc_params_p;
     struct nala_ml_spawn_params_t *spawn_params_p;
 
-    message_p = nala_alloc(56);
-    alloc_handle = ml_message_alloc_mock_once(56, message_p);
+    message_p = nala_alloc(64);
+    alloc_handle = ml_message_alloc_mock_once(64, message_p);
     spawn_handle = ml_spawn_mock_once();
 
     execute_command_req.command_p = "date";
+    execute_command_req.request_id = 3;
     call_on_execute_command_req(self_p, &execute_command_req);
     alloc_params_p = ml_message_alloc_mock_get_params_in(alloc_handle);
 
@@ -209,6 +229,7 @@ static void execute_command_send_output(struct bunga_server_t *self_p,
     (void)self_p;
     (void)client_p;
 
+    ASSERT_EQ(execute_command_rsp[0].request_id, 3);
     ASSERT_EQ(execute_command_rsp[0].error_p, "");
     ASSERT_EQ(execute_command_rsp[0].output.size, 6);
     ASSERT_MEMORY_EQ(execute_command_rsp[0].output.buf_p, "Today!", 6);
@@ -220,6 +241,7 @@ static void execute_command_send_result(struct bunga_server_t *self_p,
     (void)self_p;
     (void)client_p;
 
+    ASSERT_EQ(execute_command_rsp[1].request_id, 3);
     ASSERT_EQ(execute_command_rsp[1].error_p, "");
     ASSERT_EQ(execute_command_rsp[1].output.size, 0);
 }
@@ -315,11 +337,12 @@ static void execute_command_process_on_execute_command_req_date_error(
     struct nala_ml_message_alloc_params_t *alloc_params_p;
     struct nala_ml_spawn_params_t *spawn_params_p;
 
-    message_p = nala_alloc(56);
-    alloc_handle = ml_message_alloc_mock_once(56, message_p);
+    message_p = nala_alloc(64);
+    alloc_handle = ml_message_alloc_mock_once(64, message_p);
     spawn_handle = ml_spawn_mock_once();
 
     execute_command_req.command_p = "date";
+    execute_command_req.request_id = 3;
     call_on_execute_command_req(self_p, &execute_command_req);
     alloc_params_p = ml_message_alloc_mock_get_params_in(alloc_handle);
 
@@ -339,6 +362,7 @@ static void execute_command_send_error(struct bunga_server_t *self_p,
     (void)self_p;
     (void)client_p;
 
+    ASSERT_EQ(execute_command_rsp[0].request_id, 3);
     ASSERT_EQ(execute_command_rsp[0].error_p, "Invalid argument");
     ASSERT_EQ(execute_command_rsp[0].output.size, 0);
 }
@@ -372,3 +396,121 @@ TEST(execute_command_date_error)
 
     call_server_main();
 }
+
+static void keep_alive_process_on_client_connected(
+    struct bunga_server_t *self_p,
+    int fd,
+    uint32_t events)
+{
+    bunga_clients_p[0].keep_alive_timer_fd = TIMER_FD;
+    execute_command_process_on_client_connected(self_p, fd, events);
+}
+
+static void keep_alive_connect_reply(struct bunga_server_t *self_p)
+{
+    (void)self_p;
+
+    ASSERT_EQ(connect_rsp.keep_alive_timeout, 10);
+}
+
+static void keep_alive_process_on_connect_req(
+    struct bunga_server_t *self_p,
+    int fd,
+    uint32_t events)
+{
+    (void)fd;
+    (void)events;
+
+    struct bunga_connect_req_t connect_req;
+
+    memset(&connect_req, 0, sizeof(connect_req));
+    connect_req.keep_alive_timeout = 10;
+    bunga_server_init_connect_rsp_mock_once(&connect_rsp);
+    bunga_server_reply_mock_once();
+    bunga_server_reply_mock_set_callback(keep_alive_connect_reply);
+
+    call_on_connect_req(self_p, &connect_req);
+}
+
+TEST(keep_alive_timeout)
+{
+    struct epoll_event event;
+    struct itimerspec timeout;
+
+    mock_prepare_server_main_until_epoll();
+    mock_prepare_execute_command(keep_alive_process_on_client_connected);
+    mock_prepare_execute_command(keep_alive_process_on_connect_req);
+
+    /* The generated server's timer expires after 3 seconds and is
+       rearmed for the remaining 12 of the 15 seconds timeout. */
+    epoll_wait_mock_once(10, 1, -1, 1);
+    event.events = EPOLLIN;
+    event.data.fd = TIMER_FD;
+    epoll_wait_mock_set_events_out(&event, sizeof(event));
+    memset(&timeout, 0, sizeof(timeout));
+    timerfd_gettime_mock_once(TIMER_FD, 0);
+    timerfd_gettime_mock_set_otmr_out(&timeout, sizeof(timeout));
+    timeout.it_value.tv_sec = 12;
+    timeout.it_interval.tv_sec = 15;
+    timerfd_settime_mock_once(TIMER_FD, 0, 0);
+    timerfd_settime_mock_set_new_value_in(&timeout, sizeof(timeout));
+
+    /* The rearmed timer expires, and the client is disconnected by
+       the generated server. */
+    epoll_wait_mock_once(10, 1, -1, 1);
+    epoll_wait_mock_set_events_out(&event, sizeof(event));
+    timerfd_gettime_mock_once(TIMER_FD, 0);
+    timerfd_gettime_mock_set_otmr_out(&timeout, sizeof(timeout));
+    bunga_server_process_mock_once(TIMER_FD, EPOLLIN);
+
+    /* End loop. */
+    epoll_wait_mock_once(10, 1, -1, -1);
+
+    call_server_main();
+}
+
+TEST(bunga_ps_stat)
+{
+    ml_shell_command_callback_t command;
+    const char *argv[3];
+    char pid[16];
+    char expected[32];
+    char *buf_p;
+    size_t size;
+    FILE *fout_p;
+
+    ps_stat_handle = ml_shell_register_command_mock_once(
+        "bunga_ps_stat",
+        "Process and thread statistics for ps.");
+    pthread_create_mock_once(0);
+    bunga_server_linux_create();
+    command = ml_shell_register_command_mock_get_params_in(
+        ps_stat_handle)->callback;
+
+    /* Threads of this process. */
+    snprintf(&pid[0], sizeof(pid), "%d", getpid());
+    snprintf(&expected[0], sizeof(expected), "\n%d (", getpid());
+    argv[0] = "bunga_ps_stat";
+    argv[1] = &pid[0];
+    fout_p = open_memstream(&buf_p, &size);
+    ASSERT_EQ(command(2, &argv[0], fout_p), 0);
+    fclose(fout_p);
+    ASSERT_EQ(strncmp(buf_p, "cpu ", 4), 0);
+    ASSERT_SUBSTRING(buf_p, &expected[0]);
+    free(buf_p);
+
+    /* Bad PID. */
+    argv[1] = "1/../2";
+    fout_p = open_memstream(&buf_p, &size);
+    ASSERT_EQ(command(2, &argv[0], fout_p), -EINVAL);
+    fclose(fout_p);
+    ASSERT_EQ(buf_p, "Usage: bunga_ps_stat [<pid>]\n");
+    free(buf_p);
+
+    /* Too many arguments. */
+    argv[2] = "2";
+    fout_p = open_memstream(&buf_p, &size);
+    ASSERT_EQ(command(3, &argv[0], fout_p), -EINVAL);
+    fclose(fout_p);
+    free(buf_p);
+}
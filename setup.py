@@ -24,7 +24,7 @@ setup(name='bunga',
       ],
       keywords=[],
       url='https://github.com/eerimoq/bunga',
-      packages=find_packages(exclude=['tests']),
+      packages=find_packages(exclude=['tests', 'benchmarks']),
       install_requires=[
           'prompt_toolkit',
           'grpcio-tools',
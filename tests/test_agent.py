@@ -0,0 +1,189 @@
+import os
+import time
+import socket
+import unittest
+import tempfile
+from unittest.mock import patch
+from io import BytesIO
+from io import TextIOWrapper
+
+import bunga
+from bunga.agent import Agent
+from bunga.agent_client import AgentError
+from bunga.agent_client import FrameType
+from bunga.agent_client import call
+from bunga.agent_client import pack_json_frame
+from bunga.server import MAXIMUM_MESSAGE_SIZE
+from bunga.server import PUT_FILE_WINDOW_SIZE
+from bunga.server import ServerThread
+
+
+async def start_agent(path, uris):
+    agent = Agent(path, uris)
+    await agent.start()
+
+    return agent
+
+
+class AgentTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmpdir.name, 'root')
+        os.mkdir(self.root)
+        self.path = os.path.join(self.tmpdir.name, 'agent.sock')
+        self.server = ServerThread(self.root,
+                                   MAXIMUM_MESSAGE_SIZE,
+                                   PUT_FILE_WINDOW_SIZE)
+        self.server.start()
+        self.uri = self.server.uri
+        self.agent = self.server.run_coroutine(
+            start_agent(self.path, [self.uri])).result()
+
+    def tearDown(self):
+        self.server.run_coroutine(self.agent.stop()).result()
+        self.server.stop()
+        self.tmpdir.cleanup()
+
+    def test_socket_permissions(self):
+        path = os.path.join(self.tmpdir.name, 'other.sock')
+        umask = os.umask(0)
+
+        try:
+            agent = self.server.run_coroutine(start_agent(path, [])).result()
+        finally:
+            os.umask(umask)
+
+        self.assertEqual(os.stat(path).st_mode & 0o077, 0)
+        self.server.run_coroutine(agent.stop()).result()
+
+    def test_call(self):
+        chunks = []
+        result = call('execute',
+                      {'uri': self.uri, 'command': 'echo hi'},
+                      chunks.append,
+                      self.path)
+        self.assertIsNone(result)
+        self.assertEqual(b''.join(chunks), b'hi\n')
+
+        with self.assertRaises(AgentError) as cm:
+            call('execute',
+                 {'uri': self.uri, 'command': 'missing'},
+                 path=self.path)
+
+        self.assertEqual(cm.exception.error, 'No such file or directory')
+
+        with self.assertRaises(AgentError) as cm:
+            call('bad', {'uri': self.uri}, path=self.path)
+
+        self.assertEqual(cm.exception.error, "Invalid operation 'bad'.")
+
+        with self.assertRaises(AgentError) as cm:
+            call('execute',
+                 {'uri': self.uri, 'command': 'ls'},
+                 path=self.path + '.missing')
+
+        self.assertIn('No agent at', cm.exception.error)
+
+    async def _server_read_offsets(self):
+        return [get_file.fin.tell()
+                for client in self.server.server._clients
+                for get_file in client.get_files.values()]
+
+    async def _agent_requests(self):
+        return len(self.agent._clients[self.uri]._requests)
+
+    def test_get_file_to_slow_reader(self):
+        size = 32 * 1024 * 1024
+
+        with open(os.path.join(self.root, 'file.bin'), 'wb') as fout:
+            fout.write(size * b'a')
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.path)
+            sock.sendall(pack_json_frame(FrameType.REQUEST,
+                                         {
+                                             'operation': 'get_file',
+                                             'uri': self.uri,
+                                             'remote_path': '/file.bin',
+                                             'local_path': None,
+                                             'window_size': 4,
+                                             'compress': False
+                                         }))
+            time.sleep(1)
+
+            # Nothing is read, so the server only sends about as much
+            # as the agent buffers and a window.
+            offsets = self.server.run_coroutine(
+                self._server_read_offsets()).result()
+            self.assertEqual(len(offsets), 1)
+            self.assertLess(offsets[0], size // 4)
+            self.assertEqual(
+                self.server.run_coroutine(self._agent_requests()).result(),
+                1)
+
+        # The transfer is cancelled when the invocation is gone.
+        for _ in range(100):
+            if self.server.run_coroutine(self._agent_requests()).result() == 0:
+                break
+
+            time.sleep(0.01)
+
+        self.assertEqual(
+            self.server.run_coroutine(self._agent_requests()).result(),
+            0)
+
+    def test_command_line(self):
+        local_path = os.path.join(self.tmpdir.name, 'file.bin')
+        got_path = os.path.join(self.tmpdir.name, 'got.bin')
+        data = os.urandom(100000)
+
+        with open(local_path, 'wb') as fout:
+            fout.write(data)
+
+        with patch.dict(os.environ, {'BUNGA_AGENT_SOCKET': self.path}):
+            argv = [
+                'bunga', 'put_file', '--agent', '--uri', self.uri,
+                local_path, '/file.bin'
+            ]
+
+            with patch('sys.argv', argv):
+                bunga.main()
+
+            with open(os.path.join(self.root, 'file.bin'), 'rb') as fin:
+                self.assertEqual(fin.read(), data)
+
+            argv = [
+                'bunga', 'get_file', '--agent', '--uri', self.uri,
+                '--verify', '/file.bin', got_path
+            ]
+
+            with patch('sys.argv', argv):
+                bunga.main()
+
+            with open(got_path, 'rb') as fin:
+                self.assertEqual(fin.read(), data)
+
+            argv = [
+                'bunga', 'get_file', '--agent', '--uri', self.uri,
+                '/file.bin', '-'
+            ]
+            stdout = TextIOWrapper(BytesIO())
+
+            with patch('sys.argv', argv):
+                with patch('sys.stdout', stdout):
+                    bunga.main()
+
+            self.assertEqual(stdout.buffer.getvalue(), data)
+
+            argv = [
+                'bunga', 'execute', '--agent', '--uri', self.uri,
+                'cat file.bin'
+            ]
+            stdout = TextIOWrapper(BytesIO())
+
+            with patch('sys.argv', argv):
+                with patch('sys.stdout', stdout):
+                    bunga.main()
+
+            self.assertEqual(stdout.buffer.getvalue(), data)
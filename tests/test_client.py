@@ -2,9 +2,14 @@ import os
 import sys
 import logging
 import asyncio
+import zlib
+import struct
 import unittest
+import tempfile
 from unittest.mock import patch
+from unittest.mock import Mock
 from io import StringIO
+from io import BytesIO
 
 from colors import red
 from colors import green
@@ -13,11 +18,7 @@ from colors import color
 
 import bunga
 
-
-def create_tcp_uri(listener):
-    address, port = listener.sockets[0].getsockname()
-
-    return f'tcp://{address}:{port}'
+from .utils import create_tcp_uri
 
 
 async def server_main(listener):
@@ -49,8 +50,9 @@ class ClientTest(unittest.TestCase):
         return client
 
     async def connect_req_rsp(self, reader, writer):
-        connect_req = await reader.readexactly(6)
-        self.assertEqual(connect_req, b'\x01\x00\x00\x02\n\x00')
+        connect_req = await reader.readexactly(12)
+        self.assertEqual(connect_req,
+                         b'\x01\x00\x00\x08\n\x06\x10\x80\x80\x04\x18\x01')
         writer.write(b'\x02\x00\x00\x07\n\x05\x08\x02\x10\xd8\x01')
 
     def test_execute_command(self):
@@ -64,9 +66,11 @@ class ClientTest(unittest.TestCase):
             writer.write(b'\x02\x00\x00\x08\x12\x06\n\x042020')
             writer.write(b'\x02\x00\x00\x02\x12\x00')
 
-            bad_req = await reader.readexactly(11)
-            self.assertEqual(bad_req, b'\x01\x00\x00\x07\x12\x05\n\x03bad')
-            writer.write(b'\x02\x00\x00\x0d\x12\x0b\x12\tnot found')
+            # Request identifiers are not reused.
+            bad_req = await reader.readexactly(13)
+            self.assertEqual(bad_req,
+                             b'\x01\x00\x00\x09\x12\x07\n\x03bad\x10\x01')
+            writer.write(b'\x02\x00\x00\x0f\x12\x0d\x12\tnot found\x18\x01')
 
             writer.close()
 
@@ -90,6 +94,55 @@ class ClientTest(unittest.TestCase):
         await asyncio.wait_for(
             asyncio.gather(server_main(listener), client_main()), 2)
 
+    def test_execute_command_stream(self):
+        asyncio.run(self.execute_command_stream())
+
+    async def execute_command_stream(self):
+        first_chunk_received = asyncio.Event()
+
+        async def on_client_connected(reader, writer):
+            await self.connect_req_rsp(reader, writer)
+            req = await reader.readexactly(11)
+            self.assertEqual(req, b'\x01\x00\x00\x07\x12\x05\n\x03cat')
+            writer.write(b'\x02\x00\x00\x07\x12\x05\n\x03foo')
+
+            # The first chunk is yielded before the command completes.
+            await first_chunk_received.wait()
+            writer.write(b'\x02\x00\x00\x07\x12\x05\n\x03bar')
+            writer.write(b'\x02\x00\x00\x02\x12\x00')
+
+            req = await reader.readexactly(13)
+            self.assertEqual(req, b'\x01\x00\x00\x09\x12\x07\n\x03bad\x10\x01')
+            writer.write(b'\x02\x00\x00\x09\x12\x07\n\x03foo\x18\x01')
+            writer.write(b'\x02\x00\x00\x0f\x12\x0d\x12\tnot found\x18\x01')
+
+            writer.close()
+
+        listener = await asyncio.start_server(on_client_connected, 'localhost', 0)
+
+        async def client_main():
+            client = await self.start_client(listener)
+            chunks = []
+
+            async for chunk in client.execute_command_stream('cat'):
+                chunks.append(chunk)
+                first_chunk_received.set()
+
+            self.assertEqual(chunks, [b'foo', b'bar'])
+
+            # Output received before the failure is kept.
+            with self.assertRaises(bunga.ExecuteCommandError) as cm:
+                await client.execute_command('bad')
+
+            self.assertEqual(cm.exception.output, b'foo')
+            self.assertEqual(cm.exception.error, 'not found')
+
+            client.stop()
+            listener.close()
+
+        await asyncio.wait_for(
+            asyncio.gather(server_main(listener), client_main()), 2)
+
     def test_execute_command_disconnect_and_no_response(self):
         asyncio.run(self.execute_command_disconnect_and_no_response())
 
@@ -117,6 +170,82 @@ class ClientTest(unittest.TestCase):
         await asyncio.wait_for(
             asyncio.gather(server_main(listener), client_main()), 2)
 
+    def test_late_responses_to_cancelled_request(self):
+        asyncio.run(self.late_responses_to_cancelled_request())
+
+    async def late_responses_to_cancelled_request(self):
+        async def on_client_connected(reader, writer):
+            await self.connect_req_rsp(reader, writer)
+            sleep_req = await reader.readexactly(13)
+            self.assertEqual(sleep_req, b'\x01\x00\x00\x09\x12\x07\n\x05sleep')
+            date_req = await reader.readexactly(14)
+            self.assertEqual(date_req,
+                             b'\x01\x00\x00\x0a\x12\x08\n\x04date\x10\x01')
+
+            # Late responses to the cancelled request are discarded.
+            writer.write(b'\x02\x00\x00\x08\x12\x06\n\x04late')
+            writer.write(b'\x02\x00\x00\x02\x12\x00')
+            writer.write(b'\x02\x00\x00\x0a\x12\x08\n\x042020\x18\x01')
+            writer.write(b'\x02\x00\x00\x04\x12\x02\x18\x01')
+
+            writer.close()
+
+        listener = await asyncio.start_server(on_client_connected, 'localhost', 0)
+
+        async def client_main():
+            client = await self.start_client(listener)
+
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(client.execute_command('sleep'), 0.1)
+
+            self.assertEqual(await client.execute_command('date'), b'2020')
+
+            client.stop()
+            listener.close()
+
+        await asyncio.wait_for(
+            asyncio.gather(server_main(listener), client_main()), 2)
+
+    def test_concurrent_requests(self):
+        asyncio.run(self.concurrent_requests())
+
+    async def concurrent_requests(self):
+        async def on_client_connected(reader, writer):
+            await self.connect_req_rsp(reader, writer)
+            date_req = await reader.readexactly(12)
+            self.assertEqual(date_req, b'\x01\x00\x00\x08\x12\x06\n\x04date')
+            get_req = await reader.readexactly(15)
+            self.assertEqual(get_req, b'\x01\x00\x00\x0b\x1a\t\n\x05/init \x01')
+
+            # Responses to the second request before the first.
+            writer.write(b'\x02\x00\x00\x0c"\n\x08\x04\x12\x041234 \x01')
+            writer.write(b'\x02\x00\x00\x08\x12\x06\n\x042020')
+            writer.write(b'\x02\x00\x00\x02\x12\x00')
+            req = await reader.readexactly(10)
+            self.assertEqual(req, b'\x01\x00\x00\x06\x1a\x04\x18\x01 \x01')
+            writer.write(b'\x02\x00\x00\x04"\x02 \x01')
+
+            writer.close()
+
+        listener = await asyncio.start_server(on_client_connected, 'localhost', 0)
+
+        async def client_main():
+            client = await self.start_client(listener)
+
+            output, _ = await asyncio.gather(
+                client.execute_command('date'),
+                client.get_file('/init', 'get.txt'))
+            self.assertEqual(output, b'2020')
+
+            with open('get.txt', 'rb') as fin:
+                self.assertEqual(fin.read(), b'1234')
+
+            client.stop()
+            listener.close()
+
+        await asyncio.wait_for(
+            asyncio.gather(server_main(listener), client_main()), 2)
+
     def test_log_entry(self):
         asyncio.run(self.log_entry())
 
@@ -181,6 +310,234 @@ class ClientTest(unittest.TestCase):
         await asyncio.wait_for(
             asyncio.gather(server_main(listener), client_main()), 2)
 
+    def test_get_file_targets(self):
+        asyncio.run(self.get_file_targets())
+
+    async def get_file_targets(self):
+        async def on_client_connected(reader, writer):
+            await self.connect_req_rsp(reader, writer)
+
+            # Remote file sizes 8, 8, 8, 4 and 12 bytes, in requests 0
+            # to 4. Request identifier 0 is not encoded.
+            sizes = [b'\x08', b'\x08', b'\x08', b'\x04', b'\x0c']
+
+            for request_id, size in enumerate(sizes):
+                if request_id == 0:
+                    field = b''
+                else:
+                    field = b' ' + bytes([request_id])
+
+                n = len(field)
+                req = await reader.readexactly(13 + n)
+                self.assertEqual(req,
+                                 b'\x01\x00\x00' + bytes([9 + n])
+                                 + b'\x1a' + bytes([7 + n])
+                                 + b'\n\x05/init' + field)
+                writer.write(b'\x02\x00\x00' + bytes([10 + n])
+                             + b'"' + bytes([8 + n])
+                             + b'\x08' + size + b'\x12\x041234' + field)
+                ack = (b'\x01\x00\x00' + bytes([4 + n])
+                       + b'\x1a' + bytes([2 + n]) + b'\x18\x01' + field)
+                req = await reader.readexactly(8 + n)
+                self.assertEqual(req, ack)
+                writer.write(b'\x02\x00\x00' + bytes([8 + n])
+                             + b'"' + bytes([6 + n])
+                             + b'\x12\x045678' + field)
+                req = await reader.readexactly(8 + n)
+                self.assertEqual(req, ack)
+                writer.write(b'\x02\x00\x00' + bytes([2 + n])
+                             + b'"' + bytes([n]) + field)
+
+            writer.close()
+
+        listener = await asyncio.start_server(on_client_connected, 'localhost', 0)
+
+        async def client_main():
+            client = await self.start_client(listener)
+
+            # Into memory.
+            self.assertEqual(await client.get_file('/init'), b'12345678')
+
+            # Into a stream.
+            fout = BytesIO()
+            self.assertIsNone(await client.get_file('/init', fout))
+            self.assertEqual(fout.getvalue(), b'12345678')
+
+            # Into a preallocated memory mapped file, also when the
+            # remote file grows or shrinks during the transfer.
+            for _ in range(3):
+                await client.get_file('/init', 'get.txt', preallocate=True)
+
+                with open('get.txt', 'rb') as fin:
+                    self.assertEqual(fin.read(), b'12345678')
+
+            client.stop()
+            listener.close()
+
+        await asyncio.wait_for(
+            asyncio.gather(server_main(listener), client_main()), 2)
+
+    def test_get_file_window(self):
+        asyncio.run(self.get_file_window())
+
+    async def get_file_window(self):
+        async def on_client_connected(reader, writer):
+            await self.connect_req_rsp(reader, writer)
+
+            # Open.
+            req = await reader.readexactly(15)
+            self.assertEqual(req, b'\x01\x00\x00\x0b\x1a\t\n\x05/init\x10\x04')
+            writer.write(b'\x02\x00\x00\n"\x08\x08\x0c\x12\x041234')
+            writer.write(b'\x02\x00\x00\x08"\x06\x12\x045678')
+
+            # Cumulative acknowledge of two messages.
+            req = await reader.readexactly(8)
+            self.assertEqual(req, b'\x01\x00\x00\x04\x1a\x02\x18\x02')
+            writer.write(b'\x02\x00\x00\x08"\x06\x12\x049012')
+
+            # Acknowledge of the last message after a delay.
+            req = await reader.readexactly(8)
+            self.assertEqual(req, b'\x01\x00\x00\x04\x1a\x02\x18\x01')
+
+            # Close.
+            writer.write(b'\x02\x00\x00\x02"\x00')
+
+            writer.close()
+
+        listener = await asyncio.start_server(on_client_connected, 'localhost', 0)
+
+        async def client_main():
+            client = await self.start_client(listener)
+
+            await client.get_file('/init', 'get.txt', window_size=4)
+
+            with open('get.txt', 'rb') as fin:
+                self.assertEqual(fin.read(), b'123456789012')
+
+            client.stop()
+            listener.close()
+
+        await asyncio.wait_for(
+            asyncio.gather(server_main(listener), client_main()), 2)
+
+    def test_get_file_resume(self):
+        asyncio.run(self.get_file_resume())
+
+    async def get_file_resume(self):
+        connections = []
+
+        async def on_client_connected(reader, writer):
+            connections.append(writer)
+            await self.connect_req_rsp(reader, writer)
+
+            if len(connections) == 1:
+                # Open and connection lost after the first data.
+                req = await reader.readexactly(13)
+                self.assertEqual(req, b'\x01\x00\x00\x09\x1a\x07\n\x05/init')
+                writer.write(b'\x02\x00\x00\x0a"\x08\x08\x08\x12\x041234')
+                req = await reader.readexactly(8)
+                self.assertEqual(req, b'\x01\x00\x00\x04\x1a\x02\x18\x01')
+            else:
+                # Resumed at offset 4, in the same request.
+                req = await reader.readexactly(15)
+                self.assertEqual(req,
+                                 b'\x01\x00\x00\x0b\x1a\t\n\x05/init(\x04')
+                writer.write(b'\x02\x00\x00\x0a"\x08\x08\x08\x12\x045678')
+                req = await reader.readexactly(8)
+                self.assertEqual(req, b'\x01\x00\x00\x04\x1a\x02\x18\x01')
+                writer.write(b'\x02\x00\x00\x02"\x00')
+
+                # Four bytes at offset 2, in request 1.
+                req = await reader.readexactly(19)
+                self.assertEqual(
+                    req,
+                    b'\x01\x00\x00\x0f\x1a\x0d\n\x05/init \x01(\x020\x04')
+                writer.write(
+                    b'\x02\x00\x00\x0c"\x0a\x08\x08\x12\x043456 \x01')
+                req = await reader.readexactly(10)
+                self.assertEqual(req,
+                                 b'\x01\x00\x00\x06\x1a\x04\x18\x01 \x01')
+                writer.write(b'\x02\x00\x00\x04"\x02 \x01')
+
+            writer.close()
+
+        listener = await asyncio.start_server(on_client_connected, 'localhost', 0)
+
+        async def client_main():
+            client = await self.start_client(listener)
+
+            self.assertEqual(await client.get_file('/init'), b'12345678')
+            self.assertEqual(len(connections), 2)
+            self.assertEqual(await client.get_file('/init', offset=2, length=4),
+                             b'3456')
+
+            client.stop()
+            listener.close()
+
+        await asyncio.wait_for(
+            asyncio.gather(server_main(listener), client_main()), 2)
+
+    def test_put_file_resume(self):
+        asyncio.run(self.put_file_resume())
+
+    async def put_file_resume(self):
+        with open('tests/put.txt', 'rb') as fin:
+            data = fin.read()
+
+        connections = []
+
+        async def on_client_connected(reader, writer):
+            connections.append(writer)
+            await self.connect_req_rsp(reader, writer)
+
+            if len(connections) == 1:
+                # Open and connection lost after the first of three
+                # data messages is acknowledged.
+                req = await reader.readexactly(25)
+                self.assertEqual(
+                    req,
+                    b'\x01\x00\x00\x15"\x13\n\x0eput_remote.txt\x10\x89\x04')
+                writer.write(b'\x02\x00\x00\x06*\x04\x08\n\x18\x01')
+                req = await reader.readexactly(210)
+                self.assertEqual(req[10:], data[:200])
+                writer.write(b'\x02\x00\x00\x04*\x02\x18\x01')
+                await reader.readexactly(210 + 129)
+            else:
+                # Resumed at offset 200.
+                req = await reader.readexactly(28)
+                self.assertEqual(
+                    req,
+                    b'\x01\x00\x00\x18"\x16\n\x0eput_remote.txt\x10\x89\x04'
+                    b'(\xc8\x01')
+                writer.write(b'\x02\x00\x00\x06*\x04\x08\n\x18\x01')
+                req = await reader.readexactly(210)
+                self.assertEqual(req[10:], data[200:400])
+                req = await reader.readexactly(129)
+                self.assertEqual(req[8:], data[400:])
+                writer.write(b'\x02\x00\x00\x04*\x02\x18\x02')
+
+                # Finalize.
+                req = await reader.readexactly(6)
+                self.assertEqual(req, b'\x01\x00\x00\x02"\x00')
+                writer.write(b'\x02\x00\x00\x04*\x02\x18\x01')
+
+            writer.close()
+
+        listener = await asyncio.start_server(on_client_connected, 'localhost', 0)
+
+        async def client_main():
+            client = await self.start_client(listener)
+
+            with open('tests/put.txt', 'rb') as fin:
+                await client.put_file(fin, len(data), 'put_remote.txt')
+
+            self.assertEqual(len(connections), 2)
+            client.stop()
+            listener.close()
+
+        await asyncio.wait_for(
+            asyncio.gather(server_main(listener), client_main()), 2)
+
     def test_put_file(self):
         asyncio.run(self.put_file())
 
@@ -249,6 +606,609 @@ class ClientTest(unittest.TestCase):
         await asyncio.wait_for(
             asyncio.gather(server_main(listener), client_main()), 2)
 
+    def test_put_file_large_messages(self):
+        asyncio.run(self.put_file_large_messages())
+
+    async def put_file_large_messages(self):
+        with open('tests/put.txt', 'rb') as fin:
+            data = fin.read()
+
+        async def on_client_connected(reader, writer):
+            # Maximum message size 1024 bytes.
+            connect_req = await reader.readexactly(12)
+            self.assertEqual(connect_req,
+                             b'\x01\x00\x00\x08\n\x06\x10\x80\x80\x04\x18\x01')
+            writer.write(b'\x02\x00\x00\x07\n\x05\x08\x02\x10\x80\x08')
+
+            # Setup.
+            req = await reader.readexactly(25)
+            self.assertEqual(
+                req,
+                b'\x01\x00\x00\x15"\x13\n\x0eput_remote.txt\x10\x89\x04')
+            writer.write(b'\x02\x00\x00\x06*\x04\x08\n\x18\x01')
+
+            # All data in one message.
+            req = await reader.readexactly(531)
+            self.assertEqual(req,
+                             b'\x01\x00\x02\x0f"\x8c\x04\x1a\x89\x04' + data)
+            writer.write(b'\x02\x00\x00\x04*\x02\x18\x01')
+
+            # Finalize.
+            req = await reader.readexactly(6)
+            self.assertEqual(req, b'\x01\x00\x00\x02"\x00')
+            writer.write(b'\x02\x00\x00\x04*\x02\x18\x01')
+            writer.close()
+
+        listener = await asyncio.start_server(on_client_connected, 'localhost', 0)
+
+        async def client_main():
+            client = await self.start_client(listener)
+
+            with open('tests/put.txt', 'rb') as fin:
+                await client.put_file(fin, len(data), 'put_remote.txt')
+
+            client.stop()
+            listener.close()
+
+        await asyncio.wait_for(
+            asyncio.gather(server_main(listener), client_main()), 2)
+
+    def test_compression(self):
+        asyncio.run(self.compression())
+
+    async def compression(self):
+        output = 100 * b'output '
+        data = 100 * b'data '
+
+        async def read_request(reader):
+            header = await reader.readexactly(4)
+            message = bunga.bunga_pb2.ClientToServer()
+            message.ParseFromString(await reader.readexactly(header[3]))
+
+            return message
+
+        def write_response(writer, message):
+            payload = message.SerializeToString()
+            writer.write(bunga.transport.pack_header(2, len(payload)) + payload)
+
+        async def on_client_connected(reader, writer):
+            connect_req = (await read_request(reader)).connect_req
+            self.assertEqual(connect_req.compressions, 1)
+            message = bunga.bunga_pb2.ServerToClient()
+            message.connect_rsp.maximum_message_size = 216
+            message.connect_rsp.compression = 1
+            write_response(writer, message)
+
+            # Execute command with compressed output.
+            req = (await read_request(reader)).execute_command_req
+            self.assertTrue(req.compressed)
+            compressed = zlib.compress(output)
+
+            for chunk in [compressed[:10], compressed[10:]]:
+                message = bunga.bunga_pb2.ServerToClient()
+                message.execute_command_rsp.output = chunk
+                message.execute_command_rsp.request_id = req.request_id
+                write_response(writer, message)
+
+            message = bunga.bunga_pb2.ServerToClient()
+            message.execute_command_rsp.request_id = req.request_id
+            write_response(writer, message)
+
+            # Get compressed and uncompressed file.
+            for compressed in [True, False]:
+                req = (await read_request(reader)).get_file_req
+                self.assertEqual(req.compressed, compressed)
+
+                if compressed:
+                    chunk = zlib.compress(data)
+                else:
+                    chunk = data
+
+                message = bunga.bunga_pb2.ServerToClient()
+                message.get_file_rsp.size = len(data)
+                message.get_file_rsp.data = chunk
+                message.get_file_rsp.request_id = req.request_id
+                write_response(writer, message)
+                await read_request(reader)
+                message = bunga.bunga_pb2.ServerToClient()
+                message.get_file_rsp.request_id = req.request_id
+                write_response(writer, message)
+
+            # Put compressed file, flushed at the end of each message.
+            req = (await read_request(reader)).put_file_req
+            self.assertTrue(req.compressed)
+            message = bunga.bunga_pb2.ServerToClient()
+            message.put_file_rsp.window_size = 1
+            message.put_file_rsp.request_id = req.request_id
+            write_response(writer, message)
+            decompressor = zlib.decompressobj()
+            received = b''
+
+            while True:
+                req = (await read_request(reader)).put_file_req
+                received += decompressor.decompress(req.data)
+                message = bunga.bunga_pb2.ServerToClient()
+                message.put_file_rsp.acknowledge_count = 1
+                message.put_file_rsp.request_id = req.request_id
+                write_response(writer, message)
+
+                if not req.data:
+                    break
+
+            self.assertEqual(received, 10 * data)
+            writer.close()
+
+        listener = await asyncio.start_server(on_client_connected, 'localhost', 0)
+
+        async def client_main():
+            client = await self.start_client(listener)
+            self.assertTrue(client.is_compressing())
+
+            self.assertEqual(await client.execute_command('cat'), output)
+            self.assertEqual(await client.get_file('/init'), data)
+            self.assertEqual(await client.get_file('/init', compress=False), data)
+            await client.put_file(BytesIO(10 * data), 10 * len(data), '/init')
+
+            client.stop()
+            listener.close()
+
+        await asyncio.wait_for(
+            asyncio.gather(server_main(listener), client_main()), 2)
+
+    def test_put_file_delta(self):
+        asyncio.run(self.put_file_delta())
+
+    async def put_file_delta(self):
+        old = bytes(range(256)) * 8
+        new = old[:700] + b'inserted' + old[700:1800] + old[1900:]
+
+        async def read_request(reader):
+            header = await reader.readexactly(4)
+            message = bunga.bunga_pb2.ClientToServer()
+            message.ParseFromString(await reader.readexactly(header[3]))
+
+            return message
+
+        def write_response(writer, message):
+            payload = message.SerializeToString()
+            writer.write(bunga.transport.pack_header(2, len(payload)) + payload)
+
+        async def find_blocks(reader, writer):
+            req = (await read_request(reader)).find_blocks_req
+            self.assertEqual(req.path, '/data')
+            block_size = req.block_size
+            message = bunga.bunga_pb2.ServerToClient()
+            message.find_blocks_rsp.window_size = 2
+            message.find_blocks_rsp.acknowledge_count = 1
+            message.find_blocks_rsp.request_id = req.request_id
+            write_response(writer, message)
+            checksums = b''
+
+            while True:
+                req = (await read_request(reader)).find_blocks_req
+
+                if not req.checksums:
+                    break
+
+                checksums += req.checksums
+                message = bunga.bunga_pb2.ServerToClient()
+                message.find_blocks_rsp.acknowledge_count = 1
+                message.find_blocks_rsp.request_id = req.request_id
+                write_response(writer, message)
+
+            offsets = []
+
+            for i in range(0, len(checksums), 8):
+                for offset in range(len(old) - block_size + 1):
+                    block = old[offset:offset + block_size]
+
+                    if checksums[i:i + 8] == struct.pack('>II',
+                                                         zlib.adler32(block),
+                                                         zlib.crc32(block)):
+                        break
+                else:
+                    offset = 0xffffffffffffffff
+
+                offsets.append(struct.pack('>Q', offset))
+
+            for i in range(0, len(offsets), 20):
+                message = bunga.bunga_pb2.ServerToClient()
+                message.find_blocks_rsp.offsets = b''.join(offsets[i:i + 20])
+                message.find_blocks_rsp.request_id = req.request_id
+                write_response(writer, message)
+
+            message = bunga.bunga_pb2.ServerToClient()
+            message.find_blocks_rsp.acknowledge_count = 1
+            message.find_blocks_rsp.request_id = req.request_id
+            write_response(writer, message)
+
+        async def on_client_connected(reader, writer):
+            await self.connect_req_rsp(reader, writer)
+            await find_blocks(reader, writer)
+
+            # Put data and copies of found blocks.
+            req = (await read_request(reader)).put_file_req
+            self.assertTrue(req.delta)
+            message = bunga.bunga_pb2.ServerToClient()
+            message.put_file_rsp.window_size = 1
+            message.put_file_rsp.acknowledge_count = 1
+            message.put_file_rsp.request_id = req.request_id
+            write_response(writer, message)
+            received = b''
+
+            while True:
+                req = (await read_request(reader)).put_file_req
+
+                if req.copy_size > 0:
+                    received += old[req.copy_offset:req.copy_offset + req.copy_size]
+                else:
+                    received += req.data
+
+                message = bunga.bunga_pb2.ServerToClient()
+                message.put_file_rsp.acknowledge_count = 1
+                message.put_file_rsp.request_id = req.request_id
+                write_response(writer, message)
+
+                if not req.data and req.copy_size == 0:
+                    break
+
+            self.assertEqual(received, new)
+
+            # The file does not exist, so all of it is put.
+            req = (await read_request(reader)).find_blocks_req
+            message = bunga.bunga_pb2.ServerToClient()
+            message.find_blocks_rsp.acknowledge_count = 1
+            message.find_blocks_rsp.error = 'Open failed.'
+            message.find_blocks_rsp.request_id = req.request_id
+            write_response(writer, message)
+            req = (await read_request(reader)).put_file_req
+            self.assertFalse(req.delta)
+            message = bunga.bunga_pb2.ServerToClient()
+            message.put_file_rsp.window_size = 1
+            message.put_file_rsp.acknowledge_count = 1
+            message.put_file_rsp.request_id = req.request_id
+            write_response(writer, message)
+
+            while True:
+                req = (await read_request(reader)).put_file_req
+                message = bunga.bunga_pb2.ServerToClient()
+                message.put_file_rsp.acknowledge_count = 1
+                message.put_file_rsp.request_id = req.request_id
+                write_response(writer, message)
+
+                if not req.data:
+                    break
+
+            writer.close()
+
+        listener = await asyncio.start_server(on_client_connected, 'localhost', 0)
+
+        async def client_main():
+            client = await self.start_client(listener)
+
+            size = await client.put_file_delta(BytesIO(new),
+                                               len(new),
+                                               '/data',
+                                               block_size=16)
+            self.assertLess(size, 200)
+            size = await client.put_file_delta(BytesIO(new), len(new), '/new')
+            self.assertEqual(size, len(new))
+
+            client.stop()
+            listener.close()
+
+        await asyncio.wait_for(
+            asyncio.gather(server_main(listener), client_main()), 2)
+
+    def test_get_tree_and_put_tree(self):
+        asyncio.run(self.get_tree_and_put_tree())
+
+    async def get_tree_and_put_tree(self):
+        remote_files = {
+            '/logs/a.txt': (b'a' * 300, 1000),
+            '/logs/sub/b.txt': (b'b', 2000),
+            '/logs/c.txt': (b'', 3000)
+        }
+        puts = {}
+        gets = set()
+        max_gets = 0
+
+        async def read_request(reader):
+            header = await reader.readexactly(4)
+            message = bunga.bunga_pb2.ClientToServer()
+            message.ParseFromString(await reader.readexactly(header[3]))
+
+            return message
+
+        def write_response(writer, message):
+            payload = message.SerializeToString()
+            writer.write(bunga.transport.pack_header(2, len(payload)) + payload)
+
+        def list_files(writer, req):
+            message = bunga.bunga_pb2.ServerToClient()
+            rsp = message.list_files_rsp
+            rsp.request_id = req.request_id
+            prefix = req.path + '/'
+
+            for path, (data, mtime) in remote_files.items():
+                if path.startswith(prefix):
+                    rsp.paths.append(path[len(prefix):])
+                    rsp.sizes.append(len(data))
+                    rsp.mtimes.append(mtime)
+
+            if rsp.paths:
+                write_response(writer, message)
+                message = bunga.bunga_pb2.ServerToClient()
+                message.list_files_rsp.request_id = req.request_id
+            else:
+                message.list_files_rsp.error = 'No such file or directory'
+
+            write_response(writer, message)
+
+        def get_file(writer, req):
+            nonlocal max_gets
+
+            message = bunga.bunga_pb2.ServerToClient()
+            message.get_file_rsp.request_id = req.request_id
+
+            if req.path:
+                data = remote_files[req.path][0]
+                message.get_file_rsp.size = len(data)
+                message.get_file_rsp.data = data
+
+                if data:
+                    gets.add(req.request_id)
+                    max_gets = max(len(gets), max_gets)
+            else:
+                gets.remove(req.request_id)
+
+            write_response(writer, message)
+
+        def put_file(writer, req):
+            message = bunga.bunga_pb2.ServerToClient()
+            message.put_file_rsp.request_id = req.request_id
+            message.put_file_rsp.acknowledge_count = 1
+
+            if req.path:
+                self.assertTrue(req.create_directories)
+                puts[req.request_id] = (req.path, req.mtime, b'')
+                message.put_file_rsp.window_size = 10
+            elif req.data:
+                path, mtime, data = puts[req.request_id]
+                puts[req.request_id] = (path, mtime, data + req.data)
+            else:
+                path, mtime, data = puts.pop(req.request_id)
+                remote_files[path] = (data, mtime)
+
+            write_response(writer, message)
+
+        async def on_client_connected(reader, writer):
+            await self.connect_req_rsp(reader, writer)
+
+            while True:
+                try:
+                    message = await read_request(reader)
+                except asyncio.IncompleteReadError:
+                    break
+
+                choice = message.WhichOneof('messages')
+
+                if choice == 'list_files_req':
+                    list_files(writer, message.list_files_req)
+                elif choice == 'get_file_req':
+                    get_file(writer, message.get_file_req)
+                elif choice == 'put_file_req':
+                    put_file(writer, message.put_file_req)
+
+            writer.close()
+
+        listener = await asyncio.start_server(on_client_connected, 'localhost', 0)
+
+        async def client_main():
+            client = await self.start_client(listener)
+
+            with tempfile.TemporaryDirectory() as tmpdir:
+                local_path = os.path.join(tmpdir, 'logs')
+
+                # Get all files, with all transfers in flight at once.
+                paths = await client.get_tree('/logs', local_path)
+                self.assertEqual(sorted(paths),
+                                 ['a.txt', 'c.txt', 'sub/b.txt'])
+                self.assertEqual(max_gets, 2)
+
+                with open(os.path.join(local_path, 'sub', 'b.txt'), 'rb') as fin:
+                    self.assertEqual(fin.read(), b'b')
+
+                self.assertEqual(
+                    os.stat(os.path.join(local_path, 'a.txt')).st_mtime,
+                    1000)
+
+                # Nothing has changed.
+                self.assertEqual(await client.get_tree('/logs', local_path), [])
+
+                # Put all files in a new directory, and then nothing.
+                paths = await client.put_tree(local_path, '/copy')
+                self.assertEqual(sorted(paths),
+                                 ['a.txt', 'c.txt', 'sub/b.txt'])
+                self.assertEqual(remote_files['/copy/a.txt'], (b'a' * 300, 1000))
+                self.assertEqual(remote_files['/copy/sub/b.txt'], (b'b', 2000))
+                self.assertEqual(await client.put_tree(local_path, '/copy'), [])
+
+            client.stop()
+            listener.close()
+
+        await asyncio.wait_for(
+            asyncio.gather(server_main(listener), client_main()), 2)
+
+    def test_checksum(self):
+        asyncio.run(self.checksum())
+
+    async def checksum(self):
+        data = 100 * b'data '
+
+        async def read_request(reader):
+            header = await reader.readexactly(4)
+            message = bunga.bunga_pb2.ClientToServer()
+            message.ParseFromString(await reader.readexactly(header[3]))
+
+            return message
+
+        def write_response(writer, message):
+            payload = message.SerializeToString()
+            writer.write(bunga.transport.pack_header(2, len(payload)) + payload)
+
+        async def on_client_connected(reader, writer):
+            await self.connect_req_rsp(reader, writer)
+
+            # Get file with correct and wrong checksum.
+            for crc in [zlib.crc32(data), 0]:
+                req = (await read_request(reader)).get_file_req
+                self.assertTrue(req.checksum)
+                message = bunga.bunga_pb2.ServerToClient()
+                message.get_file_rsp.size = len(data)
+                message.get_file_rsp.data = data
+                message.get_file_rsp.request_id = req.request_id
+                write_response(writer, message)
+                await read_request(reader)
+                message = bunga.bunga_pb2.ServerToClient()
+                message.get_file_rsp.crc32 = crc
+                message.get_file_rsp.request_id = req.request_id
+                write_response(writer, message)
+
+            # Put file with checksum in the last message.
+            req = (await read_request(reader)).put_file_req
+            self.assertTrue(req.checksum)
+            message = bunga.bunga_pb2.ServerToClient()
+            message.put_file_rsp.window_size = 10
+            message.put_file_rsp.request_id = req.request_id
+            write_response(writer, message)
+            received = b''
+
+            while True:
+                req = (await read_request(reader)).put_file_req
+                received += req.data
+                message = bunga.bunga_pb2.ServerToClient()
+                message.put_file_rsp.acknowledge_count = 1
+                message.put_file_rsp.request_id = req.request_id
+                write_response(writer, message)
+
+                if not req.data:
+                    break
+
+            self.assertEqual(req.crc32, zlib.crc32(received))
+            writer.close()
+
+        listener = await asyncio.start_server(on_client_connected, 'localhost', 0)
+
+        async def client_main():
+            client = await self.start_client(listener)
+
+            self.assertEqual(await client.get_file('/init', verify=True), data)
+
+            with self.assertRaises(bunga.client.GetFileError) as cm:
+                await client.get_file('/init', verify=True)
+
+            self.assertEqual(cm.exception.error, 'Checksum mismatch.')
+            await client.put_file(BytesIO(data), len(data), '/init', verify=True)
+
+            client.stop()
+            listener.close()
+
+        await asyncio.wait_for(
+            asyncio.gather(server_main(listener), client_main()), 2)
+
+    def test_frame_protocol(self):
+        asyncio.run(self.frame_protocol())
+
+    async def frame_protocol(self):
+        protocol = bunga.transport.FrameProtocol(buffer_size=8)
+        protocol.connection_made(None)
+
+        def receive(data):
+            while data:
+                buffer = protocol.get_buffer(-1)
+                size = min(len(buffer), len(data))
+                buffer[:size] = data[:size]
+                protocol.buffer_updated(size)
+                data = data[size:]
+
+        # Two complete frames and the start of a third, larger than
+        # the initial buffer.
+        receive(b'\x04\x00\x00\x00\x02\x00\x00\x02\x12\x00\x02\x00\x00\x0c"\n')
+        self.assertEqual(await protocol.read_frames(),
+                         [(4, b''), (2, b'\x12\x00')])
+
+        receive(b'\x08\x04\x12\x041234 \x01\x03\x00')
+        self.assertEqual(await protocol.read_frames(),
+                         [(2, b'"\n\x08\x04\x12\x041234 \x01')])
+
+        receive(b'\x00\x00')
+        protocol.connection_lost(None)
+        self.assertEqual(await protocol.read_frames(), [(3, b'')])
+
+        with self.assertRaises(ConnectionResetError):
+            await protocol.read_frames()
+
+        # The connection is aborted instead of growing the buffer for
+        # frames larger than the maximum size.
+        protocol = bunga.transport.FrameProtocol(maximum_size=16,
+                                                    buffer_size=8)
+        transport = Mock()
+        protocol.connection_made(transport)
+        receive(b'\x02\x00\x00\x02\x12\x00\x02\xff\xff\xff')
+        transport.abort.assert_called_once_with()
+        self.assertLessEqual(len(protocol.get_buffer(-1)), 8)
+        protocol.connection_lost(None)
+        self.assertEqual(await protocol.read_frames(), [(2, b'\x12\x00')])
+
+        with self.assertRaises(ConnectionAbortedError):
+            await protocol.read_frames()
+
+    def test_round_trip_time(self):
+        rtt = bunga.transport.RoundTripTime()
+        self.assertEqual(rtt.timeout(2), 2)
+
+        rtt.update(1.0)
+        self.assertEqual((rtt.samples, rtt.latest, rtt.minimum), (1, 1.0, 1.0))
+        self.assertEqual((rtt.smoothed, rtt.variation), (1.0, 0.5))
+        self.assertEqual(rtt.timeout(2), 3.0)
+
+        rtt.update(0.2)
+        self.assertEqual((rtt.samples, rtt.latest, rtt.minimum), (2, 0.2, 0.2))
+        self.assertAlmostEqual(rtt.smoothed, 0.9)
+        self.assertAlmostEqual(rtt.variation, 0.575)
+        self.assertAlmostEqual(rtt.timeout(2), 3.2)
+        self.assertEqual(rtt.timeout(5), 5)
+
+    def test_send_coalescing(self):
+        asyncio.run(self.send_coalescing())
+
+    async def send_coalescing(self):
+        client = bunga.bunga_client.BungaClient('tcp://localhost:0')
+        client._transport = Mock()
+
+        for command in ['date', 'ls']:
+            message = client.init_execute_command_req()
+            message.command = command
+            client.send()
+
+        client._transport.writelines.assert_not_called()
+        await asyncio.sleep(0)
+        client._transport.writelines.assert_called_once_with([
+            b'\x01\x00\x00\x08', b'\x12\x06\n\x04date',
+            b'\x01\x00\x00\x06', b'\x12\x04\n\x02ls'
+        ])
+
+        # Explicit flush.
+        client.init_put_file_req()
+        client.send()
+        client.flush()
+        client._transport.writelines.assert_called_with([
+            b'\x01\x00\x00\x02', b'"\x00'
+        ])
+        await asyncio.sleep(0)
+        self.assertEqual(client._transport.writelines.call_count, 2)
+
     def test_print_log_entry(self):
         stdout = StringIO()
 
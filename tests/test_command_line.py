@@ -4,9 +4,14 @@ import socket
 import bunga
 import bunga.subparsers.shell
 import os
+import json
 import unittest
 from unittest.mock import patch
 from io import StringIO
+from io import BytesIO
+from io import TextIOWrapper
+
+from bunga.server import ServerThread
 
 from .utils import start_server
 
@@ -14,8 +19,9 @@ from .utils import start_server
 class CommandLineTest(unittest.TestCase):
 
     def connect_req_rsp(self, client):
-        connect_req = client.recv(6)
-        self.assertEqual(connect_req, b'\x01\x00\x00\x02\n\x00')
+        connect_req = client.recv(12)
+        self.assertEqual(connect_req,
+                         b'\x01\x00\x00\x08\n\x06\x10\x80\x80\x04\x18\x01')
         client.sendall(b'\x02\x00\x00\x07\n\x05\x08\x02\x10\xd8\x01')
 
     def shell_handler(self, client):
@@ -23,10 +29,10 @@ class CommandLineTest(unittest.TestCase):
         req = client.recv(10)
         self.assertEqual(req, b'\x01\x00\x00\x06\x12\x04\n\x02ko')
         client.sendall(b'\x02\x00\x00\x0d\x12\x0b\x12\tNot found')
-        req = client.recv(10)
-        self.assertEqual(req, b'\x01\x00\x00\x06\x12\x04\n\x02ls')
-        client.sendall(b'\x02\x00\x00\x0f\x12\r\n\x0bfoo bar fie')
-        client.sendall(b'\x02\x00\x00\x02\x12\x00')
+        req = client.recv(12)
+        self.assertEqual(req, b'\x01\x00\x00\x08\x12\x06\n\x02ls\x10\x01')
+        client.sendall(b'\x02\x00\x00\x11\x12\x0f\n\x0bfoo bar fie\x18\x01')
+        client.sendall(b'\x02\x00\x00\x04\x12\x02\x18\x01')
         client.close()
 
     def test_shell(self):
@@ -51,6 +57,32 @@ class CommandLineTest(unittest.TestCase):
         server.join()
         self.assertIsNone(server.exception)
 
+    def execute_handler(self, client):
+        self.connect_req_rsp(client)
+        req = client.recv(10)
+        self.assertEqual(req, b'\x01\x00\x00\x06\x12\x04\n\x02ls')
+        client.sendall(b'\x02\x00\x00\x07\x12\x05\n\x03foo')
+        client.sendall(b'\x02\x00\x00\x07\x12\x05\n\x03bar')
+        client.sendall(b'\x02\x00\x00\x02\x12\x00')
+        client.close()
+
+    def test_execute(self):
+        server, port = start_server(self.execute_handler)
+        argv = [
+            'bunga', 'execute',
+            '--uri', f'tcp://localhost:{port}',
+            'ls'
+        ]
+        stdout = TextIOWrapper(BytesIO())
+
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', stdout):
+                bunga.main()
+
+        self.assertEqual(stdout.buffer.getvalue(), b'foobar')
+        server.join()
+        self.assertIsNone(server.exception)
+
     def get_file_handler(self, client):
         self.connect_req_rsp(client)
 
@@ -198,3 +230,145 @@ class CommandLineTest(unittest.TestCase):
 
         server.join()
         self.assertIsNone(server.exception)
+
+    def fleet_execute_handler(self, client):
+        self.connect_req_rsp(client)
+        req = client.recv(10)
+        self.assertEqual(req, b'\x01\x00\x00\x06\x12\x04\n\x02ls')
+        client.sendall(b'\x02\x00\x00\x0f\x12\r\n\x0bfoo bar fie')
+        client.sendall(b'\x02\x00\x00\x02\x12\x00')
+        client.close()
+
+    def test_fleet_execute(self):
+        server_1, port_1 = start_server(self.fleet_execute_handler)
+        server_2, port_2 = start_server(self.fleet_execute_handler)
+        argv = [
+            'bunga', 'fleet_execute',
+            '--uri', f'tcp://localhost:{port_1}',
+            '--uri', f'tcp://localhost:{port_2}',
+            'ls'
+        ]
+        stdout = StringIO()
+
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', stdout):
+                bunga.main()
+
+        self.assertIn(f'tcp://localhost:{port_1}: foo bar fie\n', stdout.getvalue())
+        self.assertIn(f'tcp://localhost:{port_2}: foo bar fie\n', stdout.getvalue())
+
+        server_1.join()
+        self.assertIsNone(server_1.exception)
+        server_2.join()
+        self.assertIsNone(server_2.exception)
+
+    def test_bench(self):
+        argv = [
+            'bunga', 'bench',
+            '--iterations', '10',
+            '--size', '100000',
+            '--message-size', '4096',
+            '--message-size', '65536',
+            '--window-size', '10',
+            '--log-entries', '100',
+            '--startup-iterations', '1',
+            '--proc-parse-iterations', '2',
+            '--json'
+        ]
+        stdout = StringIO()
+
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', stdout):
+                bunga.main()
+
+        results = json.loads(stdout.getvalue())
+        self.assertEqual(results['execute_command']['iterations'], 10)
+        self.assertEqual(sorted(results['execute_command']['latency_us']),
+                         ['max', 'mean', 'min', 'p50', 'p90', 'p99'])
+
+        for operation in ['put_file', 'get_file']:
+            self.assertEqual(
+                [(result['maximum_message_size'], result['window_size'])
+                 for result in results[operation]],
+                [(4096, 10), (65536, 10)])
+
+        self.assertEqual(results['log_entry_ind']['count'], 100)
+        self.assertEqual(results['startup']['iterations'], 1)
+        self.assertIn('agent_time_ms', results['startup'])
+        self.assertEqual([result['file'] for result in results['proc_parse']],
+                         [
+                             '/proc/stat',
+                             '/proc/<pid>/stat',
+                             '/proc/meminfo',
+                             '/proc/net/dev',
+                             '/proc/diskstats',
+                             '/proc/loadavg'
+                         ])
+        self.assertEqual(results['proc_parse'][0]['iterations'], 2)
+
+    def test_top(self):
+        server = ServerThread('/', 65536, 10)
+        server.start()
+        argv = [
+            'bunga', 'top',
+            '--uri', server.uri,
+            '--pid', str(os.getpid()),
+            '--interval', '0.1',
+            '--iterations', '2',
+            '--json'
+        ]
+        stdout = StringIO()
+
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', stdout):
+                bunga.main()
+
+        server.stop()
+        samples = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(len(samples), 2)
+        self.assertEqual(samples[0][-1]['name'], 'idle')
+        self.assertIsNone(samples[0][-1]['cpu'])
+        self.assertIsNotNone(samples[1][-1]['cpu'])
+        self.assertIn(str(threading.get_native_id()),
+                      [row['pid'] for row in samples[1]])
+
+    def test_netstat(self):
+        server = ServerThread('/', 65536, 10)
+        server.start()
+        port = int(server.uri.split(':')[-1])
+        argv = [
+            'bunga', 'netstat',
+            '--uri', server.uri,
+            '--protocol', 'tcp',
+            '--protocol', 'tcp6',
+            '--state', 'listen',
+            '--port', str(port),
+            '--json'
+        ]
+        stdout = StringIO()
+
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', stdout):
+                bunga.main()
+
+        server.stop()
+        sockets = json.loads(stdout.getvalue())
+        self.assertEqual(len(sockets), 1)
+        self.assertEqual(sockets[0]['protocol'], 'tcp')
+        self.assertEqual(sockets[0]['local_address'], '127.0.0.1')
+        self.assertEqual(sockets[0]['local_port'], port)
+        self.assertEqual(sockets[0]['state'], 'listen')
+        self.assertGreater(sockets[0]['inode'], 0)
+
+    def test_find_subcommand(self):
+        datas = [
+            (['execute', 'ls'], 'execute'),
+            (['-d', '-l', 'info', 'get_file', '-u', 'x', 'a'], 'get_file'),
+            (['--log-level', 'debug', 'fleet-execute'], 'fleet-execute'),
+            (['--log-level=debug', 'log'], 'log'),
+            (['--help'], None),
+            ([], None)
+        ]
+
+        for argv, subcommand in datas:
+            self.assertEqual(bunga.find_subcommand(argv), subcommand)
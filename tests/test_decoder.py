@@ -0,0 +1,140 @@
+import os
+import asyncio
+import unittest
+import tempfile
+from unittest.mock import patch
+
+import bunga
+from bunga import bunga_pb2
+from bunga.decoder import decode_server_to_client
+
+
+def encode(**kwargs):
+    message = bunga_pb2.ServerToClient()
+
+    for choice, fields in kwargs.items():
+        sub_message = getattr(message, choice)
+        sub_message.SetInParent()
+
+        for name, value in fields.items():
+            if isinstance(value, list):
+                getattr(sub_message, name).extend(value)
+            else:
+                setattr(sub_message, name, value)
+
+    return message.SerializeToString()
+
+
+class DecoderTest(unittest.TestCase):
+
+    def assert_decoded(self, payload, fields):
+        message = bunga_pb2.ServerToClient()
+        message.ParseFromString(payload)
+        expected_choice = message.WhichOneof('messages')
+        expected = getattr(message, expected_choice)
+        choice, decoded = decode_server_to_client(payload)
+        self.assertEqual(choice, expected_choice)
+
+        for name in fields:
+            if name == 'text':
+                self.assertEqual(decoded.text, list(expected.text))
+            else:
+                self.assertEqual(getattr(decoded, name), getattr(expected, name))
+
+    def test_get_file_rsp(self):
+        fields = ['size', 'data', 'error', 'request_id', 'crc32']
+        datas = [
+            {},
+            {'size': 2 ** 40, 'request_id': 1},
+            {'data': 448 * b'\xa5', 'request_id': 300},
+            {'data': 65000 * b'x', 'request_id': 2 ** 32 - 1},
+            {'error': 'No such file or directory', 'crc32': 0xdeadbeef}
+        ]
+
+        for data in datas:
+            self.assert_decoded(encode(get_file_rsp=data), fields)
+
+        _, decoded = decode_server_to_client(encode(get_file_rsp={'data': b'ab'}))
+        self.assertIsInstance(decoded.data, memoryview)
+
+    def test_execute_command_rsp(self):
+        fields = ['output', 'error', 'request_id']
+        datas = [
+            {},
+            {'output': b'foo bar fie', 'request_id': 7},
+            {'error': 'Not found'},
+            {'output': 1000 * b'\x00'}
+        ]
+
+        for data in datas:
+            self.assert_decoded(encode(execute_command_rsp=data), fields)
+
+    def test_log_entry_ind(self):
+        datas = [
+            {},
+            {'text': ['[    1.000000] ', 'Hello!']},
+            {'text': ['åäö', 200 * 'a']}
+        ]
+
+        for data in datas:
+            self.assert_decoded(encode(log_entry_ind=data), ['text'])
+
+    def test_fallback(self):
+        payloads = [
+            # Other messages.
+            encode(connect_rsp={'keep_alive_timeout': 2}),
+            encode(put_file_rsp={'window_size': 100}),
+            # Unknown field.
+            b'\x22\x02\x30\x01',
+            # A oneof field twice.
+            encode(get_file_rsp={'request_id': 1}) * 2,
+            # Truncated.
+            b'\x22\x04\x12\x05ab',
+            b'\x22',
+            b'',
+            # Invalid UTF-8.
+            b'\x1a\x03\x0a\x01\xff'
+        ]
+
+        for payload in payloads:
+            self.assertEqual(decode_server_to_client(payload), (None, None))
+
+    def test_client(self):
+        asyncio.run(self.client())
+
+    async def client(self):
+        class Client(bunga.Client):
+
+            def __init__(self, uri):
+                super().__init__(uri, asyncio.get_event_loop())
+                self.log_entries = asyncio.Queue()
+
+            async def on_log_entry_ind(self, message):
+                await self.log_entries.put(''.join(message.text))
+
+        data = os.urandom(200000)
+
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, 'file.bin'), 'wb') as fout:
+                fout.write(data)
+
+            server = bunga.Server('tcp://127.0.0.1:0', root=root)
+            await server.start()
+
+            with patch('bunga.bunga_client.is_fast_decoding_enabled',
+                       return_value=True):
+                client = Client(server.uri)
+
+            client.start()
+            await client.wait_for_connection()
+            self.assertEqual(await client.get_file('/file.bin', verify=True),
+                             data)
+            self.assertEqual(await client.execute_command('echo hi'), b'hi\n')
+
+            with self.assertRaises(bunga.ExecuteCommandError):
+                await client.execute_command('missing')
+
+            server.log('Hello!')
+            self.assertTrue((await client.log_entries.get()).endswith('Hello!'))
+            client.stop()
+            await server.stop()
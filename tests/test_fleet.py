@@ -0,0 +1,67 @@
+import asyncio
+import unittest
+
+import bunga
+
+from .utils import create_refused_uri
+from .utils import create_tcp_uri
+
+
+class FleetTest(unittest.TestCase):
+
+    async def connect_req_rsp(self, reader, writer):
+        connect_req = await reader.readexactly(12)
+        self.assertEqual(connect_req,
+                         b'\x01\x00\x00\x08\n\x06\x10\x80\x80\x04\x18\x01')
+        writer.write(b'\x02\x00\x00\x07\n\x05\x08\x02\x10\xd8\x01')
+
+    def test_execute_command(self):
+        asyncio.run(self.execute_command())
+
+    async def execute_command(self):
+        async def on_client_connected(reader, writer):
+            await self.connect_req_rsp(reader, writer)
+            date_req = await reader.readexactly(12)
+            self.assertEqual(date_req, b'\x01\x00\x00\x08\x12\x06\n\x04date')
+            writer.write(b'\x02\x00\x00\x08\x12\x06\n\x042020')
+            writer.write(b'\x02\x00\x00\x02\x12\x00')
+
+        async def on_client_connected_error(reader, writer):
+            await self.connect_req_rsp(reader, writer)
+            await reader.readexactly(12)
+            writer.write(b'\x02\x00\x00\x0d\x12\x0b\x12\tnot found')
+
+        async def on_client_connected_silent(reader, writer):
+            await reader.readexactly(12)
+
+        listeners = [
+            await asyncio.start_server(on_client_connected, 'localhost', 0),
+            await asyncio.start_server(on_client_connected, 'localhost', 0),
+            await asyncio.start_server(on_client_connected_error, 'localhost', 0),
+            await asyncio.start_server(on_client_connected_silent, 'localhost', 0)
+        ]
+        ok_uris = [create_tcp_uri(listener) for listener in listeners[:2]]
+        error_uri = create_tcp_uri(listeners[2])
+        timeout_uri = create_tcp_uri(listeners[3])
+        refused_uri = create_refused_uri()
+        fleet = bunga.Fleet(ok_uris + [error_uri, timeout_uri, refused_uri],
+                            concurrency=2,
+                            timeout=0.5)
+        results = {}
+
+        async for result in fleet.execute_command('date'):
+            results[result.uri] = result
+
+        self.assertEqual(len(results), 5)
+
+        for uri in ok_uris:
+            self.assertEqual(results[uri].value, b'2020')
+            self.assertIsNone(results[uri].error)
+
+        self.assertEqual(results[error_uri].error, 'not found')
+        self.assertEqual(results[timeout_uri].error, 'Timeout.')
+        self.assertIsNotNone(results[refused_uri].error)
+
+        for listener in listeners:
+            listener.close()
+            await listener.wait_closed()
@@ -15,15 +15,117 @@ class LinuxTest(unittest.TestCase):
             '00000000     0        0 0 3 0000000000000000\n'
         )
 
-        formatted = linux.format_netstat(proc_net_tcp)
+        formatted = linux.format_sockets(
+            linux.parse_proc_net_inet('tcp', proc_net_tcp))
 
         self.assertEqual(
             formatted,
-            'PROTO  LOCAL-ADDRESS          REMOTE-ADDRESS         STATE\n'
-            '----------------------------------------------------------------\n'
-            'tcp    0.0.0.0:28000          0.0.0.0:0              listen\n'
-            'tcp    192.168.0.4:50444      192.168.0.3:28000      established\n'
-            'tcp    192.168.0.4:50442      192.168.0.3:28000      time-wait\n')
+            'PROTO  RECV-Q  SEND-Q  LOCAL-ADDRESS      REMOTE-ADDRESS     '
+            'STATE        INODE\n'
+            '---------------------------------------------------------'
+            '-------------------------\n'
+            'tcp    0       0       0.0.0.0:28000      0.0.0.0:0          '
+            'listen       2006\n'
+            'tcp    0       0       192.168.0.4:50444  192.168.0.3:28000  '
+            'established  44434359\n'
+            'tcp    0       0       192.168.0.4:50442  192.168.0.3:28000  '
+            'time-wait    0\n')
+
+    def test_sockets(self):
+        proc_net_tcp = (
+            '  sl  local_address rem_address   st tx_queue rx_queue tr tm->when '
+            'retrnsmt   uid  timeout inode\n'
+            '   0: 00000000:6D60 00000000:0000 0A 00000000:00000000 00:00000000 '
+            '00000000     0        0 2006 1 eee68000 100 0 0 10 0\n'
+            '   7: 0400A8C0:C50C 0300A8C0:6D60 01 0000001A:00000003 00:00000000 '
+            '00000000  1000        0 44434359 1 0000000000000000 20 4 30 4 -1\n'
+        )
+        proc_net_tcp6 = (
+            '  sl  local_address                         remote_address          '
+            '              st tx_queue rx_queue tr tm->when retrnsmt   uid  '
+            'timeout inode\n'
+            '   0: 00000000000000000000000000000000:0016 '
+            '00000000000000000000000000000000:0000 0A 00000000:00000000 '
+            '00:00000000 00000000     0        0 15461 1 0000000000000000 100 0 '
+            '0 10 0\n'
+            '   1: 0000000000000000FFFF00000400A8C0:0016 '
+            '0000000000000000FFFF00000300A8C0:D2F4 01 00000000:00000000 '
+            '02:00093A4F 00000000     0        0 9817 2 0000000000000000 20 4 '
+            '29 10 -1\n'
+            '   2: B80D01200000000000000000FE0100FE:0050 '
+            '00000000000000000000000001000000:0000 0A 00000000:00000000 '
+            '00:00000000 00000000     0        0 9818 1 0000000000000000 100 0 '
+            '0 10 0\n'
+        )
+        proc_net_udp = (
+            '   sl  local_address rem_address   st tx_queue rx_queue tr '
+            'tm->when retrnsmt   uid  timeout inode ref pointer drops\n'
+            '  267: 3500007F:0035 00000000:0000 07 00000000:00000100 00:00000000 '
+            '00000000   101        0 17313 2 0000000000000000 0\n'
+        )
+        proc_net_unix = (
+            'Num       RefCount Protocol Flags    Type St Inode Path\n'
+            '0000000074c3817c: 00000002 00000000 00010000 0001 01  3607 '
+            '/run/my app.sock\n'
+            '000000006e6568a3: 00000003 00000000 00000000 0001 03   659\n'
+            '00000000a1b2c3d4: 00000002 00000000 00000000 0002 01  2001 '
+            '@abstract\n'
+        )
+        sockets = (linux.parse_proc_net('tcp', proc_net_tcp)
+                   + linux.parse_proc_net('tcp6', proc_net_tcp6)
+                   + linux.parse_proc_net('udp', proc_net_udp)
+                   + linux.parse_proc_net('udp6', '')
+                   + linux.parse_proc_net('unix', proc_net_unix))
+
+        self.assertEqual(sockets[1].as_dict(),
+                         {
+                             'protocol': 'tcp',
+                             'local_address': '192.168.0.4',
+                             'local_port': 50444,
+                             'remote_address': '192.168.0.3',
+                             'remote_port': 28000,
+                             'state': 'established',
+                             'send_queue': 26,
+                             'receive_queue': 3,
+                             'inode': 44434359
+                         })
+        self.assertEqual(sockets[3].local_address, '::ffff:192.168.0.4')
+        self.assertEqual(sockets[3].remote_address, '::ffff:192.168.0.3')
+        self.assertEqual(
+            linux.format_sockets(sockets),
+            'PROTO  RECV-Q  SEND-Q  LOCAL-ADDRESS          '
+            'REMOTE-ADDRESS            STATE        INODE\n'
+            '----------------------------------------------'
+            '-----------------------------------------------\n'
+            'tcp    0       0       0.0.0.0:28000          '
+            '0.0.0.0:0                 listen       2006\n'
+            'tcp    3       26      192.168.0.4:50444      '
+            '192.168.0.3:28000         established  44434359\n'
+            'tcp6   0       0       :::22                  '
+            ':::0                      listen       15461\n'
+            'tcp6   0       0       ::ffff:192.168.0.4:22  '
+            '::ffff:192.168.0.3:54004  established  9817\n'
+            'tcp6   0       0       2001:db8::fe00:1fe:80  '
+            '::1:0                     listen       9818\n'
+            'udp    256     0       127.0.0.53:53          '
+            '0.0.0.0:0                 close        17313\n'
+            'unix   -       -       /run/my app.sock       '
+            '-                         listen       3607\n'
+            'unix   -       -                              '
+            '-                         connected    659\n'
+            'unix   -       -       @abstract              '
+            '-                         unconnected  2001\n')
+
+        self.assertEqual(
+            [socket.inode
+             for socket in linux.filter_sockets(sockets, states=['listen'])],
+            [2006, 15461, 9818, 3607])
+        self.assertEqual(
+            [socket.inode
+             for socket in linux.filter_sockets(sockets,
+                                                protocols=['tcp', 'tcp6'],
+                                                port=22)],
+            [15461, 9817])
 
     def test_uptime(self):
         formatted = linux.format_uptime('19747.42 19696.08\n',
@@ -82,3 +184,60 @@ class LinuxTest(unittest.TestCase):
             'ml_worker_pool     36   sleeping  358        0\n'
             'ml_shell           42   sleeping  0          -\n'
             'idle               -    -         178717     1000\n')
+
+    def test_top(self):
+        top = linux.Top(cpus=2)
+        rows = top.update(
+            'cpu  4812 0 859 177717 0 0 97 0 0 0',
+            [
+                '49 (bunga_server) S 0 0 0 0 -1 4194368 735 0 0 0 74 241 0 0 20 0 '
+                '9 0 248 5316608 930 4294967295 65536 923972 3196878608 0 0 0 0 0 '
+                '0 1 0 0 -1 0 0 0 0 0 0 991224 991996 1011712 3196878814 3196878820 '
+                '3196878820 3196878838 0',
+                '36 (ml worker (1)) S 0 0 0 0 -1 1077936192 2080 0 0 0 334 24 0 0 '
+                '20 0 9 0 29 5316608 930 4294967295 65536 923972 3196878608 0 0 0 0 '
+                '0 0 1 0 0 -1 0 0 0 0 0 0 991224 991996 1011712 3196878814 3196878820 '
+                '3196878820 3196878838 0'
+            ])
+
+        self.assertEqual([(row.name, row.pid, row.ticks, row.cpu) for row in rows],
+                         [
+                             ('ml worker (1)', '36', 358, None),
+                             ('bunga_server', '49', 315, None),
+                             ('idle', '-', 177717, None)
+                         ])
+
+        rows = top.update(
+            'cpu  4837 0 859 177892 0 0 97 0 0 0',
+            [
+                '49 (bunga_server) R 0 0 0 0 -1 4194368 735 0 0 0 88 251 0 0 20 0 '
+                '9 0 248 5316608 930 4294967295 65536 923972 3196878608 0 0 0 0 0 '
+                '0 0 0 0 -1 0 0 0 0 0 0 991224 991996 1011712 3196878814 3196878820 '
+                '3196878820 3196878838 0',
+                '36 (ml worker (1)) S 0 0 0 0 -1 1077936192 2080 0 0 0 335 24 0 0 '
+                '20 0 9 0 29 5316608 930 4294967295 65536 923972 3196878608 0 0 0 0 '
+                '0 0 1 0 0 -1 0 0 0 0 0 0 991224 991996 1011712 3196878814 3196878820 '
+                '3196878820 3196878838 0',
+                '42 (ml_shell) S 0 0 0 0 -1 4194368 0 0 0 0 0 0 0 0 20 0 9 0 30 '
+                '5316608 930 4294967295 65536 923972 3196878608 0 0 0 0 0 0 1 0 0 '
+                '-1 0 0 0 0 0 0 991224 991996 1011712 3196878814 3196878820 '
+                '3196878820 3196878838 0'
+            ])
+
+        self.assertEqual(rows[0].as_dict(),
+                         {
+                             'name': 'bunga_server',
+                             'pid': '49',
+                             'state': 'running',
+                             'ticks': 339,
+                             'cpu': 24.0
+                         })
+        self.assertEqual(
+            linux.format_top(rows),
+            'NAME               PID  STATE     CPU-TICKS   CPU%\n'
+            '--------------------------------------------------\n'
+            'bunga_server       49   running   339         24.0\n'
+            'ml worker (1)      36   sleeping  359          1.0\n'
+            'ml_shell           42   sleeping  0              -\n'
+            'idle               -    -         177892     175.0\n')
+
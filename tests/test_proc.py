@@ -0,0 +1,175 @@
+import unittest
+
+import bunga.proc as proc
+
+
+class ProcTest(unittest.TestCase):
+
+    def test_stat(self):
+        stat = proc.parse_stat(
+            'cpu  4812 0 859 177717 213 0 97 0 0 0\n'
+            'cpu0 2406 0 430 88858 106 0 48 0 0 0\n'
+            'cpu1 2406 0 429 88859 107 0 49 0 0 0\n'
+            'intr 60213 9 0 0 0 0\n'
+            'ctxt 120713\n'
+            'btime 1792318981\n'
+            'processes 1095\n'
+            'procs_running 2\n'
+            'procs_blocked 1\n'
+            'softirq 31016 0 10071 2 1290 0 0 3 9810 0 9840\n')
+
+        self.assertEqual(stat.cpu,
+                         proc.CpuTimes('cpu', 4812, 0, 859, 177717, 213, 0, 97))
+        self.assertEqual(stat.cpu.total, 183698)
+        self.assertEqual([cpu.name for cpu in stat.cpus], ['cpu0', 'cpu1'])
+        self.assertEqual(stat.cpus[1].idle, 88859)
+        self.assertEqual(stat.interrupts, 60213)
+        self.assertEqual(stat.context_switches, 120713)
+        self.assertEqual(stat.boot_time, 1792318981)
+        self.assertEqual(stat.processes, 1095)
+        self.assertEqual(stat.procs_running, 2)
+        self.assertEqual(stat.procs_blocked, 1)
+
+        # Only the first line, as returned by bunga_ps_stat, and an
+        # old kernel with fewer columns.
+        stat = proc.parse_stat('cpu  4812 0 859 177717')
+        self.assertEqual(stat.cpu.idle, 177717)
+        self.assertEqual(stat.cpu.steal, 0)
+        self.assertEqual(stat.cpus, [])
+        self.assertIsNone(stat.context_switches)
+
+    def test_process_stat(self):
+        stat = proc.parse_process_stat(
+            '36 (ml worker (1)) S 1 36 36 0 -1 1077936192 2080 0 0 0 334 24 0 '
+            '0 20 0 9 0 29 5316608 930 4294967295 65536 923972 3196878608 0 0 '
+            '0 0 0 0 1 0 0 -1 0 0 0 0 0 0 991224 991996 1011712 3196878814 '
+            '3196878820 3196878820 3196878838 0')
+
+        self.assertEqual(stat.pid, 36)
+        self.assertEqual(stat.name, 'ml worker (1)')
+        self.assertEqual(stat.state, 'S')
+        self.assertEqual(stat.ppid, 1)
+        self.assertEqual(stat.tpgid, -1)
+        self.assertEqual(stat.minflt, 2080)
+        self.assertEqual(stat.utime, 334)
+        self.assertEqual(stat.stime, 24)
+        self.assertEqual(stat.ticks, 358)
+        self.assertEqual(stat.priority, 20)
+        self.assertEqual(stat.num_threads, 9)
+        self.assertEqual(stat.starttime, 29)
+        self.assertEqual(stat.vsize, 5316608)
+        self.assertEqual(stat.rss, 930)
+
+    def test_meminfo(self):
+        meminfo = proc.parse_meminfo(
+            'MemTotal:       16318912 kB\n'
+            'MemFree:         8117164 kB\n'
+            'Buffers:          290968 kB\n'
+            'Cached:          4563812 kB\n'
+            'Active(anon):    2451344 kB\n'
+            'SwapTotal:             0 kB\n'
+            'HugePages_Total:       0\n'
+            'Hugepagesize:       2048 kB\n')
+
+        self.assertEqual(meminfo.total, 16318912 * 1024)
+        self.assertEqual(meminfo.free, 8117164 * 1024)
+        self.assertIsNone(meminfo.available)
+        self.assertEqual(meminfo.buffers, 290968 * 1024)
+        self.assertEqual(meminfo.cached, 4563812 * 1024)
+        self.assertEqual(meminfo.swap_total, 0)
+        self.assertIsNone(meminfo.swap_free)
+        self.assertEqual(meminfo.values['Active(anon)'], 2451344 * 1024)
+        self.assertEqual(meminfo.values['HugePages_Total'], 0)
+        self.assertEqual(meminfo.values['Hugepagesize'], 2048 * 1024)
+
+    def test_net_dev(self):
+        devices = proc.parse_net_dev(
+            'Inter-|   Receive                                                |'
+            '  Transmit\n'
+            ' face |bytes    packets errs drop fifo frame compressed multicast|'
+            'bytes    packets errs drop fifo colls carrier compressed\n'
+            '    lo:  374901    7049    0    0    0     0          0         0'
+            '   374901    7049    0    0    0     0       0          0\n'
+            '  eth0:4294967296 3155 1 2 3 4 5 6 290894 2680 7 8 9 10 11 12\n')
+
+        self.assertEqual([device.name for device in devices], ['lo', 'eth0'])
+        self.assertEqual(devices[0].rx_bytes, 374901)
+        self.assertEqual(devices[0].tx_packets, 7049)
+        self.assertEqual(devices[1].as_dict(),
+                         {
+                             'name': 'eth0',
+                             'rx_bytes': 4294967296,
+                             'rx_packets': 3155,
+                             'rx_errors': 1,
+                             'rx_dropped': 2,
+                             'rx_fifo': 3,
+                             'rx_frame': 4,
+                             'rx_compressed': 5,
+                             'rx_multicast': 6,
+                             'tx_bytes': 290894,
+                             'tx_packets': 2680,
+                             'tx_errors': 7,
+                             'tx_dropped': 8,
+                             'tx_fifo': 9,
+                             'tx_collisions': 10,
+                             'tx_carrier': 11,
+                             'tx_compressed': 12
+                         })
+
+    def test_diskstats(self):
+        disks = proc.parse_diskstats(
+            ' 259       0 nvme0n1 45031 8123 3521470 9912 108274 60291 7462994 '
+            '107355 0 83608 121287 0 0 0 0 4107 4019\n'
+            ' 259       1 nvme0n1p1 301 0 20462 83 2 0 2 0 0 120 84 0 0 0 0 0 '
+            '0\n')
+
+        self.assertEqual([(disk.major, disk.minor, disk.name) for disk in disks],
+                         [(259, 0, 'nvme0n1'), (259, 1, 'nvme0n1p1')])
+        self.assertEqual(disks[0].reads, 45031)
+        self.assertEqual(disks[0].sectors_written, 7462994)
+        self.assertEqual(disks[0].weighted_io_time, 121287)
+        self.assertEqual(disks[1].io_time, 120)
+
+        # Kernels before 4.18 have 14 columns.
+        disks = proc.parse_diskstats(
+            '   8       0 sda 1 2 3 4 5 6 7 8 9 10 11\n')
+        self.assertEqual(disks[0].weighted_io_time, 11)
+        self.assertEqual(proc.parse_diskstats(''), [])
+
+        # Partitions in kernels before 2.6.25 have 7 columns.
+        disks = proc.parse_diskstats(
+            '   3       0 hda 1 2 3 4 5 6 7 8 9 10 11\n'
+            '   3       1 hda1 12 13 14 15\n')
+        self.assertEqual(disks[0].weighted_io_time, 11)
+        self.assertEqual(disks[1].as_dict(),
+                         {
+                             'major': 3,
+                             'minor': 1,
+                             'name': 'hda1',
+                             'reads': 12,
+                             'reads_merged': 0,
+                             'sectors_read': 13,
+                             'read_time': 0,
+                             'writes': 14,
+                             'writes_merged': 0,
+                             'sectors_written': 15,
+                             'write_time': 0,
+                             'ios_in_progress': 0,
+                             'io_time': 0,
+                             'weighted_io_time': 0
+                         })
+        self.assertEqual(
+            proc.parse_diskstats('   3       1 hda1 12 13 14 15\n')[0].writes,
+            14)
+
+        with self.assertRaises(ValueError):
+            proc.parse_diskstats('   8       0 sda 1 2 3 4 5 6 7 8 9 10 11\n'
+                                 '   8       1 sda1 1 2 3\n')
+
+    def test_loadavg(self):
+        self.assertEqual(proc.parse_loadavg('0.49 0.45 0.46 3/35 102\n'),
+                         proc.LoadAvg(0.49, 0.45, 0.46, 3, 35, 102))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,236 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import bunga
+
+from .utils import create_refused_uri
+
+
+class ReconnectTest(unittest.TestCase):
+
+    def test_policy_without_next_delay(self):
+        with self.assertRaises(TypeError):
+            bunga.ReconnectPolicy()
+
+    def test_fixed_delay(self):
+        policy = bunga.FixedDelay(2, attempts=3)
+        self.assertEqual(policy.delay(1, None), 2)
+        self.assertEqual(policy.delay(2, 2), 2)
+        self.assertIsNone(policy.delay(3, 2))
+        self.assertEqual(bunga.FixedDelay().delay(1000, 1), 1)
+
+    def test_exponential_backoff(self):
+        policy = bunga.ExponentialBackoff(base=0.5, cap=10, jitter=False)
+        self.assertEqual([policy.delay(failures, None)
+                          for failures in range(1, 8)],
+                         [0.5, 1, 2, 4, 8, 10, 10])
+        self.assertEqual(policy.delay(100000, None), 10)
+
+        policy = bunga.ExponentialBackoff(base=1, cap=10, attempts=5)
+
+        with patch('random.uniform', return_value=1.5) as uniform:
+            self.assertEqual(policy.delay(3, None), 1.5)
+
+        uniform.assert_called_once_with(0, 4)
+
+        for _ in range(100):
+            self.assertLessEqual(0, policy.delay(4, None))
+            self.assertLessEqual(policy.delay(4, None), 8)
+
+        self.assertIsNone(policy.delay(5, None))
+
+    def test_decorrelated_jitter(self):
+        policy = bunga.DecorrelatedJitter(base=1, cap=5)
+
+        with patch('random.uniform', return_value=2) as uniform:
+            self.assertEqual(policy.delay(1, None), 2)
+            self.assertEqual(policy.delay(2, 1.5), 2)
+
+        self.assertEqual(uniform.call_args_list[0][0], (1, 3))
+        self.assertEqual(uniform.call_args_list[1][0], (1, 4.5))
+
+        for _ in range(100):
+            delay = policy.delay(10, 4)
+            self.assertLessEqual(1, delay)
+            self.assertLessEqual(delay, 5)
+
+    def test_connect_statistics(self):
+        asyncio.run(self.connect_statistics())
+
+    async def connect_statistics(self):
+        client = bunga.Client(create_refused_uri(),
+                              asyncio.get_event_loop(),
+                              reconnect_policy=bunga.FixedDelay(0.01, 3))
+        client.start()
+
+        with self.assertRaises(ConnectionRefusedError):
+            await client.wait_for_connection()
+
+        statistics = client.connect_statistics
+        self.assertEqual(statistics.attempts, 3)
+        self.assertEqual(statistics.connects, 0)
+        self.assertEqual(statistics.refused, 3)
+        self.assertEqual(statistics.timeouts, 0)
+        self.assertEqual(statistics.errors, 0)
+        self.assertEqual(statistics.failures, 3)
+        self.assertEqual(statistics.consecutive_failures, 3)
+        self.assertEqual(statistics.delay, 0.01)
+        self.assertAlmostEqual(statistics.total_delay, 0.02)
+        client.stop()
+
+    def test_connect_statistics_after_restart(self):
+        asyncio.run(self.connect_statistics_after_restart())
+
+    async def connect_statistics_after_restart(self):
+        uri = create_refused_uri()
+        client = bunga.Client(uri,
+                              asyncio.get_event_loop(),
+                              reconnect_policy=bunga.DecorrelatedJitter(0.01,
+                                                                        0.05))
+        client.start()
+
+        while client.connect_statistics.refused < 3:
+            await asyncio.sleep(0.01)
+
+        server = bunga.Server(uri)
+        await server.start()
+        await client.wait_for_connection(5)
+
+        statistics = client.connect_statistics
+        self.assertEqual(statistics.connects, 1)
+        self.assertEqual(statistics.attempts, statistics.refused + 1)
+        self.assertEqual(statistics.consecutive_failures, 0)
+        self.assertIsNone(statistics.delay)
+        self.assertGreaterEqual(statistics.total_delay, 0.03)
+        client.stop()
+        await server.stop()
+
+    def test_closed_before_connect_rsp(self):
+        asyncio.run(self.closed_before_connect_rsp())
+
+    async def closed_before_connect_rsp(self):
+        # Accepts and closes all connections, as a server with all
+        # client slots in use.
+        async def close(reader, writer):
+            writer.close()
+
+        listener = await asyncio.start_server(close, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        client = bunga.Client(f'tcp://127.0.0.1:{port}',
+                              asyncio.get_event_loop(),
+                              reconnect_policy=bunga.ExponentialBackoff(
+                                  base=0.05,
+                                  jitter=False,
+                                  attempts=4))
+        client.start()
+
+        with self.assertRaises(bunga.client.ConnectionClosedError):
+            await client.wait_for_connection()
+
+        statistics = client.connect_statistics
+        self.assertEqual(statistics.attempts, 4)
+        self.assertEqual(statistics.connects, 4)
+        self.assertEqual(statistics.closed, 4)
+        self.assertEqual(statistics.failures, 4)
+        self.assertEqual(statistics.consecutive_failures, 4)
+        self.assertEqual(statistics.delay, 0.2)
+        self.assertAlmostEqual(statistics.total_delay, 0.35)
+        client.stop()
+        listener.close()
+        await listener.wait_closed()
+
+    def test_fleet_closed_before_connect_rsp(self):
+        asyncio.run(self.fleet_closed_before_connect_rsp())
+
+    async def fleet_closed_before_connect_rsp(self):
+        async def close(reader, writer):
+            writer.close()
+
+        listener = await asyncio.start_server(close, '127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        uri = f'tcp://127.0.0.1:{port}'
+        fleet = bunga.Fleet([uri], timeout=5)
+        results = [result async for result in fleet.execute_command('date')]
+
+        # Gives up at once instead of retrying until the timeout.
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].error,
+                         'Connection closed before connect response.')
+        listener.close()
+        await listener.wait_closed()
+
+    def test_connection_lost(self):
+        asyncio.run(self.connection_lost())
+
+    async def connection_lost(self):
+        server = bunga.Server('tcp://127.0.0.1:0')
+        await server.start()
+        policy = bunga.FixedDelay(0.01)
+        client = bunga.Client(server.uri,
+                              asyncio.get_event_loop(),
+                              reconnect_policy=policy)
+
+        with patch.object(policy, 'next_delay', wraps=policy.next_delay) as delay:
+            client.start()
+            await client.wait_for_connection()
+            delay.assert_not_called()
+            await server.stop()
+
+            while client.is_connected():
+                await asyncio.sleep(0.01)
+
+            while delay.call_count == 0:
+                await asyncio.sleep(0.01)
+
+        # The policy delays also the first reconnect after a lost
+        # connection.
+        self.assertEqual(delay.call_args_list[0][0], (1, None))
+        self.assertGreaterEqual(client.connect_statistics.total_delay, 0.01)
+        client.stop()
+
+    def test_connection_lost_attempts(self):
+        asyncio.run(self.connection_lost_attempts())
+
+    async def connection_lost_attempts(self):
+        server = bunga.Server('tcp://127.0.0.1:0')
+        await server.start()
+        client = bunga.Client(server.uri,
+                              asyncio.get_event_loop(),
+                              reconnect_policy=bunga.FixedDelay(0.01, 2))
+        client.start()
+        await client.wait_for_connection()
+        await server.stop()
+
+        while client.is_connected():
+            await asyncio.sleep(0.01)
+
+        # The lost connection and the refused reconnect use up both
+        # attempts.
+        with self.assertRaises(ConnectionRefusedError):
+            await client.wait_for_connection(5)
+
+        statistics = client.connect_statistics
+        self.assertEqual(statistics.attempts, 2)
+        self.assertEqual(statistics.connects, 1)
+        self.assertEqual(statistics.refused, 1)
+        self.assertEqual(statistics.consecutive_failures, 2)
+        client.stop()
+
+    def test_fleet(self):
+        asyncio.run(self.fleet())
+
+    async def fleet(self):
+        refused_uri = create_refused_uri()
+        fleet = bunga.Fleet([refused_uri],
+                            timeout=5,
+                            reconnect_policy=bunga.FixedDelay(0, 2))
+        results = [result async for result in fleet.execute_command('date')]
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].uri, refused_uri)
+        self.assertIn('Connect call failed', results[0].error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,526 @@
+import os
+import time
+import asyncio
+import unittest
+import tempfile
+from io import BytesIO
+from unittest.mock import patch
+
+import bunga
+from bunga import bunga_pb2
+from bunga.bunga_client import MessageType
+from bunga.server import ServerClient
+from bunga.transport import pack_header
+
+
+async def start(root):
+    server = bunga.Server('tcp://127.0.0.1:0', root=root)
+    await server.start()
+    client = bunga.Client(server.uri, asyncio.get_event_loop())
+    client.start()
+    await client.wait_for_connection()
+
+    return server, client
+
+
+async def stop(server, client):
+    client.stop()
+    await server.stop()
+
+
+async def nop(argv):
+    return b''
+
+
+def write_message(writer, message):
+    encoded = message.SerializeToString()
+    writer.write(pack_header(MessageType.CLIENT_TO_SERVER_USER, len(encoded))
+                 + encoded)
+
+
+class ServerTest(unittest.TestCase):
+
+    def test_execute_command(self):
+        asyncio.run(self.execute_command())
+
+    async def execute_command(self):
+        async def date(argv):
+            return '2020'
+
+        async def count(argv):
+            for i in range(int(argv[1])):
+                yield f'{i}\n'
+
+        async def fail(argv):
+            raise OSError(5, 'Input/output error')
+
+        with tempfile.TemporaryDirectory() as root:
+            server, client = await start(root)
+            server.add_command('date', date)
+            server.add_command('count', count)
+            server.add_command('fail', fail)
+
+            self.assertEqual(await client.execute_command('date'), b'2020')
+            self.assertEqual(await client.execute_command('echo "a  b" c'),
+                             b'a  b c\n')
+
+            chunks = []
+
+            async for chunk in client.execute_command_stream('count 1000'):
+                chunks.append(chunk)
+
+            self.assertEqual(b''.join(chunks),
+                             ''.join(f'{i}\n' for i in range(1000)).encode())
+
+            with self.assertRaises(bunga.ExecuteCommandError) as cm:
+                await client.execute_command('bad')
+
+            self.assertEqual(cm.exception.error, 'No such file or directory')
+
+            with self.assertRaises(bunga.ExecuteCommandError) as cm:
+                await client.execute_command('fail')
+
+            self.assertEqual(cm.exception.error, 'Input/output error')
+
+            await stop(server, client)
+
+    def test_execute_many(self):
+        asyncio.run(self.execute_many())
+
+    async def execute_many(self):
+        event = asyncio.Event()
+
+        async def wait(argv):
+            await event.wait()
+
+            return 'waited\n'
+
+        async def release(argv):
+            event.set()
+
+            return 'released\n'
+
+        with tempfile.TemporaryDirectory() as root:
+            server, client = await start(root)
+            server.add_command('wait', wait)
+            server.add_command('release', release)
+
+            # Would never complete if executed one at a time.
+            results = await asyncio.wait_for(
+                client.execute_many(['wait', 'bad', 'echo hi', 'release']),
+                5)
+
+            self.assertEqual(len(results), 4)
+            self.assertEqual(results[0], b'waited\n')
+            self.assertIsInstance(results[1], bunga.ExecuteCommandError)
+            self.assertEqual(results[1].error, 'No such file or directory')
+            self.assertEqual(results[2:], [b'hi\n', b'released\n'])
+            self.assertEqual(await client.execute_many([]), [])
+
+            fleet = bunga.Fleet([server.uri, server.uri])
+            results = [result async for result in fleet.execute_many(
+                ['echo a', 'echo b'])]
+            self.assertEqual([result.value for result in results],
+                             2 * [[b'a\n', b'b\n']])
+
+            await stop(server, client)
+
+    def test_get_and_put_file(self):
+        asyncio.run(self.get_and_put_file())
+
+    async def get_and_put_file(self):
+        data = os.urandom(100000) + 100000 * b'a'
+
+        with tempfile.TemporaryDirectory() as root:
+            server, client = await start(root)
+
+            for compress in [False, True]:
+                await client.put_file(BytesIO(data),
+                                      len(data),
+                                      '/dir/file.bin',
+                                      compress=compress,
+                                      mtime=1600000000,
+                                      create_directories=True,
+                                      verify=True)
+                path = os.path.join(root, 'dir', 'file.bin')
+
+                with open(path, 'rb') as fin:
+                    self.assertEqual(fin.read(), data)
+
+                self.assertEqual(os.stat(path).st_mtime, 1600000000)
+                self.assertEqual(await client.get_file('/dir/file.bin',
+                                                       compress=compress,
+                                                       verify=True),
+                                 data)
+
+            self.assertEqual(await client.get_file('/dir/file.bin',
+                                                   offset=1000,
+                                                   length=2000),
+                             data[1000:3000])
+            self.assertEqual(await client.get_file('/dir/file.bin',
+                                                   offset=4,
+                                                   length=0),
+                             b'')
+
+            with self.assertRaises(bunga.client.GetFileError) as cm:
+                await client.get_file('/missing.bin')
+
+            self.assertEqual(cm.exception.error, 'No such file or directory')
+
+            self.assertEqual(await client.execute_command('cat dir/file.bin'),
+                             data)
+
+            await stop(server, client)
+
+    def test_put_file_delta(self):
+        asyncio.run(self.put_file_delta())
+
+    async def put_file_delta(self):
+        old = os.urandom(20000)
+        new = old[:5000] + b'new data' + old[5000:]
+
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, 'file.bin')
+
+            with open(path, 'wb') as fout:
+                fout.write(old)
+
+            server, client = await start(root)
+            sent = await client.put_file_delta(BytesIO(new),
+                                               len(new),
+                                               '/file.bin',
+                                               block_size=1000,
+                                               verify=True)
+            self.assertLess(sent, 2000)
+
+            with open(path, 'rb') as fin:
+                self.assertEqual(fin.read(), new)
+
+            self.assertEqual(os.listdir(root), ['file.bin'])
+
+            # Failing to keep the permissions closes both files and
+            # removes the temporary file.
+            with patch('os.chmod', side_effect=PermissionError(1, 'Denied')):
+                with self.assertRaises(bunga.client.PutFileError) as cm:
+                    await client.put_file_delta(BytesIO(old),
+                                                len(old),
+                                                '/file.bin',
+                                                block_size=1000)
+
+            self.assertEqual(cm.exception.error, 'Open failed.')
+            self.assertEqual(os.listdir(root), ['file.bin'])
+
+            await stop(server, client)
+
+    def test_outside_root(self):
+        asyncio.run(self.outside_root())
+
+    async def outside_root(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            root = os.path.join(tmpdir, 'root')
+            os.mkdir(root)
+            secret = os.path.join(tmpdir, 'secret')
+
+            with open(secret, 'wb') as fout:
+                fout.write(b'secret')
+
+            os.symlink(secret, os.path.join(root, 'link'))
+            server, client = await start(root)
+
+            for path in ['../secret', '/../secret', 'link']:
+                with self.assertRaises(bunga.client.GetFileError) as cm:
+                    await client.get_file(path)
+
+                self.assertEqual(cm.exception.error, 'Permission denied')
+
+                with self.assertRaises(bunga.client.ExecuteCommandError) as cm:
+                    await client.execute_command(f'cat {path}')
+
+                self.assertEqual(cm.exception.error, 'Permission denied')
+
+                with self.assertRaises(bunga.client.PutFileError) as cm:
+                    await client.put_file(BytesIO(b'new'), 3, path)
+
+                self.assertEqual(cm.exception.error, 'Open failed.')
+
+                with self.assertRaises(bunga.client.PutFileError) as cm:
+                    await client.put_file_delta(BytesIO(b'new'), 3, path)
+
+            with self.assertRaises(bunga.client.ListFilesError) as cm:
+                await client.list_files('..')
+
+            with self.assertRaises(bunga.client.ExecuteCommandError):
+                await client.execute_command('ls ..')
+
+            with open(secret, 'rb') as fin:
+                self.assertEqual(fin.read(), b'secret')
+
+            self.assertEqual(sorted(os.listdir(tmpdir)), ['root', 'secret'])
+            await stop(server, client)
+
+    def test_put_file_create_directories_failure(self):
+        asyncio.run(self.put_file_create_directories_failure())
+
+    async def put_file_create_directories_failure(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, 'f'), 'wb'):
+                pass
+
+            server, client = await start(root)
+
+            with self.assertRaises(bunga.client.PutFileError) as cm:
+                await client.put_file(BytesIO(b'c'),
+                                      1,
+                                      '/f/sub/c',
+                                      create_directories=True)
+
+            self.assertEqual(cm.exception.error, 'Open failed.')
+
+            # Still connected.
+            self.assertEqual(await client.execute_command('echo hi'), b'hi\n')
+            await stop(server, client)
+
+    def test_get_tree_and_put_tree(self):
+        asyncio.run(self.get_tree_and_put_tree())
+
+    async def get_tree_and_put_tree(self):
+        with tempfile.TemporaryDirectory() as root:
+            with tempfile.TemporaryDirectory() as local:
+                os.makedirs(os.path.join(local, 'a', 'b'))
+
+                for name, data in [('1.txt', b'1'), ('a/2.txt', b'22'), ('a/b/3.txt', b'')]:
+                    with open(os.path.join(local, name), 'wb') as fout:
+                        fout.write(data)
+
+                server, client = await start(root)
+                self.assertEqual(sorted(await client.put_tree(local, '/tree')),
+                                 ['1.txt', 'a/2.txt', 'a/b/3.txt'])
+                self.assertEqual(await client.put_tree(local, '/tree'), [])
+                files = await client.list_files('/tree')
+                self.assertEqual(sorted((info.path, info.size) for info in files),
+                                 [('1.txt', 1), ('a/2.txt', 2), ('a/b/3.txt', 0)])
+
+                with self.assertRaises(bunga.client.ListFilesError):
+                    await client.list_files('/missing')
+
+                got = os.path.join(local, 'got')
+                self.assertEqual(sorted(await client.get_tree('/tree', got)),
+                                 ['1.txt', 'a/2.txt', 'a/b/3.txt'])
+
+                with open(os.path.join(got, 'a', '2.txt'), 'rb') as fin:
+                    self.assertEqual(fin.read(), b'22')
+
+                await stop(server, client)
+
+    def test_get_tree_invalid_path(self):
+        asyncio.run(self.get_tree_invalid_path())
+
+    async def get_tree_invalid_path(self):
+        with tempfile.TemporaryDirectory() as root:
+            with tempfile.TemporaryDirectory() as local:
+                with open(os.path.join(root, '1.txt'), 'wb') as fout:
+                    fout.write(b'1')
+
+                server, client = await start(root)
+                got = os.path.join(local, 'got')
+                os.makedirs(got)
+                os.symlink(local, os.path.join(got, 'link'))
+
+                for path in ['../1.txt', 'a/../../1.txt', '/1.txt', '.', 'link/1.txt']:
+                    async def list_files(remote_path):
+                        return [bunga.client.FileInfo('1.txt', 1, 0),
+                                bunga.client.FileInfo(path, 1, 0)]
+
+                    client.list_files = list_files
+
+                    with self.assertRaises(bunga.client.GetFileError) as cm:
+                        await client.get_tree('/', got)
+
+                    self.assertEqual(cm.exception.error, 'Invalid path.')
+                    self.assertEqual(sorted(os.listdir(local)), ['got'])
+                    self.assertEqual(sorted(os.listdir(got)), ['link'])
+
+                await stop(server, client)
+
+    def test_log(self):
+        asyncio.run(self.log())
+
+    async def log(self):
+        class Client(bunga.Client):
+
+            def __init__(self, uri):
+                super().__init__(uri, asyncio.get_event_loop())
+                self.log_entries = asyncio.Queue()
+
+            async def on_log_entry_ind(self, message):
+                await self.log_entries.put(''.join(message.text))
+
+        with tempfile.TemporaryDirectory() as root:
+            server = bunga.Server('tcp://127.0.0.1:0', root=root)
+            await server.start()
+            client = Client(server.uri)
+            client.start()
+            await client.wait_for_connection()
+            server.log('Hello!')
+            entry = await client.log_entries.get()
+            self.assertRegex(entry, r'^\[ {4}\d\.\d{6}\] Hello!$')
+            await stop(server, client)
+
+    def test_ps(self):
+        asyncio.run(self.ps())
+
+    async def ps(self):
+        server = bunga.Server('tcp://127.0.0.1:0')
+        await server.start()
+        client = bunga.Client(server.uri, asyncio.get_event_loop())
+        client.start()
+        await client.wait_for_connection()
+        pid = os.getpid()
+        threads = set(os.listdir(f'/proc/{pid}/task'))
+
+        # A single command.
+        output = (await client.execute_command(f'ps {pid}')).decode()
+        lines = output.splitlines()
+        self.assertEqual(lines[0].split(),
+                         ['NAME', 'PID', 'STATE', 'CPU-TICKS', 'CPU-DELTA'])
+        self.assertEqual({line.split()[1] for line in lines[2:-1]}, threads)
+        self.assertEqual(lines[-1].split()[:3], ['idle', '-', '-'])
+        self.assertTrue(client._ps_stat_supported)
+
+        # A command per thread for servers without bunga_ps_stat. Deltas
+        # since the previous ps are shown.
+        del server._commands['bunga_ps_stat']
+        output = (await client.execute_command(f'ps {pid}')).decode()
+        lines = output.splitlines()
+        self.assertEqual({line.split()[1] for line in lines[2:-1]}, threads)
+        self.assertNotEqual(lines[-1].split()[-1], '-')
+        self.assertFalse(client._ps_stat_supported)
+
+        with self.assertRaises(bunga.ExecuteCommandError):
+            await client.execute_command('ps 999999999')
+
+        await stop(server, client)
+
+    def test_frame_too_large(self):
+        asyncio.run(self.frame_too_large())
+
+    async def frame_too_large(self):
+        with tempfile.TemporaryDirectory() as root:
+            server = bunga.Server('tcp://127.0.0.1:0',
+                                  root=root,
+                                  maximum_message_size=512)
+            await server.start()
+            host, port = server.uri[6:].split(':')
+            reader, writer = await asyncio.open_connection(host, int(port))
+
+            # The server closes the connection instead of receiving a
+            # 16 MiB frame.
+            writer.write(b'\x01\xff\xff\xff')
+            self.assertEqual(await asyncio.wait_for(reader.read(), 2), b'')
+            writer.close()
+            await server.stop()
+
+    def test_keep_alive(self):
+        asyncio.run(self.keep_alive())
+
+    async def keep_alive(self):
+        data = os.urandom(100000)
+
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, 'file.bin'), 'wb') as fout:
+                fout.write(data)
+
+            server = bunga.Server('tcp://127.0.0.1:0',
+                                  root=root,
+                                  maximum_message_size=512)
+            await server.start()
+            client = bunga.Client(server.uri,
+                                  asyncio.get_event_loop(),
+                                  keep_alive_timeout=1)
+            client.start()
+            await client.wait_for_connection()
+            self.assertEqual([c.ping_timeout for c in server._clients], [2])
+
+            # Pings are sent every second as requested.
+            self.assertEqual(client.rtt.samples, 0)
+            self.assertIsNone(client._get_file_window_size())
+            await asyncio.sleep(2.5)
+            self.assertEqual(client.rtt.samples, 2)
+            self.assertLessEqual(client.rtt.minimum, client.rtt.latest)
+            self.assertLess(client.rtt.smoothed, 1)
+
+            # The get file window is sized for the round trip time.
+            client.rtt.smoothed = 0.1
+            self.assertEqual(client._get_file_window_size(), 196)
+            client.rtt.smoothed = 10
+            self.assertEqual(client._get_file_window_size(), 1000)
+            client.rtt.smoothed = 0.01
+            self.assertIsNone(client._get_file_window_size())
+            client.rtt.smoothed = 0.1
+            self.assertEqual(await client.get_file('/file.bin'), data)
+
+            await stop(server, client)
+
+    def test_keep_alive_only_pings(self):
+        asyncio.run(self.keep_alive_only_pings())
+
+    async def keep_alive_only_pings(self):
+        server = bunga.Server('tcp://127.0.0.1:0')
+        server.add_command('nop', nop)
+        await server.start()
+        host, port = server.uri[6:].split(':')
+        reader, writer = await asyncio.open_connection(host, int(port))
+        message = bunga_pb2.ClientToServer()
+        message.connect_req.keep_alive_timeout = 1
+        write_message(writer, message)
+        start_time = time.monotonic()
+        read_task = asyncio.create_task(reader.read())
+
+        # Other messages than pings do not keep the connection alive,
+        # so it is closed after the ping timeout of 2 seconds.
+        while not read_task.done() and time.monotonic() - start_time < 5:
+            message = bunga_pb2.ClientToServer()
+            message.execute_command_req.command = 'nop'
+            write_message(writer, message)
+            await asyncio.sleep(0.2)
+
+        self.assertTrue(read_task.done())
+        self.assertLess(time.monotonic() - start_time, 3)
+        writer.close()
+        await server.stop()
+
+    def test_keep_alive_long_round_trip_time(self):
+        asyncio.run(self.keep_alive_long_round_trip_time())
+
+    async def keep_alive_long_round_trip_time(self):
+        send_pong = ServerClient.send_pong
+
+        # Pongs delayed longer than half the keep alive timeout, as on
+        # a satellite link.
+        def delayed_send_pong(client):
+            asyncio.get_event_loop().call_later(1.2, send_pong, client)
+
+        with patch.object(ServerClient,
+                          'send_pong',
+                          delayed_send_pong):
+            server = bunga.Server('tcp://127.0.0.1:0')
+            await server.start()
+            client = bunga.Client(server.uri,
+                                  asyncio.get_event_loop(),
+                                  keep_alive_timeout=1)
+            client.start()
+            await client.wait_for_connection()
+            await asyncio.sleep(5)
+
+            # Pings are still sent every second, so the server does not
+            # disconnect the client.
+            self.assertTrue(client.is_connected())
+            self.assertEqual(client.connect_statistics.connects, 1)
+            self.assertGreaterEqual(client.rtt.samples, 3)
+            self.assertGreaterEqual(client.rtt.minimum, 1.2)
+
+            await stop(server, client)
+
+
+if __name__ == '__main__':
+    unittest.main()
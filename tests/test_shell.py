@@ -14,6 +14,7 @@ class Client:
 
     def __init__(self):
         self.execute_command = Mock()
+        self.execute_command_stream = Mock()
         self.wait_for_connection = Mock()
 
 
@@ -178,20 +179,18 @@ class ShellTest(unittest.TestCase):
         ]
         client = Client()
         client.execute_command.side_effect = [
-            b'\nCommands\n',
-            b'2021'
+            b'\nCommands\n'
         ]
+        client.execute_command_stream.return_value = iter([b'20', b'21', b'\xc3'])
         stdout = StringIO()
 
         with patch('sys.stdout', stdout):
             shell.shell_main(client)
 
-        self.assertEqual(client.execute_command.call_args_list,
-                         [
-                             call('help'),
-                             call('date')
-                         ])
-        self.assertIn('2021', stdout.getvalue())
+        self.assertEqual(client.execute_command.call_args_list, [call('help')])
+        self.assertEqual(client.execute_command_stream.call_args_list,
+                         [call('date')])
+        self.assertIn('2021\ufffd', stdout.getvalue())
 
     @patch('prompt_toolkit.prompt')
     def test_execute_command_error(self, prompt):
@@ -201,19 +200,22 @@ class ShellTest(unittest.TestCase):
         ]
         client = Client()
         client.execute_command.side_effect = [
-            b'\nCommands\n',
-            bunga.ExecuteCommandError('bad', b'', 'Bad command.')
+            b'\nCommands\n'
         ]
+
+        def execute_command_stream(command):
+            yield b'partial'
+
+            raise bunga.ExecuteCommandError(command, b'', 'Bad command.')
+
+        client.execute_command_stream.side_effect = execute_command_stream
         stdout = StringIO()
 
         with patch('sys.stdout', stdout):
             shell.shell_main(client)
 
-        self.assertEqual(client.execute_command.call_args_list,
-                         [
-                             call('help'),
-                             call('bad')
-                         ])
+        self.assertEqual(client.execute_command.call_args_list, [call('help')])
+        self.assertIn('partial', stdout.getvalue())
         self.assertIn('ERROR(Bad command.)', stdout.getvalue())
 
     def test_load_commands(self):
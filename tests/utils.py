@@ -29,3 +29,18 @@ def start_server(handler):
     server.start()
 
     return server, listener.getsockname()[1]
+
+
+def create_tcp_uri(listener):
+    address, port = listener.sockets[0].getsockname()
+
+    return f'tcp://{address}:{port}'
+
+
+def create_refused_uri():
+    sock = socket.socket()
+    sock.bind(('localhost', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    return f'tcp://127.0.0.1:{port}'